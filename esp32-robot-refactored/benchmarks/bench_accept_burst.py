@@ -0,0 +1,160 @@
+"""
+Ráfagas de conexiones contra el servidor síncrono: una por vuelta vs cola drenada
+
+Arranca el firmware en el emulador (sockets reales en localhost y el robot
+en el mundo 2D) dos veces en subprocesos: como antes (listen(1) y una
+conexión por vuelta del loop) y vaciando la cola de accept() hasta
+ACCEPT_BUDGET_MS con SERVER_BACKLOG pendientes. Lanza ráfagas de
+conexiones simultáneas a /status y mide la latencia de cada una.
+
+El kernel descarta los SYN que no caben en la cola y el cliente los
+reintenta al cabo de 1 s: esos son los picos de latencia. Drenar la cola
+los evita mientras la ráfaga quepa en SERVER_BACKLOG.
+
+Uso:
+    python benchmarks/bench_accept_burst.py [--burst N] [--bursts N]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+REQUEST = b"GET /status HTTP/1.1\r\nHost: robot\r\nConnection: close\r\n\r\n"
+
+VARIANTS = (
+    ("una por vuelta (listen(1))", 1, 0),
+    ("cola drenada, backlog 4", 4, 50),
+    ("cola drenada, backlog 16", 16, 50),
+)
+
+
+def serve(port, backlog, budget):
+    """Servidor síncrono del firmware en el emulador (no retorna)"""
+    import contextlib
+    import io
+
+    import emulator
+    from emulator.world import World
+
+    # Sin límite de peticiones: se mide la cola, no el rate limiting
+    emulator.install(
+        SERVER_PORT=port, SERVER_BACKLOG=backlog, ACCEPT_BUDGET_MS=budget,
+        RATE_LIMIT_REQUESTS=1 << 30, UDP_CONTROL_PORT=port + 1
+    )
+    emulator.attach_world(World.default())
+
+    from http_server import HTTPServer
+    from motor_controller import MotorController
+    from sensor_handler import UltrasonicSensor
+    from sensor_sampler import SensorSampler
+    from logger import Logger
+    from security_manager import SecurityManager
+    from auto_mode import AutoMode
+
+    logger = Logger()
+    logger.add = lambda message: None
+    motors = MotorController()
+    sampler = SensorSampler(UltrasonicSensor())
+    security = SecurityManager(logger)
+    auto_mode = AutoMode(motors, sampler, logger)
+    server = HTTPServer("127.0.0.1", motors, sampler, logger, security, auto_mode)
+    with contextlib.redirect_stdout(io.StringIO()):
+        server.start()
+
+
+def wait_ready(port, timeout=10.0):
+    """Espera a que el servidor acepte conexiones"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def fetch(port, results, errors):
+    """Una petición completa; guarda su latencia en ms o el tipo de error"""
+    start = time.perf_counter()
+    try:
+        sock = socket.create_connection(("127.0.0.1", port), timeout=10)
+        try:
+            sock.sendall(REQUEST)
+            while sock.recv(1024):
+                pass
+        finally:
+            sock.close()
+    except OSError as e:
+        errors.append(type(e).__name__)
+        return
+    results.append((time.perf_counter() - start) * 1000)
+
+
+def run_bursts(port, burst, bursts, pause):
+    """
+    Returns:
+        tuple: (latencias en ms, errores)
+    """
+    results = []
+    errors = []
+    for _ in range(bursts):
+        threads = [threading.Thread(target=fetch, args=(port, results, errors)) for _ in range(burst)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        time.sleep(pause)
+    return sorted(results), errors
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, (len(values) * p) // 100)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--burst", type=int, default=12, help="conexiones simultáneas por ráfaga")
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--pause", type=float, default=0.2, help="segundos entre ráfagas")
+    parser.add_argument("--port", type=int, default=18090)
+    parser.add_argument("--serve", nargs=3, type=int, metavar=("PORT", "BACKLOG", "BUDGET_MS"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(*args.serve)
+        return
+
+    print("{:<28} {:>8} {:>8} {:>8} {:>8} {:>8} {:>7}".format(
+        "servidor", "ok", "p50 ms", "p90 ms", "p99 ms", "max ms", "errores"))
+    for index, (name, backlog, budget) in enumerate(VARIANTS):
+        port = args.port + 2 * index
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", str(port), str(backlog), str(budget)],
+            cwd=ROOT_DIR
+        )
+        try:
+            if not wait_ready(port):
+                sys.exit("El servidor no arrancó en el puerto {}".format(port))
+            latencies, errors = run_bursts(port, args.burst, args.bursts, args.pause)
+        finally:
+            proc.kill()
+            proc.wait()
+
+        print("{:<28} {:>8} {:>8.1f} {:>8.1f} {:>8.1f} {:>8.1f} {:>7}".format(
+            name, len(latencies), percentile(latencies, 50), percentile(latencies, 90),
+            percentile(latencies, 99), latencies[-1] if latencies else float("nan"), len(errors)
+        ))
+
+
+if __name__ == "__main__":
+    main()
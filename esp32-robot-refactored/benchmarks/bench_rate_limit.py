@@ -0,0 +1,129 @@
+"""
+Rate limiting con miles de IPs de origen: listas de timestamps vs token bucket
+
+Simula una red compartida en la que --clients IPs distintas envían
+peticiones repartidas en el tiempo, con un reloj simulado (1 ms por
+petición). Compara el limitador original (lista de timestamps por IP,
+reconstruida en cada petición y sin expulsión) con RateLimiter, y mide
+tiempo por petición, tamaño de la tabla y memoria que retiene.
+
+Uso:
+    python benchmarks/bench_rate_limit.py [--clients N] [--requests N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emulator
+
+config = emulator.install()
+
+from rate_limiter import RateLimiter  # noqa: E402
+
+
+# Reloj simulado: el benchmark avanza el tiempo a mano
+_clock = [0]
+time.ticks_ms = lambda: _clock[0]
+
+
+class LegacyLimiter:
+    """Limitador original de HTTPServer (request_history)"""
+
+    def __init__(self):
+        self.request_history = {}
+
+    def allow(self, client_ip, expensive=False):
+        now = time.ticks_ms()
+        if client_ip not in self.request_history:
+            self.request_history[client_ip] = []
+        history = self.request_history[client_ip]
+        recent_requests = [ts for ts in history if time.ticks_diff(now, ts) < config.RATE_LIMIT_WINDOW_MS]
+        self.request_history[client_ip] = recent_requests
+        if len(recent_requests) >= config.RATE_LIMIT_REQUESTS:
+            return False
+        recent_requests.append(now)
+        return True
+
+
+def workload(clients, requests, seed=1):
+    """
+    Secuencia de IPs: un grupo pequeño de clientes habituales (dashboards)
+    mezclado con muchas IPs que aparecen pocas veces
+    """
+    rng = random.Random(seed)
+    regulars = ["192.168.1.{}".format(i) for i in range(2, 6)]
+    crowd = ["10.{}.{}.{}".format(i >> 16, (i >> 8) & 255, i & 255) for i in range(clients)]
+    return [rng.choice(regulars) if rng.random() < 0.5 else rng.choice(crowd) for _ in range(requests)]
+
+
+def _replay(limiter, ips):
+    """Pasa la secuencia por el limitador y devuelve las peticiones rechazadas"""
+    _clock[0] = 0
+    rejected = 0
+    for ip in ips:
+        _clock[0] += 1
+        if not limiter.allow(ip):
+            rejected += 1
+    return rejected
+
+
+def run(factory, ips):
+    """
+    Mide un limitador nuevo: (µs por petición, rechazadas, bytes retenidos, limitador)
+
+    El tiempo y la memoria se miden en pasadas separadas: tracemalloc
+    ralentiza cada asignación y falsearía la comparación.
+    """
+    limiter = factory()
+    start = time.perf_counter()
+    rejected = _replay(limiter, ips)
+    elapsed = time.perf_counter() - start
+
+    limiter = factory()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    _replay(limiter, ips)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return elapsed / len(ips) * 1e6, rejected, retained, limiter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=5000, help="IPs distintas")
+    parser.add_argument("--requests", type=int, default=50000)
+    args = parser.parse_args()
+
+    ips = workload(args.clients, args.requests)
+
+    def bucket_factory():
+        return RateLimiter(
+            config.RATE_LIMIT_REQUESTS,
+            config.RATE_LIMIT_EXPENSIVE_REQUESTS,
+            config.RATE_LIMIT_WINDOW_MS,
+            config.RATE_LIMIT_MAX_CLIENTS
+        )
+
+    legacy = run(LegacyLimiter, ips)
+    bucket = run(bucket_factory, ips)
+    results = (
+        ("lista de timestamps", legacy, len(legacy[3].request_history)),
+        ("token bucket (LRU {})".format(config.RATE_LIMIT_MAX_CLIENTS), bucket, len(bucket[3].clients)),
+    )
+
+    print("{} peticiones desde {} IPs ({} req/{} ms por IP)".format(
+        args.requests, args.clients + 4, config.RATE_LIMIT_REQUESTS, config.RATE_LIMIT_WINDOW_MS
+    ))
+    print("{:<26} {:>10} {:>11} {:>10} {:>14}".format("limitador", "µs/req", "rechazadas", "IPs", "KB retenidos"))
+    for name, (us, rejected, retained, _), size in results:
+        print("{:<26} {:>10.2f} {:>11} {:>10} {:>14.1f}".format(name, us, rejected, size, retained / 1024))
+    print("Expulsiones LRU: {}".format(bucket[3].evictions))
+
+
+if __name__ == "__main__":
+    main()
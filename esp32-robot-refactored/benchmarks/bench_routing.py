@@ -0,0 +1,101 @@
+"""
+Micro-benchmark del despacho de rutas de HTTPServer en el host
+
+Compara la cadena de path.startswith() original con la tabla de rutas
+(dict) por path. Los handlers se sustituyen por funciones vacías para
+medir solo el coste del despacho.
+
+Uso:
+    python benchmarks/bench_routing.py [--iterations N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emulator
+
+emulator.install()
+
+from http_server import HTTPServer  # noqa: E402
+
+
+PATHS = [
+    "/",
+    "/status",
+    "/telemetry",
+    "/move?dir=F",
+    "/logs?token=abc",
+    "/restart?token=abc",
+    "/does-not-exist",
+]
+
+
+def _noop(*args):
+    pass
+
+
+def legacy_route(client, path, client_ip):
+    """Despacho original: cadena de startswith() en orden"""
+    if path == "/":
+        _noop(client)
+    elif path.startswith("/status"):
+        _noop(client)
+    elif path.startswith("/telemetry"):
+        _noop(client)
+    elif path.startswith("/move"):
+        _noop(client, path, client_ip)
+    elif path.startswith("/auto"):
+        _noop(client, path)
+    elif path.startswith("/logs"):
+        _noop(client, path)
+    elif path.startswith("/security"):
+        _noop(client)
+    elif path.startswith("/clear"):
+        _noop(client, path)
+    elif path.startswith("/restart"):
+        _noop(client, path, client_ip)
+    else:
+        _noop(client, path, client_ip)
+
+
+def build_server():
+    """HTTPServer real con todos los handlers sustituidos por _noop"""
+    server = HTTPServer("127.0.0.1", None, None, None, None, None)
+    for path in list(server.routes):
+        server.add_route(path, _noop)
+    server._handle_not_found = _noop
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    server = build_server()
+    route = server._route_request
+
+    print("{:<22} {:>12} {:>12} {:>8}".format("path", "antes ns", "ahora ns", "ratio"))
+    for path in PATHS:
+        # Mejor de N repeticiones para reducir el ruido del host
+        before = min(timeit.repeat(
+            lambda: legacy_route(None, path, "10.0.0.1"),
+            number=args.iterations, repeat=args.repeat
+        ))
+        after = min(timeit.repeat(
+            lambda: route(None, path, "10.0.0.1", "GET"),
+            number=args.iterations, repeat=args.repeat
+        ))
+        before_ns = before / args.iterations * 1e9
+        after_ns = after / args.iterations * 1e9
+        print("{:<22} {:>12.1f} {:>12.1f} {:>7.2f}x".format(
+            path, before_ns, after_ns, before_ns / after_ns
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Frecuencia de muestreo del sonar: alcance completo vs alcance del modo auto
+
+Mide en el emulador (HC-SR04 contra una pared del mundo 2D, robot parado)
+las muestras por segundo que consigue SensorSampler llamado desde un loop
+de control, con y sin interrupciones en ECHO:
+
+- alcance completo: SENSOR_SAMPLE_INTERVAL_MS y ULTRASONIC_TIMEOUT, como
+  con el modo auto apagado;
+- alcance del modo auto: request_range(AUTO_MIN_DISTANCE + margen), que
+  acorta el timeout del eco y mide cada SENSOR_FAST_INTERVAL_MS.
+
+Además del ritmo informa de lo que el sensor bloquea el loop (peor
+step()) y de cuántos triggers se descartaron con ECHO aún en alto: el
+HC-SR04 no acepta un ping nuevo hasta que vuelve el eco del anterior, así
+que con la pared lejos el ritmo lo limita la pared, no el timeout.
+
+Con --array mide también los tres sensores de emulator.SENSOR_ARRAY
+(izquierda, centro y derecha) disparados por turnos con SensorArray: la
+columna de muestras/s es el ritmo agregado de los tres.
+
+Uso:
+    python benchmarks/bench_sensor_rate.py [--seconds S] [--distance CM ...] [--array]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import emulator
+from emulator.world import World
+
+# Los tres sensores conectados en el emulador; sin --array solo se usa el central
+config = emulator.install(ULTRASONIC_SENSORS=emulator.SENSOR_ARRAY)
+
+from sensor_handler import UltrasonicSensor, echo_timeout_us
+from sensor_sampler import SensorSampler
+from sensor_array import SensorArray, build_sensors
+
+
+def count_triggers(sensor, triggers):
+    """Envuelve el trigger del sensor para contar los pings que salen"""
+    trigger = sensor._trigger
+
+    def counted():
+        triggers[0] += 1
+        trigger()
+    sensor._trigger = counted
+
+
+def run(distance, irq, short, seconds, loop_ms, array=False):
+    """
+    Muestrea durante seconds con el robot a distance cm de la pared
+
+    Returns:
+        dict: Muestras/s, triggers/s, peor step() en ms y lecturas "libre"
+            (sumadas entre sensores con array)
+    """
+    emulator.attach_world(World(width=50.0 + distance, height=50.0 + 2 * distance,
+                                y=25.0 + distance, obstacles=[]))
+    config.ULTRASONIC_IRQ = irq
+
+    triggers = [0]
+    if array:
+        sensors = build_sensors()
+        for sensor in sensors:
+            count_triggers(sensor, triggers)
+        sampler = SensorArray(sensors)
+        samplers = sampler.samplers
+    else:
+        sensor = UltrasonicSensor()
+        count_triggers(sensor, triggers)
+        sampler = SensorSampler(sensor)
+        samplers = [sampler]
+    if short:
+        sampler.request_range(config.AUTO_MIN_DISTANCE + config.SENSOR_AUTO_RANGE_MARGIN_CM)
+
+    worst = 0.0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        sampler.step()
+        worst = max(worst, time.perf_counter() - now)
+        time.sleep(loop_ms / 1000)
+
+    elapsed = time.perf_counter() - started
+    samples = sum(s.samples for s in samplers)
+    return {
+        "samples_hz": samples / elapsed,
+        "triggers_hz": triggers[0] / elapsed,
+        "worst_ms": worst * 1000,
+        "clear": sum(s.clears for s in samplers),
+        "samples": samples,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=2.0, help="duración de cada variante")
+    parser.add_argument("--distance", type=float, nargs="+", default=[150.0, 350.0],
+                        help="distancias a la pared en cm")
+    parser.add_argument("--loop-ms", type=float, default=1.0, help="pausa del loop de control entre steps")
+    parser.add_argument("--array", action="store_true", help="medir también el array de tres sensores")
+    args = parser.parse_args()
+    layouts = [False, True] if args.array else [False]
+
+    auto_range = config.AUTO_MIN_DISTANCE + config.SENSOR_AUTO_RANGE_MARGIN_CM
+    print("alcance auto: {} cm (AUTO_MIN_DISTANCE + SENSOR_AUTO_RANGE_MARGIN_CM), timeout {} µs".format(
+        auto_range, echo_timeout_us(auto_range)))
+    print("{:>8} {:<8} {:<10} {:<10} {:>10} {:>11} {:>10} {:>9}".format(
+        "pared", "sensores", "medición", "alcance", "muestras/s", "triggers/s", "peor step", "libres"))
+    for distance in args.distance:
+        for array in layouts:
+            for irq in (False, True):
+                for short in (False, True):
+                    result = run(distance, irq, short, args.seconds, args.loop_ms, array)
+                    print("{:>6.0f}cm {:<8} {:<10} {:<10} {:>10.1f} {:>11.1f} {:>8.2f}ms {:>9}".format(
+                        distance, "3" if array else "1", "irq" if irq else "bloqueo",
+                        "auto" if short else "completo",
+                        result["samples_hz"], result["triggers_hz"], result["worst_ms"],
+                        "{}/{}".format(result["clear"], result["samples"])
+                    ))
+
+
+if __name__ == "__main__":
+    main()
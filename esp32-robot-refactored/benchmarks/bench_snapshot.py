@@ -0,0 +1,116 @@
+"""
+Refresco del dashboard: cuatro peticiones frente a una sola /snapshot
+
+Pasa cada petición por el camino completo del servidor síncrono
+(recepción, rate limiting, parseo, despacho y respuesta) con un socket en
+memoria, y calcula las peticiones por segundo que se ahorra el ESP32.
+
+Uso:
+    python benchmarks/bench_snapshot.py [--refreshes N] [--dashboards N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emulator
+
+# Sin límite de peticiones: se mide el coste, no el rate limiting
+config = emulator.install(RATE_LIMIT_REQUESTS=1 << 30)
+
+from http_server import HTTPServer  # noqa: E402
+from motor_controller import MotorController  # noqa: E402
+from sensor_handler import UltrasonicSensor  # noqa: E402
+from logger import Logger  # noqa: E402
+from security_manager import SecurityManager  # noqa: E402
+from auto_mode import AutoMode  # noqa: E402
+
+
+class MemoryClient:
+    """Socket en memoria: entrega una petición y descarta la respuesta"""
+
+    def __init__(self, request):
+        self.request = request
+
+    def recv_into(self, buf):
+        n = len(self.request)
+        buf[:n] = self.request
+        return n
+
+    def send(self, data):
+        return len(data)
+
+    def settimeout(self, timeout):
+        pass
+
+    def close(self):
+        pass
+
+
+def build_server():
+    """HTTPServer real sobre el hardware emulado"""
+    logger = Logger()
+    motors = MotorController()
+    sensor = UltrasonicSensor()
+    security = SecurityManager(logger)
+    auto_mode = AutoMode(motors, sensor, logger)
+    # Buffer de logs lleno (sin imprimir cada entrada)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(config.MAX_LOG_ENTRIES):
+            logger.add("MOVE F")
+    return HTTPServer("127.0.0.1", motors, sensor, logger, security, auto_mode)
+
+
+def _request(path):
+    return "GET {} HTTP/1.1\r\nHost: robot\r\nConnection: close\r\n\r\n".format(path).encode()
+
+
+def measure(server, paths, refreshes):
+    """Segundos por refresco haciendo una petición por path"""
+    clients = [MemoryClient(_request(path)) for path in paths]
+    remote = ("10.0.0.2", 50000)
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        for client in clients:
+            server._handle_request(client, remote)
+    return (time.perf_counter() - start) / refreshes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--refreshes", type=int, default=2000)
+    parser.add_argument("--dashboards", type=int, default=2,
+                        help="dashboards refrescando una vez por segundo")
+    args = parser.parse_args()
+
+    token = "token=" + config.SECURITY_TOKEN
+    separate = ["/status", "/telemetry", "/security", "/logs?" + token]
+    snapshot = ["/snapshot?" + token]
+
+    # Silenciar los print() del logger durante la medida
+    server = build_server()
+    server.logger.add = lambda message: None
+
+    before = measure(server, separate, args.refreshes)
+    after = measure(server, snapshot, args.refreshes)
+
+    print("{:<28} {:>10} {:>14} {:>14}".format("refresco", "peticiones", "µs/refresco", "refrescos/s"))
+    print("{:<28} {:>10} {:>14.1f} {:>14.0f}".format("4 endpoints", len(separate), before * 1e6, 1 / before))
+    print("{:<28} {:>10} {:>14.1f} {:>14.0f}".format("/snapshot", len(snapshot), after * 1e6, 1 / after))
+    print()
+
+    saved = (len(separate) - len(snapshot)) * args.dashboards
+    print("Peticiones/s ahorradas con {} dashboard(s) a 1 Hz: {} ({} -> {})".format(
+        args.dashboards, saved, len(separate) * args.dashboards, len(snapshot) * args.dashboards
+    ))
+    print("Tiempo de servidor por segundo: {:.1f} µs -> {:.1f} µs ({:.2f}x)".format(
+        before * args.dashboards * 1e6, after * args.dashboards * 1e6, before / after
+    ))
+
+
+if __name__ == "__main__":
+    main()
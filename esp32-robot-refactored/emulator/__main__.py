@@ -0,0 +1,48 @@
+"""
+Arranca el firmware completo (src/main.py) en localhost
+
+La WiFi, los pines y el sensor son los del emulador; el robot se mueve en
+el mundo 2D de emulator/world.py. El dashboard puede apuntar al emulador
+con VITE_ROBOT_IP=http://127.0.0.1:8080.
+
+Uso:
+    python -m emulator [--port 8080] [--mode sync|async] [--sensor-array]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emulator  # noqa: E402
+from emulator.world import World  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--mode", choices=("sync", "async"), default=None,
+                        help="servidor (por defecto config.SERVER_MODE)")
+    parser.add_argument("--sensor-array", action="store_true",
+                        help="tres HC-SR04 (izquierda, centro y derecha) en vez de uno")
+    args = parser.parse_args()
+
+    overrides = {"SERVER_PORT": args.port, "WIFI_STATIC_IP": None}
+    if args.mode is not None:
+        overrides["SERVER_MODE"] = args.mode
+    if args.sensor_array:
+        overrides["ULTRASONIC_SENSORS"] = emulator.SENSOR_ARRAY
+    emulator.install(**overrides)
+
+    world = World.default()
+    emulator.attach_world(world)
+
+    import main as firmware
+    try:
+        firmware.main()
+    finally:
+        print("Mundo:", world.state())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Sustituto del módulo machine de MicroPython para el emulador de host
+
+Sin mundo conectado time_pulse_us() devuelve siempre echo_us. Con
+emulator.attach_world() el echo sale de la distancia del robot al
+obstáculo que tiene delante y los cambios en los pines del L298N mueven
+el robot en el mundo. Cada HC-SR04 de sonars mide en su propio rumbo.
+
+Pin.irq() funciona: al bajar el pin TRIG de un HC-SR04 se programan los
+flancos de subida y bajada de ECHO en un hilo, con la duración del eco,
+y el handler se llama desde ese hilo como lo haría una interrupción.
+
+Como en el HC-SR04, ECHO sigue en alto hasta que vuelve el eco aunque
+time_pulse_us() se rinda antes por su timeout: un ping nuevo en ese
+intervalo lo ignoraría el sensor.
+"""
+import threading
+import time
+
+
+# Pines creados, por número: el mundo lee aquí el estado de los motores
+pins = {}
+
+# Mundo simulado (emulator.world.World) o None
+world = None
+
+# HC-SR04 conectados, {pin TRIG: (pin ECHO, rumbo en grados respecto al
+# frente, positivo a la izquierda)}: los fija emulator.install()
+sonars = {}
+
+# Retraso del flanco de subida de ECHO tras el trigger (8 ciclos a 40 kHz)
+ECHO_DELAY_US = 250
+
+# Pulso que da el HC-SR04 cuando no recibe eco
+NO_ECHO_US = 38000
+
+
+class Pin:
+    """Pin GPIO simulado"""
+    OUT = 1
+    IN = 0
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, pin_num, mode=IN):
+        self.pin_num = pin_num
+        self.mode = mode
+        self._value = 0
+        self._handler = None
+        self._irq_trigger = 0
+        # time.monotonic() hasta el que el pulso de ECHO sigue en alto
+        self._busy_until = 0.0
+        pins[pin_num] = self
+
+    def value(self, val=None):
+        if val is not None:
+            previous = self._value
+            self._value = val
+            if world is not None:
+                # Integrar el tramo anterior y tomar el nuevo estado de motores
+                world.update()
+            if previous and not val and self.pin_num in sonars:
+                echo_pin, bearing = sonars[self.pin_num]
+                _start_echo(pins.get(echo_pin), bearing)
+        if self._busy_until and time.monotonic() < self._busy_until:
+            return 1
+        return self._value
+
+    def irq(self, handler=None, trigger=IRQ_RISING | IRQ_FALLING, hard=False):
+        """Instala el handler de interrupción para los flancos indicados"""
+        self._handler = handler
+        self._irq_trigger = trigger
+
+    def _edge(self, level):
+        """Cambia el nivel desde fuera (señal simulada) y dispara la interrupción"""
+        self._value = level
+        mask = Pin.IRQ_RISING if level else Pin.IRQ_FALLING
+        if self._handler is not None and self._irq_trigger & mask:
+            self._handler(self)
+
+
+def _bearing(echo_pin):
+    """Rumbo del HC-SR04 cuyo ECHO es echo_pin (0 = al frente)"""
+    for echo, bearing in sonars.values():
+        if echo == echo_pin:
+            return bearing
+    return 0.0
+
+
+def _start_echo(echo, bearing):
+    """Genera el pulso de ECHO tras un trigger si hay interrupción instalada"""
+    if echo is None or echo._handler is None:
+        # Medición bloqueante: la resuelve time_pulse_us()
+        return
+
+    duration = world.echo_us(bearing) if world is not None else echo_us
+    duration = min(duration, NO_ECHO_US)
+
+    def pulse():
+        time.sleep(ECHO_DELAY_US / 1000000)
+        echo._edge(1)
+        time.sleep(duration / 1000000)
+        echo._edge(0)
+
+    thread = threading.Thread(target=pulse)
+    thread.daemon = True
+    thread.start()
+
+
+# Duración del echo que devuelve time_pulse_us() sin mundo (580µs = 10cm)
+echo_us = 580
+
+
+def time_pulse_us(pin, level, timeout_us):
+    """Duración del pulso de echo simulado, o -1 si supera el timeout"""
+    if world is None:
+        if echo_us > timeout_us:
+            return -1
+        return echo_us
+
+    # Como en el ESP32, la llamada bloquea lo que dura el pulso (o el timeout)
+    duration = min(world.echo_us(_bearing(pin.pin_num)), NO_ECHO_US)
+    if duration > timeout_us:
+        time.sleep(timeout_us / 1000000)
+        # El pulso sigue hasta que vuelva el eco
+        pin._busy_until = time.monotonic() + (duration - timeout_us) / 1000000
+        return -1
+    time.sleep(duration / 1000000)
+    return int(duration)
+
+
+def reset():
+    """Reinicio del ESP32: en el host termina el proceso"""
+    raise SystemExit("machine.reset()")
@@ -0,0 +1,54 @@
+"""
+Funciones de tiempo de MicroPython (ticks_ms, ticks_us, sleep_ms...) sobre
+el módulo time de CPython
+"""
+import time
+
+
+# Los ticks de MicroPython son contadores que dan la vuelta; en el ESP32
+# el periodo es 2**30. Se respeta para detectar usos sin ticks_diff().
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALFPERIOD = TICKS_PERIOD // 2
+
+_start_ns = time.monotonic_ns()
+
+
+def ticks_ms():
+    """Milisegundos desde el arranque del emulador (con vuelta)"""
+    return ((time.monotonic_ns() - _start_ns) // 1000000) & TICKS_MAX
+
+
+def ticks_us():
+    """Microsegundos desde el arranque del emulador (con vuelta)"""
+    return ((time.monotonic_ns() - _start_ns) // 1000) & TICKS_MAX
+
+
+def ticks_diff(new, old):
+    """Diferencia con signo entre dos valores de ticks"""
+    return ((new - old + TICKS_HALFPERIOD) & TICKS_MAX) - TICKS_HALFPERIOD
+
+
+def ticks_add(ticks, delta):
+    """Suma un desplazamiento a un valor de ticks"""
+    return (ticks + delta) & TICKS_MAX
+
+
+def sleep_ms(ms):
+    """Espera en milisegundos"""
+    time.sleep(ms / 1000)
+
+
+def sleep_us(us):
+    """Espera en microsegundos"""
+    time.sleep(us / 1000000)
+
+
+def install():
+    """Añade las funciones de MicroPython al módulo time de CPython"""
+    time.ticks_ms = ticks_ms
+    time.ticks_us = ticks_us
+    time.ticks_diff = ticks_diff
+    time.ticks_add = ticks_add
+    time.sleep_ms = sleep_ms
+    time.sleep_us = sleep_us
@@ -0,0 +1,41 @@
+"""
+Sustituto del módulo network de MicroPython para el emulador de host
+
+La "WiFi" es la interfaz de loopback: connect() siempre tiene éxito y
+ifconfig() devuelve la IP en la que escucha el emulador.
+"""
+
+STA_IF = 0
+AP_IF = 1
+
+# IP que devuelve ifconfig() (el servidor hace bind en ella)
+ip = "127.0.0.1"
+
+
+class WLAN:
+    """Interfaz WiFi simulada"""
+
+    def __init__(self, interface):
+        self.interface = interface
+        self._active = False
+        self._connected = False
+
+    def active(self, is_active=None):
+        if is_active is not None:
+            self._active = bool(is_active)
+        return self._active
+
+    def connect(self, ssid, password):
+        self._connected = True
+
+    def disconnect(self):
+        self._connected = False
+
+    def isconnected(self):
+        return self._connected
+
+    def ifconfig(self, cfg=None):
+        # Una IP estática de la LAN no existe en el host: se mantiene loopback
+        if cfg is not None:
+            return None
+        return (ip, "255.0.0.0", ip, ip)
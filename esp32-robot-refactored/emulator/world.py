@@ -0,0 +1,208 @@
+"""
+Mundo 2D simulado para el emulador: arena, obstáculos y pose del robot
+
+La pose se integra a partir de los pines del L298N (los mismos que
+escribe MotorController) y el HC-SR04 se simula lanzando un rayo desde el
+robot en la dirección en la que mira. No hay hilos: el estado se
+actualiza de forma perezosa justo antes de cada cambio de pines y de cada
+medición, con el tiempo real transcurrido.
+
+Example:
+    >>> world = World.default()
+    >>> emulator.attach_world(world)
+"""
+import math
+import time
+
+# Ida y vuelta del sonido: 2 * 29.1 µs por cm (ver sensor_handler.py)
+ECHO_US_PER_CM = 58.2
+
+
+class World:
+    """Arena rectangular con obstáculos circulares y un robot diferencial
+
+    Attributes:
+        width (float): Ancho de la arena en cm (x en [0, width])
+        height (float): Alto de la arena en cm (y en [0, height])
+        obstacles (list): [(x, y, radio)] en cm
+        x (float): Posición del robot en cm
+        y (float): Posición del robot en cm
+        heading (float): Orientación en grados (0 = +x, 90 = +y)
+        speed (float): Velocidad lineal con ambos motores hacia delante (cm/s)
+        turn_rate (float): Velocidad de giro sobre sí mismo (grados/s)
+        radius (float): Radio del robot para las colisiones (cm)
+        distance_travelled (float): cm recorridos desde el arranque
+        collisions (int): Veces que el robot chocó y se quedó parado
+    """
+
+    def __init__(self, width=300.0, height=200.0, obstacles=(), x=50.0, y=100.0, heading=0.0,
+                 speed=30.0, turn_rate=120.0, radius=8.0):
+        self.width = width
+        self.height = height
+        self.obstacles = list(obstacles)
+        self.x = x
+        self.y = y
+        self.heading = heading
+        self.speed = speed
+        self.turn_rate = turn_rate
+        self.radius = radius
+
+        self.distance_travelled = 0.0
+        self.collisions = 0
+
+        # Sentido de cada rueda (-1, 0, 1) desde la última actualización
+        self.left = 0
+        self.right = 0
+        self.updated_at = time.monotonic()
+
+        # Registro de pines {número: Pin} y números de in1..in4 (ver attach)
+        self.registry = None
+        self.motor_pins = ()
+
+    @classmethod
+    def default(cls):
+        """Arena de 3x2 m con dos obstáculos delante del robot"""
+        return cls(obstacles=[(200.0, 100.0, 20.0), (120.0, 40.0, 15.0)])
+
+    def attach(self, registry, motor_pins):
+        """
+        Conecta el mundo a los pines del L298N
+
+        Los pines se buscan en cada actualización: MotorController puede
+        crearlos después de conectar el mundo.
+
+        Args:
+            registry (dict): {número: Pin} con los pines creados
+            motor_pins (tuple): Números de in1, in2, in3 e in4
+        """
+        self.registry = registry
+        self.motor_pins = tuple(motor_pins)
+        self.updated_at = time.monotonic()
+
+    def _pin(self, num):
+        pin = self.registry.get(num)
+        return pin.value() if pin is not None else 0
+
+    def update(self, now=None):
+        """
+        Integra la pose con el estado de los motores desde la última llamada
+
+        Args:
+            now (float): Instante (time.monotonic) hasta el que integrar
+        """
+        if now is None:
+            now = time.monotonic()
+        dt = now - self.updated_at
+        self.updated_at = now
+
+        if self.registry is not None:
+            in1, in2, in3, in4 = (self._pin(num) for num in self.motor_pins)
+            left, right = in1 - in2, in3 - in4
+        else:
+            left, right = 0, 0
+
+        # Integrar con el estado anterior y guardar el nuevo
+        self._advance(self.left, self.right, dt)
+        self.left = left
+        self.right = right
+
+    def _advance(self, left, right, dt):
+        """Mueve el robot dt segundos con las ruedas en (left, right)"""
+        if dt <= 0 or (left == 0 and right == 0):
+            return
+
+        # Diferencial: avance con la media, giro con la diferencia
+        self.heading = (self.heading + self.turn_rate * (right - left) / 2.0 * dt) % 360.0
+        step = self.speed * (left + right) / 2.0 * dt
+        if not step:
+            return
+
+        rad = math.radians(self.heading)
+        x = self.x + step * math.cos(rad)
+        y = self.y + step * math.sin(rad)
+        if self._collides(x, y):
+            # El robot se queda contra el obstáculo (las ruedas patinan)
+            self.collisions += 1
+            return
+
+        self.x = x
+        self.y = y
+        self.distance_travelled += abs(step)
+
+    def _collides(self, x, y):
+        """True si el robot en (x, y) se sale de la arena o toca un obstáculo"""
+        r = self.radius
+        if x < r or y < r or x > self.width - r or y > self.height - r:
+            return True
+        for ox, oy, oradius in self.obstacles:
+            if (x - ox) ** 2 + (y - oy) ** 2 < (oradius + r) ** 2:
+                return True
+        return False
+
+    def distance_cm(self, bearing=0.0):
+        """
+        Distancia desde el robot a lo primero que tiene delante
+
+        Args:
+            bearing (float): Ángulo del sensor respecto al frente del robot
+                (grados, positivo hacia la izquierda)
+
+        Returns:
+            float: cm hasta la pared u obstáculo más cercano en la dirección del sensor
+        """
+        self.update()
+
+        rad = math.radians(self.heading + bearing)
+        dx = math.cos(rad)
+        dy = math.sin(rad)
+
+        # Paredes de la arena
+        best = math.inf
+        if dx > 0:
+            best = min(best, (self.width - self.x) / dx)
+        elif dx < 0:
+            best = min(best, -self.x / dx)
+        if dy > 0:
+            best = min(best, (self.height - self.y) / dy)
+        elif dy < 0:
+            best = min(best, -self.y / dy)
+
+        # Obstáculos circulares: intersección rayo-círculo
+        for ox, oy, oradius in self.obstacles:
+            fx = self.x - ox
+            fy = self.y - oy
+            b = fx * dx + fy * dy
+            c = fx * fx + fy * fy - oradius * oradius
+            disc = b * b - c
+            if disc < 0:
+                continue
+            t = -b - math.sqrt(disc)
+            if t >= 0:
+                best = min(best, t)
+
+        return best
+
+    def echo_us(self, bearing=0.0):
+        """
+        Args:
+            bearing (float): Ángulo del sensor respecto al frente (ver distance_cm)
+
+        Returns:
+            float: Duración del pulso de echo del HC-SR04 para distance_cm()
+        """
+        return self.distance_cm(bearing) * ECHO_US_PER_CM
+
+    def state(self):
+        """
+        Returns:
+            dict: Pose, motores y contadores actuales
+        """
+        self.update()
+        return {
+            "x": round(self.x, 1),
+            "y": round(self.y, 1),
+            "heading": round(self.heading, 1),
+            "motors": (self.left, self.right),
+            "distance_travelled": round(self.distance_travelled, 1),
+            "collisions": self.collisions,
+        }
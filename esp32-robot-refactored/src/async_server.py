@@ -0,0 +1,663 @@
+"""
+Servidor HTTP asíncrono (uasyncio en el ESP32, asyncio en CPython)
+
+Cada conexión es una corrutina y el modo automático corre en su propia
+tarea, así que un cliente lento ya no bloquea el loop de control ni al
+resto de clientes. Los handlers de HTTPServer se reutilizan sin cambios.
+
+/ws mantiene abierta una conexión WebSocket por dashboard: el servidor
+envía status, telemetría, seguridad y logs nuevos cuando cambian y el
+cliente manda comandos de movimiento por el mismo socket. /events envía
+lo mismo como Server-Sent Events para herramientas que solo leen.
+"""
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+import time
+import machine
+import config
+import websocket
+import sse
+import metrics
+from http_server import HTTPServer
+from http_request import MAX_REQUEST_SIZE, HEADER_UPGRADE, HEADER_WEBSOCKET_KEY
+
+
+class StreamClient:
+    """Adaptador que expone send() sobre un StreamWriter de asyncio
+
+    Attributes:
+        writer: StreamWriter de la conexión
+        sent (int): Bytes encolados de la respuesta en curso (0 = aún no
+            salió ni la cabecera; _handle_connection lo pone a 0 en cada
+            petición)
+    """
+
+    def __init__(self, writer):
+        """
+        Args:
+            writer: StreamWriter de la conexión
+        """
+        self.writer = writer
+        self.sent = 0
+
+    def send(self, data):
+        """
+        Encola datos en el writer (se envían en el siguiente drain())
+
+        Args:
+            data (str|bytes|bytearray|memoryview): Datos a enviar
+
+        Returns:
+            int: Número de bytes encolados
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        else:
+            # Copiar: el writer puede guardar la referencia hasta el drain
+            data = bytes(data)
+        self.writer.write(data)
+        self.sent += len(data)
+        return len(data)
+
+
+class PushState:
+    """Lo último enviado a un cliente de streaming
+
+    Cada llamada a changes() regenera los cuerpos JSON de los endpoints y
+    devuelve solo los que han cambiado desde la anterior, más las líneas
+    de log nuevas.
+    """
+
+    def __init__(self, server, with_logs):
+        """
+        Args:
+            server (HTTPServer): Servidor del que se leen los datos
+            with_logs (bool): Si el cliente presentó el token (logs incluidos)
+        """
+        self.server = server
+        self.with_logs = with_logs
+        self.last = {}
+        # Secuencia del último log enviado (None = aún no se envió nada)
+        self.log_seq = None
+
+    def changes(self):
+        """
+        Returns:
+            list: [(tipo, json)] con lo que ha cambiado desde la última llamada
+        """
+        server = self.server
+        changed = []
+        for kind, body in (
+            ("status", server._status_json()),
+            ("telemetry", server._telemetry_json()),
+            ("security", server.security.get_json()),
+        ):
+            if self.last.get(kind) != body:
+                self.last[kind] = body
+                changed.append((kind, body))
+
+        if self.with_logs:
+            body = self._logs_json()
+            if body is not None:
+                changed.append(("logs", body))
+        return changed
+
+    def _logs_json(self):
+        """Entradas nuevas desde el último envío (o todas si hubo hueco)"""
+        logger = self.server.logger
+        if self.log_seq is not None and self.log_seq == logger.head_seq:
+            return None
+
+        since = 0 if self.log_seq is None else self.log_seq
+        self.log_seq = logger.head_seq
+        return logger.get_json_since(since)
+
+
+class StreamSession:
+    """Conexión de streaming abierta (/ws o /events); el envío se serializa con un lock"""
+
+    def __init__(self, reader, writer, client_ip, with_logs, response_writer=None):
+        """
+        Args:
+            reader: StreamReader de la conexión
+            writer: StreamWriter de la conexión
+            client_ip (str): IP del cliente
+            with_logs (bool): Si el cliente presentó el token
+            response_writer (ResponseWriter): Donde se suman los bytes
+                enviados (bytes_sent), o None para no contarlos
+        """
+        self.reader = reader
+        self.writer = writer
+        self.response_writer = response_writer
+        self.client_ip = client_ip
+        self.with_logs = with_logs
+        self.open = True
+        self.lock = asyncio.Lock()
+
+    async def write(self, data, last=False):
+        """
+        Envía datos ya codificados (el push y otras respuestas no se mezclan)
+
+        Args:
+            data (bytes): Datos a enviar
+            last (bool): Si es lo último que sale por la conexión
+        """
+        async with self.lock:
+            # Tras el cierre no puede salir nada más
+            if not self.open:
+                return
+            if last:
+                self.open = False
+            self.writer.write(data)
+            if self.response_writer is not None:
+                self.response_writer.bytes_sent += len(data)
+            await self.writer.drain()
+
+
+class WebSocketSession(StreamSession):
+    """Sesión /ws: el envío se hace en tramas WebSocket"""
+
+    async def send(self, payload, opcode=websocket.OP_TEXT):
+        """
+        Envía una trama
+
+        Args:
+            payload (str|bytes): Contenido de la trama
+            opcode (int): Tipo de trama
+        """
+        await self.write(websocket.encode_frame(payload, opcode), opcode == websocket.OP_CLOSE)
+
+
+def _ws_message(kind, body):
+    """Trama de push para /ws: {"type": tipo, "data": cuerpo}"""
+    return websocket.encode_frame('{"type":"' + kind + '","data":' + body + '}')
+
+
+class AsyncHTTPServer(HTTPServer):
+    """Servidor HTTP basado en corrutinas con tarea de control independiente"""
+
+    def __init__(self, ip, motors, sensor, logger, security, auto_mode):
+        """
+        Inicializa el servidor asíncrono (mismos argumentos que HTTPServer)
+        """
+        super().__init__(ip, motors, sensor, logger, security, auto_mode)
+        self.server = None
+        self.active_connections = 0
+        self.ws_clients = 0
+        self.sse_clients = 0
+
+        # Sesión pedida por el handler en curso: (corrutina, client_ip, with_logs) o None
+        self._upgrade = None
+
+        # Cuerpo que queda por enviar tras las cabeceras: (corrutina, fichero
+        # o generador) o None. Se envía con drain() entre trozos
+        self._pending_body = None
+
+    def start(self):
+        """Inicia el servidor y bloquea ejecutando el event loop"""
+        self._print_banner()
+
+        self.motors.stop()
+        self.logger.add("🚀 Servidor HTTP asíncrono iniciado")
+
+        asyncio.run(self.serve())
+
+    async def serve(self, port=None):
+        """
+        Abre el socket de escucha y ejecuta la tarea de control para siempre
+
+        Args:
+            port (int): Puerto de escucha (usa config.SERVER_PORT si es None)
+        """
+        await self.listen(port)
+
+        self._open_udp_control()
+        if self.udp is not None:
+            asyncio.create_task(self._udp_loop())
+
+        await self._control_loop()
+
+    async def listen(self, port=None):
+        """
+        Abre el socket de escucha sin bloquear
+
+        Args:
+            port (int): Puerto de escucha (usa config.SERVER_PORT si es None)
+        """
+        if port is None:
+            port = config.SERVER_PORT
+
+        self.server = await asyncio.start_server(
+            self._handle_connection, self.ip, port, backlog=config.SERVER_BACKLOG
+        )
+
+    async def _control_loop(self):
+        """
+        Tarea de control: programa de movimiento y modo automático
+
+        Duerme CONTROL_LOOP_INTERVAL_MS entre pasos, o el intervalo de
+        muestreo del sensor si es menor (alcance reducido del modo auto).
+        """
+        interval = config.CONTROL_LOOP_INTERVAL_MS / 1000
+        while True:
+            try:
+                self._control_step()
+            except Exception as e:
+                self.logger.add("ERROR en tarea de control: " + str(e))
+            sampling = self._sampling_interval_s()
+            if sampling is not None and sampling < interval:
+                await asyncio.sleep(sampling)
+            else:
+                await asyncio.sleep(interval)
+
+    async def _udp_loop(self):
+        """Tarea del control UDP: lee el socket cada UDP_POLL_INTERVAL_MS"""
+        interval = config.UDP_POLL_INTERVAL_MS / 1000
+        while True:
+            try:
+                self.udp.poll()
+            except Exception as e:
+                self.logger.add("ERROR en control UDP: " + str(e))
+            await asyncio.sleep(interval)
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Corrutina por conexión: atiende peticiones hasta que el cliente
+        cierra, pide "Connection: close" o pasa KEEPALIVE_IDLE_MS sin actividad
+
+        Args:
+            reader: StreamReader de la conexión
+            writer: StreamWriter de la conexión
+        """
+        self.active_connections += 1
+        self.connections_accepted += 1
+        client = StreamClient(writer)
+        try:
+            peer = writer.get_extra_info("peername")
+            client_ip = peer[0] if peer else "0.0.0.0"
+
+            timeout = config.REQUEST_READ_TIMEOUT_MS / 1000
+            while True:
+                data = await asyncio.wait_for(self._read_request(reader), timeout)
+                if not data:
+                    break
+
+                # Cargar y procesar sin await de por medio: el buffer de
+                # self.request se comparte entre todas las conexiones
+                client.sent = 0
+                self.request.load(data)
+                started = time.ticks_us()
+                keep_alive = self._process_request(client, client_ip)
+                self.profiler.request_finished(started)
+
+                upgrade = self._upgrade
+                if upgrade is not None:
+                    # La conexión deja de ser HTTP: la sesión la gestiona hasta el final
+                    self._upgrade = None
+                    await upgrade[0](reader, writer, upgrade[1], upgrade[2])
+                    break
+
+                pending = self._pending_body
+                if pending is not None:
+                    self._pending_body = None
+                    await pending[0](client, writer, pending[1])
+
+                await writer.drain()
+                if not keep_alive:
+                    break
+
+                timeout = config.KEEPALIVE_IDLE_MS / 1000
+
+        except asyncio.TimeoutError:
+            # Cliente inactivo: cerrar la conexión
+            pass
+
+        except Exception as e:
+            self.logger.add("ERROR crítico en _handle_connection: " + str(e))
+            if self._pending_body is not None:
+                # Tanto los ficheros como los generadores tienen close()
+                self._pending_body[1].close()
+                self._pending_body = None
+            self._keep_alive = False
+            # Con la cabecera (o parte del cuerpo) ya enviada un 500 se
+            # mezclaría con la respuesta a medias: solo cerrar
+            if not client.sent:
+                try:
+                    self._send_json(client, '{"error":"server error"}', "500 Internal Server Error")
+                    await writer.drain()
+                except OSError as send_error:
+                    self.logger.add("ERROR al enviar respuesta de error: " + str(send_error))
+
+        finally:
+            self.active_connections -= 1
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except OSError as e:
+                self.logger.add("ERROR al cerrar socket: " + str(e))
+
+    async def _read_request(self, reader):
+        """
+        Lee una petición completa: headers hasta la línea en blanco y el
+        cuerpo según Content-Length, sin pasar de MAX_REQUEST_SIZE
+
+        Un solo read() puede devolver la petición a trozos (headers y
+        cuerpo en segmentos TCP distintos). Lo que no cabe se corta en
+        MAX_REQUEST_SIZE y el handler lo trata como incompleto.
+
+        Args:
+            reader: StreamReader de la conexión
+
+        Returns:
+            bytes: Petición leída (vacío si el cliente cerró sin enviar nada)
+        """
+        data = b""
+        end = -1
+        while end < 0:
+            chunk = await reader.read(MAX_REQUEST_SIZE - len(data))
+            if not chunk:
+                return data
+            data += chunk
+            end = data.find(b"\r\n\r\n")
+            if end < 0 and len(data) >= MAX_REQUEST_SIZE:
+                return data
+
+        # Content-Length con el parser compartido (sin await de por medio)
+        request = self.request
+        request.load(data)
+        length = request.content_length() if request.parse() else 0
+        total = min(end + 4 + max(length, 0), MAX_REQUEST_SIZE)
+        while len(data) < total:
+            chunk = await reader.read(total - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    # ==========================================
+    # STREAMING (/ws y /events)
+    # ==========================================
+
+    def _send_file_body(self, client, f):
+        """
+        Deja el fichero pendiente: _handle_connection lo envía por trozos
+        con un drain() entre ellos, sin encolar el fichero entero en RAM
+
+        Args:
+            client: StreamClient de la conexión
+            f: Fichero abierto con self.static.open()
+        """
+        self._pending_body = (self._send_file_chunks, f)
+
+    def _send_stream_body(self, client, parts):
+        """
+        Deja el cuerpo pendiente para _handle_connection (ver _send_stream_chunks)
+
+        Args:
+            client: StreamClient de la conexión
+            parts: Iterable con el cuerpo
+        """
+        self._pending_body = (self._send_stream_chunks, parts)
+
+    async def _send_stream_chunks(self, client, writer, parts):
+        """
+        Envía un cuerpo generado por partes con drain() cada vez que se
+        llena el buffer del ResponseWriter
+
+        El buffer se comparte entre conexiones: antes de cada await se
+        vacía para que otra corrutina pueda usarlo, y después se recupera
+        el modo (chunked o no) de esta respuesta.
+
+        Args:
+            client: StreamClient de la conexión
+            writer: StreamWriter de la conexión
+            parts: Iterable con el cuerpo
+        """
+        response = self.writer
+        chunked = response.chunked
+        for part in parts:
+            if response.write_stream(client, part):
+                response.flush_stream(client)
+                await writer.drain()
+                response.resume_stream(chunked)
+        response.end_stream(client)
+
+    async def _send_file_chunks(self, client, writer, f):
+        """
+        Envía y cierra un fichero del dashboard trozo a trozo
+
+        Args:
+            client: StreamClient de la conexión
+            writer: StreamWriter de la conexión
+            f: Fichero abierto con self.static.open()
+        """
+        static = self.static
+        try:
+            chunk = static.read_chunk(f)
+            while chunk is not None:
+                # StreamClient copia el trozo: el buffer de lectura queda
+                # libre para otras conexiones durante el drain()
+                self.writer.send_all(client, chunk)
+                await writer.drain()
+                chunk = static.read_chunk(f)
+        finally:
+            f.close()
+
+    async def _push_changes(self, session, encode, interval_ms):
+        """
+        Envía lo que cambie cada interval_ms mientras la sesión siga abierta
+
+        Args:
+            session (StreamSession): Sesión abierta
+            encode (function): (tipo, json) -> bytes en el formato del stream
+            interval_ms (int): Intervalo entre comprobaciones
+        """
+        state = PushState(self, session.with_logs)
+        interval = interval_ms / 1000
+        while session.open:
+            for kind, body in state.changes():
+                await session.write(encode(kind, body))
+            await asyncio.sleep(interval)
+
+    def _handle_events(self, client, query, client_ip):
+        """Handler para /events - Abre un stream text/event-stream"""
+        if self.sse_clients >= config.SSE_MAX_CLIENTS:
+            self._send_json(client, '{"error":"too many event streams"}', "503 Service Unavailable")
+            return
+
+        # Los logs solo se envían a clientes con token (igual que /logs)
+        with_logs = self._query_param(query, "token") == config.SECURITY_TOKEN
+
+        self._status = "200 OK"
+        self.writer.send_all(client, sse.stream_head(config.SSE_RETRY_MS))
+        self.sse_clients += 1
+        self._keep_alive = False
+        self._upgrade = (self._event_stream_session, client_ip, with_logs)
+
+    async def _event_stream_session(self, reader, writer, client_ip, with_logs):
+        """
+        Sesión SSE: envía los cambios cada SSE_PUSH_INTERVAL_MS hasta que el
+        cliente cierra la conexión
+
+        Args:
+            reader: StreamReader de la conexión
+            writer: StreamWriter de la conexión
+            client_ip (str): IP del cliente
+            with_logs (bool): Si el cliente presentó el token
+        """
+        session = StreamSession(reader, writer, client_ip, with_logs, self.writer)
+        watcher = None
+        try:
+            await writer.drain()
+            self.logger.add("SSE conectado: " + client_ip)
+
+            watcher = asyncio.create_task(self._watch_close(session))
+            await self._push_changes(session, sse.encode_event, config.SSE_PUSH_INTERVAL_MS)
+
+        except Exception as e:
+            # Cliente desconectado a mitad de un envío
+            self.logger.add("SSE cerrado (" + client_ip + "): " + str(e))
+
+        finally:
+            session.open = False
+            self.sse_clients -= 1
+            if watcher is not None:
+                watcher.cancel()
+
+    async def _watch_close(self, session):
+        """
+        Detecta el cierre del cliente en un stream de solo envío
+
+        Args:
+            session (StreamSession): Sesión abierta
+        """
+        try:
+            # El cliente no envía nada más: cualquier lectura vacía es el cierre
+            while await session.reader.read(64):
+                pass
+        except OSError:
+            pass
+        finally:
+            session.open = False
+
+    # ==========================================
+    # WEBSOCKET
+    # ==========================================
+
+    def _handle_websocket(self, client, query, client_ip):
+        """Handler para /ws - Responde al handshake y marca la conexión para upgrade"""
+        request = self.request
+        key = request.header(HEADER_WEBSOCKET_KEY)
+        if not request.header_equals(HEADER_UPGRADE, b"websocket") or key is None:
+            self._send_json(client, '{"error":"websocket upgrade required"}', "400 Bad Request")
+            return
+
+        if self.ws_clients >= config.WS_MAX_CLIENTS:
+            self._send_json(client, '{"error":"too many websocket clients"}', "503 Service Unavailable")
+            return
+
+        # Los logs solo se envían a clientes con token (igual que /logs)
+        with_logs = self._query_param(query, "token") == config.SECURITY_TOKEN
+
+        self._status = "101 Switching Protocols"
+        self.writer.send_all(client, websocket.handshake_response(key))
+        self.ws_clients += 1
+        self._keep_alive = False
+        self._upgrade = (self._websocket_session, client_ip, with_logs)
+
+    async def _websocket_session(self, reader, writer, client_ip, with_logs):
+        """
+        Sesión WebSocket: envía los cambios cada WS_PUSH_INTERVAL_MS mientras
+        otra tarea atiende los comandos del cliente
+
+        Args:
+            reader: StreamReader de la conexión
+            writer: StreamWriter de la conexión
+            client_ip (str): IP del cliente
+            with_logs (bool): Si el cliente presentó el token
+        """
+        session = WebSocketSession(reader, writer, client_ip, with_logs, self.writer)
+        receiver = None
+        try:
+            await writer.drain()
+            self.logger.add("WS conectado: " + client_ip)
+
+            receiver = asyncio.create_task(self._websocket_receive(session))
+            await self._push_changes(session, _ws_message, config.WS_PUSH_INTERVAL_MS)
+
+        except Exception as e:
+            # Cliente desconectado a mitad de un envío
+            self.logger.add("WS cerrado (" + client_ip + "): " + str(e))
+
+        finally:
+            session.open = False
+            self.ws_clients -= 1
+            if receiver is not None:
+                receiver.cancel()
+
+    async def _websocket_receive(self, session):
+        """
+        Tarea de recepción: responde a ping/close y ejecuta los comandos
+
+        Args:
+            session (WebSocketSession): Sesión abierta
+        """
+        try:
+            while session.open:
+                opcode, payload = await websocket.read_frame(session.reader)
+
+                if opcode == websocket.OP_CLOSE:
+                    await session.send(payload, websocket.OP_CLOSE)
+                    break
+                elif opcode == websocket.OP_PING:
+                    await session.send(payload, websocket.OP_PONG)
+                elif opcode == websocket.OP_TEXT:
+                    await session.send(self._websocket_command(payload, session.client_ip))
+
+        except websocket.WebSocketError as e:
+            self.logger.add("ERROR WS (" + session.client_ip + "): " + str(e))
+            try:
+                # 1002: error de protocolo
+                await session.send(b"\x03\xea", websocket.OP_CLOSE)
+            except OSError:
+                pass
+
+        except (EOFError, OSError):
+            # El cliente cerró el socket sin trama de cierre
+            pass
+
+        finally:
+            session.open = False
+
+    def _websocket_command(self, payload, client_ip):
+        """
+        Ejecuta un comando de texto recibido por /ws ("move:F")
+
+        Args:
+            payload (bytearray): Contenido de la trama de texto
+            client_ip (str): IP del cliente
+
+        Returns:
+            str: Respuesta JSON para el cliente
+        """
+        # Mismo límite que las peticiones HTTP: cada comando cuenta
+        if not self._check_rate_limit(client_ip):
+            self.metrics.count_rate_limited(metrics.BUDGET_GENERAL)
+            self.logger.add("RATE_LIMIT excedido: " + client_ip)
+            return '{"type":"error","status":429,"data":{"error":"too many requests"}}'
+
+        try:
+            command = str(payload, "utf-8")
+        except UnicodeError:
+            return '{"type":"error","status":400,"data":{"error":"invalid encoding"}}'
+
+        separator = command.find(":")
+        name = command[:separator] if separator >= 0 else command
+
+        if name == "move":
+            body, status = self._move(command[separator + 1:] if separator >= 0 else None, client_ip)
+            return '{"type":"move","status":' + status[:3] + ',"data":' + body + '}'
+
+        self.security.add_error(client_ip, "ws_unknown_command")
+        return '{"type":"error","status":400,"data":{"error":"unknown command"}}'
+
+    def _keepalive_available(self):
+        """
+        Indica si la conexión actual puede quedar abierta
+
+        Returns:
+            bool: True si no se supera config.KEEPALIVE_MAX_CONNECTIONS
+        """
+        return self.active_connections <= config.KEEPALIVE_MAX_CONNECTIONS
+
+    def _reset_device(self):
+        """Reinicia el ESP32 desde una tarea para no cortar la respuesta"""
+        asyncio.create_task(self._reset_later())
+
+    async def _reset_later(self):
+        """Espera a que se vacíe la respuesta y reinicia"""
+        await asyncio.sleep(0.1)
+        machine.reset()
@@ -1,8 +1,22 @@
 """
 Modo automático con navegación autónoma y evasión de obstáculos
+
+La maniobra de evasión (parar, retroceder, girar) no bloquea: step() la
+avanza de fase cuando vence cada plazo, así que el loop de control (y en
+modo async el resto de tareas) sigue atendiendo mientras el robot esquiva.
+
+Un eco de menos de 2 cm (ERROR_TOO_CLOSE) es un obstáculo y dispara la
+evasión; un sensor sin eco (ERROR_NO_ECHO) para el robot en vez de dejarlo
+avanzar a ciegas.
 """
 import time
 import config
+from sensor_handler import ERROR_TOO_CLOSE, ERROR_NO_ECHO
+
+# Fases de la maniobra de evasión (None = sin maniobra en curso)
+PHASE_STOP = "stop"
+PHASE_BACKWARD = "backward"
+PHASE_TURN = "turn"
 
 
 class AutoMode:
@@ -14,7 +28,9 @@ class AutoMode:
         
         Args:
             motor_controller (MotorController): Controlador de motores
-            sensor (UltrasonicSensor): Sensor ultrasónico
+            sensor (SensorSampler): Lecturas cacheadas del sensor (o el
+                SensorArray con sensores laterales, o el UltrasonicSensor
+                directo, que mide en cada llamada)
             logger (Logger): Sistema de logging
         """
         self.motors = motor_controller
@@ -24,17 +40,41 @@ class AutoMode:
         self.enabled = False
         self.min_distance = config.AUTO_MIN_DISTANCE
         self.last_check = time.ticks_ms()
+        self.sensor_fault = False
+
+        # Maniobra de evasión en curso: fase e instante (ticks_ms) en que empezó
+        self.phase = None
+        self.phase_started = 0
     
     def enable(self):
         """Activa el modo automático"""
         self.enabled = True
+        self._request_range()
         self.logger.add("🤖 MODO AUTO ACTIVADO")
     
     def disable(self):
         """Desactiva el modo automático"""
         self.enabled = False
+        self.phase = None
+        self._request_range()
         self.motors.stop()
         self.logger.add("🤖 MODO AUTO DESACTIVADO")
+
+    def _request_range(self):
+        """
+        Pide al muestreador el alcance que necesita el modo auto
+
+        Activo solo importa si hay algo a menos de min_distance (más un
+        margen), así que el sensor puede medir con un timeout más corto y
+        más a menudo. El sensor directo no admite alcance y mide completo.
+        """
+        request = getattr(self.sensor, "request_range", None)
+        if request is None:
+            return
+        if self.enabled:
+            request(self.min_distance + config.SENSOR_AUTO_RANGE_MARGIN_CM)
+        else:
+            request(None)
     
     def is_enabled(self):
         """
@@ -44,6 +84,13 @@ class AutoMode:
             bool: True si está activo
         """
         return self.enabled
+
+    def is_evading(self):
+        """
+        Returns:
+            bool: True si hay una maniobra de evasión en curso
+        """
+        return self.phase is not None
     
     def set_min_distance(self, distance_cm):
         """
@@ -53,6 +100,7 @@ class AutoMode:
             distance_cm (float): Distancia en centímetros
         """
         self.min_distance = distance_cm
+        self._request_range()
         self.logger.add("Distancia mínima ajustada a {}cm".format(distance_cm))
     
     def step(self):
@@ -61,6 +109,11 @@ class AutoMode:
         """
         if not self.enabled:
             return
+
+        # Maniobra en curso: solo se avanza de fase, sin medir
+        if self.phase is not None:
+            self._step_evasion(time.ticks_ms())
+            return
         
         # Control de frecuencia de ejecución
         now = time.ticks_ms()
@@ -71,6 +124,20 @@ class AutoMode:
         
         # Medir distancia
         distance = self.sensor.measure_distance_cm()
+
+        if distance == ERROR_NO_ECHO:
+            # El sensor no responde: no avanzar a ciegas
+            if not self.sensor_fault:
+                self.logger.add("⚠️ Sensor sin eco - Robot detenido")
+                self.sensor_fault = True
+            self.motors.stop()
+            return
+        self.sensor_fault = False
+
+        if distance == ERROR_TOO_CLOSE:
+            # Obstáculo pegado al sensor (< 2 cm)
+            self._execute_evasion_maneuver()
+            return
         
         if distance < 0:
             # Error en la medición, continuar con precaución
@@ -83,24 +150,59 @@ class AutoMode:
             # Camino libre, avanzar
             self.motors.forward()
     
+    def _evasion_side(self):
+        """
+        Returns:
+            str: "left" o "right" según SensorArray.clearer_side(), o None
+                sin sensores laterales
+        """
+        clearer_side = getattr(self.sensor, "clearer_side", None)
+        if clearer_side is None:
+            return None
+        return clearer_side()
+
     def _execute_evasion_maneuver(self):
         """
-        Ejecuta maniobra de evasión de obstáculo
-        Secuencia: Stop → Retroceso → Giro → Stop
+        Empieza la maniobra de evasión de obstáculo
+        Secuencia: Stop → Retroceso → Giro → Stop, avanzada por step()
+        El giro es hacia el lateral más despejado si hay sensores laterales.
         """
         self.logger.add("⚠️ Obstáculo detectado - Ejecutando evasión")
-        
-        # Detener
-        self.motors.stop()
-        time.sleep_ms(config.AUTO_STOP_TIME)
-        
-        # Retroceder
-        self.motors.backward()
-        time.sleep_ms(config.AUTO_BACKWARD_TIME)
-        
-        # Girar (alternativa: podrías randomizar left/right)
-        self.motors.turn_left()
-        time.sleep_ms(config.AUTO_TURN_TIME)
-        
-        # Detener
         self.motors.stop()
+        self.phase = PHASE_STOP
+        self.phase_started = time.ticks_ms()
+
+    def _step_evasion(self, now):
+        """
+        Pasa a la fase siguiente si ha vencido la actual
+
+        Los plazos se encadenan desde el inicio de cada fase (no desde la
+        llamada), así que un paso tardío no alarga la maniobra completa.
+
+        Args:
+            now (int): ticks_ms actual
+        """
+        phase = self.phase
+        if phase == PHASE_STOP:
+            duration = config.AUTO_STOP_TIME
+        elif phase == PHASE_BACKWARD:
+            duration = config.AUTO_BACKWARD_TIME
+        else:
+            duration = config.AUTO_TURN_TIME
+        if time.ticks_diff(now, self.phase_started) < duration:
+            return
+        self.phase_started = time.ticks_add(self.phase_started, duration)
+
+        if phase == PHASE_STOP:
+            self.motors.backward()
+            self.phase = PHASE_BACKWARD
+        elif phase == PHASE_BACKWARD:
+            # Girar hacia el lateral más despejado (con un solo sensor, izquierda)
+            if self._evasion_side() == "right":
+                self.motors.turn_right()
+            else:
+                self.motors.turn_left()
+            self.phase = PHASE_TURN
+        else:
+            self.motors.stop()
+            self.phase = None
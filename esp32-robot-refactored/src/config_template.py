@@ -19,6 +19,11 @@ MOTOR_RIGHT_PIN2 = 12
 ULTRASONIC_TRIG = 5
 ULTRASONIC_ECHO = 18
 
+# Varios HC-SR04 (ver sensor_array.py): tuplas (posición, TRIG, ECHO) con
+# posición "left", "center" o "right". Vacío = solo el frontal de arriba.
+# Ejemplo: (("left", 17, 16), ("center", 5, 18), ("right", 19, 21))
+ULTRASONIC_SENSORS = ()
+
 # ===========================
 # CONFIGURACIÓN WIFI
 # ===========================
@@ -38,6 +43,55 @@ WIFI_CONNECT_ATTEMPTS = 40
 SERVER_PORT = 80
 SOCKET_TIMEOUT = 0.1  # segundos
 
+# Modo del servidor:
+#   "sync"  -> loop bloqueante clásico (un paso de control entre ráfagas)
+#   "async" -> opcional: uasyncio, una corrutina por conexión y tarea de
+#              control propia (necesario para /ws y /events)
+SERVER_MODE = "sync"
+
+# Conexiones pendientes que admite el socket de escucha
+SERVER_BACKLOG = 4
+
+# Modo sync: tiempo máximo por vuelta atendiendo las conexiones que ya
+# esperan en la cola antes de volver al loop de control (0 = una por vuelta)
+ACCEPT_BUDGET_MS = 50
+
+# Intervalo de la tarea de control en modo async (ms)
+CONTROL_LOOP_INTERVAL_MS = 20
+
+# Tiempo máximo para recibir una petición en modo async (ms)
+REQUEST_READ_TIMEOUT_MS = 2000
+
+# Conexiones persistentes (HTTP/1.1 keep-alive)
+KEEPALIVE_MAX_CONNECTIONS = 4  # Máximo de sockets abiertos a la vez
+KEEPALIVE_IDLE_MS = 5000  # Cierre tras este tiempo sin peticiones
+KEEPALIVE_POLL_TIMEOUT = 0.01  # Timeout de accept() con conexiones abiertas (s)
+
+# WebSocket /ws (solo en modo async): push de cambios al dashboard
+WS_MAX_CLIENTS = 2  # Dashboards conectados a la vez
+WS_PUSH_INTERVAL_MS = 250  # Cada cuánto se buscan cambios para enviar
+
+# Server-Sent Events /events (solo en modo async): stream para monitorización
+SSE_MAX_CLIENTS = 2  # Streams abiertos a la vez
+SSE_PUSH_INTERVAL_MS = 1000  # Cada cuánto se buscan cambios para enviar
+SSE_RETRY_MS = 3000  # Espera sugerida al cliente antes de reconectar
+
+# Métricas en /metrics (formato Prometheus): rutas con contadores propios
+METRICS_MAX_ROUTES = 24
+
+# Dashboard servido desde la flash (ver tools/build_dashboard.py)
+STATIC_ROOT = "/www"  # Directorio con manifest.tsv y los ficheros .gz
+STATIC_CHUNK_SIZE = 1024  # Bytes leídos de la flash por envío
+
+# Perfilado del loop de control (telemetría "loop" y /metrics)
+PROFILER_WINDOW = 128  # Muestras por medida (min/avg/max/p99 de las últimas N)
+PROFILER_DEADLINE_MARGIN_MS = 50  # Retraso sobre AUTO_CHECK_INTERVAL que cuenta como deadline incumplido
+
+# Control por UDP (paquetes binarios, ver udp_control.py)
+UDP_CONTROL_ENABLED = False
+UDP_CONTROL_PORT = 4210
+UDP_POLL_INTERVAL_MS = 5  # Intervalo de lectura del socket en modo async
+
 # ===========================
 # CONFIGURACIÓN DE SEGURIDAD
 # ===========================
@@ -45,12 +99,15 @@ SOCKET_TIMEOUT = 0.1  # segundos
 # Número máximo de errores antes de activar Safe Mode
 MAX_ERRORS_BEFORE_SAFE_MODE = 5
 
-# Tamaño máximo del buffer de logs
+# Tamaño máximo del buffer de logs (/logs se envía por chunks: subirlo
+# solo cuesta la RAM de las propias entradas)
 MAX_LOG_ENTRIES = 50
 
-# Rate limiting (requests por IP)
+# Rate limiting (token bucket por IP)
 RATE_LIMIT_REQUESTS = 10  # Máximo de requests
 RATE_LIMIT_WINDOW_MS = 1000  # Ventana de tiempo en milisegundos
+RATE_LIMIT_EXPENSIVE_REQUESTS = 5  # Requests a endpoints caros (/logs, /snapshot) por ventana
+RATE_LIMIT_MAX_CLIENTS = 32  # IPs registradas como máximo (se expulsa la menos reciente)
 
 # Token de seguridad para operaciones críticas (restart, clear)
 # IMPORTANTE: Cambiar este token por uno único
@@ -71,9 +128,38 @@ AUTO_STOP_TIME = 200
 AUTO_BACKWARD_TIME = 400
 AUTO_TURN_TIME = 400
 
+# ===========================
+# PROGRAMAS DE MOVIMIENTO (/program)
+# ===========================
+
+PROGRAM_MAX_SEGMENTS = 32  # Segmentos por programa
+PROGRAM_MAX_SEGMENT_MS = 10000  # Duración máxima de un segmento (ms)
+
 # ===========================
 # CONFIGURACIÓN DEL SENSOR
 # ===========================
 
 # Timeout de pulso del sensor ultrasónico (microsegundos)
 ULTRASONIC_TIMEOUT = 30000
+
+# Medición sin bloqueo: interrupción en ECHO en vez de esperar en
+# time_pulse_us() (False = medición bloqueante clásica)
+ULTRASONIC_IRQ = True
+
+# Muestreo compartido del sensor (ver sensor_sampler.py)
+SENSOR_SAMPLE_INTERVAL_MS = 100  # Una medición cada 100 ms (el HC-SR04 pide >= 60 ms)
+SENSOR_MAX_AGE_MS = 500  # Edad máxima de una lectura antes de considerarla caducada
+
+# Filtrado de lecturas (ver distance_filter.py)
+SENSOR_FILTER = "median"  # "median", "ema" o "raw" (sin filtrar)
+SENSOR_HISTORY_SIZE = 16  # Lecturas guardadas con su instante
+SENSOR_MEDIAN_WINDOW = 3  # Mediana de las últimas N (3 descarta un pico aislado)
+SENSOR_EMA_ALPHA = 0.3  # Peso de cada lectura nueva en la media exponencial
+
+# Alcance reducido en modo auto: timeout del eco según la distancia de interés
+SENSOR_AUTO_RANGE_MARGIN_CM = 30  # Alcance = AUTO_MIN_DISTANCE + margen
+SENSOR_FAST_INTERVAL_MS = 8  # Intervalo entre pings con alcance reducido
+SENSOR_FULL_RANGE_EVERY = 10  # Uno de cada N pings con alcance completo (telemetría)
+
+# Varios sensores: se disparan por turnos, uno en el aire cada vez
+SENSOR_STAGGER_GUARD_MS = 10  # Mínimo entre pings de sensores consecutivos (rebotes)
@@ -0,0 +1,161 @@
+"""
+Historial de lecturas del sensor con filtros de mediana y media exponencial
+
+Un eco espurio del HC-SR04 (una lectura corta aislada) basta para que
+AutoMode lance una maniobra de evasión completa. DistanceFilter guarda las
+últimas SENSOR_HISTORY_SIZE lecturas con su instante en arrays
+preasignados y ofrece, sin medir de nuevo:
+
+    median()       mediana de las lecturas válidas entre las últimas
+                   SENSOR_MEDIAN_WINDOW (O(k), k pequeño): descarta picos
+    ema()          media móvil exponencial con SENSOR_EMA_ALPHA (O(1),
+                   se actualiza al añadir)
+    valid_ratio()  fracción de lecturas válidas en el historial (O(1))
+
+Las lecturas con error (negativas) cuentan para valid_ratio() pero no
+entran en los filtros. Las más viejas que max_age_ms se ignoran.
+"""
+from array import array
+import time
+import config
+
+
+class DistanceFilter:
+    """Anillo de lecturas (distancia, ticks_ms) con filtros bajo demanda
+
+    Attributes:
+        values (array): Distancias en cm ('f'), negativas si hubo error
+        times (array): ticks_ms de cada lectura ('l')
+        count (int): Lecturas añadidas desde el arranque
+        valid (int): Lecturas válidas dentro del anillo
+    """
+
+    def __init__(self, size=None, median_window=None, ema_alpha=None, max_age_ms=None):
+        """
+        Args:
+            size (int): Lecturas guardadas (config.SENSOR_HISTORY_SIZE si es None)
+            median_window (int): Lecturas para la mediana (config.SENSOR_MEDIAN_WINDOW si es None)
+            ema_alpha (float): Peso de la lectura nueva en la EMA (config.SENSOR_EMA_ALPHA si es None)
+            max_age_ms (int): Edad máxima de una lectura usable (config.SENSOR_MAX_AGE_MS si es None)
+        """
+        if size is None:
+            size = config.SENSOR_HISTORY_SIZE
+        if median_window is None:
+            median_window = config.SENSOR_MEDIAN_WINDOW
+        self.size = size
+        self.median_window = min(median_window, size)
+        self.alpha = config.SENSOR_EMA_ALPHA if ema_alpha is None else ema_alpha
+        self.max_age_ms = config.SENSOR_MAX_AGE_MS if max_age_ms is None else max_age_ms
+
+        self.values = array('f', [0.0] * size)
+        self.times = array('l', [0] * size)
+        self.count = 0
+        self.valid = 0
+
+        # EMA de las lecturas válidas (negativa = sin valor) y su instante
+        self._ema = -1.0
+        self._ema_at = 0
+
+        # Espacio para ordenar la ventana de la mediana sin asignar memoria
+        self._window = array('f', [0.0] * self.median_window)
+
+    def add(self, distance, now):
+        """
+        Añade una lectura (O(1))
+
+        Args:
+            distance (float): Distancia en cm o código de error negativo
+            now (int): ticks_ms de la lectura
+        """
+        index = self.count % self.size
+        if self.count >= self.size and self.values[index] >= 0:
+            self.valid -= 1
+        self.values[index] = distance
+        self.times[index] = now
+        self.count += 1
+
+        if distance < 0:
+            return
+        self.valid += 1
+
+        # Tras un hueco mayor que max_age_ms la EMA arranca de nuevo
+        if self._ema < 0 or time.ticks_diff(now, self._ema_at) > self.max_age_ms:
+            self._ema = distance
+        else:
+            self._ema += self.alpha * (distance - self._ema)
+        self._ema_at = now
+
+    def latest(self):
+        """
+        Returns:
+            float: Última lectura tal cual (-1.0 si aún no hay ninguna)
+        """
+        if not self.count:
+            return -1.0
+        return self.values[(self.count - 1) % self.size]
+
+    def median(self, now=None, window=None):
+        """
+        Mediana de las lecturas válidas y vigentes entre las últimas window
+
+        Args:
+            now (int): ticks_ms actual (time.ticks_ms() si es None)
+            window (int): Lecturas a considerar (median_window si es None)
+
+        Returns:
+            float: Mediana en cm, o -1.0 si no hay ninguna lectura válida
+        """
+        if now is None:
+            now = time.ticks_ms()
+        if window is None or window > self.median_window:
+            window = self.median_window
+
+        # Inserción ordenada en el buffer fijo (k pequeño)
+        buf = self._window
+        n = 0
+        index = self.count - 1
+        last = self.count - min(window, self.count)
+        while index >= last:
+            slot = index % self.size
+            index -= 1
+            value = self.values[slot]
+            if value < 0 or time.ticks_diff(now, self.times[slot]) > self.max_age_ms:
+                continue
+            pos = n
+            while pos > 0 and buf[pos - 1] > value:
+                buf[pos] = buf[pos - 1]
+                pos -= 1
+            buf[pos] = value
+            n += 1
+
+        if not n:
+            return -1.0
+        if n % 2:
+            return buf[n // 2]
+        return (buf[n // 2 - 1] + buf[n // 2]) / 2
+
+    def ema(self, now=None):
+        """
+        Args:
+            now (int): ticks_ms actual (time.ticks_ms() si es None)
+
+        Returns:
+            float: Media móvil exponencial en cm, o -1.0 si no hay o ha caducado
+        """
+        if self._ema < 0:
+            return -1.0
+        if now is None:
+            now = time.ticks_ms()
+        if time.ticks_diff(now, self._ema_at) > self.max_age_ms:
+            return -1.0
+        return self._ema
+
+    def valid_ratio(self):
+        """
+        Returns:
+            float: Fracción de lecturas válidas en el historial (0.0 sin lecturas)
+        """
+        n = min(self.count, self.size)
+        if not n:
+            return 0.0
+        return self.valid / n
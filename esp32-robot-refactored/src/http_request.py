@@ -0,0 +1,342 @@
+"""
+Parser de peticiones HTTP sobre un buffer preasignado
+
+Recibe con recv_into() en un bytearray reutilizable y recorre solo la
+request line y los headers que le interesan al servidor. El único texto
+que se decodifica por petición es el path; los headers se comparan como
+bytes y solo se decodifican si un handler los pide.
+"""
+
+# Tamaño máximo de una petición HTTP (bytes)
+MAX_REQUEST_SIZE = 1024
+
+# Headers que interesan al servidor (índice -> nombre en minúsculas)
+HEADER_CONNECTION = 0
+HEADER_UPGRADE = 1
+HEADER_WEBSOCKET_KEY = 2
+HEADER_IF_NONE_MATCH = 3
+HEADER_ACCEPT = 4
+HEADER_CONTENT_LENGTH = 5
+HEADERS = (
+    b"connection", b"upgrade", b"sec-websocket-key", b"if-none-match", b"accept",
+    b"content-length",
+)
+
+# Métodos conocidos: se devuelven como constantes sin decodificar
+METHODS = (
+    (b"GET", "GET"),
+    (b"POST", "POST"),
+    (b"OPTIONS", "OPTIONS"),
+    (b"HEAD", "HEAD"),
+    (b"PUT", "PUT"),
+    (b"DELETE", "DELETE"),
+)
+
+SPACE = 32
+TAB = 9
+
+# bytearray.find() no existe en todos los ports de MicroPython
+_HAS_FIND = hasattr(bytearray, "find")
+
+
+class HTTPRequest:
+    """Petición HTTP parseada in-place sobre un buffer reutilizable
+
+    Attributes:
+        buf (bytearray): Buffer de recepción (se reutiliza entre peticiones)
+        view (memoryview): Vista sin copia de buf
+        length (int): Bytes válidos en buf
+        method (str): Método HTTP
+        path_start (int): Inicio del path (con query string) en buf
+        path_end (int): Fin del path en buf
+        http11 (bool): True si la petición es HTTP/1.1
+        body_start (int): Inicio del cuerpo en buf
+    """
+
+    def __init__(self, size=MAX_REQUEST_SIZE):
+        """
+        Args:
+            size (int): Tamaño del buffer de recepción en bytes
+        """
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.length = 0
+        self.method = ""
+        self.path_start = 0
+        self.path_end = 0
+        self.http11 = False
+        self.body_start = 0
+        # Posiciones [inicio, fin] del valor de cada header de HEADERS
+        self.spans = [-1] * (2 * len(HEADERS))
+
+    def receive(self, client):
+        """
+        Recibe una petición del socket directamente en el buffer
+
+        Args:
+            client: Socket del cliente
+
+        Returns:
+            int: Bytes recibidos (0 si el cliente cerró la conexión)
+
+        Raises:
+            OSError: Si el socket no bloqueante no tiene datos (EAGAIN)
+        """
+        try:
+            n = client.recv_into(self.buf)
+        except AttributeError:
+            # Los sockets de MicroPython exponen readinto() en lugar de recv_into()
+            n = client.readinto(self.buf)
+            if n is None:
+                raise OSError(11)
+        self.length = n
+        return n
+
+    def load(self, data):
+        """
+        Copia en el buffer una petición ya recibida (modo asyncio)
+
+        Args:
+            data (bytes): Datos crudos de la petición
+
+        Returns:
+            int: Bytes cargados
+        """
+        n = len(data)
+        if n > len(self.buf):
+            n = len(self.buf)
+            data = memoryview(data)[:n]
+        # Asignar sobre la memoryview: en el bytearray el slice haría una copia temporal
+        self.view[:n] = data
+        self.length = n
+        return n
+
+    def parse(self):
+        """
+        Parsea la request line y los headers de interés
+
+        Returns:
+            bool: True si la request line es válida
+        """
+        spans = self.spans
+        for i in range(len(spans)):
+            spans[i] = -1
+
+        length = self.length
+        line_end = self._find(b"\r\n", 0, length)
+        if line_end < 0:
+            line_end = length
+
+        method_end = self._find(b" ", 0, line_end)
+        if method_end <= 0:
+            return False
+
+        self.method = self._method(method_end)
+        self.path_start = method_end + 1
+
+        path_end = self._find(b" ", self.path_start, line_end)
+        if path_end < 0:
+            path_end = line_end
+        self.path_end = path_end
+
+        self.http11 = self._equals(path_end + 1, line_end, b"HTTP/1.1")
+
+        # Headers: solo se guardan las posiciones de los de HEADERS
+        pos = line_end + 2
+        while pos < length:
+            end = self._find(b"\r\n", pos, length)
+            if end < 0:
+                end = length
+            if end == pos:
+                self.body_start = pos + 2
+                return True
+
+            colon = self._find(b":", pos, end)
+            if colon > 0:
+                index = self._header_index(pos, colon)
+                if index >= 0:
+                    start = colon + 1
+                    while start < end and self.buf[start] in (SPACE, TAB):
+                        start += 1
+                    stop = end
+                    while stop > start and self.buf[stop - 1] in (SPACE, TAB):
+                        stop -= 1
+                    spans[2 * index] = start
+                    spans[2 * index + 1] = stop
+
+            pos = end + 2
+
+        # Headers truncados (petición mayor que el buffer): sin cuerpo
+        self.body_start = length
+        return True
+
+    def path_length(self):
+        """
+        Returns:
+            int: Longitud del path en bytes (sin decodificar)
+        """
+        return self.path_end - self.path_start
+
+    def path(self):
+        """
+        Decodifica el path (única cadena que se crea por petición)
+
+        Returns:
+            str: Path con query string
+
+        Raises:
+            UnicodeError: Si el path no es UTF-8 válido
+        """
+        return str(self.view[self.path_start:self.path_end], "utf-8")
+
+    def header(self, index):
+        """
+        Decodifica el valor de un header de HEADERS
+
+        Args:
+            index (int): Índice del header (ej: HEADER_CONNECTION)
+
+        Returns:
+            str: Valor del header o None si no se recibió
+        """
+        start = self.spans[2 * index]
+        if start < 0:
+            return None
+        return str(self.view[start:self.spans[2 * index + 1]], "utf-8")
+
+    def header_equals(self, index, value):
+        """
+        Compara el valor de un header sin decodificarlo (sin distinguir mayúsculas)
+
+        Args:
+            index (int): Índice del header
+            value (bytes): Valor esperado en minúsculas
+
+        Returns:
+            bool: True si el header existe y coincide
+        """
+        start = self.spans[2 * index]
+        if start < 0:
+            return False
+        return self._equals(start, self.spans[2 * index + 1], value, True)
+
+    def header_contains(self, index, value):
+        """
+        Busca un valor dentro de un header sin decodificarlo
+
+        Sirve para listas como "Accept: text/html, application/octet-stream".
+        Distingue mayúsculas: los tipos MIME se envían en minúsculas.
+
+        Args:
+            index (int): Índice del header
+            value (bytes): Fragmento a buscar
+
+        Returns:
+            bool: True si el header existe y contiene value
+        """
+        start = self.spans[2 * index]
+        if start < 0:
+            return False
+        return self._find(value, start, self.spans[2 * index + 1]) >= 0
+
+    def content_length(self):
+        """
+        Valor de Content-Length
+
+        Returns:
+            int: Longitud declarada del cuerpo, 0 si no se envió o -1 si no
+                es un número válido
+        """
+        start = self.spans[2 * HEADER_CONTENT_LENGTH]
+        if start < 0:
+            return 0
+        value = 0
+        for i in range(start, self.spans[2 * HEADER_CONTENT_LENGTH + 1]):
+            c = self.buf[i]
+            if c < 48 or c > 57:
+                return -1
+            value = value * 10 + c - 48
+        return value
+
+    def body(self):
+        """
+        Decodifica el cuerpo de la petición
+
+        Solo se atiende el cuerpo que llegó junto a los headers (cabe en el
+        buffer de MAX_REQUEST_SIZE bytes).
+
+        Returns:
+            str: Cuerpo completo según Content-Length, o None si llegó
+                incompleto o Content-Length no es válido
+
+        Raises:
+            UnicodeError: Si el cuerpo no es UTF-8 válido
+        """
+        length = self.content_length()
+        if length < 0 or self.body_start + length > self.length:
+            return None
+        return str(self.view[self.body_start:self.body_start + length], "utf-8")
+
+    def keep_alive(self):
+        """
+        Determina si el cliente pide una conexión persistente
+
+        HTTP/1.1 es persistente salvo "Connection: close"; HTTP/1.0 solo
+        si envía "Connection: keep-alive".
+
+        Returns:
+            bool: True si el cliente quiere mantener la conexión
+        """
+        if self.header_equals(HEADER_CONNECTION, b"close"):
+            return False
+        if self.header_equals(HEADER_CONNECTION, b"keep-alive"):
+            return True
+        return self.http11
+
+    # ==========================================
+    # UTILIDADES
+    # ==========================================
+
+    def _method(self, end):
+        """Método como constante de METHODS (o decodificado si es desconocido)"""
+        for raw, name in METHODS:
+            if self._equals(0, end, raw):
+                return name
+        return str(self.view[0:end], "utf-8")
+
+    def _header_index(self, start, end):
+        """Índice en HEADERS del nombre buf[start:end], o -1"""
+        for index in range(len(HEADERS)):
+            if self._equals(start, end, HEADERS[index], True):
+                return index
+        return -1
+
+    def _equals(self, start, end, value, ignore_case=False):
+        """Compara buf[start:end] con value byte a byte, sin copias"""
+        if end - start != len(value):
+            return False
+        buf = self.buf
+        for i in range(len(value)):
+            c = buf[start + i]
+            if ignore_case and 65 <= c <= 90:
+                c += 32
+            if c != value[i]:
+                return False
+        return True
+
+    def _find(self, needle, start, end):
+        """Posición de needle en buf[start:end], o -1"""
+        if _HAS_FIND:
+            return self.buf.find(needle, start, end)
+
+        buf = self.buf
+        first = needle[0]
+        size = len(needle)
+        for i in range(start, end - size + 1):
+            if buf[i] == first:
+                j = 1
+                while j < size and buf[i + j] == needle[j]:
+                    j += 1
+                if j == size:
+                    return i
+        return -1
@@ -0,0 +1,356 @@
+"""
+Escritor de respuestas HTTP con cabeceras precodificadas
+
+Las status lines y los bloques de headers son constantes bytes; cada
+respuesta se monta en un buffer reutilizable y se envía con un bucle que
+tolera escrituras parciales del socket.
+"""
+
+# Tamaño del buffer de cabeceras (si cabe, el cuerpo va en el mismo envío)
+RESPONSE_BUFFER_SIZE = 512
+
+STATUS_LINES = {
+    "101 Switching Protocols": b"HTTP/1.1 101 Switching Protocols\r\n",
+    "200 OK": b"HTTP/1.1 200 OK\r\n",
+    "304 Not Modified": b"HTTP/1.1 304 Not Modified\r\n",
+    "400 Bad Request": b"HTTP/1.1 400 Bad Request\r\n",
+    "401 Unauthorized": b"HTTP/1.1 401 Unauthorized\r\n",
+    "403 Forbidden": b"HTTP/1.1 403 Forbidden\r\n",
+    "404 Not Found": b"HTTP/1.1 404 Not Found\r\n",
+    "405 Method Not Allowed": b"HTTP/1.1 405 Method Not Allowed\r\n",
+    "409 Conflict": b"HTTP/1.1 409 Conflict\r\n",
+    "429 Too Many Requests": b"HTTP/1.1 429 Too Many Requests\r\n",
+    "500 Internal Server Error": b"HTTP/1.1 500 Internal Server Error\r\n",
+    "501 Not Implemented": b"HTTP/1.1 501 Not Implemented\r\n",
+    "503 Service Unavailable": b"HTTP/1.1 503 Service Unavailable\r\n",
+}
+
+CONTENT_TYPES = {
+    "application/json": b"Content-Type: application/json\r\n",
+    "text/plain": b"Content-Type: text/plain\r\n",
+}
+
+CORS_HEADERS = (
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+    b"Access-Control-Allow-Headers: *\r\n"
+)
+
+CONNECTION_KEEP_ALIVE = b"Connection: keep-alive\r\n"
+CONNECTION_CLOSE = b"Connection: close\r\n"
+CONTENT_LENGTH = b"Content-Length: "
+ETAG = b"ETag: "
+# El navegador guarda la respuesta pero revalida siempre con If-None-Match
+CACHE_REVALIDATE = b"Cache-Control: no-cache\r\n"
+# Ficheros con hash en el nombre: el contenido de una URL no cambia nunca
+CACHE_IMMUTABLE = b"Cache-Control: public, max-age=31536000, immutable\r\n"
+CRLF = b"\r\n"
+
+# Cuerpos enviados por trozos (Transfer-Encoding: chunked)
+TRANSFER_ENCODING_CHUNKED = b"Transfer-Encoding: chunked\r\n"
+LAST_CHUNK = b"0\r\n\r\n"
+HEX_DIGITS = b"0123456789abcdef"
+# Prefijo "1f9\r\n" reservado al principio del buffer: 3 cifras hex (buffer < 4 KB)
+CHUNK_PREFIX_SIZE = 5
+
+
+class ResponseWriter:
+    """Monta y envía respuestas HTTP sobre un buffer preasignado
+
+    Attributes:
+        buf (bytearray): Buffer de cabeceras (se reutiliza entre respuestas)
+        view (memoryview): Vista sin copia de buf
+        bytes_sent (int): Total de bytes enviados desde el arranque
+        chunked (bool): Si el cuerpo en streaming va en chunked
+    """
+
+    def __init__(self, size=RESPONSE_BUFFER_SIZE):
+        """
+        Args:
+            size (int): Tamaño del buffer en bytes
+        """
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.bytes_sent = 0
+
+        # Respuesta en streaming: si va en chunked y dónde empieza/acaba el
+        # trozo acumulado en buf
+        self.chunked = False
+        self._stream_start = 0
+        self._stream_pos = 0
+
+    def send(self, client, status, content_type, body, keep_alive=False, extra_headers=b"", etag=None,
+             cache_control=CACHE_REVALIDATE):
+        """
+        Envía una respuesta completa con Content-Length y headers CORS
+
+        Args:
+            client: Socket del cliente
+            status (str): Status HTTP (ej: "200 OK")
+            content_type (str): Tipo MIME del cuerpo
+            body (str|bytes): Cuerpo de la respuesta
+            keep_alive (bool): Si la conexión queda abierta
+            extra_headers (bytes): Headers adicionales ya terminados en CRLF
+            etag (bytes): ETag entre comillas (activa la revalidación) o None
+            cache_control (bytes): Header Cache-Control que acompaña al ETag
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        pos = self._put_head(status, content_type, len(body), keep_alive, extra_headers, etag, cache_control)
+
+        # Cuerpo pequeño: un único envío con cabeceras y cuerpo juntos
+        if pos + len(body) <= len(self.buf):
+            pos = self._put(pos, body)
+            self.send_all(client, self.view[:pos])
+        else:
+            self.send_all(client, self.view[:pos])
+            self.send_all(client, body)
+
+    def send_head(self, client, status, content_type, length, keep_alive=False, extra_headers=b"", etag=None,
+                  cache_control=CACHE_REVALIDATE):
+        """
+        Envía solo las cabeceras; el llamador manda después length bytes
+        de cuerpo con send_all() (ficheros enviados por trozos)
+
+        Args:
+            client: Socket del cliente
+            status (str): Status HTTP
+            content_type (str): Tipo MIME del cuerpo
+            length (int): Content-Length del cuerpo que vendrá
+            keep_alive (bool): Si la conexión queda abierta
+            extra_headers (bytes): Headers adicionales ya terminados en CRLF
+            etag (bytes): ETag entre comillas o None
+            cache_control (bytes): Header Cache-Control que acompaña al ETag
+        """
+        pos = self._put_head(status, content_type, length, keep_alive, extra_headers, etag, cache_control)
+        self.send_all(client, self.view[:pos])
+
+    def start_stream(self, client, status, content_type, chunked=True, keep_alive=False, extra_headers=b"",
+                     etag=None, cache_control=CACHE_REVALIDATE):
+        """
+        Envía las cabeceras de una respuesta de longitud desconocida
+
+        El cuerpo se añade con write_stream() y se termina con end_stream().
+        Sin chunked (clientes HTTP/1.0) no hay Content-Length: el cuerpo
+        acaba al cerrar la conexión, así que keep_alive debe ser False.
+
+        Args:
+            client: Socket del cliente
+            status (str): Status HTTP
+            content_type (str): Tipo MIME del cuerpo
+            chunked (bool): Usar Transfer-Encoding: chunked
+            keep_alive (bool): Si la conexión queda abierta
+            extra_headers (bytes): Headers adicionales ya terminados en CRLF
+            etag (bytes): ETag entre comillas o None
+            cache_control (bytes): Header Cache-Control que acompaña al ETag
+        """
+        pos = self._put_head(status, content_type, -1 if chunked else None, keep_alive, extra_headers, etag,
+                             cache_control)
+        self.send_all(client, self.view[:pos])
+        self.resume_stream(chunked)
+
+    def resume_stream(self, chunked):
+        """
+        Prepara buf para seguir un cuerpo en streaming vacío
+
+        Lo usa start_stream() y el servidor async tras un drain(), por si
+        otra conexión usó el writer mientras tanto (siempre con buf vacío).
+
+        Args:
+            chunked (bool): Si la respuesta va en Transfer-Encoding: chunked
+        """
+        self.chunked = chunked
+        self._stream_start = CHUNK_PREFIX_SIZE if chunked else 0
+        self._stream_pos = self._stream_start
+
+    def write_stream(self, client, data):
+        """
+        Añade data al cuerpo en curso
+
+        Los trozos pequeños se acumulan en buf y salen juntos cuando se
+        llena, así que la memoria usada no depende del tamaño total.
+
+        Args:
+            client: Socket del cliente
+            data (str|bytes): Siguiente parte del cuerpo
+
+        Returns:
+            bool: True si se envió lo acumulado para hacer sitio
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        # Hueco final para el CRLF que cierra cada chunk
+        limit = len(self.buf) - 2
+        if self._stream_pos + len(data) <= limit:
+            self._stream_pos = self._put(self._stream_pos, data)
+            return False
+
+        self.flush_stream(client)
+        if self._stream_start + len(data) <= limit:
+            self._stream_pos = self._put(self._stream_pos, data)
+        else:
+            # Más grande que el buffer: se envía como un chunk propio
+            if self.chunked:
+                self.send_all(client, "{:x}\r\n".format(len(data)).encode())
+                self.send_all(client, data)
+                self.send_all(client, CRLF)
+            else:
+                self.send_all(client, data)
+        return True
+
+    def flush_stream(self, client):
+        """
+        Envía lo acumulado por write_stream() (un chunk) y vacía buf
+
+        Args:
+            client: Socket del cliente
+        """
+        size = self._stream_pos - self._stream_start
+        if not size:
+            return
+
+        if self.chunked:
+            # Tamaño en hexadecimal con ceros a la izquierda en el prefijo reservado
+            for i in (2, 1, 0):
+                self.buf[i] = HEX_DIGITS[size & 15]
+                size >>= 4
+            self.buf[3] = 13
+            self.buf[4] = 10
+            end = self._put(self._stream_pos, CRLF)
+            self.send_all(client, self.view[:end])
+        else:
+            self.send_all(client, self.view[:self._stream_pos])
+        self._stream_pos = self._stream_start
+
+    def end_stream(self, client):
+        """
+        Envía lo pendiente y el chunk final
+
+        Args:
+            client: Socket del cliente
+        """
+        self.flush_stream(client)
+        if self.chunked:
+            self.send_all(client, LAST_CHUNK)
+
+    def send_not_modified(self, client, etag, keep_alive=False, cache_control=CACHE_REVALIDATE):
+        """
+        Envía un 304 Not Modified (sin cuerpo ni Content-Length)
+
+        Args:
+            client: Socket del cliente
+            etag (bytes): ETag que el cliente ya tiene
+            keep_alive (bool): Si la conexión queda abierta
+            cache_control (bytes): Header Cache-Control que acompaña al ETag
+        """
+        pos = self._put(0, STATUS_LINES["304 Not Modified"])
+        pos = self._put_etag(pos, etag, cache_control)
+        pos = self._put(pos, CONNECTION_KEEP_ALIVE if keep_alive else CONNECTION_CLOSE)
+        pos = self._put(pos, CORS_HEADERS)
+        pos = self._put(pos, CRLF)
+        self.send_all(client, self.view[:pos])
+
+    def send_all(self, client, data):
+        """
+        Envía todos los bytes aunque el socket acepte escrituras parciales
+
+        Args:
+            client: Socket del cliente
+            data (bytes|memoryview): Datos a enviar
+
+        Raises:
+            OSError: Si el socket deja de aceptar datos
+        """
+        total = len(data)
+
+        # Caso habitual: el socket acepta todo en la primera llamada
+        sent = client.send(data)
+        if not sent:
+            raise OSError("send: conexión cerrada")
+
+        if sent < total:
+            view = memoryview(data)
+            while sent < total:
+                n = client.send(view[sent:])
+                if not n:
+                    raise OSError("send: conexión cerrada")
+                sent += n
+        self.bytes_sent += total
+
+    # ==========================================
+    # UTILIDADES
+    # ==========================================
+
+    def _status_line(self, status):
+        """Status line precodificada (se crea y guarda si es nueva)"""
+        line = STATUS_LINES.get(status)
+        if line is None:
+            line = b"HTTP/1.1 " + status.encode("utf-8") + CRLF
+            STATUS_LINES[status] = line
+        return line
+
+    def _content_type(self, content_type):
+        """Header Content-Type precodificado (se crea y guarda si es nuevo)"""
+        header = CONTENT_TYPES.get(content_type)
+        if header is None:
+            header = b"Content-Type: " + content_type.encode("utf-8") + CRLF
+            CONTENT_TYPES[content_type] = header
+        return header
+
+    def _put_head(self, status, content_type, length, keep_alive, extra_headers, etag, cache_control):
+        """
+        Escribe status line y cabeceras al principio del buffer y devuelve su longitud
+
+        length -1 envía Transfer-Encoding: chunked y None ninguna de las dos
+        (cuerpo delimitado por el cierre de la conexión).
+        """
+        pos = self._put(0, self._status_line(status))
+        pos = self._put(pos, self._content_type(content_type))
+        if length == -1:
+            pos = self._put(pos, TRANSFER_ENCODING_CHUNKED)
+        elif length is not None:
+            pos = self._put(pos, CONTENT_LENGTH)
+            pos = self._put_int(pos, length)
+            pos = self._put(pos, CRLF)
+        pos = self._put(pos, CONNECTION_KEEP_ALIVE if keep_alive else CONNECTION_CLOSE)
+        pos = self._put(pos, CORS_HEADERS)
+        if etag is not None:
+            pos = self._put_etag(pos, etag, cache_control)
+        if extra_headers:
+            pos = self._put(pos, extra_headers)
+        return self._put(pos, CRLF)
+
+    def _put(self, pos, data):
+        """Copia data en el buffer a partir de pos y devuelve la nueva posición"""
+        end = pos + len(data)
+        self.view[pos:end] = data
+        return end
+
+    def _put_etag(self, pos, etag, cache_control=CACHE_REVALIDATE):
+        """Escribe los headers ETag y Cache-Control"""
+        pos = self._put(pos, ETAG)
+        pos = self._put(pos, etag)
+        pos = self._put(pos, CRLF)
+        return self._put(pos, cache_control)
+
+    def _put_int(self, pos, value):
+        """Escribe un entero decimal en el buffer sin crear cadenas"""
+        if value == 0:
+            self.buf[pos] = 48
+            return pos + 1
+
+        digits = 0
+        rest = value
+        while rest:
+            digits += 1
+            rest //= 10
+
+        end = pos + digits
+        i = end - 1
+        while value:
+            self.buf[i] = 48 + value % 10
+            value //= 10
+            i -= 1
+        return end
@@ -3,8 +3,29 @@ Servidor HTTP con API REST para control del robot
 """
 import socket
 import time
+import random
 import machine
 import config
+from http_request import HTTPRequest, MAX_REQUEST_SIZE, HEADER_IF_NONE_MATCH, HEADER_ACCEPT
+from http_response import ResponseWriter, CACHE_REVALIDATE
+import telemetry_format
+from udp_control import UDPControl
+from rate_limiter import RateLimiter
+from motion_program import MotionProgram, parse_program
+from sensor_sampler import SensorSampler
+from sensor_array import SensorArray
+from sensor_handler import ERROR_TOO_CLOSE
+from loop_profiler import LoopProfiler
+from static_files import StaticFiles, CONTENT_ENCODING_GZIP
+import metrics
+
+
+# Secciones de /snapshot en el orden en que se devuelven
+SNAPSHOT_FIELDS = ("status", "telemetry", "security", "logs")
+
+# Errores de accept() que solo indican que no hay nadie esperando:
+# EAGAIN (socket no bloqueante) y ETIMEDOUT (Linux / lwIP)
+ACCEPT_IDLE_ERRNOS = (11, 110, 116)
 
 
 class HTTPServer:
@@ -30,8 +51,74 @@ class HTTPServer:
         self.auto_mode = auto_mode
         self.socket = None
 
-        # Rate limiting: diccionario {IP: [timestamp1, timestamp2, ...]}
-        self.request_history = {}
+        # Canal de control UDP (solo si config.UDP_CONTROL_ENABLED)
+        self.udp = None
+
+        # Lecturas del sensor cacheadas: main.py pasa un SensorArray que
+        # comparte con AutoMode; con el sensor directo se crea un muestreador
+        if isinstance(sensor, (SensorSampler, SensorArray)):
+            self.sampler = sensor
+        else:
+            self.sampler = SensorSampler(sensor)
+
+        # Programa de movimiento temporizado (/program)
+        self.program = MotionProgram(motors, logger)
+
+        # Rate limiting: token buckets por IP con tabla acotada
+        self.rate_limiter = RateLimiter(
+            config.RATE_LIMIT_REQUESTS,
+            config.RATE_LIMIT_EXPENSIVE_REQUESTS,
+            config.RATE_LIMIT_WINDOW_MS,
+            config.RATE_LIMIT_MAX_CLIENTS
+        )
+
+        # Conexiones persistentes (keep-alive): [[socket, ip, último_uso_ms], ...]
+        self.keepalive_clients = []
+
+        # Timeout actual de accept() y contadores de conexiones: aceptadas,
+        # atendidas de la cola en la misma vuelta y rechazadas por accept()
+        self._accept_timeout = None
+        self.connections_accepted = 0
+        self.connections_queued = 0
+        self.connections_refused = 0
+
+        # Buffers de recepción y respuesta reutilizados por todas las peticiones
+        self.request = HTTPRequest(MAX_REQUEST_SIZE)
+        self.writer = ResponseWriter()
+
+        # Si la respuesta en curso mantiene la conexión abierta
+        self._keep_alive = False
+
+        # ETags: prefijo aleatorio por arranque (las versiones vuelven a 0
+        # al reiniciar) y caché {tipo: (versión, etag)}
+        self.boot_id = "{:04x}".format(random.getrandbits(16))
+        self._etags = {}
+
+        # Cuerpo de /status por segundo de uptime: (uptime, json)
+        self._status_cache = (-1, None)
+
+        # Telemetría binaria: número de muestra y registro reutilizado
+        self.telemetry_seq = 0
+        self._telemetry_record = bytearray(telemetry_format.RECORD_SIZE)
+
+        # Métricas por ruta (/metrics) y status de la última respuesta enviada
+        self.metrics = metrics.Metrics(config.METRICS_MAX_ROUTES)
+        self._status = "200 OK"
+
+        # Retraso del loop de control, jitter del modo auto y tiempo por petición
+        self.profiler = LoopProfiler()
+        # Si la última comprobación del modo auto sirve de referencia para la
+        # siguiente (no la hay tras arrancar ni tras desactivarlo)
+        self._auto_checked = False
+
+        # Dashboard comprimido en la flash (sin www/ solo se sirve la API)
+        self.static = StaticFiles()
+        self.static.load()
+
+        # Tabla de rutas: {path: {método: handler}} y paths con límite costoso
+        self.routes = {}
+        self.expensive_routes = set()
+        self._register_routes()
     
     def start(self):
         """Inicia el servidor HTTP"""
@@ -40,9 +127,27 @@ class HTTPServer:
         self.socket = socket.socket()
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.socket.bind(addr)
-        self.socket.listen(1)
-        self.socket.settimeout(config.SOCKET_TIMEOUT)
+        self.socket.listen(config.SERVER_BACKLOG)
+        self._set_accept_timeout(config.SOCKET_TIMEOUT)
+        
+        self._open_udp_control()
+        self._print_banner()
+        
+        self.motors.stop()
+        self.logger.add("🚀 Servidor HTTP iniciado")
         
+        # Loop principal
+        self._run_loop()
+    
+    def _open_udp_control(self):
+        """Abre el canal de control UDP si está activado en config"""
+        if not config.UDP_CONTROL_ENABLED:
+            return
+        self.udp = UDPControl(self.motors, self.security, self.logger, self.program)
+        self.udp.open(self.ip, config.UDP_CONTROL_PORT)
+
+    def _print_banner(self):
+        """Muestra por consola la URL de la API y los endpoints disponibles"""
         print("\n" + "="*50)
         print("SERVIDOR HTTP INICIADO")
         print("="*50)
@@ -54,7 +159,14 @@ class HTTPServer:
         print("  GET  /telemetry     - Telemetría de sensores")
         print("  GET  /move?dir=X    - Control de movimiento")
         print("  GET  /auto?enabled=X - Modo automático")
+        print("  GET|POST /program   - Secuencia temporizada (F:500,L:300,...)")
+        print("  GET  /metrics       - Métricas en formato Prometheus")
         print("  GET  /security      - Estado de seguridad")
+        print("  GET  /snapshot      - status, telemetry y security (logs con ?token=XXX)")
+        print("")
+        print("Streaming (solo modo async, logs con ?token=XXX):")
+        print("  GET  /ws            - WebSocket: estado en vivo y comandos move:X")
+        print("  GET  /events        - Server-Sent Events con los mismos cambios")
         print("")
         print("Endpoints protegidos (requieren ?token=XXX):")
         print("  GET  /logs?token=XXX   - Historial de logs")
@@ -62,252 +174,656 @@ class HTTPServer:
         print("  GET  /restart?token=XXX - Reiniciar ESP32")
         print("="*50)
         print("")
-        print("Rate limiting: {} req/{}ms por IP".format(
+        if config.UDP_CONTROL_ENABLED:
+            print("Control UDP binario en puerto {}".format(config.UDP_CONTROL_PORT))
+        print("Rate limiting: {} req/{}ms por IP ({} en endpoints caros)".format(
             config.RATE_LIMIT_REQUESTS,
-            config.RATE_LIMIT_WINDOW_MS
+            config.RATE_LIMIT_WINDOW_MS,
+            config.RATE_LIMIT_EXPENSIVE_REQUESTS
         ))
         print("="*50)
         print("")
-        
-        self.motors.stop()
-        self.logger.add("🚀 Servidor HTTP iniciado")
-        
-        # Loop principal
-        self._run_loop()
     
     def _run_loop(self):
         """Loop principal del servidor"""
         while True:
-            # Ejecutar paso del modo automático
-            self.auto_mode.step()
+            # Programa de movimiento y modo automático
+            self._control_step()
+
+            # Comandos UDP pendientes (no bloquea)
+            if self.udp is not None:
+                self.udp.poll()
+
+            # Atender peticiones en conexiones persistentes
+            self._poll_keepalive()
+
+            self._set_accept_timeout(self._accept_wait())
 
             # Intentar aceptar conexión
+            accepted = self._accept()
+            if accepted is None:
+                continue
+
+            # Procesar request y, dentro del presupuesto, las que esperan en cola
+            self._handle_request(accepted[0], accepted[1])
+            self._accept_backlog()
+
+    def _accept_wait(self):
+        """
+        Espera de accept() para el siguiente paso del loop
+
+        Con conexiones abiertas, control UDP, un programa en curso o el modo
+        automático se espera menos para no retrasar lo siguiente. Mientras
+        se pide alcance reducido al sensor, accept() no espera más que el
+        intervalo de muestreo: si no, el muestreo caería al ritmo de
+        SOCKET_TIMEOUT.
+
+        Returns:
+            float: Segundos
+        """
+        busy = (self.keepalive_clients or self.udp is not None
+                or self.program.is_running() or self.auto_mode.is_enabled())
+        timeout = config.KEEPALIVE_POLL_TIMEOUT if busy else config.SOCKET_TIMEOUT
+        sampling = self._sampling_interval_s()
+        if sampling is not None and sampling < timeout:
+            timeout = sampling
+        return timeout
+
+    def _sampling_interval_s(self):
+        """
+        Returns:
+            float: Intervalo de muestreo del sensor en segundos mientras un
+                consumidor pide alcance reducido (request_range), o None
+        """
+        sampler = self.sampler
+        if sampler.range_cm is None:
+            return None
+        return sampler.active_interval_ms() / 1000
+
+    def _set_accept_timeout(self, timeout):
+        """
+        Cambia el timeout de accept() solo si es distinto del actual
+
+        Args:
+            timeout (float): Segundos (0 = no bloqueante)
+        """
+        if timeout != self._accept_timeout:
+            self.socket.settimeout(timeout)
+            self._accept_timeout = timeout
+
+    def _accept(self):
+        """
+        Acepta una conexión con el timeout actual
+
+        Returns:
+            tuple: (socket, dirección) o None si no había ninguna esperando
+        """
+        try:
+            client, remote = self.socket.accept()
+        except OSError as e:
+            # Timeout o cola vacía: nada que hacer. Cualquier otro error
+            # (sin memoria, sin sockets libres...) es una conexión perdida
+            code = e.args[0] if e.args else None
+            if isinstance(code, int) and code not in ACCEPT_IDLE_ERRNOS:
+                self.connections_refused += 1
+            return None
+
+        self.connections_accepted += 1
+        return client, remote
+
+    def _accept_backlog(self):
+        """
+        Atiende sin esperar las conexiones que ya están en la cola
+
+        Una ráfaga de varios dashboards se sirve en la misma vuelta en lugar
+        de una conexión por paso de control, hasta config.ACCEPT_BUDGET_MS.
+
+        Returns:
+            int: Conexiones atendidas desde la cola
+        """
+        budget = config.ACCEPT_BUDGET_MS
+        if budget <= 0:
+            return 0
+
+        started = time.ticks_ms()
+        served = 0
+        self._set_accept_timeout(0)
+        while time.ticks_diff(time.ticks_ms(), started) < budget:
+            accepted = self._accept()
+            if accepted is None:
+                break
+            self.connections_queued += 1
+            served += 1
+            # Los sockets aceptados pueden heredar el modo no bloqueante
+            accepted[0].settimeout(None)
+            self._handle_request(accepted[0], accepted[1])
+        return served
+
+    def _control_step(self):
+        """Un paso de control: muestreo del sensor, programa de movimiento y modo automático"""
+        profiler = self.profiler
+        started = profiler.step_started()
+
+        self.sampler.step()
+        if self.program.is_running() and self.security.is_safe_mode_active():
+            self.program.stop("safe_mode")
+        self.program.step()
+
+        # Intervalo real entre comprobaciones: last_check solo cambia cuando
+        # step() pasa el control de frecuencia y comprueba de verdad
+        auto = self.auto_mode
+        last_check = auto.last_check
+        auto.step()
+        if auto.last_check != last_check:
+            if self._auto_checked:
+                profiler.auto_checked(time.ticks_diff(auto.last_check, last_check))
+            self._auto_checked = True
+        elif not auto.is_enabled():
+            self._auto_checked = False
+
+        profiler.step_finished(started)
+
+    def _poll_keepalive(self):
+        """
+        Revisa sin bloquear las conexiones persistentes
+
+        Atiende las que tienen una petición pendiente y cierra las que
+        superan config.KEEPALIVE_IDLE_MS sin actividad.
+        """
+        if not self.keepalive_clients:
+            return
+
+        now = time.ticks_ms()
+        for entry in self.keepalive_clients[:]:
+            client, client_ip, last_used = entry
             try:
-                client, remote = self.socket.accept()
+                received = self.request.receive(client)
             except OSError:
-                # Timeout, continuar el loop
+                # Sin datos todavía (socket no bloqueante)
+                if time.ticks_diff(now, last_used) > config.KEEPALIVE_IDLE_MS:
+                    self.keepalive_clients.remove(entry)
+                    self._close_client(client)
+                continue
+
+            self.keepalive_clients.remove(entry)
+            if not received:
+                # El cliente cerró la conexión
+                self._close_client(client)
                 continue
 
-            # Procesar request
-            self._handle_request(client, remote)
+            client.settimeout(None)
+            self._serve_client(client, client_ip)
 
-    def _check_rate_limit(self, client_ip):
+    def _check_rate_limit(self, client_ip, expensive=False):
         """
         Verifica si un cliente ha excedido el rate limit
 
         Args:
             client_ip (str): IP del cliente
+            expensive (bool): True para el límite de endpoints caros
 
         Returns:
             bool: True si está permitido, False si excede el límite
         """
-        now = time.ticks_ms()
+        return self.rate_limiter.allow(client_ip, expensive)
+
+    def _handle_request(self, client, remote):
+        """
+        Maneja una petición HTTP
 
-        # Inicializar historial si es primera vez
-        if client_ip not in self.request_history:
-            self.request_history[client_ip] = []
+        Args:
+            client: Socket del cliente
+            remote: Información del cliente remoto
+        """
+        try:
+            # Recibir datos directamente en el buffer (máximo MAX_REQUEST_SIZE)
+            received = self.request.receive(client)
+        except OSError as e:
+            self.logger.add("ERROR al recibir petición: " + str(e))
+            received = 0
 
-        # Obtener historial de esta IP
-        history = self.request_history[client_ip]
+        if not received:
+            self._close_client(client)
+            return
 
-        # Filtrar requests dentro de la ventana de tiempo
-        window_start = time.ticks_diff(now, config.RATE_LIMIT_WINDOW_MS)
-        recent_requests = [ts for ts in history if time.ticks_diff(now, ts) < config.RATE_LIMIT_WINDOW_MS]
+        self._serve_client(client, remote[0])
 
-        # Actualizar historial
-        self.request_history[client_ip] = recent_requests
+    def _serve_client(self, client, client_ip):
+        """
+        Responde la petición recibida en self.request y decide si la
+        conexión sigue abierta
 
-        # Verificar límite
-        if len(recent_requests) >= config.RATE_LIMIT_REQUESTS:
-            return False
+        Args:
+            client: Socket del cliente
+            client_ip (str): IP del cliente
+        """
+        keep_alive = False
+        started = time.ticks_us()
+        try:
+            keep_alive = self._process_request(client, client_ip)
 
-        # Agregar este request al historial
-        recent_requests.append(now)
-        return True
+        except Exception as e:
+            self.logger.add("ERROR crítico en _handle_request: " + str(e))
+            self._keep_alive = False
+            try:
+                self._send_json(client, '{"error":"server error"}', "500 Internal Server Error")
+            except OSError as close_error:
+                self.logger.add("ERROR al enviar respuesta de error: " + str(close_error))
 
-    def _handle_request(self, client, remote):
+        finally:
+            self.profiler.request_finished(started)
+            if keep_alive:
+                # Socket no bloqueante para revisarlo en _poll_keepalive()
+                client.settimeout(0)
+                self.keepalive_clients.append([client, client_ip, time.ticks_ms()])
+            else:
+                self._close_client(client)
+
+    def _close_client(self, client):
         """
-        Maneja una petición HTTP
+        Cierra el socket de un cliente
 
         Args:
             client: Socket del cliente
-            remote: Información del cliente remoto
         """
         try:
-            # Obtener IP del cliente
-            client_ip = remote[0]
+            client.close()
+        except OSError as e:
+            # Error al cerrar socket, loguear pero continuar
+            self.logger.add("ERROR al cerrar socket: " + str(e))
 
-            # Verificar rate limiting
-            if not self._check_rate_limit(client_ip):
-                self.logger.add("RATE_LIMIT excedido: " + client_ip)
-                self._send_json(client, '{"error":"too many requests"}', "429 Too Many Requests")
-                return
+    def _keepalive_available(self):
+        """
+        Indica si queda hueco para otra conexión persistente
 
-            # Recibir datos (máximo 1024 bytes)
-            MAX_REQUEST_SIZE = 1024
-            request = client.recv(MAX_REQUEST_SIZE)
-            if not request:
-                return
+        Returns:
+            bool: True si la conexión actual puede quedar abierta
+        """
+        return len(self.keepalive_clients) < config.KEEPALIVE_MAX_CONNECTIONS
 
-            # Decodificar
-            try:
-                text = request.decode('utf-8')
-            except UnicodeDecodeError as e:
-                self.logger.add("ERROR: Request inválido (UTF-8): " + str(e))
-                self._send_json(client, '{"error":"invalid encoding"}', "400 Bad Request")
-                return
+    def _process_request(self, client, client_ip):
+        """
+        Procesa la petición recibida en self.request y envía la respuesta
 
-            # Parsear primera línea
-            lines = text.split("\r\n")
-            if not lines:
-                return
+        Compartido por el loop bloqueante y por AsyncHTTPServer: no
+        lee ni cierra el socket, solo valida, enruta y responde.
 
-            request_line = lines[0]
+        Args:
+            client: Socket del cliente (o cualquier objeto con send())
+            client_ip (str): IP del cliente
 
-            # Manejar preflight CORS (OPTIONS)
-            if request_line.startswith("OPTIONS"):
-                self._send_text(client, "ok", "200 OK")
-                return
+        Returns:
+            bool: True si la conexión debe mantenerse abierta (keep-alive)
+        """
+        self._keep_alive = False
+        request = self.request
 
-            # Parsear path
-            path = self._parse_path(request_line)
+        # Verificar rate limiting
+        if not self._check_rate_limit(client_ip):
+            self.metrics.count_rate_limited(metrics.BUDGET_GENERAL)
+            self.logger.add("RATE_LIMIT excedido: " + client_ip)
+            self._send_json(client, '{"error":"too many requests"}', "429 Too Many Requests")
+            return False
 
-            # Validar longitud de path
-            if len(path) > 256:
-                self.logger.add("ERROR: Path demasiado largo")
-                self._send_json(client, '{"error":"path too long"}', "400 Bad Request")
-                return
+        # Parsear request line y headers de interés (sin copiar el buffer)
+        if not request.parse():
+            self._send_json(client, '{"error":"bad request"}', "400 Bad Request")
+            return False
 
-            # Validar caracteres en path (sanitización básica)
-            if ".." in path or "\\" in path:
-                self.logger.add("ERROR: Path inválido (traversal): " + path)
-                self._send_json(client, '{"error":"invalid path"}', "400 Bad Request")
-                return
+        # Conexión persistente si el cliente la admite y hay hueco libre
+        self._keep_alive = request.keep_alive() and self._keepalive_available()
 
-            # Rutear la petición
-            self._route_request(client, path, client_ip)
+        # Manejar preflight CORS (OPTIONS)
+        if request.method == "OPTIONS":
+            self._send_text(client, "ok", "200 OK")
+            return self._keep_alive
 
-        except Exception as e:
-            self.logger.add("ERROR crítico en _handle_request: " + str(e))
-            try:
-                self._send_json(client, '{"error":"server error"}', "500 Internal Server Error")
-            except OSError as close_error:
-                self.logger.add("ERROR al enviar respuesta de error: " + str(close_error))
+        # Validar longitud de path (antes de decodificarlo)
+        if request.path_length() > 256:
+            self.logger.add("ERROR: Path demasiado largo")
+            self._send_json(client, '{"error":"path too long"}', "400 Bad Request")
+            return self._keep_alive
 
-        finally:
-            try:
-                client.close()
-            except OSError as e:
-                # Error al cerrar socket, loguear pero continuar
-                self.logger.add("ERROR al cerrar socket: " + str(e))
+        # Decodificar solo el path
+        try:
+            path = request.path()
+        except UnicodeError as e:
+            self.logger.add("ERROR: Request inválido (UTF-8): " + str(e))
+            self._send_json(client, '{"error":"invalid encoding"}', "400 Bad Request")
+            return False
+
+        # Validar caracteres en path (sanitización básica)
+        if ".." in path or "\\" in path:
+            self.logger.add("ERROR: Path inválido (traversal): " + path)
+            self._send_json(client, '{"error":"invalid path"}', "400 Bad Request")
+            return self._keep_alive
+
+        # Rutear la petición
+        self._route_request(client, path, client_ip, request.method)
+        return self._keep_alive
     
-    def _route_request(self, client, path, client_ip):
+    def add_route(self, path, handler, methods=("GET",), expensive=False):
+        """
+        Registra un endpoint en la tabla de rutas
+
+        Args:
+            path (str): Path exacto, sin query string (ej: "/status")
+            handler (callable): Función handler(client, query, client_ip)
+            methods (tuple): Métodos HTTP aceptados
+            expensive (bool): Si el endpoint consume además del límite costoso
+        """
+        route = self.routes.get(path)
+        if route is None:
+            route = {}
+            self.routes[path] = route
+
+        for method in methods:
+            route[method] = handler
+
+        self.metrics.add_route(path)
+        if expensive:
+            self.expensive_routes.add(path)
+
+    def _register_routes(self):
+        """Registra los endpoints de la API (se llama una vez al crear el servidor)"""
+        self.add_route("/", self._handle_root)
+        self.add_route("/status", self._handle_status)
+        self.add_route("/telemetry", self._handle_telemetry)
+        self.add_route("/move", self._handle_move)
+        self.add_route("/auto", self._handle_auto)
+        self.add_route("/logs", self._handle_logs, expensive=True)
+        self.add_route("/security", self._handle_security)
+        self.add_route("/clear", self._handle_clear)
+        self.add_route("/restart", self._handle_restart)
+        self.add_route("/snapshot", self._handle_snapshot, expensive=True)
+        self.add_route("/program", self._handle_program, ("GET", "POST"))
+        self.add_route("/metrics", self._handle_metrics, expensive=True)
+        self.add_route("/ws", self._handle_websocket)
+        self.add_route("/events", self._handle_events)
+
+        # Dashboard: una ruta por fichero del manifiesto ("/" sirve index.html)
+        for url in self.static.files:
+            if url != "/":
+                self.add_route(url, self._static_handler(self.static.files[url]))
+
+    def _route_request(self, client, path, client_ip, method="GET"):
         """
         Enruta la petición al handler correspondiente
         
+        Separa el path del query string una sola vez y busca el handler
+        en la tabla de rutas (coincidencia exacta, por método).
+        
         Args:
             client: Socket del cliente
-            path (str): Path de la petición
+            path (str): Path de la petición (con query string)
             client_ip (str): IP del cliente
+            method (str): Método HTTP de la petición
         """
-        if path == "/":
-            self._handle_root(client)
-        
-        elif path.startswith("/status"):
-            self._handle_status(client)
-        
-        elif path.startswith("/telemetry"):
-            self._handle_telemetry(client)
-        
-        elif path.startswith("/move"):
-            self._handle_move(client, path, client_ip)
-        
-        elif path.startswith("/auto"):
-            self._handle_auto(client, path)
-        
-        elif path.startswith("/logs"):
-            self._handle_logs(client, path)
+        separator = path.find("?")
+        if separator < 0:
+            route_path = path
+            query = ""
+        else:
+            route_path = path[:separator]
+            query = path[separator + 1:]
 
-        elif path.startswith("/security"):
-            self._handle_security(client)
+        # Latencia del despacho y el handler, por ruta y código de estado
+        route_index = self.metrics.route(route_path)
+        started = time.ticks_us()
+        # Los handlers que no pasan por _send_json fijan su propio status
+        self._status = "200 OK"
+        self._dispatch(client, path, route_path, query, client_ip, method)
+        self.metrics.observe(route_index, self._status, time.ticks_diff(time.ticks_us(), started))
 
-        elif path.startswith("/clear"):
-            self._handle_clear(client, path)
+    def _dispatch(self, client, path, route_path, query, client_ip, method):
+        """Busca el handler de route_path y lo ejecuta (404/405/429 si no procede)"""
+        route = self.routes.get(route_path)
+        if route is None:
+            self._handle_not_found(client, path, client_ip)
+            return
 
-        elif path.startswith("/restart"):
-            self._handle_restart(client, path, client_ip)
+        handler = route.get(method)
+        if handler is None:
+            self._send_json(client, '{"error":"method not allowed"}', "405 Method Not Allowed")
+            return
 
-        else:
-            self._handle_not_found(client, path, client_ip)
+        # Los endpoints caros tienen además su propio presupuesto
+        if route_path in self.expensive_routes and not self._check_rate_limit(client_ip, True):
+            self.metrics.count_rate_limited(metrics.BUDGET_EXPENSIVE)
+            self.logger.add("RATE_LIMIT (costoso) excedido: " + client_ip)
+            self._send_json(client, '{"error":"too many requests"}', "429 Too Many Requests")
+            return
+
+        handler(client, query, client_ip)
     
     # ==========================================
     # HANDLERS DE ENDPOINTS
     # ==========================================
     
-    def _handle_root(self, client):
-        """Handler para /"""
+    def _handle_root(self, client, query, client_ip):
+        """Handler para / - el dashboard si está en la flash, si no un texto de verificación"""
+        index = self.static.get("/index.html")
+        if index is not None:
+            self._send_static(client, index)
+            return
         self._send_text(client, "ESP32 Robot API OK")
+
+    def _static_handler(self, entry):
+        """
+        Args:
+            entry (StaticFile): Fichero del dashboard
+
+        Returns:
+            Handler de ruta que envía entry
+        """
+        def handler(client, query, client_ip):
+            self._send_static(client, entry)
+        return handler
+
+    def _send_static(self, client, entry):
+        """
+        Envía un fichero del dashboard ya comprimido con gzip
+
+        Las cabeceras salen de la entrada del manifiesto; el cuerpo se lee
+        de la flash por trozos (ver _send_file_body).
+
+        Args:
+            client: Socket del cliente
+            entry (StaticFile): Fichero a enviar
+        """
+        if self._not_modified(client, entry.etag, entry.cache_control):
+            return
+
+        try:
+            f = self.static.open(entry)
+        except OSError:
+            self.logger.add("ERROR: falta " + entry.path + " (vuelve a subir www/)")
+            self._send_json(client, '{"error":"not found"}', "404 Not Found")
+            return
+
+        self._status = "200 OK"
+        self.writer.send_head(
+            client, "200 OK", entry.content_type, entry.size, self._keep_alive,
+            CONTENT_ENCODING_GZIP, entry.etag, entry.cache_control
+        )
+        self._send_file_body(client, f)
+
+    def _send_file_body(self, client, f):
+        """
+        Envía y cierra el fichero abierto tras sus cabeceras
+
+        AsyncHTTPServer lo sobrescribe para esperar al drain() entre trozos.
+
+        Args:
+            client: Socket del cliente
+            f: Fichero abierto con self.static.open()
+        """
+        self.static.send(client, self.writer, f)
     
-    def _handle_status(self, client):
-        """Handler para /status"""
+    def _handle_status(self, client, query, client_ip):
+        """Handler para /status (el contenido solo cambia con el uptime)"""
+        etag = self._etag("u", self.logger.get_uptime_seconds())
+        if self._not_modified(client, etag):
+            return
+        self._send_json(client, self._status_json(), etag=etag)
+
+    def _status_json(self):
+        """Cuerpo JSON de /status (también se envía por /ws)"""
         uptime = self.logger.get_uptime_seconds()
-        body = (
-            '{'
-            '"uptime": ' + str(uptime) + ','
-            '"wifi": "ok",'
-            '"ip": "' + self.ip + '"'
-            '}'
-        )
-        self._send_json(client, body)
+        if self._status_cache[0] != uptime:
+            body = (
+                '{'
+                '"uptime": ' + str(uptime) + ','
+                '"wifi": "ok",'
+                '"ip": "' + self.ip + '"'
+                '}'
+            )
+            self._status_cache = (uptime, body)
+        return self._status_cache[1]
     
-    def _handle_telemetry(self, client):
-        """Handler para /telemetry"""
+    def _handle_telemetry(self, client, query, client_ip):
+        """
+        Handler para /telemetry
+
+        Con ?fmt=bin o "Accept: application/octet-stream" responde con un
+        registro binario de telemetry_format en lugar de JSON.
+        """
+        fmt = self._query_param(query, "fmt")
+        if fmt is None:
+            binary = self.request.header_contains(HEADER_ACCEPT, b"application/octet-stream")
+        else:
+            binary = fmt == "bin"
+        if binary:
+            self._send_response(
+                client, self._telemetry_record_bytes(), "200 OK", telemetry_format.CONTENT_TYPE
+            )
+            return
+        self._send_json(client, self._telemetry_json())
+
+    def _telemetry_record_bytes(self):
+        """
+        Registro binario de la telemetría actual
+
+        Returns:
+            bytearray: Registro reutilizado (válido hasta la siguiente muestra)
+        """
+        distance = self.sampler.measure_distance_cm()
+        obstacle = distance == ERROR_TOO_CLOSE or 0 <= distance < self.auto_mode.min_distance
+        self.telemetry_seq += 1
+        telemetry_format.pack_into(
+            self._telemetry_record,
+            self.telemetry_seq,
+            time.ticks_diff(time.ticks_ms(), self.logger.start_time),
+            distance,
+            obstacle,
+            self.auto_mode.is_enabled()
+        )
+        return self._telemetry_record
+
+    def _telemetry_json(self):
+        """
+        Cuerpo JSON de /telemetry (también se envía por /ws)
+
+        La distancia sale de las muestras de self.sampler (no mide):
+        distance_cm es la filtrada según SENSOR_FILTER, distance_raw_cm la
+        última lectura y distance_median_cm/distance_ema_cm los dos filtros;
+        valid_ratio es la fracción de lecturas válidas del historial.
+        sample_age_ms es la edad de la última y stale indica que supera
+        max_sample_age_ms, en cuyo caso las distancias son -1.0. Con un
+        SensorArray, sensors da la distancia filtrada de cada posición.
+        """
         uptime = self.logger.get_uptime_seconds()
-        distance = self.sensor.measure_distance_cm()
+        sampler = self.sampler
+        history = sampler.history
+        distance = sampler.measure_distance_cm()
+        obstacle = distance == ERROR_TOO_CLOSE or 0 <= distance < self.auto_mode.min_distance
         
         if distance < 0:
             distance = -1.0
+
+        stale = sampler.is_stale()
+        raw = sampler.raw_distance_cm()
+        median = -1.0 if stale else history.median()
+        ema = -1.0 if stale else history.ema()
         
-        obstacle = distance != -1.0 and distance < self.auto_mode.min_distance
-        
-        body = (
+        return (
             '{'
             '"uptime": ' + str(uptime) + ','
             '"distance_cm": ' + "{:.1f}".format(distance) + ','
+            '"distance_raw_cm": ' + "{:.1f}".format(raw if raw >= 0 else -1.0) + ','
+            '"distance_median_cm": ' + "{:.1f}".format(median) + ','
+            '"distance_ema_cm": ' + "{:.1f}".format(ema) + ','
+            '"valid_ratio": ' + "{:.2f}".format(history.valid_ratio()) + ','
+            + self._sensors_json() +
+            '"sample_age_ms": ' + str(sampler.age_ms()) + ','
+            '"max_sample_age_ms": ' + str(sampler.max_age_ms) + ','
+            '"stale": ' + str(stale).lower() + ','
             '"obstacle": ' + str(obstacle).lower() + ','
-            '"auto_enabled": ' + str(self.auto_mode.is_enabled()).lower() +
+            '"auto_enabled": ' + str(self.auto_mode.is_enabled()).lower() + ','
+            '"program": ' + self.program.progress_json() + ','
+            '"loop": ' + self.profiler.get_json() +
             '}'
         )
-        self._send_json(client, body)
     
-    def _handle_move(self, client, path, client_ip):
+    def _sensors_json(self):
+        """
+        Returns:
+            str: '"sensors": {...},' con cada posición del SensorArray, o ''
+        """
+        if not isinstance(self.sampler, SensorArray):
+            return ''
+        parts = []
+        for name, distance in self.sampler.readings():
+            parts.append('"' + name + '": ' + "{:.1f}".format(distance if distance >= 0 else -1.0))
+        return '"sensors": {' + ",".join(parts) + '},'
+
+    def _handle_move(self, client, query, client_ip):
         """Handler para /move"""
+        body, status = self._move(self._query_param(query, "dir"), client_ip)
+        self._send_json(client, body, status)
+
+    def _move(self, direction, client_ip):
+        """
+        Ejecuta un comando de movimiento (compartido por /move y /ws)
+
+        Args:
+            direction (str): Dirección recibida o None
+            client_ip (str): IP del cliente
+
+        Returns:
+            tuple: (cuerpo JSON, status HTTP)
+        """
         # Verificar Safe Mode
         if self.security.is_safe_mode_active():
-            self._send_json(client, '{"error":"safe_mode"}', "403 Forbidden")
-            return
-        
-        # Obtener dirección
-        direction = self._get_query_param(path, "dir")
+            return '{"error":"safe_mode"}', "403 Forbidden"
         
         if direction is None:
             self.security.add_error(client_ip, "missing_dir")
-            self._send_json(client, '{"error":"missing dir"}', "400 Bad Request")
-            return
+            return '{"error":"missing dir"}', "400 Bad Request"
+
+        # Un comando manual siempre tiene prioridad sobre el programa en
+        # curso y sobre la duración de un comando UDP anterior
+        self.program.stop("move")
+        self._cancel_udp_move()
         
         # Ejecutar comando
         if self.motors.execute_command(direction):
             # Escapar direction para JSON
             safe_dir = self._escape_json_string(direction.upper())
             self.logger.add("MOVE {}".format(safe_dir))
-            self._send_json(client, '{"ok":true,"dir":"' + safe_dir + '"}')
-        else:
-            self.security.add_error(client_ip, "invalid_dir:" + direction)
-            self._send_json(client, '{"error":"invalid dir"}', "400 Bad Request")
+            return '{"ok":true,"dir":"' + safe_dir + '"}', "200 OK"
+
+        self.security.add_error(client_ip, "invalid_dir:" + direction)
+        return '{"error":"invalid dir"}', "400 Bad Request"
     
-    def _handle_auto(self, client, path):
+    def _cancel_udp_move(self):
+        """Otro camino toma los motores: la duración UDP pendiente ya no aplica"""
+        if self.udp is not None:
+            self.udp.cancel()
+
+    def _handle_auto(self, client, query, client_ip):
         """Handler para /auto"""
-        value = self._get_query_param(path, "enabled")
+        value = self._query_param(query, "enabled")
         
         if value is None:
             self._send_json(client, '{"error":"missing enabled"}', "400 Bad Request")
@@ -318,32 +834,112 @@ class HTTPServer:
         
         # Activar/desactivar modo auto
         if enabled:
+            self.program.stop("auto")
+            self._cancel_udp_move()
             self.auto_mode.enable()
         else:
             self.auto_mode.disable()
         
         self._send_json(client, '{"auto_enabled": ' + str(enabled).lower() + '}')
     
-    def _handle_logs(self, client, path):
+    def _handle_program(self, client, query, client_ip):
+        """
+        Handler para /program - secuencia temporizada ejecutada en el robot
+
+        GET /program?steps=F:500,L:300,S:0 o POST con el programa en el
+        cuerpo. Sin programa devuelve el progreso del actual. Un /move
+        (o un comando por /ws o UDP) lo cancela.
+        """
+        if self.request.method == "POST":
+            try:
+                text = self.request.body()
+            except UnicodeError:
+                text = None
+            if text is None:
+                self._send_json(client, '{"error":"incomplete body"}', "400 Bad Request")
+                return
+        else:
+            text = self._query_param(query, "steps")
+            if text is None:
+                self._send_json(client, self.program.progress_json())
+                return
+            # encodeURIComponent() codifica ',' y ':'
+            text = text.replace("%2C", ",").replace("%2c", ",").replace("%3A", ":").replace("%3a", ":")
+
+        if self.security.is_safe_mode_active():
+            self._send_json(client, '{"error":"safe_mode"}', "403 Forbidden")
+            return
+
+        if self.auto_mode.is_enabled():
+            self._send_json(client, '{"error":"auto_mode"}', "409 Conflict")
+            return
+
+        try:
+            segments = parse_program(text.strip())
+        except ValueError as e:
+            self.security.add_error(client_ip, "invalid_program")
+            self._send_json(
+                client,
+                '{"error":"invalid program","detail":"' + self._escape_json_string(e) + '"}',
+                "400 Bad Request"
+            )
+            return
+
+        self._cancel_udp_move()
+        self.program.start(segments)
+        self._send_json(
+            client,
+            '{"ok":true,"segments":' + str(len(segments)) + ',"total_ms":' + str(self.program.total_ms) + '}'
+        )
+
+    def _handle_logs(self, client, query, client_ip):
         """Handler para /logs - Requiere token de seguridad"""
         # Verificar token
-        token = self._get_query_param(path, "token")
+        token = self._query_param(query, "token")
         if token != config.SECURITY_TOKEN:
             self.logger.add("ERROR: Token inválido para /logs")
             self._send_json(client, '{"error":"unauthorized"}', "401 Unauthorized")
             return
 
-        logs_json = self.logger.get_json_array()
-        self._send_json(client, '{"logs": ' + logs_json + '}')
+        since = self._since_param(query)
+        if since is False:
+            self._send_json(client, '{"error":"invalid since"}', "400 Bad Request")
+            return
+
+        # La secuencia del último log hace de versión
+        etag = self._etag("l", self.logger.head_seq)
+        if self._not_modified(client, etag):
+            return
+        # Por partes: la memoria no crece con MAX_LOG_ENTRIES
+        self._send_stream(client, self.logger.iter_json_since(since), "application/json", etag=etag)
+
+    def _since_param(self, query):
+        """
+        Parámetro ?since= de /logs y /snapshot
+
+        Returns:
+            int: Secuencia pedida, None si no viene o False si no es un entero >= 0
+        """
+        value = self._query_param(query, "since")
+        if value is None:
+            return None
+        try:
+            since = int(value)
+        except ValueError:
+            return False
+        return since if since >= 0 else False
     
-    def _handle_security(self, client):
+    def _handle_security(self, client, query, client_ip):
         """Handler para /security"""
-        self._send_json(client, self.security.get_json())
+        etag = self._etag("s", self.security.version)
+        if self._not_modified(client, etag):
+            return
+        self._send_json(client, self.security.get_json(), etag=etag)
     
-    def _handle_clear(self, client, path):
+    def _handle_clear(self, client, query, client_ip):
         """Handler para /clear - Requiere token de seguridad"""
         # Verificar token
-        token = self._get_query_param(path, "token")
+        token = self._query_param(query, "token")
         if token != config.SECURITY_TOKEN:
             self.logger.add("ERROR: Token inválido para /clear")
             self._send_json(client, '{"error":"unauthorized"}', "401 Unauthorized")
@@ -353,10 +949,10 @@ class HTTPServer:
         self.logger.add("Safe Mode desactivado con token")
         self._send_json(client, '{"ok":true}')
 
-    def _handle_restart(self, client, path, client_ip):
+    def _handle_restart(self, client, query, client_ip):
         """Handler para /restart - Requiere token de seguridad"""
         # Verificar token
-        token = self._get_query_param(path, "token")
+        token = self._query_param(query, "token")
         if token != config.SECURITY_TOKEN:
             self.logger.add("ERROR: Token inválido para /restart desde " + client_ip)
             self.security.add_error(client_ip, "restart_unauthorized")
@@ -367,9 +963,138 @@ class HTTPServer:
         self.logger.add("⚠️ Reinicio autorizado desde " + client_ip)
         self._send_json(client, '{"ok":true,"message":"restarting"}')
         self.motors.stop()
+        self._reset_device()
+
+    def _reset_device(self):
+        """Reinicia el ESP32 dando tiempo a que salga la respuesta"""
         time.sleep_ms(100)  # Dar tiempo para enviar respuesta
         machine.reset()
 
+    def _handle_snapshot(self, client, query, client_ip):
+        """
+        Handler para /snapshot - status, telemetry, security y logs en una respuesta
+
+        ?fields=telemetry,security limita las secciones. Sin fields se
+        devuelven todas; logs solo si el token es válido y con el mismo
+        formato que /logs (?since=N devuelve solo las entradas nuevas).
+        """
+        authorized = self._query_param(query, "token") == config.SECURITY_TOKEN
+
+        value = self._query_param(query, "fields")
+        if value is None:
+            fields = SNAPSHOT_FIELDS if authorized else SNAPSHOT_FIELDS[:-1]
+        else:
+            fields = value.split(",")
+            for field in fields:
+                if field not in SNAPSHOT_FIELDS:
+                    self.security.add_error(client_ip, "snapshot_field")
+                    self._send_json(client, '{"error":"unknown field"}', "400 Bad Request")
+                    return
+
+            # La sección logs mantiene la protección de /logs
+            if "logs" in fields and not authorized:
+                self.logger.add("ERROR: Token inválido para /snapshot logs")
+                self._send_json(client, '{"error":"unauthorized"}', "401 Unauthorized")
+                return
+
+        since = self._since_param(query)
+        if since is False:
+            self._send_json(client, '{"error":"invalid since"}', "400 Bad Request")
+            return
+
+        parts = []
+        for field in SNAPSHOT_FIELDS:
+            if field not in fields:
+                continue
+            if field == "status":
+                section = self._status_json()
+            elif field == "telemetry":
+                section = self._telemetry_json()
+            elif field == "security":
+                section = self.security.get_json()
+            else:
+                # Mismo cuerpo que /logs (admite ?since=)
+                section = self.logger.get_json_since(since)
+            parts.append('"' + field + '": ' + section)
+
+        self._send_json(client, "{" + ",".join(parts) + "}")
+
+    def _handle_metrics(self, client, query, client_ip):
+        """
+        Handler para /metrics - contadores e histogramas en formato Prometheus
+
+        Incluye las métricas HTTP de self.metrics y el estado del resto de
+        módulos (bytes enviados, errores del sensor, Safe Mode).
+        """
+        lines = []
+        self.metrics.render(lines)
+
+        write_metric = metrics.write_metric
+        write_metric(lines, "robot_http_connections_total", "counter",
+                     "Conexiones aceptadas, atendidas desde la cola y rechazadas por accept()", [
+                         ('{kind="accepted"}', self.connections_accepted),
+                         ('{kind="queued"}', self.connections_queued),
+                         ('{kind="refused"}', self.connections_refused),
+                     ])
+        write_metric(lines, "robot_http_response_bytes_total", "counter",
+                     "Bytes enviados en respuestas HTTP y en el push de /ws y /events",
+                     [("", self.writer.bytes_sent)])
+
+        sampler = self.sampler
+        write_metric(lines, "robot_sensor_samples_total", "counter",
+                     "Mediciones del sensor ultrasónico", [("", sampler.samples)])
+        write_metric(lines, "robot_sensor_errors_total", "counter",
+                     "Mediciones fallidas por código de measure_distance_cm()", [
+                         ('{code="-1"}', sampler.errors[0]),
+                         ('{code="-2"}', sampler.errors[1]),
+                         ('{code="-3"}', sampler.errors[2]),
+                         ('{code="-4"}', sampler.errors[3]),
+                         ('{code="-5"}', sampler.errors[4]),
+                     ])
+        write_metric(lines, "robot_sensor_sample_age_ms", "gauge",
+                     "Edad de la última lectura del sensor", [("", sampler.age_ms())])
+        write_metric(lines, "robot_sensor_valid_ratio", "gauge",
+                     "Fracción de lecturas válidas en el historial del sensor",
+                     [("", "{:.2f}".format(sampler.history.valid_ratio()))])
+        if isinstance(sampler, SensorArray):
+            write_metric(lines, "robot_sensor_distance_cm", "gauge",
+                         "Distancia filtrada de cada sensor del array (-1 sin lectura)", [
+                             ('{sensor="' + name + '"}', "{:.1f}".format(distance if distance >= 0 else -1.0))
+                             for name, distance in sampler.readings()
+                         ])
+
+        profiler = self.profiler
+        for name, stats in profiler.stats():
+            summary = stats.summary()
+            if summary is None:
+                continue
+            write_metric(lines, "robot_" + name, "gauge",
+                         "Ventana de las últimas {} muestras".format(len(stats.samples)), [
+                             ('{stat="min"}', summary[0]),
+                             ('{stat="avg"}', summary[1]),
+                             ('{stat="max"}', summary[2]),
+                             ('{stat="p99"}', summary[3]),
+                         ])
+        write_metric(lines, "robot_auto_deadline_misses_total", "counter",
+                     "Comprobaciones del modo auto más de PROFILER_DEADLINE_MARGIN_MS tarde",
+                     [("", profiler.deadline_misses)])
+
+        write_metric(lines, "robot_uptime_seconds", "gauge",
+                     "Segundos desde el arranque", [("", self.logger.get_uptime_seconds())])
+        write_metric(lines, "robot_safe_mode", "gauge",
+                     "1 si el Safe Mode está activo", [("", 1 if self.security.is_safe_mode_active() else 0)])
+
+        lines.append("")
+        self._send_response(client, "\n".join(lines), "200 OK", metrics.CONTENT_TYPE)
+
+    def _handle_websocket(self, client, query, client_ip):
+        """Handler para /ws - El push por WebSocket solo existe en modo async"""
+        self._send_json(client, '{"error":"websocket requires async mode"}', "501 Not Implemented")
+
+    def _handle_events(self, client, query, client_ip):
+        """Handler para /events - Los streams SSE solo existen en modo async"""
+        self._send_json(client, '{"error":"event stream requires async mode"}', "501 Not Implemented")
+
     def _handle_not_found(self, client, path, client_ip):
         """Handler para rutas no encontradas"""
         self.security.add_error(client_ip, "route_not_found:" + path)
@@ -379,43 +1104,21 @@ class HTTPServer:
     # UTILIDADES
     # ==========================================
     
-    def _parse_path(self, request_line):
-        """
-        Parsea el path de la request line
-
-        Args:
-            request_line (str): Primera línea de la petición HTTP
-
-        Returns:
-            str: Path de la petición
-        """
-        try:
-            parts = request_line.split(" ")
-            if len(parts) >= 2:
-                return parts[1]
-            return "/"
-        except (IndexError, AttributeError) as e:
-            self.logger.add("ERROR: Request line inválido")
-            return "/"
-    
-    def _get_query_param(self, path, key):
+    def _query_param(self, query, key):
         """
-        Obtiene un parámetro de query string
+        Obtiene un parámetro de un query string ya separado del path
 
         Args:
-            path (str): Path completo con query string
+            query (str): Query string sin "?" (ej: "dir=F&speed=2")
             key (str): Nombre del parámetro
 
         Returns:
             str: Valor del parámetro o None
         """
-        if "?" not in path:
+        if not query:
             return None
 
-        base, query = path.split("?", 1)
-        params = query.split("&")
-
-        for param in params:
+        for param in query.split("&"):
             if "=" in param:
                 k, v = param.split("=", 1)
                 if k == key:
@@ -445,7 +1148,7 @@ class HTTPServer:
         text = text.replace("\t", "\\t")   # Tab
         return text
     
-    def _send_json(self, client, body, status="200 OK"):
+    def _send_json(self, client, body, status="200 OK", etag=None):
         """
         Envía respuesta JSON con headers CORS
         
@@ -453,16 +1156,9 @@ class HTTPServer:
             client: Socket del cliente
             body (str): Cuerpo JSON
             status (str): Status HTTP
+            etag (bytes): ETag de la versión enviada (None = sin caché)
         """
-        header = (
-            "HTTP/1.1 " + status + "\r\n"
-            "Content-Type: application/json\r\n"
-            "Access-Control-Allow-Origin: *\r\n"
-            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
-            "Access-Control-Allow-Headers: *\r\n"
-            "\r\n"
-        )
-        client.send(header + body)
+        self._send_response(client, body, status, "application/json", etag=etag)
     
     def _send_text(self, client, body, status="200 OK"):
         """
@@ -473,12 +1169,92 @@ class HTTPServer:
             body (str): Cuerpo de texto
             status (str): Status HTTP
         """
-        header = (
-            "HTTP/1.1 " + status + "\r\n"
-            "Content-Type: text/plain\r\n"
-            "Access-Control-Allow-Origin: *\r\n"
-            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
-            "Access-Control-Allow-Headers: *\r\n"
-            "\r\n"
-        )
-        client.send(header + body)
+        self._send_response(client, body, status, "text/plain")
+
+    def _send_response(self, client, body, status, content_type, extra_headers=b"", etag=None):
+        """
+        Envía una respuesta completa con Content-Length y headers CORS
+
+        Todas las respuestas de los handlers pasan por self.writer.
+
+        Args:
+            client: Socket del cliente
+            body (str|bytes): Cuerpo de la respuesta
+            status (str): Status HTTP
+            content_type (str): Tipo MIME del cuerpo
+            extra_headers (bytes): Headers adicionales terminados en CRLF
+            etag (bytes): ETag de la versión enviada (None = sin caché)
+        """
+        self._status = status
+        self.writer.send(client, status, content_type, body, self._keep_alive, extra_headers, etag)
+
+    def _send_stream(self, client, parts, content_type, status="200 OK", etag=None):
+        """
+        Envía un cuerpo generado por partes sin montarlo entero en memoria
+
+        HTTP/1.1 recibe Transfer-Encoding: chunked; un cliente HTTP/1.0 no
+        lo entiende, así que recibe el cuerpo tal cual y se cierra la conexión.
+
+        Args:
+            client: Socket del cliente
+            parts: Iterable de str/bytes con el cuerpo en orden
+            content_type (str): Tipo MIME del cuerpo
+            status (str): Status HTTP
+            etag (bytes): ETag de la versión enviada (None = sin caché)
+        """
+        chunked = self.request.http11
+        if not chunked:
+            self._keep_alive = False
+
+        self._status = status
+        self.writer.start_stream(client, status, content_type, chunked, self._keep_alive, etag=etag)
+        self._send_stream_body(client, parts)
+
+    def _send_stream_body(self, client, parts):
+        """
+        Envía las partes tras start_stream() y termina el cuerpo
+
+        AsyncHTTPServer lo sobrescribe para esperar al drain() entre envíos.
+
+        Args:
+            client: Socket del cliente
+            parts: Iterable con el cuerpo
+        """
+        writer = self.writer
+        for part in parts:
+            writer.write_stream(client, part)
+        writer.end_stream(client)
+
+    def _etag(self, kind, version):
+        """
+        ETag de una versión de un recurso (se reutiliza mientras no cambie)
+
+        Args:
+            kind (str): Letra del recurso ("s" security, "l" logs, "u" status)
+            version (int): Versión actual del recurso
+
+        Returns:
+            bytes: ETag entre comillas, en minúsculas
+        """
+        cached = self._etags.get(kind)
+        if cached is None or cached[0] != version:
+            etag = ('"' + self.boot_id + "-" + kind + str(version) + '"').encode()
+            cached = (version, etag)
+            self._etags[kind] = cached
+        return cached[1]
+
+    def _not_modified(self, client, etag, cache_control=CACHE_REVALIDATE):
+        """
+        Responde 304 si If-None-Match coincide con el ETag actual
+
+        Se compara un único ETag (lo que envía la caché del navegador)
+        sin decodificar el header.
+
+        Returns:
+            bool: True si se envió el 304
+        """
+        if not self.request.header_equals(HEADER_IF_NONE_MATCH, etag):
+            return False
+        self._status = "304 Not Modified"
+        self.writer.send_not_modified(client, etag, self._keep_alive, cache_control)
+        return True
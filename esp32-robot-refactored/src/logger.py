@@ -11,6 +11,13 @@ class Logger:
     def __init__(self):
         self.logs = []
         self.start_time = time.ticks_ms()
+        # Número de secuencia de la última entrada (0 = ninguna todavía).
+        # La entrada logs[i] tiene la secuencia head_seq - len(logs) + 1 + i
+        self.head_seq = 0
+        # JSON de la lista completa: se regenera solo cuando cambia head_seq
+        self._json_seq = -1
+        self._json_array = None
+        self._json_body = None
     
     def get_uptime_seconds(self):
         return time.ticks_diff(time.ticks_ms(), self.start_time) // 1000
@@ -23,6 +30,7 @@ class Logger:
         timestamp = self.get_uptime_seconds()
         entry = "[{}s] {}".format(timestamp, message)
         self.logs.append(entry)
+        self.head_seq += 1
         
         # Mostrar en consola para revisar
         print(entry)
@@ -30,19 +38,105 @@ class Logger:
     def get_all(self):
         return self.logs
     
+    def get_since(self, since):
+        """
+        Entradas posteriores a un número de secuencia
+
+        Args:
+            since (int): Última secuencia que ya tiene el cliente
+
+        Returns:
+            tuple: (entradas, head_seq, gap). gap es True si el buffer ya
+                sobrescribió parte de lo pedido (o since es de otro arranque);
+                en ese caso se devuelven todas las entradas disponibles.
+        """
+        first = self.head_seq - len(self.logs) + 1
+        if since > self.head_seq or since < first - 1:
+            return self.logs, self.head_seq, True
+        return self.logs[since - first + 1:], self.head_seq, False
+
+    def get_json_since(self, since=None):
+        """
+        JSON de /logs: entradas nuevas, secuencia actual y si hubo hueco
+
+        Args:
+            since (int): Última secuencia del cliente (None = todas)
+
+        Returns:
+            str: {"logs": [...], "head": N, "gap": bool}
+        """
+        if since is None:
+            self._refresh_json()
+            return self._json_body
+
+        entries, head, gap = self.get_since(since)
+        return (
+            '{"logs": ' + self.get_json_array(entries) +
+            ', "head": ' + str(head) +
+            ', "gap": ' + str(gap).lower() + '}'
+        )
+
+    def iter_json_since(self, since=None):
+        """
+        Mismo JSON que get_json_since() generado por partes: la apertura,
+        una entrada por parte y el cierre, sin montar la cadena completa
+
+        Args:
+            since (int): Última secuencia del cliente (None = todas)
+
+        Yields:
+            str: Siguiente parte del JSON
+        """
+        if since is None:
+            entries, head, gap = self.logs, self.head_seq, False
+        else:
+            entries, head, gap = self.get_since(since)
+        if entries is self.logs:
+            # Copia de referencias: add() puede rotar la lista mientras se envía
+            entries = entries[:]
+
+        yield '{"logs": ['
+        separator = '"'
+        for entry in entries:
+            yield separator + self._escape(entry) + '"'
+            separator = ',"'
+        yield '], "head": ' + str(head) + ', "gap": ' + str(gap).lower() + '}'
+
     def clear(self):
         self.logs = []
         self.add("LOGS CLEARED")
     
-    def get_json_array(self):
+    def get_json_array(self, entries=None):
         """
         Devuelve los logs con formato seguro para JSON.
         Evita fallos en el navegador.
+
+        Args:
+            entries (list): Entradas a serializar (todas si es None)
         """
+        if entries is None or entries is self.logs:
+            self._refresh_json()
+            return self._json_array
+
+        return self._serialize(entries)
+
+    def _refresh_json(self):
+        """Regenera el JSON de la lista completa si hubo entradas nuevas"""
+        if self._json_seq == self.head_seq:
+            return
+        self._json_array = self._serialize(self.logs)
+        self._json_body = '{"logs": ' + self._json_array + ', "head": ' + str(self.head_seq) + ', "gap": false}'
+        self._json_seq = self.head_seq
+
+    def _serialize(self, entries):
+        """Array JSON con las entradas escapadas"""
         items = []
         
-        for entry in self.logs:
-            safe = entry.replace('"', '\\"')
-            items.append('"' + safe + '"')
+        for entry in entries:
+            items.append('"' + self._escape(entry) + '"')
         
         return "[" + ",".join(items) + "]"
+
+    def _escape(self, entry):
+        """Escapa las comillas de una entrada para incluirla en JSON"""
+        return entry.replace('"', '\\"')
@@ -0,0 +1,178 @@
+"""
+Perfilado del loop de control: retraso, jitter y tiempo por petición
+
+AutoMode.step() solo corre entre timeouts de accept() o al terminar una
+petición, así que bajo carga el intervalo real entre comprobaciones puede
+alejarse mucho de AUTO_CHECK_INTERVAL. LoopProfiler guarda las últimas
+PROFILER_WINDOW muestras de cada medida en anillos preasignados:
+
+    loop_interval_ms  tiempo entre dos pasos de control (vueltas del loop)
+    step_us           duración de un paso de control (sensor, programa, auto)
+    auto_interval_ms  intervalo real entre comprobaciones del modo auto
+    request_us        tiempo atendiendo una petición HTTP
+
+Cada comprobación del modo auto que llega más de PROFILER_DEADLINE_MARGIN_MS
+tarde respecto a AUTO_CHECK_INTERVAL cuenta como deadline incumplido.
+"""
+import time
+import config
+
+
+class RollingStats:
+    """Últimas N muestras en un anillo fijo con min/avg/max/p99 bajo demanda
+
+    Attributes:
+        samples (list): Anillo preasignado
+        count (int): Muestras añadidas desde el arranque
+    """
+
+    def __init__(self, size):
+        """
+        Args:
+            size (int): Tamaño del anillo
+        """
+        self.samples = [0] * size
+        self.count = 0
+
+    def add(self, value):
+        """
+        Añade una muestra (O(1), sin asignar memoria)
+
+        Args:
+            value (int): Valor de la muestra
+        """
+        self.samples[self.count % len(self.samples)] = value
+        self.count += 1
+
+    def summary(self):
+        """
+        Estadísticas de la ventana actual
+
+        Ordena una copia del anillo: llamar solo al publicar, no por muestra.
+
+        Returns:
+            tuple: (min, avg, max, p99) o None si no hay muestras
+        """
+        n = min(self.count, len(self.samples))
+        if not n:
+            return None
+
+        window = sorted(self.samples[:n])
+        total = 0
+        for value in window:
+            total += value
+        p99 = window[min(n - 1, (n * 99) // 100)]
+        return window[0], total // n, window[-1], p99
+
+
+class LoopProfiler:
+    """Medidas del loop de control y de las peticiones
+
+    Attributes:
+        loop_interval_ms (RollingStats): Tiempo entre pasos de control
+        step_us (RollingStats): Duración de cada paso de control
+        auto_interval_ms (RollingStats): Intervalo real entre comprobaciones del modo auto
+        request_us (RollingStats): Tiempo por petición HTTP
+        deadline_misses (int): Comprobaciones del modo auto fuera de plazo
+    """
+
+    def __init__(self, size=None):
+        """
+        Args:
+            size (int): Muestras por ventana (config.PROFILER_WINDOW si es None)
+        """
+        if size is None:
+            size = config.PROFILER_WINDOW
+
+        self.loop_interval_ms = RollingStats(size)
+        self.step_us = RollingStats(size)
+        self.auto_interval_ms = RollingStats(size)
+        self.request_us = RollingStats(size)
+        self.deadline_misses = 0
+        self.deadline_ms = config.AUTO_CHECK_INTERVAL + config.PROFILER_DEADLINE_MARGIN_MS
+
+        # Instante del paso de control anterior (None = aún no hubo ninguno)
+        self.last_step = None
+
+        # Resumen JSON cacheado: (ticks_ms, json)
+        self._json = None
+        self._json_at = 0
+
+    def step_started(self):
+        """
+        Marca el inicio de un paso de control
+
+        Returns:
+            int: ticks_us del inicio, para pasarlo a step_finished()
+        """
+        now = time.ticks_ms()
+        if self.last_step is not None:
+            self.loop_interval_ms.add(time.ticks_diff(now, self.last_step))
+        self.last_step = now
+        return time.ticks_us()
+
+    def step_finished(self, started_us):
+        """
+        Args:
+            started_us (int): Valor devuelto por step_started()
+        """
+        self.step_us.add(time.ticks_diff(time.ticks_us(), started_us))
+
+    def auto_checked(self, interval_ms):
+        """
+        Registra el intervalo real entre dos comprobaciones del modo auto
+
+        Args:
+            interval_ms (int): ms desde la comprobación anterior
+        """
+        self.auto_interval_ms.add(interval_ms)
+        if interval_ms > self.deadline_ms:
+            self.deadline_misses += 1
+
+    def request_finished(self, started_us):
+        """
+        Args:
+            started_us (int): ticks_us al empezar a atender la petición
+        """
+        self.request_us.add(time.ticks_diff(time.ticks_us(), started_us))
+
+    def stats(self):
+        """
+        Returns:
+            tuple: ((nombre, RollingStats), ...) en orden de publicación
+        """
+        return (
+            ("loop_interval_ms", self.loop_interval_ms),
+            ("step_us", self.step_us),
+            ("auto_interval_ms", self.auto_interval_ms),
+            ("request_us", self.request_us),
+        )
+
+    def get_json(self):
+        """
+        Resumen para la telemetría, recalculado como mucho una vez por segundo
+
+        Returns:
+            str: {"loop_interval_ms": [min, avg, max, p99], ..., "auto_target_ms",
+                "deadline_misses"}; null en las medidas sin muestras
+        """
+        now = time.ticks_ms()
+        if self._json is not None and time.ticks_diff(now, self._json_at) < 1000:
+            return self._json
+
+        parts = []
+        for name, stats in self.stats():
+            summary = stats.summary()
+            if summary is None:
+                value = "null"
+            else:
+                value = "[{},{},{},{}]".format(summary[0], summary[1], summary[2], summary[3])
+            parts.append('"' + name + '":' + value)
+
+        self._json = (
+            '{' + ",".join(parts) +
+            ',"auto_target_ms":' + str(config.AUTO_CHECK_INTERVAL) +
+            ',"deadline_misses":' + str(self.deadline_misses) + '}'
+        )
+        self._json_at = now
+        return self._json
@@ -5,12 +5,14 @@ Punto de entrada de la aplicación
 
 # Importar módulos del sistema
 from motor_controller import MotorController
-from sensor_handler import UltrasonicSensor
+from sensor_array import SensorArray, build_sensors
 from logger import Logger
 from security_manager import SecurityManager
 from auto_mode import AutoMode
 from wifi_manager import WiFiManager
 from http_server import HTTPServer
+from async_server import AsyncHTTPServer
+import config
 
 
 def main():
@@ -31,15 +33,19 @@ def main():
     motors = MotorController()
     logger.add("Motores inicializados")
     
-    sensor = UltrasonicSensor()
-    logger.add("Sensor ultrasónico inicializado")
+    sensors = build_sensors()
+    logger.add("Sensores ultrasónicos inicializados: {}".format(len(sensors)))
+    
+    # Un solo array dispara los sensores por turnos; servidor y modo auto
+    # leen su caché
+    sampler = SensorArray(sensors)
     
     # 3. Inicializar Sistemas
     print("⚙️ Inicializando Sistemas...")
     security = SecurityManager(logger)
     logger.add("Sistema de seguridad inicializado")
     
-    auto_mode = AutoMode(motors, sensor, logger)
+    auto_mode = AutoMode(motors, sampler, logger)
     logger.add("Modo automático inicializado")
     
     # 4. Conectar WiFi
@@ -56,7 +62,10 @@ def main():
     
     # 5. Iniciar Servidor HTTP
     print("🚀 Iniciando Servidor HTTP...")
-    server = HTTPServer(ip, motors, sensor, logger, security, auto_mode)
+    if config.SERVER_MODE == "async":
+        server = AsyncHTTPServer(ip, motors, sampler, logger, security, auto_mode)
+    else:
+        server = HTTPServer(ip, motors, sampler, logger, security, auto_mode)
     
     try:
         server.start()
@@ -0,0 +1,193 @@
+"""
+Métricas del servidor en formato de texto de Prometheus (/metrics)
+
+Por cada ruta registrada se cuentan las peticiones por código de estado
+y la latencia del handler (medida con time.ticks_us) en un histograma de
+cubos fijos. Todos los contadores viven en listas preasignadas al crear
+el servidor: registrar una petición solo incrementa enteros.
+
+Los cubos se guardan sin acumular y se acumulan al generar el texto,
+que es lo que espera Prometheus (le="..." cuenta todo lo que está por
+debajo). Con ellos el scraper calcula p50/p99 por robot mediante
+histogram_quantile().
+"""
+from http_response import STATUS_LINES
+
+# Límites superiores de los cubos de latencia (µs); el último es +Inf
+LATENCY_BUCKETS_US = (500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 1000000)
+
+# Ruta para peticiones sin ruta registrada (404) o por encima de max_routes
+OTHER_ROUTE = "other"
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Presupuestos del rate limiter
+BUDGET_GENERAL = 0
+BUDGET_EXPENSIVE = 1
+
+
+def write_metric(lines, name, kind, help_text, samples):
+    """
+    Añade una métrica con su cabecera HELP/TYPE
+
+    Args:
+        lines (list): Líneas de salida
+        name (str): Nombre de la métrica
+        kind (str): "counter", "gauge" o "histogram"
+        help_text (str): Descripción
+        samples (list): [(etiquetas, valor)] con etiquetas ya formateadas
+            ('{code="-1"}' o "")
+    """
+    lines.append("# HELP " + name + " " + help_text)
+    lines.append("# TYPE " + name + " " + kind)
+    for labels, value in samples:
+        lines.append(name + labels + " " + str(value))
+
+
+class Metrics:
+    """Contadores e histogramas por ruta
+
+    Attributes:
+        route_names (list): Nombre de cada índice de ruta (0 = OTHER_ROUTE)
+        requests (list): Peticiones por (ruta, código de estado)
+        buckets (list): Cubos de latencia por ruta (sin acumular)
+        latency_sum_us (list): Suma de latencias por ruta
+        rate_limited (list): Rechazos por presupuesto (BUDGET_*)
+    """
+
+    def __init__(self, max_routes):
+        """
+        Args:
+            max_routes (int): Rutas con contadores propios (el resto cuenta como OTHER_ROUTE)
+        """
+        self.max_routes = max_routes + 1
+        self.route_names = [OTHER_ROUTE]
+        self.route_index = {}
+
+        # Códigos conocidos (los de STATUS_LINES) y un hueco para el resto
+        self.status_codes = []
+        self.status_index = {}
+        for status in STATUS_LINES:
+            self.status_index[status] = len(self.status_codes)
+            self.status_codes.append(status[:3])
+        self.status_codes.append(OTHER_ROUTE)
+
+        self.n_status = len(self.status_codes)
+        self.n_buckets = len(LATENCY_BUCKETS_US) + 1
+
+        self.requests = [0] * (self.max_routes * self.n_status)
+        self.buckets = [0] * (self.max_routes * self.n_buckets)
+        self.latency_sum_us = [0] * self.max_routes
+        self.rate_limited = [0, 0]
+
+    def add_route(self, path):
+        """
+        Reserva contadores para una ruta (al registrarla, no por petición)
+
+        Args:
+            path (str): Path de la ruta
+
+        Returns:
+            int: Índice de la ruta (0 si ya no quedan huecos)
+        """
+        index = self.route_index.get(path)
+        if index is not None:
+            return index
+        if len(self.route_names) >= self.max_routes:
+            return 0
+
+        index = len(self.route_names)
+        self.route_names.append(path)
+        self.route_index[path] = index
+        return index
+
+    def route(self, path):
+        """
+        Args:
+            path (str): Path sin query string
+
+        Returns:
+            int: Índice de la ruta (0 si no está registrada)
+        """
+        return self.route_index.get(path, 0)
+
+    def observe(self, route, status, elapsed_us):
+        """
+        Registra una petición atendida
+
+        Args:
+            route (int): Índice devuelto por route()
+            status (str): Status HTTP enviado (ej: "200 OK")
+            elapsed_us (int): Tiempo del handler en µs
+        """
+        self.requests[route * self.n_status + self.status_index.get(status, self.n_status - 1)] += 1
+
+        bucket = 0
+        for limit in LATENCY_BUCKETS_US:
+            if elapsed_us <= limit:
+                break
+            bucket += 1
+        self.buckets[route * self.n_buckets + bucket] += 1
+        self.latency_sum_us[route] += elapsed_us
+
+    def count_rate_limited(self, budget):
+        """
+        Args:
+            budget (int): BUDGET_GENERAL o BUDGET_EXPENSIVE
+        """
+        self.rate_limited[budget] += 1
+
+    def render(self, lines):
+        """
+        Añade las métricas HTTP en formato Prometheus
+
+        Solo se listan las rutas que ya han recibido alguna petición.
+
+        Args:
+            lines (list): Líneas de salida
+        """
+        n_status = self.n_status
+        n_buckets = self.n_buckets
+
+        samples = []
+        for route in range(len(self.route_names)):
+            base = route * n_status
+            for i in range(n_status):
+                count = self.requests[base + i]
+                if count:
+                    samples.append((
+                        '{route="' + self.route_names[route] + '",code="' + self.status_codes[i] + '"}', count
+                    ))
+        write_metric(lines, "robot_http_requests_total", "counter",
+                     "Peticiones HTTP por ruta y código de estado", samples)
+
+        name = "robot_http_request_duration_seconds"
+        lines.append("# HELP " + name + " Latencia del handler por ruta")
+        lines.append("# TYPE " + name + " histogram")
+        for route in range(len(self.route_names)):
+            base = route * n_buckets
+            total = 0
+            for i in range(n_buckets):
+                total += self.buckets[base + i]
+            if not total:
+                continue
+
+            label = '{route="' + self.route_names[route] + '"'
+            cumulative = 0
+            for i in range(n_buckets):
+                cumulative += self.buckets[base + i]
+                le = "+Inf" if i == n_buckets - 1 else _seconds(LATENCY_BUCKETS_US[i])
+                lines.append(name + "_bucket" + label + ',le="' + le + '"} ' + str(cumulative))
+            lines.append(name + "_sum" + label + "} " + _seconds(self.latency_sum_us[route]))
+            lines.append(name + "_count" + label + "} " + str(total))
+
+        write_metric(lines, "robot_http_rate_limited_total", "counter",
+                     "Peticiones rechazadas por el rate limiter", [
+                         ('{budget="general"}', self.rate_limited[BUDGET_GENERAL]),
+                         ('{budget="expensive"}', self.rate_limited[BUDGET_EXPENSIVE]),
+                     ])
+
+
+def _seconds(us):
+    """µs a segundos como texto, sin notación científica"""
+    return "{}.{:06d}".format(us // 1000000, us % 1000000)
@@ -0,0 +1,193 @@
+"""
+Programas de movimiento temporizados ejecutados en el robot (/program)
+
+Un programa es una secuencia de segmentos "comando:duración_ms" separados
+por comas, por ejemplo "F:500,L:300,F:500,S:0". El navegador lo envía una
+vez y el firmware cambia de segmento localmente, así que el jitter de la
+WiFi ya no altera la trayectoria.
+
+El planificador no bloquea: step() se llama desde el loop de control y
+solo actúa al vencer el segmento en curso. Los límites de cada segmento
+se calculan desde el inicio del programa, de modo que un paso que llega
+tarde acorta el segmento siguiente en lugar de retrasar todo el programa.
+Al terminar (o al cancelarse) los motores quedan parados.
+"""
+import time
+import config
+
+COMMANDS = "FBLRS"
+
+# Estados del programa
+STATE_IDLE = "idle"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_STOPPED = "stopped"
+
+
+def parse_program(text):
+    """
+    Convierte el texto de un programa en una lista de segmentos
+
+    Args:
+        text (str): Segmentos "C:ms" separados por comas
+
+    Returns:
+        list: [(comando, duración_ms), ...]
+
+    Raises:
+        ValueError: Si el programa está vacío, es demasiado largo o algún
+            segmento no es válido
+    """
+    if not text:
+        raise ValueError("programa vacío")
+
+    parts = text.split(",")
+    if len(parts) > config.PROGRAM_MAX_SEGMENTS:
+        raise ValueError("demasiados segmentos")
+
+    segments = []
+    for part in parts:
+        separator = part.find(":")
+        if separator < 0:
+            raise ValueError("segmento sin duración: " + part)
+
+        command = part[:separator].strip().upper()
+        if len(command) != 1 or command not in COMMANDS:
+            raise ValueError("comando inválido: " + command)
+
+        duration = int(part[separator + 1:])
+        if duration < 0 or duration > config.PROGRAM_MAX_SEGMENT_MS:
+            raise ValueError("duración fuera de rango: " + str(duration))
+
+        segments.append((command, duration))
+
+    return segments
+
+
+class MotionProgram:
+    """Planificador no bloqueante de un programa de movimiento
+
+    Attributes:
+        segments (list): Segmentos del programa en curso o del último
+        index (int): Segmento en ejecución (-1 antes de empezar)
+        state (str): STATE_IDLE, STATE_RUNNING, STATE_DONE o STATE_STOPPED
+        total_ms (int): Duración total del programa
+        elapsed_ms (int): Tiempo transcurrido (se congela al terminar)
+    """
+
+    def __init__(self, motors, logger):
+        """
+        Args:
+            motors (MotorController): Controlador de motores
+            logger (Logger): Sistema de logging
+        """
+        self.motors = motors
+        self.logger = logger
+
+        self.segments = []
+        self.index = -1
+        self.state = STATE_IDLE
+        self.total_ms = 0
+        self.elapsed_ms = 0
+
+        # Inicio del programa (ticks_ms) y fin del segmento en curso (ms desde el inicio)
+        self.started = 0
+        self.segment_end = 0
+
+    def start(self, segments):
+        """
+        Empieza un programa (sustituye al que estuviera en curso)
+
+        Args:
+            segments (list): Segmentos devueltos por parse_program()
+        """
+        total = 0
+        for segment in segments:
+            total += segment[1]
+
+        self.segments = segments
+        self.index = -1
+        self.total_ms = total
+        self.elapsed_ms = 0
+        self.state = STATE_RUNNING
+        self.started = time.ticks_ms()
+        self.segment_end = 0
+        self.logger.add("PROGRAM {} segmentos ({} ms)".format(len(segments), total))
+
+        self.step()
+
+    def stop(self, reason="stop"):
+        """
+        Cancela el programa en curso y para los motores
+
+        Args:
+            reason (str): Motivo para el log (ej: "move", "safe_mode")
+
+        Returns:
+            bool: True si había un programa en ejecución
+        """
+        if self.state != STATE_RUNNING:
+            return False
+
+        self.motors.stop()
+        self.elapsed_ms = time.ticks_diff(time.ticks_ms(), self.started)
+        self.state = STATE_STOPPED
+        self.logger.add("PROGRAM cancelado (" + reason + ")")
+        return True
+
+    def is_running(self):
+        """
+        Returns:
+            bool: True si hay un programa en ejecución
+        """
+        return self.state == STATE_RUNNING
+
+    def step(self):
+        """Avanza de segmento si ha vencido el actual (llamar desde el loop de control)"""
+        if self.state != STATE_RUNNING:
+            return
+
+        elapsed = time.ticks_diff(time.ticks_ms(), self.started)
+        # Los segmentos de 0 ms (ej: "S:0") se encadenan en la misma llamada
+        while self.state == STATE_RUNNING and elapsed >= self.segment_end:
+            self._advance(elapsed)
+
+    def progress_json(self):
+        """
+        Progreso para la telemetría
+
+        Returns:
+            str: {"state", "segment" (1..n, 0 sin empezar), "segments",
+                "elapsed_ms", "total_ms"}
+        """
+        if self.state == STATE_RUNNING:
+            elapsed = time.ticks_diff(time.ticks_ms(), self.started)
+        else:
+            elapsed = self.elapsed_ms
+
+        return (
+            '{"state":"' + self.state + '",'
+            '"segment":' + str(self.index + 1) + ','
+            '"segments":' + str(len(self.segments)) + ','
+            '"elapsed_ms":' + str(elapsed) + ','
+            '"total_ms":' + str(self.total_ms) + '}'
+        )
+
+    # ==========================================
+    # UTILIDADES
+    # ==========================================
+
+    def _advance(self, elapsed):
+        """Pasa al siguiente segmento o termina el programa"""
+        self.index += 1
+        if self.index >= len(self.segments):
+            self.index = len(self.segments) - 1
+            self.motors.stop()
+            self.elapsed_ms = elapsed
+            self.state = STATE_DONE
+            self.logger.add("PROGRAM completado")
+            return
+
+        command, duration = self.segments[self.index]
+        self.motors.execute_command(command)
+        self.segment_end += duration
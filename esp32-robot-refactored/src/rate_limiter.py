@@ -0,0 +1,137 @@
+"""
+Rate limiting por IP con token bucket
+
+Cada cliente tiene dos cubos con la misma ventana de recarga:
+    - general: lo consume toda petición (RATE_LIMIT_REQUESTS por ventana)
+    - costoso: además lo consumen los endpoints caros como /logs
+      (RATE_LIMIT_EXPENSIVE_REQUESTS por ventana)
+
+Los niveles se guardan como enteros en unidades de "token * ms" para no
+crear floats en cada petición: un token cuesta window_ms unidades y cada
+ms transcurrido recarga `requests` unidades. Comprobar una petición es
+O(1) y cada cliente ocupa una lista de tres enteros.
+
+La tabla de clientes está limitada a RATE_LIMIT_MAX_CLIENTS; al llegar
+una IP nueva con la tabla llena se expulsa la usada hace más tiempo. Un
+cliente inactivo más de una ventana tiene los cubos llenos, así que
+expulsarlo no cambia su límite.
+"""
+import time
+
+# Posiciones en la entrada de cada cliente
+_GENERAL = 0
+_EXPENSIVE = 1
+_LAST = 2
+
+
+class RateLimiter:
+    """Token buckets por IP con tabla acotada y expulsión LRU
+
+    Attributes:
+        clients (dict): {IP: [nivel_general, nivel_costoso, último_ticks_ms]}
+        max_clients (int): Tamaño máximo de la tabla
+        evictions (int): Clientes expulsados por falta de hueco
+    """
+
+    def __init__(self, requests, expensive_requests, window_ms, max_clients):
+        """
+        Args:
+            requests (int): Peticiones por ventana (cubo general)
+            expensive_requests (int): Peticiones caras por ventana
+            window_ms (int): Ventana de recarga completa en ms
+            max_clients (int): Número máximo de IPs registradas
+        """
+        self.requests = requests
+        self.expensive_requests = expensive_requests
+        self.window_ms = window_ms
+        self.max_clients = max_clients
+
+        self.capacity = requests * window_ms
+        self.expensive_capacity = expensive_requests * window_ms
+
+        self.clients = {}
+        self.evictions = 0
+
+    def allow(self, client_ip, expensive=False):
+        """
+        Consume un token del cliente si queda alguno
+
+        Args:
+            client_ip (str): IP del cliente
+            expensive (bool): True para consumir del cubo costoso en lugar
+                del general (la petición ya pagó el general al entrar)
+
+        Returns:
+            bool: True si la petición está permitida
+        """
+        now = time.ticks_ms()
+        entry = self.clients.get(client_ip)
+        if entry is None:
+            entry = self._add_client(client_ip, now)
+        else:
+            self._refill(entry, now)
+
+        slot = _EXPENSIVE if expensive else _GENERAL
+        if entry[slot] < self.window_ms:
+            return False
+        entry[slot] -= self.window_ms
+        return True
+
+    def reset(self):
+        """Olvida a todos los clientes"""
+        self.clients = {}
+
+    # ==========================================
+    # UTILIDADES
+    # ==========================================
+
+    def _refill(self, entry, now):
+        """Recarga los cubos según el tiempo desde el último acceso"""
+        elapsed = time.ticks_diff(now, entry[_LAST])
+        entry[_LAST] = now
+        if elapsed <= 0:
+            return
+
+        # Una ventana completa llena cualquier cubo: evita productos grandes
+        if elapsed >= self.window_ms:
+            entry[_GENERAL] = self.capacity
+            entry[_EXPENSIVE] = self.expensive_capacity
+            return
+
+        level = entry[_GENERAL] + elapsed * self.requests
+        entry[_GENERAL] = level if level < self.capacity else self.capacity
+        level = entry[_EXPENSIVE] + elapsed * self.expensive_requests
+        entry[_EXPENSIVE] = level if level < self.expensive_capacity else self.expensive_capacity
+
+    def _add_client(self, client_ip, now):
+        """Registra una IP nueva con los cubos llenos, expulsando si hace falta"""
+        if len(self.clients) >= self.max_clients:
+            self._evict_oldest(now)
+
+        entry = [self.capacity, self.expensive_capacity, now]
+        self.clients[client_ip] = entry
+        return entry
+
+    def _evict_oldest(self, now):
+        """
+        Expulsa al cliente con el acceso más antiguo
+
+        Recorre la tabla (acotada) solo cuando llega una IP nueva con la
+        tabla llena; los dict de MicroPython no garantizan orden de
+        inserción, así que no se puede sacar el primero sin más. El
+        recorrido para en el primer cliente inactivo durante una ventana:
+        tiene los cubos llenos y expulsarlo no cambia nada.
+        """
+        oldest_ip = None
+        oldest_age = -1
+        for ip, entry in self.clients.items():
+            age = time.ticks_diff(now, entry[_LAST])
+            if age > oldest_age:
+                oldest_ip = ip
+                oldest_age = age
+                if age >= self.window_ms:
+                    break
+
+        if oldest_ip is not None:
+            del self.clients[oldest_ip]
+            self.evictions += 1
@@ -19,6 +19,10 @@ class SecurityManager:
         self.safe_mode = False
         self.last_error = ""
         self.last_ip = ""
+        # Versión del estado: sube con cada cambio (ETag de /security)
+        self.version = 0
+        self._json = None
+        self._json_version = -1
     
     def add_error(self, ip, error_message):
         """
@@ -31,6 +35,7 @@ class SecurityManager:
         self.fail_count += 1
         self.last_error = error_message
         self.last_ip = ip
+        self.version += 1
         
         self.logger.add("ERROR de {} -> {}".format(ip, error_message))
         
@@ -41,6 +46,7 @@ class SecurityManager:
     def activate_safe_mode(self):
         """Activa el Safe Mode"""
         self.safe_mode = True
+        self.version += 1
         self.logger.add("⚠️ SAFE MODE ACTIVADO - Robot bloqueado")
     
     def deactivate_safe_mode(self):
@@ -49,6 +55,7 @@ class SecurityManager:
         self.safe_mode = False
         self.last_error = ""
         self.last_ip = ""
+        self.version += 1
         self.logger.add("✅ SAFE MODE DESACTIVADO")
     
     def is_safe_mode_active(self):
@@ -76,11 +83,18 @@ class SecurityManager:
     
     def get_json(self):
         """
-        Obtiene el estado en formato JSON
+        Obtiene el estado en formato JSON (se regenera solo si cambió la versión)
         
         Returns:
             str: JSON del estado de seguridad
         """
+        if self._json_version != self.version:
+            self._json = self._serialize()
+            self._json_version = self.version
+        return self._json
+
+    def _serialize(self):
+        """JSON del estado actual"""
         status = self.get_status()
         return (
             '{'
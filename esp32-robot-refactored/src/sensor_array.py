@@ -0,0 +1,198 @@
+"""
+Varios HC-SR04 muestreados por turnos (izquierda, centro, derecha)
+
+Dos sensores que disparan a la vez oyen el eco del otro (crosstalk).
+SensorArray tiene un SensorSampler por sensor y los dispara en un
+round-robin escalonado con un solo ping en el aire: el siguiente sensor
+sale en cuanto vuelve el eco del anterior (o vence su timeout y su ECHO
+baja), con al menos SENSOR_STAGGER_GUARD_MS entre pings para que se
+apaguen los rebotes, no en una ranura fija. El ritmo agregado lo marcan
+los ecos reales.
+
+El alcance corto del modo auto solo se aplica al sensor frontal: los
+laterales siguen midiendo a alcance completo y a su intervalo normal,
+porque clearer_side() compara cuánto espacio hay a cada lado y con el
+alcance corto ambos darían "libre hasta el alcance" (empate). Un lateral
+al que aún no le toca no retiene el turno del frontal.
+
+Para el resto del firmware es el muestreador del sensor frontal
+("center", o el primero): measure_distance_cm(), history, errors, etc.
+se leen de él. readings() da además la última lectura de cada sensor y
+clearer_side() el lateral más despejado para la evasión de AutoMode.
+
+Con un solo sensor step() delega en su muestreador sin cambios.
+"""
+import time
+import config
+from sensor_handler import UltrasonicSensor
+from sensor_sampler import SensorSampler
+
+
+def build_sensors():
+    """
+    Crea los sensores de config.ULTRASONIC_SENSORS
+
+    Returns:
+        list: Un UltrasonicSensor por posición (solo el frontal de
+            ULTRASONIC_TRIG/ULTRASONIC_ECHO si la lista está vacía)
+    """
+    if not config.ULTRASONIC_SENSORS:
+        return [UltrasonicSensor()]
+    return [UltrasonicSensor(trig, echo, name) for name, trig, echo in config.ULTRASONIC_SENSORS]
+
+
+class SensorArray:
+    """Muestreadores de varios sensores con disparo escalonado
+
+    Attributes:
+        samplers (list): SensorSampler de cada sensor, en orden de disparo
+        names (list): Posición de cada sensor
+        front (SensorSampler): Muestreador del sensor frontal
+        guard_ms (int): Tiempo mínimo entre pings de sensores consecutivos
+        current (int): Índice del sensor al que le toca disparar
+        last (int): Índice del último sensor que disparó
+        fired_at (int): ticks_ms del último ping de cualquier sensor
+        pinged_at (list): ticks_ms del último ping de cada sensor
+    """
+
+    def __init__(self, sensors, guard_ms=None):
+        """
+        Args:
+            sensors (list): UltrasonicSensor (ver build_sensors)
+            guard_ms (int): Tiempo mínimo entre pings (config.SENSOR_STAGGER_GUARD_MS si es None)
+        """
+        self.samplers = [SensorSampler(sensor) for sensor in sensors]
+        self.names = [getattr(sensor, "name", "center") for sensor in sensors]
+        if "center" in self.names:
+            self.front = self.samplers[self.names.index("center")]
+        else:
+            self.front = self.samplers[0]
+        self.guard_ms = config.SENSOR_STAGGER_GUARD_MS if guard_ms is None else guard_ms
+
+        self.current = 0
+        self.last = len(self.samplers) - 1
+        self.fired_at = time.ticks_ms()
+        self.pinged_at = [0] * len(self.samplers)
+
+    def __getattr__(self, name):
+        # Interfaz de SensorSampler (history, errors, measure_distance_cm...)
+        # sobre el sensor frontal
+        return getattr(self.front, name)
+
+    def step(self):
+        """
+        Avanza el round-robin (llamar en cada paso de control)
+
+        Como en SensorSampler, el ping del siguiente sensor puede salir en
+        la misma llamada que recoge el eco del anterior: con un loop lento
+        cada sensor no gasta dos pasos.
+
+        Returns:
+            bool: True si algún sensor tomó una muestra nueva
+        """
+        samplers = self.samplers
+        if len(samplers) == 1:
+            return samplers[0].step()
+
+        sampled = False
+        sampler = samplers[self.current]
+        if sampler.in_flight():
+            if not sampler.poll():
+                return False
+            self._advance()
+            sampled = True
+
+        # Nadie en el aire: el turno sale tras la guarda y su propio intervalo
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.fired_at) < self.guard_ms:
+            return sampled
+        # Se salta a quien aún no le toca (un lateral a alcance completo mide
+        # menos a menudo que el frontal con alcance corto)
+        for _ in samplers:
+            index = self.current
+            sampler = samplers[index]
+            if not sampler.samples or time.ticks_diff(now, self.pinged_at[index]) >= sampler.active_interval_ms():
+                break
+            self._advance()
+        else:
+            return sampled
+        # El eco del anterior puede seguir en el aire tras su timeout
+        if samplers[self.last].sensor.echo_busy():
+            return sampled
+        if not sampler.ping():
+            return sampled
+        self.last = index
+        self.fired_at = now
+        self.pinged_at[index] = now
+        if sampler.in_flight():
+            return sampled
+
+        # Medición bloqueante: ya terminó dentro de ping()
+        self._advance()
+        return True
+
+    def active_interval_ms(self):
+        """
+        Returns:
+            int: Cada cuánto hay que llamar a step() para no retrasar el
+                turno: el intervalo más corto de los sensores o la guarda
+        """
+        interval = self.guard_ms
+        for sampler in self.samplers:
+            interval = min(interval, sampler.active_interval_ms())
+        return interval
+
+    def _advance(self):
+        """Cierra el turno del sensor actual y pasa al siguiente"""
+        self.current = (self.current + 1) % len(self.samplers)
+
+    def request_range(self, range_cm):
+        """
+        Fija el alcance del sensor frontal (ver SensorSampler.request_range)
+
+        Los laterales siguen a alcance completo: clearer_side() necesita su
+        distancia real, no "libre hasta el alcance".
+
+        Args:
+            range_cm (float): Distancia máxima de interés en cm, o None
+        """
+        self.front.request_range(range_cm)
+
+    def distance_of(self, name):
+        """
+        Args:
+            name (str): Posición del sensor
+
+        Returns:
+            float: Distancia filtrada (o código de error) del sensor, o None
+                si no hay sensor en esa posición
+        """
+        if name not in self.names:
+            return None
+        return self.samplers[self.names.index(name)].measure_distance_cm()
+
+    def readings(self):
+        """
+        Returns:
+            list: (posición, distancia filtrada) de cada sensor
+        """
+        return [(name, sampler.measure_distance_cm()) for name, sampler in zip(self.names, self.samplers)]
+
+    def clearer_side(self):
+        """
+        Lateral con más espacio libre según los sensores izquierdo y derecho
+
+        Una lectura sin valor (error o caducada) pierde frente a cualquier
+        distancia: no se gira hacia lo que no se ve. Con empate, izquierda.
+
+        Returns:
+            str: "left" o "right", o None sin lecturas laterales válidas
+        """
+        side = None
+        best = -1.0
+        for name in ("left", "right"):
+            distance = self.distance_of(name)
+            if distance is not None and distance > best:
+                side = name
+                best = distance
+        return side
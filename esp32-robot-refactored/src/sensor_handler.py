@@ -4,6 +4,21 @@ Este módulo proporciona una interfaz para interactuar con el sensor
 ultrasónico HC-SR04, permitiendo mediciones de distancia y detección
 de obstáculos para navegación autónoma del robot.
 
+Hay dos formas de medir:
+
+- measure_distance_cm(): bloquea en machine.time_pulse_us() hasta que
+  vuelve el eco (hasta ULTRASONIC_TIMEOUT µs, 30 ms por defecto).
+- start_measurement() + read_measurement(): lanza el pulso y vuelve al
+  instante; una interrupción en ECHO guarda con ticks_us() los flancos de
+  subida y bajada y la distancia se recoge después sin esperar. Es lo que
+  usa SensorSampler con ULTRASONIC_IRQ = True.
+
+Las dos admiten un alcance máximo (max_range_cm): el timeout del eco se
+calcula con la velocidad del sonido (58.2 µs por cm de ida y vuelta) en
+lugar de esperar siempre ULTRASONIC_TIMEOUT, y lo que esté más lejos se
+da por fuera de rango (-1.0) en cuanto vence. Mientras ECHO siga en alto
+por el pulso anterior el HC-SR04 ignora el trigger, así que no se lanza.
+
 Example:
     >>> sensor = UltrasonicSensor()
     >>> distance = sensor.measure_distance_cm()
@@ -15,6 +30,34 @@ import machine
 import time
 import config
 
+# Margen entre el fin del trigger y el flanco de subida del eco (el
+# HC-SR04 emite antes 8 ciclos a 40 kHz, ~200 µs)
+ECHO_START_MAX_US = 2000
+
+# Duración del eco por cm de distancia: ida y vuelta a 29.1 µs/cm
+ECHO_US_PER_CM = 58.2
+
+# Códigos de error que no significan "nada dentro del alcance" (-1.0):
+# el obstáculo está pegado al sensor o el sensor no responde
+ERROR_TOO_CLOSE = -4.0
+ERROR_NO_ECHO = -5.0
+
+
+def echo_timeout_us(max_range_cm=None):
+    """
+    Timeout del eco para un alcance máximo
+
+    Args:
+        max_range_cm (float): Distancia máxima de interés (None = ULTRASONIC_TIMEOUT)
+
+    Returns:
+        int: Microsegundos de eco que cubren max_range_cm, sin pasar de
+            ULTRASONIC_TIMEOUT
+    """
+    if max_range_cm is None:
+        return config.ULTRASONIC_TIMEOUT
+    return min(config.ULTRASONIC_TIMEOUT, int(max_range_cm * ECHO_US_PER_CM) + 1)
+
 
 class UltrasonicSensor:
     """Sensor ultrasónico HC-SR04 para medición de distancia.
@@ -26,38 +69,73 @@ class UltrasonicSensor:
     Attributes:
         trig (Pin): Pin de salida para trigger del sensor
         echo (Pin): Pin de entrada para echo del sensor
+        irq_capable (bool): True si el pin ECHO admite interrupciones
+        pending (bool): Hay una medición sin bloqueo en curso
+        name (str): Posición del sensor en el robot ("left", "center", ...)
 
     Note:
-        Los pines se configuran desde config.ULTRASONIC_TRIG y
+        Por defecto los pines se configuran desde config.ULTRASONIC_TRIG y
         config.ULTRASONIC_ECHO respectivamente.
     """
     
-    def __init__(self):
+    def __init__(self, trig_pin=None, echo_pin=None, name="center"):
         """Inicializa los pines del sensor ultrasónico.
 
         Configura el pin trigger como salida y el pin echo como entrada
         usando los valores definidos en el módulo config.
 
+        Args:
+            trig_pin (int): Pin TRIG (config.ULTRASONIC_TRIG si es None)
+            echo_pin (int): Pin ECHO (config.ULTRASONIC_ECHO si es None)
+            name (str): Posición del sensor (ver config.ULTRASONIC_SENSORS)
+
         Raises:
             ValueError: Si los pines no son válidos para la placa
             OSError: Si hay un error al configurar los pines GPIO
 
         Note:
-            Los números de pin se obtienen de config.ULTRASONIC_TRIG
-            y config.ULTRASONIC_ECHO.
+            Sin argumentos, los números de pin se obtienen de
+            config.ULTRASONIC_TRIG y config.ULTRASONIC_ECHO.
         """
-        self.trig = Pin(config.ULTRASONIC_TRIG, Pin.OUT)
-        self.echo = Pin(config.ULTRASONIC_ECHO, Pin.IN)
+        if trig_pin is None:
+            trig_pin = config.ULTRASONIC_TRIG
+        if echo_pin is None:
+            echo_pin = config.ULTRASONIC_ECHO
+        self.name = name
+        self.trig = Pin(trig_pin, Pin.OUT)
+        self.echo = Pin(echo_pin, Pin.IN)
+        self.irq_capable = hasattr(self.echo, "irq")
+
+        # Medición sin bloqueo: la interrupción solo escribe estos enteros
+        self.pending = False
+        self._irq_armed = False
+        self._edges = 0
+        self._rise_us = 0
+        self._fall_us = 0
+        self._triggered_us = 0
+        self._timeout_us = config.ULTRASONIC_TIMEOUT
+        self._error = None
+        # Método ligado creado una vez (no asignar memoria en cada IRQ)
+        self._echo_handler = self._on_echo
     
-    def measure_distance_cm(self):
+    def measure_distance_cm(self, max_range_cm=None):
         """
         Mide la distancia en centímetros
 
+        Args:
+            max_range_cm (float): Alcance máximo; más allá devuelve -1.0 sin
+                esperar el eco completo (None = ULTRASONIC_TIMEOUT)
+
         Returns:
             float: Distancia en cm (2-400), o valor negativo si hay error:
-                -1.0: Timeout o fuera de rango (2-400 cm)
+                -1.0: El eco empezó pero duró más que el timeout (o pasa
+                    de 400 cm): nada dentro del alcance
                 -2.0: Error de I/O en hardware (pines)
                 -3.0: Pines no inicializados correctamente
+                -4.0: Eco de menos de 2 cm (obstáculo pegado al sensor)
+                -5.0: ECHO no llegó a subir (sensor desconectado o averiado)
+            None: Solo con max_range_cm, si ECHO sigue en alto por el pulso
+                anterior (no se mide: el sensor ignoraría el trigger)
 
         Note:
             El HC-SR04 tiene un rango efectivo de 2-400 cm.
@@ -66,40 +144,19 @@ class UltrasonicSensor:
             el tipo de fallo (timeout vs. hardware vs. configuración).
         """
         try:
-            # Preparar el pulso
-            self.trig.value(0)
-            time.sleep_us(2)
+            # El pulso anterior sigue en curso: el sensor ignoraría el trigger
+            if max_range_cm is not None and self.echo.value():
+                return None
 
-            # Enviar pulso de 10µs
-            self.trig.value(1)
-            time.sleep_us(10)
-            self.trig.value(0)
+            self._trigger()
 
             # Medir duración del pulso de retorno
-            duration = machine.time_pulse_us(self.echo, 1, config.ULTRASONIC_TIMEOUT)
-
-            # Validar que no hubo timeout
-            if duration < 0:
-                return -1.0
-
-            # Validar que no excede el timeout configurado
-            if duration > config.ULTRASONIC_TIMEOUT:
-                return -1.0
-
-            # Calcular distancia: (duración / 2) / 29.1
-            # Velocidad del sonido: 343 m/s = 0.0343 cm/µs = 29.1 µs/cm
-            # Ida y vuelta: dividir por 2
-            SOUND_SPEED_FACTOR = 29.1
-            distance = (duration / 2.0) / SOUND_SPEED_FACTOR
-
-            # Validar rango del sensor HC-SR04 (2-400 cm)
-            MIN_DISTANCE = 2.0
-            MAX_DISTANCE = 400.0
-
-            if distance < MIN_DISTANCE or distance > MAX_DISTANCE:
-                return -1.0
-
-            return distance
+            timeout = echo_timeout_us(max_range_cm)
+            duration = machine.time_pulse_us(self.echo, 1, timeout)
+            if duration == -2:
+                # time_pulse_us: timeout esperando a que empiece el pulso
+                return ERROR_NO_ECHO
+            return self._distance_from_duration(duration, timeout)
 
         except OSError as e:
             # Error de I/O en los pines (hardware)
@@ -112,6 +169,154 @@ class UltrasonicSensor:
             # Pines no inicializados correctamente
             return -3.0
     
+    def echo_busy(self):
+        """
+        Returns:
+            bool: True si ECHO sigue en alto (el pulso anterior aún está en
+                el aire; un ping de otro sensor oiría su eco)
+        """
+        try:
+            return bool(self.echo.value())
+        except (OSError, AttributeError):
+            return False
+
+    def _trigger(self):
+        """Pulso de 10µs en TRIG que inicia una medición"""
+        # Preparar el pulso
+        self.trig.value(0)
+        time.sleep_us(2)
+
+        # Enviar pulso de 10µs
+        self.trig.value(1)
+        time.sleep_us(10)
+        self.trig.value(0)
+
+    def _distance_from_duration(self, duration, timeout_us=None):
+        """
+        Convierte la duración del eco en distancia con las validaciones del sensor
+
+        Args:
+            duration (int): Duración del pulso de echo en µs (negativa = timeout)
+            timeout_us (int): Timeout aplicado (ULTRASONIC_TIMEOUT si es None)
+
+        Returns:
+            float: Distancia en cm (2-400), -1.0 si hubo timeout o pasa de
+                400 cm, o ERROR_TOO_CLOSE por debajo de 2 cm
+        """
+        # Validar que no hubo timeout
+        if duration < 0:
+            return -1.0
+
+        # Validar que no excede el timeout configurado
+        if timeout_us is None:
+            timeout_us = config.ULTRASONIC_TIMEOUT
+        if duration > timeout_us:
+            return -1.0
+
+        # Calcular distancia: (duración / 2) / 29.1
+        # Velocidad del sonido: 343 m/s = 0.0343 cm/µs = 29.1 µs/cm
+        # Ida y vuelta: dividir por 2
+        SOUND_SPEED_FACTOR = 29.1
+        distance = (duration / 2.0) / SOUND_SPEED_FACTOR
+
+        # Validar rango del sensor HC-SR04 (2-400 cm)
+        MIN_DISTANCE = 2.0
+        MAX_DISTANCE = 400.0
+
+        if distance < MIN_DISTANCE:
+            return ERROR_TOO_CLOSE
+        if distance > MAX_DISTANCE:
+            return -1.0
+
+        return distance
+
+    def _on_echo(self, pin):
+        """
+        Interrupción de ECHO: marca el instante de cada flanco
+
+        El primer flanco tras el trigger es la subida y el segundo la
+        bajada; no se lee el pin (un eco de 2 cm dura ~116 µs y podría
+        haber cambiado ya). Es una interrupción hard: sin asignar memoria,
+        solo enteros pequeños.
+        """
+        now = time.ticks_us()
+        edges = self._edges
+        if edges == 0:
+            self._rise_us = now
+            self._edges = 1
+        elif edges == 1:
+            self._fall_us = now
+            self._edges = 2
+
+    def start_measurement(self, max_range_cm=None):
+        """
+        Lanza un ping sin esperar el eco
+
+        La primera llamada instala la interrupción en ECHO (flancos de
+        subida y bajada). Si falla, read_measurement() devolverá el código
+        de error como measure_distance_cm().
+
+        Args:
+            max_range_cm (float): Alcance máximo (None = ULTRASONIC_TIMEOUT)
+
+        Returns:
+            bool: False si ECHO sigue en alto por el pulso anterior (no se
+                lanza: el sensor ignoraría el trigger)
+        """
+        self._error = None
+        self._edges = 0
+        self._timeout_us = echo_timeout_us(max_range_cm)
+        try:
+            if self.echo.value():
+                return False
+            if not self._irq_armed:
+                # hard=True: el instante se toma en la propia interrupción, no
+                # cuando el planificador ejecute el handler (se retrasaría
+                # tanto como el loop ocupado)
+                self.echo.irq(trigger=Pin.IRQ_RISING | Pin.IRQ_FALLING,
+                              handler=self._echo_handler, hard=True)
+                self._irq_armed = True
+            self._trigger()
+        except OSError:
+            self._error = -2.0
+        except AttributeError:
+            self._error = -3.0
+        self._triggered_us = time.ticks_us()
+        self.pending = True
+        return True
+
+    def read_measurement(self):
+        """
+        Recoge sin bloquear el resultado del último start_measurement()
+
+        Returns:
+            float: Distancia en cm o código de error (los mismos que
+                measure_distance_cm()), o None si el eco aún no ha vuelto
+                (o no hay medición en curso)
+        """
+        if not self.pending:
+            return None
+
+        if self._error is not None:
+            self.pending = False
+            return self._error
+
+        if self._edges == 2:
+            self.pending = False
+            return self._distance_from_duration(
+                time.ticks_diff(self._fall_us, self._rise_us), self._timeout_us
+            )
+
+        # Sin eco completo a tiempo: timeout, igual que time_pulse_us() == -1
+        # si ECHO subió y -2 si ni siquiera empezó
+        waited = time.ticks_diff(time.ticks_us(), self._triggered_us)
+        if waited > self._timeout_us + ECHO_START_MAX_US:
+            self.pending = False
+            if self._edges == 0:
+                return ERROR_NO_ECHO
+            return -1.0
+        return None
+
     def is_obstacle_detected(self, threshold_cm=None):
         """
         Detecta si hay un obstáculo dentro del umbral
@@ -127,6 +332,8 @@ class UltrasonicSensor:
         
         distance = self.measure_distance_cm()
         
+        if distance == ERROR_TOO_CLOSE:
+            return True  # Obstáculo pegado al sensor
         if distance < 0:
             return False  # Error en la medición
         
@@ -0,0 +1,305 @@
+"""
+Muestreo compartido del sensor ultrasónico
+
+Un único dueño del HC-SR04: step() (llamado desde el loop de control)
+mide cada SENSOR_SAMPLE_INTERVAL_MS y guarda la última lectura con su
+instante. Los handlers HTTP y el modo automático leen el valor cacheado
+en O(1), sin esperar al eco ni lanzar pulsos extra que se interfieran.
+
+Expone la misma interfaz que UltrasonicSensor (measure_distance_cm,
+is_obstacle_detected), así que AutoMode lo recibe en lugar del sensor.
+Una lectura más vieja que SENSOR_MAX_AGE_MS se considera caducada y
+measure_distance_cm() devuelve -1.0, igual que un timeout del sensor.
+
+Con ULTRASONIC_IRQ = True (y un sensor con interrupciones) step() nunca
+espera al eco: lanza el ping en una llamada y recoge la distancia en una
+posterior, cuando la interrupción de ECHO ya marcó los dos flancos.
+
+Cada lectura entra además en un DistanceFilter: measure_distance_cm()
+devuelve la lectura filtrada según SENSOR_FILTER ("median", "ema" o
+"raw"), de modo que un eco espurio aislado no dispara una evasión.
+
+Un consumidor puede pedir un alcance reducido con request_range() (el
+modo auto solo necesita saber si hay algo a menos de AUTO_MIN_DISTANCE
+más un margen): el timeout del eco se acorta en proporción y se mide cada
+SENSOR_FAST_INTERVAL_MS. Uno de cada SENSOR_FULL_RANGE_EVERY pings sigue
+siendo de alcance completo para la telemetría. Un ping corto cuyo eco
+empezó pero no volvió dentro del alcance (-1.0) no es un error: la
+lectura queda como "libre hasta el alcance" (el propio alcance como cota
+inferior) y no entra en el historial. Un eco de menos de 2 cm (-4.0) o un
+ECHO que no llegó a subir (-5.0) nunca cuentan como libre: son obstáculo
+y fallo del sensor, y measure_distance_cm() los devuelve sin filtrar.
+"""
+import time
+import config
+from distance_filter import DistanceFilter
+from sensor_handler import ERROR_TOO_CLOSE, ERROR_NO_ECHO
+
+
+class SensorSampler:
+    """Última lectura del sensor, renovada a frecuencia fija
+
+    Attributes:
+        sensor (UltrasonicSensor): Sensor real
+        interval_ms (int): Intervalo entre mediciones
+        max_age_ms (int): Edad a partir de la cual la lectura caduca
+        distance (float): Última distancia medida (negativa si hubo error)
+        sampled_at (int): ticks_ms de la última medición
+        samples (int): Mediciones realizadas
+        errors (list): Mediciones fallidas por código [-1, -2, -3, -4, -5]
+        non_blocking (bool): Mide con start/read_measurement en vez de bloquear
+        history (DistanceFilter): Últimas lecturas con mediana y EMA
+        filter_mode (str): Lectura que devuelve measure_distance_cm()
+        pinged_at (int): ticks_ms del último ping sin bloqueo
+        pings (int): Pings sin bloqueo lanzados
+        range_cm (float): Alcance pedido por un consumidor (None = completo)
+        clear (bool): La última lectura fue un ping corto sin eco
+        clears (int): Pings cortos sin eco dentro del alcance
+    """
+
+    def __init__(self, sensor, interval_ms=None, max_age_ms=None):
+        """
+        Args:
+            sensor (UltrasonicSensor): Sensor a muestrear
+            interval_ms (int): Intervalo entre mediciones (config si es None)
+            max_age_ms (int): Edad máxima de una lectura válida (config si es None)
+        """
+        self.sensor = sensor
+        self.interval_ms = config.SENSOR_SAMPLE_INTERVAL_MS if interval_ms is None else interval_ms
+        self.max_age_ms = config.SENSOR_MAX_AGE_MS if max_age_ms is None else max_age_ms
+
+        self.distance = -1.0
+        self.sampled_at = 0
+        self.samples = 0
+        self.errors = [0, 0, 0, 0, 0]
+        self.non_blocking = config.ULTRASONIC_IRQ and getattr(sensor, "irq_capable", False)
+        self.pinged_at = 0
+        self.pings = 0
+
+        self.history = DistanceFilter(max_age_ms=self.max_age_ms)
+        self.filter_mode = config.SENSOR_FILTER
+
+        self.range_cm = None
+        self.fast_interval_ms = config.SENSOR_FAST_INTERVAL_MS
+        self.full_range_every = config.SENSOR_FULL_RANGE_EVERY
+        self.clear = False
+        self.clears = 0
+        self._ranged = 0
+        self._ping_range = None
+
+    def request_range(self, range_cm):
+        """
+        Fija el alcance de las mediciones (lo pide el modo automático)
+
+        Args:
+            range_cm (float): Distancia máxima de interés en cm, o None para
+                volver al alcance completo y al intervalo normal
+        """
+        self.range_cm = range_cm
+        self._ranged = 0
+
+    def active_interval_ms(self):
+        """Intervalo entre mediciones según el alcance pedido"""
+        if self.range_cm is None:
+            return self.interval_ms
+        return self.fast_interval_ms
+
+    def _next_range(self):
+        """Alcance del próximo ping: el pedido, salvo uno de cada full_range_every"""
+        if self.range_cm is None or self._ranged % self.full_range_every == 0:
+            return None
+        return self.range_cm
+
+    def step(self):
+        """
+        Mide si ha pasado el intervalo desde la última medición
+
+        Sin bloqueo, el ping se lanza en una llamada y la muestra se toma
+        en la primera llamada posterior con el eco ya recibido.
+
+        Returns:
+            bool: True si se tomó una muestra nueva
+        """
+        if not self.non_blocking:
+            if self.samples and time.ticks_diff(time.ticks_ms(), self.sampled_at) < self.active_interval_ms():
+                return False
+            return self.ping()
+
+        sampled = self.poll()
+        if self.sensor.pending:
+            return sampled
+
+        # El intervalo cuenta desde el ping anterior: el siguiente puede
+        # salir en la misma llamada que recoge el eco
+        if self.pings and time.ticks_diff(time.ticks_ms(), self.pinged_at) < self.active_interval_ms():
+            return sampled
+        self.ping()
+        return sampled
+
+    def in_flight(self):
+        """
+        Returns:
+            bool: Hay un ping sin bloqueo esperando su eco
+        """
+        return self.non_blocking and self.sensor.pending
+
+    def poll(self):
+        """
+        Recoge sin bloquear el eco del ping en curso
+
+        Returns:
+            bool: True si se tomó una muestra nueva
+        """
+        if not self.in_flight():
+            return False
+        distance = self.sensor.read_measurement()
+        if distance is None:
+            return False
+        self._store(distance, self._ping_range)
+        return True
+
+    def ping(self):
+        """
+        Lanza una medición ya, sin mirar el intervalo (lo usa SensorArray)
+
+        En modo bloqueante la medición se completa y se guarda aquí mismo.
+
+        Returns:
+            bool: False si ECHO sigue en alto por el pulso anterior y no se
+                pudo lanzar (se reintenta en otra llamada)
+        """
+        sensor = self.sensor
+        max_range = self._next_range()
+        if not self.non_blocking:
+            if max_range is None:
+                distance = sensor.measure_distance_cm()
+            else:
+                distance = sensor.measure_distance_cm(max_range)
+                if distance is None:
+                    return False
+            self._ranged += 1
+            self._store(distance, max_range)
+            return True
+
+        if max_range is None:
+            started = sensor.start_measurement()
+        else:
+            started = sensor.start_measurement(max_range)
+        if not started:
+            return False
+        self._ping_range = max_range
+        self._ranged += 1
+        self.pinged_at = time.ticks_ms()
+        self.pings += 1
+        return True
+
+    def _store(self, distance, range_cm=None):
+        """
+        Guarda una medición terminada y cuenta sus errores
+
+        Args:
+            distance (float): Resultado de la medición
+            range_cm (float): Alcance con el que se midió (None = completo)
+        """
+        # El instante es el del final de la medición (tras el eco)
+        self.sampled_at = time.ticks_ms()
+        self.samples += 1
+
+        if range_cm is not None and distance == -1.0:
+            # El eco empezó y no volvió dentro del alcance: libre al menos
+            # hasta range_cm
+            self.distance = float(range_cm)
+            self.clear = True
+            self.clears += 1
+            return
+
+        self.clear = False
+        self.distance = distance
+        self.history.add(distance, self.sampled_at)
+
+        # Códigos de error de measure_distance_cm(): -1.0 a -5.0
+        if self.distance < 0:
+            code = int(-self.distance)
+            if 1 <= code <= 5:
+                self.errors[code - 1] += 1
+
+    def age_ms(self):
+        """
+        Returns:
+            int: Edad de la última lectura en ms, o -1 si aún no hay ninguna
+        """
+        if not self.samples:
+            return -1
+        return time.ticks_diff(time.ticks_ms(), self.sampled_at)
+
+    def is_stale(self):
+        """
+        Returns:
+            bool: True si no hay lectura o es más vieja que max_age_ms
+        """
+        age = self.age_ms()
+        return age < 0 or age > self.max_age_ms
+
+    def raw_distance_cm(self):
+        """
+        Última lectura sin filtrar si sigue vigente
+
+        Returns:
+            float: Distancia en cm, el código de error de la medición o
+                -1.0 si la lectura ha caducado
+        """
+        if self.is_stale():
+            return -1.0
+        return self.distance
+
+    def measure_distance_cm(self):
+        """
+        Distancia filtrada si sigue vigente (misma interfaz que UltrasonicSensor)
+
+        Con SENSOR_FILTER = "median" o "ema" devuelve el filtro sobre las
+        lecturas válidas recientes; si no queda ninguna, la última lectura
+        (con su código de error). Tras un ping corto sin eco devuelve al
+        menos su alcance (lo más cercano que pudo haber ya no está). Si la
+        última lectura es ERROR_TOO_CLOSE o ERROR_NO_ECHO la devuelve tal
+        cual: el filtro no puede tapar un obstáculo pegado ni un sensor mudo.
+
+        Returns:
+            float: Distancia en cm, el código de error de la medición o
+                -1.0 si la lectura ha caducado
+        """
+        if self.is_stale():
+            return -1.0
+        if self.distance == ERROR_TOO_CLOSE or self.distance == ERROR_NO_ECHO:
+            return self.distance
+        mode = self.filter_mode
+        if mode == "median":
+            filtered = self.history.median()
+        elif mode == "ema":
+            filtered = self.history.ema()
+        else:
+            filtered = self.distance
+        if self.clear:
+            return max(self.distance, filtered)
+        if filtered < 0:
+            return self.distance
+        return filtered
+
+    def is_obstacle_detected(self, threshold_cm=None):
+        """
+        Detecta un obstáculo con la lectura cacheada
+
+        Args:
+            threshold_cm (float): Distancia mínima en cm (usa config si es None)
+
+        Returns:
+            bool: True si hay obstáculo, False si no (o sin lectura vigente)
+        """
+        if threshold_cm is None:
+            threshold_cm = config.AUTO_MIN_DISTANCE
+
+        distance = self.measure_distance_cm()
+        if distance == ERROR_TOO_CLOSE:
+            return True
+        if distance < 0:
+            return False
+        return distance < threshold_cm
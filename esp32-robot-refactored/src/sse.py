@@ -0,0 +1,45 @@
+"""
+Server-Sent Events (text/event-stream) para /events
+
+La respuesta no lleva Content-Length: la conexión queda abierta y cada
+evento es un bloque "event:/data:" terminado en una línea vacía.
+"""
+
+EVENT_STREAM_HEAD = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Connection: keep-alive\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"\r\n"
+)
+
+
+def stream_head(retry_ms):
+    """
+    Cabeceras de la respuesta más el tiempo de reconexión sugerido
+
+    Args:
+        retry_ms (int): Espera del cliente antes de reconectar (ms)
+
+    Returns:
+        bytes: Inicio de la respuesta
+    """
+    return EVENT_STREAM_HEAD + b"retry: " + str(retry_ms).encode() + b"\n\n"
+
+
+def encode_event(event, data):
+    """
+    Codifica un evento
+
+    Args:
+        event (str): Nombre del evento (ej: "telemetry")
+        data (str): Contenido (JSON en una línea)
+
+    Returns:
+        bytes: Evento listo para enviar
+    """
+    # Un salto de línea en data terminaría el evento: cada línea va en su propio "data:"
+    if "\n" in data:
+        data = data.replace("\n", "\ndata: ")
+    return ("event: " + event + "\ndata: " + data + "\n\n").encode("utf-8")
@@ -0,0 +1,153 @@
+"""
+Dashboard servido desde la flash del ESP32
+
+tools/build_dashboard.py comprime con gzip la salida de `vite build` en
+www/ y escribe www/manifest.tsv, una línea por fichero:
+
+    url<TAB>fichero<TAB>content-type<TAB>bytes<TAB>etag<TAB>immutable|revalidate
+
+Al arrancar solo se lee el manifiesto (unas pocas líneas). Los ficheros
+se envían ya comprimidos (Content-Encoding: gzip) leyendo trozos de
+STATIC_CHUNK_SIZE bytes en un buffer preasignado, así que la RAM usada no
+depende del tamaño del bundle.
+
+Los assets de Vite llevan un hash en el nombre y se cachean como
+inmutables; index.html se revalida con su ETag para que un dashboard
+nuevo llegue al navegador en cuanto se sube.
+"""
+import config
+from http_response import CACHE_IMMUTABLE, CACHE_REVALIDATE
+
+MANIFEST_NAME = "manifest.tsv"
+
+CONTENT_ENCODING_GZIP = b"Content-Encoding: gzip\r\nVary: Accept-Encoding\r\n"
+
+
+class StaticFile:
+    """Entrada del manifiesto
+
+    Attributes:
+        path (str): Ruta del fichero comprimido en la flash
+        content_type (str): Tipo MIME del contenido sin comprimir
+        size (int): Bytes del fichero comprimido (Content-Length)
+        etag (bytes): ETag entre comillas
+        cache_control (bytes): Header Cache-Control precodificado
+    """
+
+    def __init__(self, path, content_type, size, etag, cache_control):
+        self.path = path
+        self.content_type = content_type
+        self.size = size
+        self.etag = etag
+        self.cache_control = cache_control
+
+
+class StaticFiles:
+    """Ficheros del dashboard listados en el manifiesto
+
+    Attributes:
+        root (str): Directorio del dashboard en la flash
+        files (dict): {url: StaticFile}
+        buf (bytearray): Buffer de lectura compartido por todos los envíos
+    """
+
+    def __init__(self, root=None, chunk_size=None):
+        """
+        Args:
+            root (str): Directorio (config.STATIC_ROOT si es None)
+            chunk_size (int): Bytes por trozo (config.STATIC_CHUNK_SIZE si es None)
+        """
+        self.root = config.STATIC_ROOT if root is None else root
+        if chunk_size is None:
+            chunk_size = config.STATIC_CHUNK_SIZE
+
+        self.files = {}
+        self.buf = bytearray(chunk_size)
+        self.view = memoryview(self.buf)
+
+    def load(self):
+        """
+        Lee el manifiesto; sin él (dashboard no subido) no hay ficheros
+
+        Returns:
+            int: Número de ficheros disponibles
+        """
+        self.files = {}
+        try:
+            manifest = open(self.root + "/" + MANIFEST_NAME)
+        except OSError:
+            return 0
+
+        try:
+            for line in manifest:
+                fields = line.rstrip("\r\n").split("\t")
+                if len(fields) != 6 or not fields[0].startswith("/"):
+                    continue
+                self.files[fields[0]] = StaticFile(
+                    self.root + "/" + fields[1],
+                    fields[2],
+                    int(fields[3]),
+                    ('"' + fields[4] + '"').encode(),
+                    CACHE_IMMUTABLE if fields[5] == "immutable" else CACHE_REVALIDATE
+                )
+        finally:
+            manifest.close()
+        return len(self.files)
+
+    def get(self, url):
+        """
+        Args:
+            url (str): Path de la petición sin query string
+
+        Returns:
+            StaticFile: Entrada del manifiesto o None
+        """
+        return self.files.get(url)
+
+    def open(self, entry):
+        """
+        Args:
+            entry (StaticFile): Fichero a enviar
+
+        Returns:
+            Fichero abierto en modo binario
+
+        Raises:
+            OSError: Si el fichero no está en la flash
+        """
+        return open(entry.path, "rb")
+
+    def read_chunk(self, f):
+        """
+        Lee el siguiente trozo en el buffer compartido
+
+        El trozo es una vista de self.buf: hay que enviarlo (o copiarlo)
+        antes de leer el siguiente.
+
+        Args:
+            f: Fichero devuelto por open()
+
+        Returns:
+            memoryview: Trozo leído o None al llegar al final
+        """
+        n = f.readinto(self.buf)
+        if not n:
+            return None
+        return self.view[:n]
+
+    def send(self, client, writer, f):
+        """
+        Envía el fichero por trozos y lo cierra (las cabeceras ya se enviaron)
+
+        Args:
+            client: Socket del cliente
+            writer (ResponseWriter): Escritor que cuenta los bytes enviados
+            f: Fichero devuelto por open()
+        """
+        try:
+            chunk = self.read_chunk(f)
+            while chunk is not None:
+                writer.send_all(client, chunk)
+                chunk = self.read_chunk(f)
+        finally:
+            f.close()
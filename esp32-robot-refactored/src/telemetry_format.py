@@ -0,0 +1,85 @@
+"""
+Formato binario de telemetría (/telemetry?fmt=bin)
+
+Registro de tamaño fijo, little-endian (el orden nativo del ESP32), para
+clientes que registran a alta frecuencia. Las respuestas se pueden
+concatenar en un fichero y leer después con tools/telemetry_decode.py.
+
+Esquema versión 1 (RECORD_FORMAT, RECORD_SIZE bytes):
+    offset  tipo  campo
+    0       B     versión del esquema (SCHEMA_VERSION)
+    1       B     flags: FLAG_OBSTACLE | FLAG_AUTO | FLAG_DISTANCE_VALID
+    2       H     tamaño del registro en bytes (para saltar versiones futuras)
+    4       I     número de secuencia de la muestra
+    8       I     uptime en ms
+    12      f     distancia en cm (-1.0 si la medida no es válida)
+
+Una versión nueva solo puede añadir campos al final y debe subir
+SCHEMA_VERSION; los lectores usan el campo de tamaño para avanzar.
+"""
+import struct
+
+SCHEMA_VERSION = 1
+RECORD_FORMAT = "<BBHIIf"
+RECORD_SIZE = 16
+
+FLAG_OBSTACLE = 0x01
+FLAG_AUTO = 0x02
+FLAG_DISTANCE_VALID = 0x04
+
+CONTENT_TYPE = "application/octet-stream"
+
+
+def pack_into(buf, seq, uptime_ms, distance_cm, obstacle, auto_enabled):
+    """
+    Escribe un registro en un buffer preasignado
+
+    Args:
+        buf (bytearray): Buffer de al menos RECORD_SIZE bytes
+        seq (int): Número de secuencia
+        uptime_ms (int): Uptime en ms
+        distance_cm (float): Distancia (negativa si no es válida)
+        obstacle (bool): Si hay obstáculo
+        auto_enabled (bool): Si el modo automático está activo
+    """
+    flags = 0
+    if obstacle:
+        flags |= FLAG_OBSTACLE
+    if auto_enabled:
+        flags |= FLAG_AUTO
+    if distance_cm >= 0:
+        flags |= FLAG_DISTANCE_VALID
+    else:
+        distance_cm = -1.0
+
+    struct.pack_into(
+        RECORD_FORMAT, buf, 0,
+        SCHEMA_VERSION, flags, RECORD_SIZE,
+        seq & 0xFFFFFFFF, uptime_ms & 0xFFFFFFFF, distance_cm
+    )
+
+
+def unpack(data):
+    """
+    Lee un registro
+
+    Args:
+        data (bytes): Registro completo
+
+    Returns:
+        dict: Campos del registro
+
+    Raises:
+        ValueError: Si la versión no es compatible
+    """
+    version, flags, size, seq, uptime_ms, distance = struct.unpack_from(RECORD_FORMAT, data)
+    if version != SCHEMA_VERSION or size < RECORD_SIZE:
+        raise ValueError("registro de telemetría no soportado")
+    return {
+        "seq": seq,
+        "uptime_ms": uptime_ms,
+        "distance_cm": distance,
+        "obstacle": bool(flags & FLAG_OBSTACLE),
+        "auto_enabled": bool(flags & FLAG_AUTO),
+        "distance_valid": bool(flags & FLAG_DISTANCE_VALID),
+    }
@@ -0,0 +1,246 @@
+"""
+Canal de control por UDP con paquetes binarios
+
+Cada pulsación por /move paga conexión TCP, parseo HTTP, rate limiting y
+una respuesta JSON. Este canal opcional recibe datagramas de tamaño fijo
+y los pasa directamente a MotorController.execute_command(), con las
+mismas comprobaciones de token y Safe Mode.
+
+Comando (big-endian, struct COMMAND_FORMAT seguido del token):
+    0  B  versión (PROTOCOL_VERSION)
+    1  B  comando ASCII: F, B, L, R o S
+    2  H  duración en ms (0 = hasta el siguiente comando)
+    4  I  número de secuencia (crece con cada paquete del cliente)
+    8  .. token (config.SECURITY_TOKEN en UTF-8)
+
+Ack (struct ACK_FORMAT):
+    0  B  versión
+    1  B  estado (ACK_*)
+    2  H  reservado (0)
+    4  I  secuencia del comando confirmado
+
+Los paquetes con secuencia menor o igual que la última aceptada del mismo
+cliente se descartan sin ack. Si se acumulan varios en el socket solo se
+ejecuta el más reciente.
+"""
+import socket
+import struct
+import time
+import config
+
+PROTOCOL_VERSION = 1
+COMMAND_FORMAT = "!BBHI"
+ACK_FORMAT = "!BBHI"
+HEADER_SIZE = 8
+ACK_SIZE = 8
+MAX_PACKET_SIZE = 64
+
+ACK_OK = 0
+ACK_BAD_TOKEN = 1
+ACK_SAFE_MODE = 2
+ACK_INVALID = 3
+
+
+def encode_command(seq, command, duration_ms, token):
+    """
+    Codifica un comando (lado cliente)
+
+    Args:
+        seq (int): Número de secuencia
+        command (str): Dirección ('F', 'B', 'L', 'R', 'S')
+        duration_ms (int): Duración del movimiento (0 = sin límite)
+        token (str): Token de seguridad
+
+    Returns:
+        bytes: Datagrama listo para enviar
+    """
+    header = struct.pack(COMMAND_FORMAT, PROTOCOL_VERSION, ord(command), duration_ms, seq)
+    return header + token.encode("utf-8")
+
+
+def decode_ack(data):
+    """
+    Decodifica un ack (lado cliente)
+
+    Args:
+        data (bytes): Datagrama recibido
+
+    Returns:
+        tuple: (estado, secuencia) o None si no es un ack válido
+    """
+    if len(data) != ACK_SIZE:
+        return None
+    version, status, _, seq = struct.unpack(ACK_FORMAT, data)
+    if version != PROTOCOL_VERSION:
+        return None
+    return status, seq
+
+
+class UDPControl:
+    """Receptor de comandos de movimiento por UDP
+
+    Attributes:
+        sock: Socket UDP no bloqueante (None hasta open())
+        last_seq (int): Secuencia del último comando aceptado
+        last_addr (tuple): Dirección del cliente que lo envió
+        received (int): Datagramas recibidos
+        executed (int): Comandos ejecutados
+        dropped (int): Datagramas descartados por llegar tarde o fuera de orden
+    """
+
+    def __init__(self, motors, security, logger, program=None):
+        """
+        Args:
+            motors (MotorController): Controlador de motores
+            security (SecurityManager): Gestor de seguridad
+            logger (Logger): Sistema de logging
+            program (MotionProgram): Programa que cancela un comando UDP (opcional)
+        """
+        self.motors = motors
+        self.security = security
+        self.logger = logger
+        self.program = program
+        self.sock = None
+        self.token = config.SECURITY_TOKEN.encode("utf-8")
+
+        self.last_seq = -1
+        self.last_addr = None
+
+        # Movimiento con duración: inicio (ticks_ms) y duración en ms
+        self.move_started = 0
+        self.move_duration = 0
+
+        self.received = 0
+        self.executed = 0
+        self.dropped = 0
+
+        # Buffer del ack (se reutiliza en cada respuesta)
+        self.ack = bytearray(ACK_SIZE)
+
+    def open(self, ip, port):
+        """
+        Abre el socket UDP en modo no bloqueante
+
+        Args:
+            ip (str): IP local
+            port (int): Puerto UDP
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((ip, port))
+        self.sock.setblocking(False)
+        self.logger.add("Control UDP en puerto " + str(port))
+
+    def close(self):
+        """Cierra el socket UDP"""
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def cancel(self):
+        """
+        Olvida la duración del último comando sin tocar los motores
+
+        Lo llama el servidor cuando otro camino toma los motores (/move,
+        /ws, /program o el modo auto): el temporizador ya no es dueño del
+        movimiento y no debe pararlo al vencer.
+        """
+        self.move_duration = 0
+
+    def poll(self):
+        """
+        Atiende los datagramas pendientes sin bloquear
+
+        Solo el comando válido más reciente llega a los motores: los que se
+        acumularon detrás de él ya no reflejan lo que quiere el conductor.
+        """
+        self._check_duration()
+
+        latest = None
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(MAX_PACKET_SIZE)
+            except OSError:
+                # EAGAIN: no hay más datagramas
+                break
+
+            self.received += 1
+            command = self._validate(data, addr)
+            if command is not None:
+                latest = (command, addr)
+
+        if latest is not None:
+            self._execute(latest[0], latest[1])
+
+    # ==========================================
+    # UTILIDADES
+    # ==========================================
+
+    def _validate(self, data, addr):
+        """
+        Comprueba un datagrama y actualiza la secuencia
+
+        Returns:
+            tuple: (comando, duración, secuencia) o None si se descarta
+        """
+        if len(data) < HEADER_SIZE:
+            return None
+
+        version, command, duration, seq = struct.unpack_from(COMMAND_FORMAT, data)
+        if version != PROTOCOL_VERSION:
+            return None
+
+        ip = addr[0]
+        if data[HEADER_SIZE:] != self.token:
+            self.security.add_error(ip, "udp_bad_token")
+            self._send_ack(ACK_BAD_TOKEN, seq, addr)
+            return None
+
+        # Fuera de orden o repetido: el cliente ya envió algo más nuevo
+        if addr == self.last_addr and seq <= self.last_seq:
+            self.dropped += 1
+            return None
+
+        if addr != self.last_addr:
+            self.logger.add("Control UDP desde " + ip)
+        self.last_addr = addr
+        self.last_seq = seq
+
+        if self.security.is_safe_mode_active():
+            self._send_ack(ACK_SAFE_MODE, seq, addr)
+            return None
+
+        return command, duration, seq
+
+    def _execute(self, command, addr):
+        """Ejecuta el comando aceptado más reciente y envía el ack"""
+        code, duration, seq = command
+        direction = chr(code) if 32 <= code < 127 else "?"
+
+        # El conductor retoma el control: cancelar el programa en curso
+        if self.program is not None:
+            self.program.stop("udp")
+
+        if not self.motors.execute_command(direction):
+            self.security.add_error(addr[0], "udp_invalid_cmd:" + direction)
+            self._send_ack(ACK_INVALID, seq, addr)
+            return
+
+        self.executed += 1
+        self.move_started = time.ticks_ms()
+        self.move_duration = duration
+        self._send_ack(ACK_OK, seq, addr)
+
+    def _check_duration(self):
+        """Para los motores cuando vence la duración del último comando"""
+        if self.move_duration and time.ticks_diff(time.ticks_ms(), self.move_started) >= self.move_duration:
+            self.move_duration = 0
+            self.motors.stop()
+
+    def _send_ack(self, status, seq, addr):
+        """Envía el ack sin crear buffers nuevos"""
+        struct.pack_into(ACK_FORMAT, self.ack, 0, PROTOCOL_VERSION, status, 0, seq)
+        try:
+            self.sock.sendto(self.ack, addr)
+        except OSError:
+            # Un ack perdido no debe parar el control
+            pass
@@ -0,0 +1,131 @@
+"""
+Protocolo WebSocket (RFC 6455) mínimo para el servidor asíncrono
+
+Solo lo que necesita el dashboard: handshake, tramas de texto sin
+fragmentar, ping/pong y cierre. Las tramas del cliente llegan siempre
+enmascaradas y las del servidor salen sin máscara.
+"""
+import hashlib
+import binascii
+
+# GUID fijo del RFC 6455 para calcular Sec-WebSocket-Accept
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+# Tamaño máximo de una trama recibida (los comandos son muy cortos)
+MAX_FRAME_SIZE = 125
+
+HANDSHAKE_HEAD = (
+    b"HTTP/1.1 101 Switching Protocols\r\n"
+    b"Upgrade: websocket\r\n"
+    b"Connection: Upgrade\r\n"
+    b"Sec-WebSocket-Accept: "
+)
+
+
+class WebSocketError(Exception):
+    """Trama inválida o fuera de lo que soporta el servidor"""
+    pass
+
+
+def accept_key(client_key):
+    """
+    Calcula Sec-WebSocket-Accept a partir de Sec-WebSocket-Key
+
+    Args:
+        client_key (str): Valor de Sec-WebSocket-Key enviado por el cliente
+
+    Returns:
+        bytes: Clave de aceptación en base64
+    """
+    digest = hashlib.sha1(client_key.encode("utf-8") + WS_GUID).digest()
+    return binascii.b2a_base64(digest).strip()
+
+
+def handshake_response(client_key):
+    """
+    Respuesta 101 que completa el upgrade a WebSocket
+
+    Args:
+        client_key (str): Valor de Sec-WebSocket-Key
+
+    Returns:
+        bytes: Respuesta HTTP completa
+    """
+    return HANDSHAKE_HEAD + accept_key(client_key) + b"\r\n\r\n"
+
+
+def encode_frame(payload, opcode=OP_TEXT):
+    """
+    Codifica una trama del servidor (FIN activo, sin máscara)
+
+    Args:
+        payload (str|bytes): Contenido de la trama
+        opcode (int): Tipo de trama
+
+    Returns:
+        bytes: Trama lista para enviar
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+
+    length = len(payload)
+    if length < 126:
+        header = bytes((0x80 | opcode, length))
+    elif length < 65536:
+        header = bytes((0x80 | opcode, 126, length >> 8, length & 0xFF))
+    else:
+        # Longitud extendida de 64 bits (big-endian, bit alto a 0)
+        header = bytes((0x80 | opcode, 127)) + bytes((length >> shift) & 0xFF for shift in range(56, -8, -8))
+    return header + payload
+
+
+async def read_frame(reader, max_size=MAX_FRAME_SIZE):
+    """
+    Lee y desenmascara una trama del cliente
+
+    Args:
+        reader: StreamReader de la conexión
+        max_size (int): Tamaño máximo aceptado del payload
+
+    Returns:
+        tuple: (opcode, payload) con payload como bytearray
+
+    Raises:
+        WebSocketError: Si la trama no está enmascarada, está fragmentada
+            o supera max_size
+    """
+    head = await reader.readexactly(2)
+    fin = head[0] & 0x80
+    opcode = head[0] & 0x0F
+    masked = head[1] & 0x80
+    length = head[1] & 0x7F
+
+    if not masked:
+        raise WebSocketError("trama sin máscara")
+    if not fin or opcode == OP_CONTINUATION:
+        raise WebSocketError("tramas fragmentadas no soportadas")
+
+    if length == 126:
+        ext = await reader.readexactly(2)
+        length = (ext[0] << 8) | ext[1]
+    elif length == 127:
+        ext = await reader.readexactly(8)
+        length = 0
+        for byte in ext:
+            length = (length << 8) | byte
+    if length > max_size:
+        raise WebSocketError("trama demasiado grande")
+
+    mask = await reader.readexactly(4)
+    payload = bytearray(await reader.readexactly(length)) if length else bytearray()
+    for i in range(length):
+        payload[i] ^= mask[i & 3]
+
+    return opcode, payload
@@ -1,11 +1,20 @@
 """
 Configuración de pytest con mocks para hardware de MicroPython
 """
+import os
 import sys
+import tracemalloc
 import pytest
 from unittest.mock import MagicMock, Mock
 
 
+# Directorio src/ (en el ESP32 todos los módulos están en la raíz y se
+# importan entre sí sin prefijo de paquete)
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
 # ==========================================
 # MOCKS PARA MÓDULOS DE MICROPYTHON
 # ==========================================
@@ -14,6 +23,8 @@ class MockPin:
     """Mock para machine.Pin"""
     OUT = 1
     IN = 0
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
     
     def __init__(self, pin_num, mode):
         self.pin_num = pin_num
@@ -26,6 +37,27 @@ class MockPin:
         return self._value
 
 
+class MockIrqPin(MockPin):
+    """Pin con interrupciones: fire() simula un flanco externo (p. ej. ECHO)"""
+
+    def __init__(self, pin_num, mode):
+        super().__init__(pin_num, mode)
+        self.handler = None
+        self.trigger = 0
+
+    def irq(self, handler=None, trigger=MockPin.IRQ_RISING | MockPin.IRQ_FALLING, hard=False):
+        self.handler = handler
+        self.trigger = trigger
+        self.hard = hard
+
+    def fire(self, level):
+        """Cambia el nivel y llama al handler si el flanco está habilitado"""
+        self._value = level
+        mask = self.IRQ_RISING if level else self.IRQ_FALLING
+        if self.handler is not None and self.trigger & mask:
+            self.handler(self)
+
+
 class MockMachine:
     """Mock para el módulo machine"""
     Pin = MockPin
@@ -54,11 +86,21 @@ class MockTime:
         """Retorna ticks en milisegundos"""
         return cls._ticks
     
+    @classmethod
+    def ticks_us(cls):
+        """Retorna ticks en microsegundos (mismo reloj que ticks_ms)"""
+        return cls._ticks * 1000
+    
     @classmethod
     def ticks_diff(cls, new, old):
         """Calcula diferencia entre ticks"""
         return new - old
     
+    @classmethod
+    def ticks_add(cls, ticks, delta):
+        """Suma un desplazamiento a un valor de ticks"""
+        return ticks + delta
+    
     @classmethod
     def sleep_ms(cls, ms):
         """Simula sleep en milisegundos"""
@@ -105,6 +147,11 @@ class MockSocket:
     def recv(self, bufsize):
         return b"GET / HTTP/1.1\r\n\r\n"
     
+    def recv_into(self, buf):
+        data = self.recv(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+    
     def send(self, data):
         return len(data)
     
@@ -152,7 +199,7 @@ def mock_config(monkeypatch):
     # Cargar config_template
     spec = importlib.util.spec_from_file_location(
         "config",
-        "/Users/yagomateos/Proyectos/Robot-2WD/esp32-robot-refactored/src/config_template.py"
+        os.path.join(SRC_DIR, "config_template.py")
     )
     config = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(config)
@@ -169,9 +216,36 @@ def mock_pin():
     return MockPin(1, MockPin.OUT)
 
 
+@pytest.fixture
+def mock_irq_pin():
+    """Fixture para un pin de entrada con interrupciones (fuente de IRQ simulada)"""
+    return MockIrqPin(18, MockPin.IN)
+
+
 @pytest.fixture
 def mock_time_module():
     """Fixture para el módulo time mockeado"""
     mock_time = MockTime()
     mock_time.reset_ticks()
     return mock_time
+
+
+def peak_allocation(func, iterations=200):
+    """Pico de memoria (bytes) sobre el nivel base mientras func() se repite"""
+    func()  # Calentar cachés del intérprete
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in range(iterations):
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - base
+
+
+@pytest.fixture
+def peak_memory():
+    """Fixture con peak_allocation(func, iterations) para los tests de presupuesto de memoria"""
+    return peak_allocation
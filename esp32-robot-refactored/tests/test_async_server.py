@@ -0,0 +1,645 @@
+"""
+Tests para async_server.py (servidor asyncio sobre sockets reales de localhost)
+"""
+import asyncio
+import sys
+import pytest
+
+
+def _build_server(mock_micropython_modules):
+    """Crea un AsyncHTTPServer con todos sus módulos sobre los mocks de hardware"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.async_server import AsyncHTTPServer
+    from src.motor_controller import MotorController
+    from src.sensor_handler import UltrasonicSensor
+    from src.logger import Logger
+    from src.security_manager import SecurityManager
+    from src.auto_mode import AutoMode
+
+    motors = MotorController()
+    sensor = UltrasonicSensor()
+    logger = Logger()
+    security = SecurityManager(logger)
+    auto_mode = AutoMode(motors, sensor, logger)
+
+    return AsyncHTTPServer("127.0.0.1", motors, sensor, logger, security, auto_mode)
+
+
+async def _read_response(reader):
+    """Lee una respuesta HTTP completa usando Content-Length"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.decode().split("\r\n"):
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    body = await reader.readexactly(length)
+    return (head + body).decode()
+
+
+async def _request(port, path):
+    """Envía un GET en una conexión nueva y devuelve la respuesta completa"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write("GET {} HTTP/1.1\r\nHost: robot\r\n\r\n".format(path).encode())
+    await writer.drain()
+    response = await _read_response(reader)
+    writer.close()
+    return response
+
+
+def _port(server):
+    return server.server.sockets[0].getsockname()[1]
+
+
+def test_async_server_serves_routes(mock_micropython_modules, mock_config):
+    """Test de que los handlers existentes se reutilizan en modo async"""
+    server = _build_server(mock_micropython_modules)
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            root = await _request(_port(server), "/")
+            move = await _request(_port(server), "/move?dir=F")
+            return root, move
+        finally:
+            server.server.close()
+
+    root, move = asyncio.run(scenario())
+
+    assert root.startswith("HTTP/1.1 200 OK")
+    assert "ESP32 Robot API OK" in root
+    assert '"dir":"F"' in move
+    assert server.motors.in1.value() == 1
+
+
+def test_async_server_idle_client_does_not_block(mock_micropython_modules, mock_config):
+    """Test de que un cliente que no envía nada no bloquea a los demás"""
+    server = _build_server(mock_micropython_modules)
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            # Cliente lento: abre la conexión y no envía la petición
+            _, idle_writer = await asyncio.open_connection("127.0.0.1", _port(server))
+            responses = await asyncio.wait_for(
+                asyncio.gather(*[_request(_port(server), "/status") for _ in range(5)]),
+                1.0
+            )
+            idle_writer.close()
+            return responses
+        finally:
+            server.server.close()
+
+    responses = asyncio.run(scenario())
+
+    assert len(responses) == 5
+    for response in responses:
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert '"ip": "127.0.0.1"' in response
+
+
+def test_async_server_control_loop_runs_as_task(mock_micropython_modules, mock_config):
+    """Test de que el modo automático corre en su propia tarea"""
+    server = _build_server(mock_micropython_modules)
+
+    steps = []
+    server.auto_mode.step = lambda: steps.append(1)
+
+    async def scenario():
+        task = asyncio.create_task(server.serve(0))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        server.server.close()
+
+    asyncio.run(scenario())
+
+    # Con CONTROL_LOOP_INTERVAL_MS=20 deben haberse ejecutado varios pasos
+    assert len(steps) >= 3
+
+
+def test_async_server_control_loop_survives_errors(mock_micropython_modules, mock_config):
+    """Test de que un error en step() no mata la tarea de control"""
+    server = _build_server(mock_micropython_modules)
+
+    calls = []
+
+    def failing_step():
+        calls.append(1)
+        raise ValueError("boom")
+
+    server.auto_mode.step = failing_step
+
+    async def scenario():
+        task = asyncio.create_task(server._control_loop())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(scenario())
+
+    assert len(calls) >= 2
+    assert any("ERROR en tarea de control" in entry for entry in server.logger.logs)
+
+
+def test_async_server_keep_alive_reuses_connection(mock_micropython_modules, mock_config):
+    """Test de varias peticiones sobre la misma conexión persistente"""
+    server = _build_server(mock_micropython_modules)
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", _port(server))
+            responses = []
+            for path in ("/status", "/move?dir=B", "/telemetry"):
+                writer.write("GET {} HTTP/1.1\r\nHost: robot\r\n\r\n".format(path).encode())
+                await writer.drain()
+                responses.append(await _read_response(reader))
+
+            # "Connection: close" hace que el servidor cierre tras responder
+            writer.write(b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            responses.append(await _read_response(reader))
+            eof = await asyncio.wait_for(reader.read(), 1.0)
+            writer.close()
+            return responses, eof
+        finally:
+            server.server.close()
+
+    responses, eof = asyncio.run(scenario())
+
+    assert len(responses) == 4
+    for response in responses[:3]:
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert "Connection: keep-alive" in response
+    assert "Connection: close" in responses[3]
+    assert eof == b""
+    assert server.active_connections == 0
+
+
+def test_async_server_keep_alive_cap(mock_micropython_modules, mock_config):
+    """Test de que por encima del máximo las conexiones no se mantienen"""
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            connections = []
+            responses = []
+            for _ in range(config.KEEPALIVE_MAX_CONNECTIONS + 1):
+                reader, writer = await asyncio.open_connection("127.0.0.1", _port(server))
+                writer.write(b"GET / HTTP/1.1\r\n\r\n")
+                await writer.drain()
+                responses.append(await _read_response(reader))
+                connections.append(writer)
+            for writer in connections:
+                writer.close()
+            return responses
+        finally:
+            server.server.close()
+
+    responses = asyncio.run(scenario())
+
+    assert all("Connection: keep-alive" in r for r in responses[:-1])
+    assert "Connection: close" in responses[-1]
+
+
+WS_KEY = "dGhlIHNhbXBsZSBub25jZQ=="
+
+
+async def _ws_connect(port, path="/ws"):
+    """Abre una conexión WebSocket y devuelve (reader, writer, cabecera 101)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((
+        "GET {} HTTP/1.1\r\nHost: robot\r\nUpgrade: websocket\r\n"
+        "Connection: Upgrade\r\nSec-WebSocket-Key: {}\r\n"
+        "Sec-WebSocket-Version: 13\r\n\r\n"
+    ).format(path, WS_KEY).encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    return reader, writer, head.decode()
+
+
+async def _ws_read(reader):
+    """Lee una trama del servidor y devuelve (opcode, payload)"""
+    head = await asyncio.wait_for(reader.readexactly(2), 1.0)
+    length = head[1] & 0x7F
+    if length == 126:
+        ext = await reader.readexactly(2)
+        length = (ext[0] << 8) | ext[1]
+    return head[0] & 0x0F, await reader.readexactly(length)
+
+
+async def _ws_read_json(reader, kind):
+    """Lee tramas hasta encontrar un mensaje JSON del tipo indicado"""
+    import json
+    while True:
+        opcode, payload = await _ws_read(reader)
+        message = json.loads(payload)
+        if message["type"] == kind:
+            return message
+
+
+def _ws_send(writer, payload, opcode=0x1):
+    """Envía una trama enmascarada de cliente"""
+    mask = b"\x01\x02\x03\x04"
+    writer.write(bytes((0x80 | opcode, 0x80 | len(payload))) + mask +
+                 bytes(b ^ mask[i % 4] for i, b in enumerate(payload)))
+
+
+def test_websocket_pushes_state(mock_micropython_modules, mock_config):
+    """Test de handshake y push inicial de status, telemetry y security"""
+    server = _build_server(mock_micropython_modules)
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            reader, writer, head = await _ws_connect(_port(server))
+            telemetry = await _ws_read_json(reader, "telemetry")
+            security = await _ws_read_json(reader, "security")
+            _ws_send(writer, b"", 0x8)
+            opcode, _ = await _ws_read(reader)
+            writer.close()
+            return head, telemetry, security, opcode
+        finally:
+            server.server.close()
+
+    head, telemetry, security, opcode = asyncio.run(scenario())
+
+    assert head.startswith("HTTP/1.1 101 Switching Protocols")
+    assert "Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=" in head
+    assert "distance_cm" in telemetry["data"]
+    assert "safe_mode" in security["data"]
+    assert opcode == 0x8
+
+
+def test_websocket_move_command(mock_micropython_modules, mock_config):
+    """Test de comandos de movimiento sobre el mismo socket"""
+    server = _build_server(mock_micropython_modules)
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            reader, writer, _ = await _ws_connect(_port(server))
+            _ws_send(writer, b"move:F")
+            ok = await _ws_read_json(reader, "move")
+            _ws_send(writer, b"move:X")
+            invalid = await _ws_read_json(reader, "move")
+            _ws_send(writer, b"jump")
+            unknown = await _ws_read_json(reader, "error")
+            writer.close()
+            return ok, invalid, unknown
+        finally:
+            server.server.close()
+
+    ok, invalid, unknown = asyncio.run(scenario())
+
+    assert ok == {"type": "move", "status": 200, "data": {"ok": True, "dir": "F"}}
+    assert invalid["status"] == 400
+    assert unknown["data"]["error"] == "unknown command"
+    assert server.motors.in1.value() == 1
+
+
+def test_websocket_logs_require_token(mock_micropython_modules, mock_config):
+    """Test de que las líneas de log solo llegan con token"""
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            reader, writer, _ = await _ws_connect(
+                _port(server), "/ws?token=" + config.SECURITY_TOKEN
+            )
+            first = await _ws_read_json(reader, "logs")
+            server.logger.add("nueva línea")
+            delta = await _ws_read_json(reader, "logs")
+            writer.close()
+            return first, delta
+        finally:
+            server.server.close()
+
+    first, delta = asyncio.run(scenario())
+
+    assert first["data"]["logs"] == server.logger.logs[:-1]
+    assert delta["data"] == {
+        "logs": [server.logger.logs[-1]], "head": server.logger.head_seq, "gap": False
+    }
+
+    # Sin token no hay tipo "logs" entre los cambios
+    from src.async_server import PushState
+    assert all(kind != "logs" for kind, _ in PushState(server, False).changes())
+
+
+def test_websocket_client_cap_and_bad_upgrade(mock_micropython_modules, mock_config):
+    """Test de límite de clientes WebSocket y de upgrade sin headers"""
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            sockets = []
+            for _ in range(config.WS_MAX_CLIENTS):
+                sockets.append(await _ws_connect(_port(server)))
+            _, extra_writer, extra_head = await _ws_connect(_port(server))
+            plain = await _request(_port(server), "/ws")
+            for _, writer, _ in sockets:
+                writer.close()
+            extra_writer.close()
+            return extra_head, plain
+        finally:
+            server.server.close()
+
+    extra_head, plain = asyncio.run(scenario())
+
+    assert extra_head.startswith("HTTP/1.1 503 Service Unavailable")
+    assert plain.startswith("HTTP/1.1 400 Bad Request")
+
+
+async def _sse_read_event(reader):
+    """Lee un evento SSE completo y devuelve (event, data)"""
+    import json
+    block = await asyncio.wait_for(reader.readuntil(b"\n\n"), 2.0)
+    fields = dict(line.split(": ", 1) for line in block.decode().strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_event_stream_pushes_and_server_stays_responsive(mock_micropython_modules, mock_config):
+    """Test de /events: eventos de estado mientras se atienden otras peticiones"""
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", _port(server))
+            writer.write("GET /events?token={} HTTP/1.1\r\n\r\n".format(config.SECURITY_TOKEN).encode())
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            retry = await reader.readuntil(b"\n\n")
+
+            events = {}
+            while len(events) < 4:
+                event, data = await _sse_read_event(reader)
+                events[event] = data
+
+            # Con el stream abierto el servidor sigue atendiendo peticiones normales
+            status = await _request(_port(server), "/status")
+
+            writer.close()
+            await asyncio.sleep(0.1)
+            return head.decode(), retry, events, status
+        finally:
+            server.server.close()
+
+    head, retry, events, status = asyncio.run(scenario())
+
+    assert head.startswith("HTTP/1.1 200 OK")
+    assert "text/event-stream" in head
+    assert retry == b"retry: 3000\n\n"
+    assert set(events) == {"status", "telemetry", "security", "logs"}
+    assert "distance_cm" in events["telemetry"]
+    assert status.startswith("HTTP/1.1 200 OK")
+    assert server.sse_clients == 0
+
+
+def test_event_stream_cap(mock_micropython_modules, mock_config):
+    """Test de límite de streams SSE abiertos"""
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            writers = []
+            for _ in range(config.SSE_MAX_CLIENTS):
+                reader, writer = await asyncio.open_connection("127.0.0.1", _port(server))
+                writer.write(b"GET /events HTTP/1.1\r\n\r\n")
+                await reader.readuntil(b"\r\n\r\n")
+                writers.append(writer)
+            rejected = await _request(_port(server), "/events")
+            for writer in writers:
+                writer.close()
+            return rejected
+        finally:
+            server.server.close()
+
+    rejected = asyncio.run(scenario())
+
+    assert rejected.startswith("HTTP/1.1 503 Service Unavailable")
+
+
+def test_stream_status_and_bytes_in_metrics(mock_micropython_modules, mock_config):
+    """Test de /metrics tras un 404: /events y /ws con su propio código y sus bytes contados"""
+    server = _build_server(mock_micropython_modules)
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            missing = await _request(_port(server), "/statusX")
+            reader, writer = await asyncio.open_connection("127.0.0.1", _port(server))
+            writer.write(b"GET /events HTTP/1.1\r\n\r\n")
+            await writer.drain()
+            # Cabecera, retry y el primer evento (el push ya pasó por la sesión)
+            received = len(await reader.readuntil(b"\r\n\r\n"))
+            received += len(await reader.readuntil(b"\n\n"))
+            received += len(await asyncio.wait_for(reader.readuntil(b"\n\n"), 2.0))
+            ws_reader, ws_writer, head = await _ws_connect(_port(server))
+            _, payload = await _ws_read(ws_reader)
+            received += len(head) + (2 if len(payload) < 126 else 4) + len(payload)
+            metrics = await _request(_port(server), "/metrics")
+            writer.close()
+            ws_writer.close()
+            await asyncio.sleep(0.1)
+            return missing, received, metrics
+        finally:
+            server.server.close()
+
+    missing, received, metrics = asyncio.run(scenario())
+    lines = metrics.split("\r\n\r\n", 1)[1].split("\n")
+
+    assert missing.startswith("HTTP/1.1 404 Not Found")
+    assert 'robot_http_requests_total{route="/events",code="200"} 1' in lines
+    assert 'robot_http_requests_total{route="/ws",code="101"} 1' in lines
+    assert not any(line.startswith('robot_http_requests_total{route="/events",code="404"}') for line in lines)
+
+    # Los eventos y tramas del push cuentan además de las cabeceras
+    total = [line for line in lines if line.startswith("robot_http_response_bytes_total ")]
+    assert int(total[0].split()[1]) >= len(missing.encode()) + received
+
+
+def test_async_server_streams_dashboard(mock_micropython_modules, mock_config, tmp_path):
+    """Test del dashboard en modo async: cuerpo completo y la conexión sigue viva"""
+    from tests.test_static_files import write_www
+
+    data = bytes(range(256)) * 64
+    compressed = write_www(tmp_path, {
+        "/assets/big.bin": (data, "application/octet-stream", "immutable"),
+    })
+    server = _build_server(mock_micropython_modules)
+    from src.static_files import StaticFiles
+
+    server.static = StaticFiles(str(tmp_path), 256)
+    server.static.load()
+    server._register_routes()
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", _port(server))
+            writer.write(b"GET /assets/big.bin HTTP/1.1\r\nHost: robot\r\n\r\n")
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+            body = await reader.readexactly(length)
+
+            # Keep-alive: la siguiente petición usa la misma conexión
+            writer.write(b"GET /status HTTP/1.1\r\nHost: robot\r\n\r\n")
+            await writer.drain()
+            status = await _read_response(reader)
+            writer.close()
+            return head, body, status
+        finally:
+            server.server.close()
+
+    head, body, status = asyncio.run(scenario())
+
+    assert b"Content-Encoding: gzip" in head
+    assert body == compressed["/assets/big.bin"]
+    assert status.startswith("HTTP/1.1 200 OK")
+
+
+def test_async_server_streams_logs(mock_micropython_modules, mock_config):
+    """Test de /logs por chunks en modo async y keep-alive después"""
+    import json
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    for i in range(config.MAX_LOG_ENTRIES):
+        server.logger.add("entrada de log número {}".format(i))
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", _port(server))
+            writer.write("GET /logs?token={} HTTP/1.1\r\nHost: robot\r\n\r\n".format(
+                config.SECURITY_TOKEN).encode())
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            body = b""
+            while True:
+                size = int((await reader.readuntil(b"\r\n"))[:-2], 16)
+                chunk = await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                body += chunk[:-2]
+
+            writer.write(b"GET /status HTTP/1.1\r\nHost: robot\r\n\r\n")
+            await writer.drain()
+            status = await _read_response(reader)
+            writer.close()
+            return head, body, status
+        finally:
+            server.server.close()
+
+    head, body, status = asyncio.run(scenario())
+
+    assert b"Transfer-Encoding: chunked" in head
+    assert len(json.loads(body)["logs"]) == config.MAX_LOG_ENTRIES
+    assert status.startswith("HTTP/1.1 200 OK")
+
+
+
+def test_async_server_control_loop_follows_sensor_interval(mock_micropython_modules, mock_config, monkeypatch):
+    """Test de que la tarea de control duerme el intervalo rápido del sensor con alcance reducido"""
+    server = _build_server(mock_micropython_modules)
+    import src.async_server
+    config = src.async_server.config
+
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        raise asyncio.CancelledError()
+
+    def one_step():
+        try:
+            asyncio.run(server._control_loop())
+        except asyncio.CancelledError:
+            pass
+
+    with monkeypatch.context() as patched:
+        patched.setattr(src.async_server.asyncio, "sleep", fake_sleep)
+        one_step()
+        server.sampler.request_range(50)
+        one_step()
+
+    assert sleeps == [config.CONTROL_LOOP_INTERVAL_MS / 1000, config.SENSOR_FAST_INTERVAL_MS / 1000]
+
+
+def test_async_server_reads_split_request(mock_micropython_modules, mock_config):
+    """Test de petición en varios segmentos: headers a trozos y cuerpo aparte"""
+    server = _build_server(mock_micropython_modules)
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", _port(server))
+            body = b"F:500,S:0"
+            head = ("POST /program HTTP/1.1\r\nHost: robot\r\n"
+                    "Content-Length: {}\r\n\r\n".format(len(body))).encode()
+            for part in (head[:20], head[20:], body):
+                writer.write(part)
+                await writer.drain()
+                await asyncio.sleep(0.02)
+            response = await _read_response(reader)
+            writer.close()
+            return response
+        finally:
+            server.server.close()
+
+    response = asyncio.run(scenario())
+
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert '"segments":2' in response
+
+
+def test_async_server_error_after_head_only_closes(mock_micropython_modules, mock_config):
+    """Test de error con la cabecera ya enviada: se cierra sin añadir un 500"""
+    server = _build_server(mock_micropython_modules)
+
+    def broken(client, client_ip):
+        if "/half" not in server.request.path():
+            raise ValueError("boom")
+        client.send(b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\npartial")
+        raise ValueError("boom")
+
+    server._process_request = broken
+
+    async def fetch(path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", _port(server))
+        writer.write("GET {} HTTP/1.1\r\nHost: robot\r\n\r\n".format(path).encode())
+        await writer.drain()
+        data = await reader.read()
+        writer.close()
+        return data
+
+    async def scenario():
+        await server.listen(0)
+        try:
+            return await fetch("/half"), await fetch("/other")
+        finally:
+            server.server.close()
+
+    half, other = asyncio.run(scenario())
+
+    assert half == b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\npartial"
+    assert other.startswith(b"HTTP/1.1 500 Internal Server Error")
@@ -168,13 +168,68 @@ def test_auto_mode_step_evasion_with_obstacle(mock_micropython_modules, mock_con
     with patch('src.sensor_handler.machine.time_pulse_us', return_value=580):
         auto_mode.step()
     
-    # Después de la evasión, los motores deben estar detenidos
+    # La maniobra empieza parando y no bloquea: step() vuelve al instante
+    assert mock_time._ticks == 300
+    assert auto_mode.is_evading() == True
     assert motors.in1.value() == 0
     assert motors.in2.value() == 0
     assert motors.in3.value() == 0
     assert motors.in4.value() == 0
 
 
+def test_auto_mode_evasion_phases_do_not_block(mock_micropython_modules, mock_config):
+    """Test de evasión por fases: stop → retroceso → giro → stop según los plazos"""
+    mock_time = mock_micropython_modules['time'].__class__
+    sys.modules['time'] = mock_time
+
+    from src.auto_mode import AutoMode
+    from src.motor_controller import MotorController
+    from src.logger import Logger
+    import src.auto_mode
+
+    config = src.auto_mode.config
+
+    class Obstacle:
+        def measure_distance_cm(self):
+            return 10.0
+
+    motors = MotorController()
+    auto_mode = AutoMode(motors, Obstacle(), Logger())
+    auto_mode.enable()
+
+    mock_time._ticks = 300
+    auto_mode.step()
+    assert auto_mode.phase == src.auto_mode.PHASE_STOP
+
+    # Fase de parada: los pasos intermedios no cambian nada
+    mock_time._ticks += config.AUTO_STOP_TIME - 1
+    auto_mode.step()
+    assert auto_mode.phase == src.auto_mode.PHASE_STOP
+
+    mock_time._ticks += 1
+    auto_mode.step()
+    assert auto_mode.phase == src.auto_mode.PHASE_BACKWARD
+    assert (motors.in1.value(), motors.in2.value()) == (0, 1)
+
+    # Un paso tardío no alarga la maniobra: el plazo cuenta desde la fase
+    mock_time._ticks += config.AUTO_BACKWARD_TIME + 50
+    auto_mode.step()
+    assert auto_mode.phase == src.auto_mode.PHASE_TURN
+    assert (motors.in1.value(), motors.in3.value()) == (0, 1)
+
+    mock_time._ticks += config.AUTO_TURN_TIME - 50
+    auto_mode.step()
+    assert auto_mode.is_evading() == False
+    assert (motors.in1.value(), motors.in2.value(), motors.in3.value(), motors.in4.value()) == (0, 0, 0, 0)
+
+    # Desactivar cancela una maniobra a medias
+    mock_time._ticks += config.AUTO_CHECK_INTERVAL
+    auto_mode.step()
+    assert auto_mode.is_evading() == True
+    auto_mode.disable()
+    assert auto_mode.is_evading() == False
+
+
 def test_auto_mode_step_frequency_control(mock_micropython_modules, mock_config):
     """Test de control de frecuencia de ejecución"""
     mock_time = mock_micropython_modules['time'].__class__
@@ -212,3 +267,118 @@ def test_auto_mode_step_frequency_control(mock_micropython_modules, mock_config)
     # Ahora sí debe ejecutarse
     # (asumiendo que no hay obstáculo, debe avanzar)
     assert motors.in1.value() == 1 or motors.in1.value() == 0  # Puede variar según el sensor
+
+
+def test_auto_mode_requests_sensor_range(mock_micropython_modules, mock_config):
+    """Test de alcance reducido pedido al muestreador mientras está activo"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.auto_mode import AutoMode
+    from src.motor_controller import MotorController
+    from src.sensor_handler import UltrasonicSensor
+    from src.sensor_sampler import SensorSampler
+    from src.logger import Logger
+    import src.auto_mode
+
+    margin = src.auto_mode.config.SENSOR_AUTO_RANGE_MARGIN_CM
+    sampler = SensorSampler(UltrasonicSensor())
+    auto_mode = AutoMode(MotorController(), sampler, Logger())
+    assert sampler.range_cm is None
+
+    auto_mode.enable()
+    assert sampler.range_cm == auto_mode.min_distance + margin
+
+    auto_mode.set_min_distance(40)
+    assert sampler.range_cm == 40 + margin
+
+    auto_mode.disable()
+    assert sampler.range_cm is None
+
+
+def test_auto_mode_evasion_turns_to_clearer_side(mock_micropython_modules, mock_config):
+    """Test de evasión hacia el lateral más despejado con un array de sensores"""
+    mock_time = mock_micropython_modules['time'].__class__
+    sys.modules['time'] = mock_time
+
+    from src.auto_mode import AutoMode
+    from src.motor_controller import MotorController
+    from src.sensor_handler import UltrasonicSensor
+    from src.sensor_array import SensorArray
+    from src.logger import Logger
+
+    class FixedArray:
+        """Array simulado con el lateral ya decidido"""
+        side = "right"
+
+        def measure_distance_cm(self):
+            return 10.0
+
+        def clearer_side(self):
+            return self.side
+
+    motors = MotorController()
+    turns = []
+    motors.turn_left = lambda: turns.append("left")
+    motors.turn_right = lambda: turns.append("right")
+
+    def evade(auto_mode):
+        """Recorre la maniobra completa avanzando el reloj simulado"""
+        auto_mode.enabled = True
+        auto_mode._execute_evasion_maneuver()
+        while auto_mode.is_evading():
+            mock_time._ticks += 100
+            auto_mode.step()
+
+    sensor = FixedArray()
+    auto_mode = AutoMode(motors, sensor, Logger())
+    evade(auto_mode)
+    sensor.side = None
+    evade(auto_mode)
+    assert turns == ["right", "left"]
+
+    # Con el sensor único de siempre el giro sigue siendo a la izquierda
+    evade(AutoMode(motors, UltrasonicSensor(), Logger()))
+    evade(AutoMode(motors, SensorArray([UltrasonicSensor()]), Logger()))
+    assert turns == ["right", "left", "left", "left"]
+
+
+def test_auto_mode_sensor_error_codes(mock_micropython_modules, mock_config):
+    """Test de eco de menos de 2 cm (evasión) y sensor sin eco (parada)"""
+    mock_time = mock_micropython_modules['time'].__class__
+    sys.modules['time'] = mock_time
+
+    from src.auto_mode import AutoMode
+    from src.motor_controller import MotorController
+    from src.logger import Logger
+
+    class Reading:
+        distance = -4.0
+
+        def measure_distance_cm(self):
+            return self.distance
+
+    motors = MotorController()
+    sensor = Reading()
+    auto_mode = AutoMode(motors, sensor, Logger())
+    auto_mode.enable()
+
+    mock_time._ticks = 300
+    auto_mode.step()
+    assert auto_mode.is_evading() == True
+    auto_mode.disable()
+
+    # Sin eco el robot no avanza a ciegas: se para
+    sensor.distance = -5.0
+    auto_mode.enable()
+    motors.forward()
+    mock_time._ticks += 300
+    auto_mode.step()
+    assert auto_mode.is_evading() == False
+    assert (motors.in1.value(), motors.in3.value()) == (0, 0)
+
+    # Un timeout normal (-1.0) sigue sin cambiar nada
+    sensor.distance = -1.0
+    motors.forward()
+    mock_time._ticks += 300
+    auto_mode.step()
+    assert (motors.in1.value(), motors.in3.value()) == (1, 1)
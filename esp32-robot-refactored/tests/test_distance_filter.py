@@ -0,0 +1,89 @@
+"""
+Tests para distance_filter.py (historial y filtros de distancia)
+"""
+import sys
+
+
+def _build_filter(mock_micropython_modules, size=8, median_window=3, ema_alpha=0.5, max_age_ms=500):
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.distance_filter import DistanceFilter
+
+    return DistanceFilter(size, median_window, ema_alpha, max_age_ms)
+
+
+def test_empty_filter(mock_micropython_modules, mock_config):
+    """Test de historial vacío: sin valores filtrados"""
+    history = _build_filter(mock_micropython_modules)
+
+    assert history.latest() == -1.0
+    assert history.median(0) == -1.0
+    assert history.ema(0) == -1.0
+    assert history.valid_ratio() == 0.0
+
+
+def test_median_rejects_single_spike(mock_micropython_modules, mock_config):
+    """Test de mediana: un eco corto aislado no cambia la distancia"""
+    history = _build_filter(mock_micropython_modules)
+
+    for now, distance in ((0, 80.0), (100, 82.0), (200, 5.0)):
+        history.add(distance, now)
+
+    assert history.latest() == 5.0
+    assert history.median(200) == 80.0
+
+    # Un obstáculo real persiste y pasa el filtro en dos lecturas
+    history.add(12.0, 300)
+    assert history.median(300) == 12.0
+
+
+def test_median_skips_errors_and_old_readings(mock_micropython_modules, mock_config):
+    """Test de mediana solo con lecturas válidas y vigentes"""
+    history = _build_filter(mock_micropython_modules)
+
+    history.add(40.0, 0)
+    history.add(-1.0, 100)
+    history.add(50.0, 200)
+    assert history.median(200) == 45.0
+
+    # A los 650 ms la lectura de 0 ms ya no cuenta
+    assert history.median(650) == 50.0
+    assert history.median(800) == -1.0
+
+
+def test_ema(mock_micropython_modules, mock_config):
+    """Test de media exponencial: O(1) al añadir y reinicio tras un hueco"""
+    history = _build_filter(mock_micropython_modules, ema_alpha=0.5)
+
+    history.add(100.0, 0)
+    history.add(50.0, 100)
+    assert history.ema(100) == 75.0
+
+    # Los errores no entran en la media
+    history.add(-1.0, 200)
+    assert history.ema(200) == 75.0
+
+    # Caduca con la última lectura válida y arranca de nuevo después
+    assert history.ema(700) == -1.0
+    history.add(20.0, 700)
+    assert history.ema(700) == 20.0
+
+
+def test_valid_ratio_and_fixed_ring(mock_micropython_modules, mock_config):
+    """Test de fracción de lecturas válidas sobre un anillo de tamaño fijo"""
+    history = _build_filter(mock_micropython_modules, size=4)
+    values = history.values
+
+    for now, distance in enumerate((30.0, -1.0, -2.0, 30.0)):
+        history.add(distance, now)
+    assert history.valid_ratio() == 0.5
+
+    # Las lecturas nuevas sustituyen a las más viejas (errores incluidos)
+    for now in range(4, 6):
+        history.add(30.0, now)
+    assert history.valid_ratio() == 0.75
+    history.add(30.0, 6)
+    assert history.valid_ratio() == 1.0
+    assert history.count == 7
+    assert history.values is values
+    assert len(history.values) == 4
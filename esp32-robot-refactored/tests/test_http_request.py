@@ -0,0 +1,183 @@
+"""
+Tests para http_request.py (parser sobre buffer preasignado)
+"""
+import pytest
+
+
+# Petición típica del dashboard (navegador con headers habituales)
+BROWSER_REQUEST = (
+    b"GET /move?dir=F HTTP/1.1\r\n"
+    b"Host: 192.168.1.100\r\n"
+    b"User-Agent: Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko)\r\n"
+    b"Accept: */*\r\n"
+    b"Accept-Language: es-ES,es;q=0.9,en;q=0.8\r\n"
+    b"Origin: http://192.168.1.10:5173\r\n"
+    b"Referer: http://192.168.1.10:5173/\r\n"
+    b"Connection: keep-alive\r\n"
+    b"\r\n"
+)
+
+# Presupuesto de memoria por petición: el path decodificado y objetos
+# temporales pequeños (incluye ~100 bytes del propio bucle de medida),
+# nunca una copia de la petición completa
+PARSE_BUDGET_BYTES = 512
+
+
+def _parsed(raw):
+    from src.http_request import HTTPRequest
+
+    request = HTTPRequest()
+    request.load(raw)
+    assert request.parse()
+    return request
+
+
+def test_parse_request_line():
+    """Test de método, path y versión"""
+    request = _parsed(BROWSER_REQUEST)
+
+    assert request.method == "GET"
+    assert request.path() == "/move?dir=F"
+    assert request.path_length() == len("/move?dir=F")
+    assert request.http11 == True
+
+
+def test_parse_headers_case_insensitive():
+    """Test de headers de interés sin distinguir mayúsculas"""
+    from src.http_request import HEADER_CONNECTION
+
+    request = _parsed(b"GET / HTTP/1.1\r\nCONNECTION:   Close  \r\n\r\n")
+
+    assert request.header(HEADER_CONNECTION) == "Close"
+    assert request.header_equals(HEADER_CONNECTION, b"close")
+    assert request.keep_alive() == False
+
+
+def test_parse_keep_alive_defaults():
+    """Test de keep-alive por defecto según la versión HTTP"""
+    assert _parsed(b"GET / HTTP/1.1\r\n\r\n").keep_alive() == True
+    assert _parsed(b"GET / HTTP/1.0\r\n\r\n").keep_alive() == False
+    assert _parsed(b"GET / HTTP/1.0\r\nConnection: keep-alive\r\n\r\n").keep_alive() == True
+
+
+def test_parse_missing_header_is_none():
+    """Test de header no recibido"""
+    from src.http_request import HEADER_CONNECTION
+
+    request = _parsed(b"GET /status HTTP/1.1\r\nHost: robot\r\n\r\n")
+
+    assert request.header(HEADER_CONNECTION) is None
+    assert request.header_equals(HEADER_CONNECTION, b"close") == False
+
+
+def test_header_contains():
+    """Test de búsqueda dentro de un header con varios valores"""
+    from src.http_request import HEADER_ACCEPT
+
+    request = _parsed(b"GET / HTTP/1.1\r\nAccept: text/html, application/octet-stream;q=0.9\r\n\r\n")
+
+    assert request.header_contains(HEADER_ACCEPT, b"application/octet-stream")
+    assert request.header_contains(HEADER_ACCEPT, b"application/json") == False
+    assert _parsed(b"GET / HTTP/1.1\r\n\r\n").header_contains(HEADER_ACCEPT, b"text/html") == False
+
+
+def test_parse_body_start():
+    """Test de la posición del cuerpo tras la línea en blanco"""
+    raw = b"POST /x HTTP/1.1\r\nContent-Length: 4\r\n\r\nF:10"
+    request = _parsed(raw)
+
+    assert request.method == "POST"
+    assert bytes(request.view[request.body_start:request.length]) == b"F:10"
+
+
+def test_parse_body_content_length():
+    """Test del cuerpo acotado por Content-Length"""
+    request = _parsed(b"POST /program HTTP/1.1\r\nContent-Length: 9\r\n\r\nF:500,S:0")
+
+    assert request.content_length() == 9
+    assert request.body() == "F:500,S:0"
+
+
+def test_parse_body_incomplete_or_invalid_length():
+    """Test de cuerpo más corto que Content-Length y longitud no numérica"""
+    assert _parsed(b"POST /x HTTP/1.1\r\nContent-Length: 20\r\n\r\nF:500").body() is None
+    assert _parsed(b"POST /x HTTP/1.1\r\nContent-Length: abc\r\n\r\nF").body() is None
+    assert _parsed(b"POST /x HTTP/1.1\r\n\r\n").body() == ""
+
+
+def test_parse_invalid_request_line():
+    """Test de request line sin método"""
+    from src.http_request import HTTPRequest
+
+    request = HTTPRequest()
+    request.load(b"INVALID")
+    assert request.parse() == False
+
+
+def test_parse_truncated_headers():
+    """Test de petición cortada por el tamaño del buffer"""
+    from src.http_request import HTTPRequest
+
+    request = HTTPRequest(64)
+    request.load(BROWSER_REQUEST)
+
+    assert request.length == 64
+    assert request.parse() == True
+    assert request.path() == "/move?dir=F"
+
+
+def test_buffer_is_reused():
+    """Test de que el buffer no se reasigna entre peticiones"""
+    from src.http_request import HTTPRequest
+
+    request = HTTPRequest()
+    buf = request.buf
+
+    request.load(b"GET /a HTTP/1.1\r\n\r\n")
+    request.parse()
+    request.load(b"GET /status HTTP/1.1\r\n\r\n")
+    request.parse()
+
+    assert request.buf is buf
+    assert request.path() == "/status"
+
+
+def test_receive_uses_recv_into():
+    """Test de recepción directa en el buffer"""
+    from src.http_request import HTTPRequest
+
+    class Client:
+        def recv_into(self, buf):
+            buf[:len(BROWSER_REQUEST)] = BROWSER_REQUEST
+            return len(BROWSER_REQUEST)
+
+    request = HTTPRequest()
+    assert request.receive(Client()) == len(BROWSER_REQUEST)
+    assert request.parse()
+    assert request.path() == "/move?dir=F"
+
+
+def test_parse_allocation_budget(peak_memory):
+    """Test de presupuesto de memoria del parser por petición"""
+    from src.http_request import HTTPRequest
+
+    request = HTTPRequest()
+
+    def parse_once():
+        request.load(BROWSER_REQUEST)
+        request.parse()
+        request.keep_alive()
+        return request.path()
+
+    assert peak_memory(parse_once) < PARSE_BUDGET_BYTES
+
+
+def test_legacy_parsing_exceeds_budget(peak_memory):
+    """Test de referencia: decodificar y partir toda la petición no cabe en el presupuesto"""
+
+    def legacy_parse():
+        text = BROWSER_REQUEST.decode("utf-8")
+        lines = text.split("\r\n")
+        return lines[0].split(" ")[1]
+
+    assert peak_memory(legacy_parse) > PARSE_BUDGET_BYTES
@@ -0,0 +1,244 @@
+"""
+Tests para http_response.py (escritor de respuestas precodificadas)
+"""
+import pytest
+
+
+class ChunkyClient:
+    """Socket que acepta como mucho max_chunk bytes por send()"""
+
+    def __init__(self, max_chunk=None):
+        self.max_chunk = max_chunk
+        self.sent = bytearray()
+        self.calls = 0
+
+    def send(self, data):
+        self.calls += 1
+        n = len(data) if self.max_chunk is None else min(len(data), self.max_chunk)
+        self.sent += bytes(data[:n])
+        return n
+
+
+class DiscardClient:
+    """Socket que descarta los datos sin copiarlos"""
+
+    def send(self, data):
+        return len(data)
+
+
+def _split(raw):
+    head, body = bytes(raw).split(b"\r\n\r\n", 1)
+    return head.decode().split("\r\n"), body
+
+
+def test_response_format():
+    """Test de status line, headers y cuerpo"""
+    from src.http_response import ResponseWriter
+
+    client = ChunkyClient()
+    ResponseWriter().send(client, "200 OK", "application/json", '{"ok":true}', keep_alive=True)
+
+    lines, body = _split(client.sent)
+    assert lines[0] == "HTTP/1.1 200 OK"
+    assert "Content-Type: application/json" in lines
+    assert "Content-Length: 11" in lines
+    assert "Connection: keep-alive" in lines
+    assert "Access-Control-Allow-Origin: *" in lines
+    assert body == b'{"ok":true}'
+    # Cabeceras y cuerpo pequeño en un solo envío
+    assert client.calls == 1
+
+
+def test_response_content_length_utf8():
+    """Test de Content-Length en bytes con caracteres no ASCII"""
+    from src.http_response import ResponseWriter
+
+    client = ChunkyClient()
+    ResponseWriter().send(client, "200 OK", "text/plain", "🚀 ñ")
+
+    lines, body = _split(client.sent)
+    assert "Content-Length: " + str(len("🚀 ñ".encode())) in lines
+    assert "Connection: close" in lines
+    assert body.decode() == "🚀 ñ"
+
+
+def test_response_partial_writes():
+    """Test de envío completo aunque el socket acepte pocos bytes por llamada"""
+    from src.http_response import ResponseWriter
+
+    body = '{"logs": [' + ",".join(['"entrada %d"' % i for i in range(100)]) + ']}'
+    client = ChunkyClient(max_chunk=7)
+    writer = ResponseWriter()
+    writer.send(client, "200 OK", "application/json", body)
+
+    lines, received = _split(client.sent)
+    assert received.decode() == body
+    assert "Content-Length: " + str(len(body)) in lines
+    assert writer.bytes_sent == len(client.sent)
+
+
+def test_response_large_body():
+    """Test de cuerpo mayor que el buffer de cabeceras"""
+    from src.http_response import ResponseWriter
+
+    body = b"x" * 5000
+    client = ChunkyClient()
+    ResponseWriter(256).send(client, "200 OK", "text/plain", body)
+
+    lines, received = _split(client.sent)
+    assert received == body
+    assert "Content-Length: 5000" in lines
+
+
+def test_response_unknown_status_and_extra_headers():
+    """Test de status no precodificado y headers adicionales"""
+    from src.http_response import ResponseWriter, STATUS_LINES
+
+    client = ChunkyClient()
+    ResponseWriter().send(client, "418 I'm a teapot", "text/plain", "", extra_headers=b"X-Test: 1\r\n")
+
+    lines, body = _split(client.sent)
+    assert lines[0] == "HTTP/1.1 418 I'm a teapot"
+    assert "X-Test: 1" in lines
+    assert "Content-Length: 0" in lines
+    assert "418 I'm a teapot" in STATUS_LINES
+
+
+def test_response_send_zero_raises():
+    """Test de socket que deja de aceptar datos"""
+    from src.http_response import ResponseWriter
+
+    class DeadClient:
+        def send(self, data):
+            return 0
+
+    with pytest.raises(OSError):
+        ResponseWriter().send(DeadClient(), "200 OK", "text/plain", "hola")
+
+
+def test_response_allocation_below_legacy(peak_memory):
+    """Test de que el writer usa menos memoria que la concatenación de strings"""
+    from src.http_response import ResponseWriter
+
+    body = '{"uptime": 1234,"distance_cm": 42.0,"obstacle": false,"auto_enabled": false}'
+    client = DiscardClient()
+    writer = ResponseWriter()
+
+    def legacy_send():
+        header = (
+            "HTTP/1.1 " + "200 OK" + "\r\n"
+            "Content-Type: application/json\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+            "Access-Control-Allow-Headers: *\r\n"
+            "\r\n"
+        )
+        client.send((header + body).encode())
+
+    def writer_send():
+        writer.send(client, "200 OK", "application/json", body)
+
+    assert peak_memory(writer_send) < peak_memory(legacy_send)
+
+
+def test_etag_headers():
+    """Test de ETag y Cache-Control en una respuesta 200"""
+    from src.http_response import ResponseWriter
+
+    client = ChunkyClient()
+    ResponseWriter().send(client, "200 OK", "application/json", "{}", etag=b'"ab12-s3"')
+
+    lines, body = _split(client.sent)
+    assert 'ETag: "ab12-s3"' in lines
+    assert "Cache-Control: no-cache" in lines
+    assert body == b"{}"
+
+
+def test_not_modified_has_no_body():
+    """Test de 304: ETag y sin cuerpo ni Content-Length"""
+    from src.http_response import ResponseWriter
+
+    client = ChunkyClient()
+    ResponseWriter().send_not_modified(client, b'"ab12-s3"', keep_alive=True)
+
+    lines, body = _split(client.sent)
+    assert lines[0] == "HTTP/1.1 304 Not Modified"
+    assert 'ETag: "ab12-s3"' in lines
+    assert "Connection: keep-alive" in lines
+    assert not any(line.startswith("Content-Length") for line in lines)
+    assert body == b""
+
+
+def _dechunk(body):
+    """Cuerpo de una respuesta chunked y tamaño de cada chunk"""
+    data = b""
+    sizes = []
+    while True:
+        size_line, body = body.split(b"\r\n", 1)
+        size = int(size_line, 16)
+        if size == 0:
+            assert body == b"\r\n"
+            return data, sizes
+        sizes.append(size)
+        data += body[:size]
+        assert body[size:size + 2] == b"\r\n"
+        body = body[size + 2:]
+
+
+def test_stream_chunked_coalesces_parts():
+    """Test de streaming: partes pequeñas agrupadas en chunks del tamaño del buffer"""
+    from src.http_response import ResponseWriter
+
+    client = ChunkyClient()
+    writer = ResponseWriter(256)
+    writer.start_stream(client, "200 OK", "application/json", keep_alive=True)
+    parts = ["parte {:03d};".format(i) for i in range(200)]
+    for part in parts:
+        writer.write_stream(client, part)
+    writer.end_stream(client)
+
+    lines, body = _split(client.sent)
+    assert "Transfer-Encoding: chunked" in lines
+    assert not any(line.startswith("Content-Length") for line in lines)
+
+    data, sizes = _dechunk(body)
+    assert data == "".join(parts).encode()
+    assert max(sizes) <= 256
+    # Un envío por buffer lleno, no uno por parte
+    assert client.calls < 20
+    assert writer.bytes_sent == len(client.sent)
+
+
+def test_stream_part_larger_than_buffer():
+    """Test de una parte mayor que el buffer: va como chunk propio"""
+    from src.http_response import ResponseWriter
+
+    client = ChunkyClient()
+    writer = ResponseWriter(256)
+    writer.start_stream(client, "200 OK", "text/plain")
+    writer.write_stream(client, "a")
+    writer.write_stream(client, "b" * 300)
+    writer.write_stream(client, "c")
+    writer.end_stream(client)
+
+    lines, body = _split(client.sent)
+    data, sizes = _dechunk(body)
+    assert data == b"a" + b"b" * 300 + b"c"
+    assert sizes == [1, 300, 1]
+
+
+def test_stream_without_chunked():
+    """Test de streaming para HTTP/1.0: sin framing ni Content-Length"""
+    from src.http_response import ResponseWriter
+
+    client = ChunkyClient()
+    writer = ResponseWriter(256)
+    writer.start_stream(client, "200 OK", "text/plain", chunked=False)
+    for i in range(60):
+        writer.write_stream(client, "linea {}\n".format(i))
+    writer.end_stream(client)
+
+    lines, body = _split(client.sent)
+    assert "Connection: close" in lines
+    assert not any(line.startswith(("Content-Length", "Transfer-Encoding")) for line in lines)
+    assert body == "".join("linea {}\n".format(i) for i in range(60)).encode()
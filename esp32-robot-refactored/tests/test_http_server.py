@@ -2,11 +2,12 @@
 Tests para http_server.py (utilidades)
 """
 import sys
+import json
 import pytest
 
 
-def test_parse_path_valid(mock_micropython_modules, mock_config):
-    """Test de parseo de paths válidos"""
+def test_route_request_valid(mock_micropython_modules, mock_config):
+    """Test de enrutado de paths válidos (con y sin query string)"""
     sys.modules['time'] = mock_micropython_modules['time'].__class__
     
     from src.http_server import HTTPServer
@@ -25,13 +26,23 @@ def test_parse_path_valid(mock_micropython_modules, mock_config):
     server = HTTPServer("192.168.1.1", motors, sensor, logger, security, auto_mode)
     
     # Test de paths válidos
-    assert server._parse_path("GET / HTTP/1.1") == "/"
-    assert server._parse_path("GET /status HTTP/1.1") == "/status"
-    assert server._parse_path("GET /move?dir=F HTTP/1.1") == "/move?dir=F"
+    client = FakeClient()
+    server._route_request(client, "/", "192.168.1.50")
+    assert client.sent.startswith(b"HTTP/1.1 200 OK")
+    assert b"ESP32 Robot API OK" in client.sent
 
+    client = FakeClient()
+    server._route_request(client, "/status", "192.168.1.50")
+    assert client.sent.startswith(b"HTTP/1.1 200 OK")
 
-def test_parse_path_invalid(mock_micropython_modules, mock_config):
-    """Test de parseo de paths inválidos"""
+    client = FakeClient()
+    server._route_request(client, "/move?dir=F", "192.168.1.50")
+    assert b'"dir":"F"' in client.sent
+    assert motors.in1.value() == 1
+
+
+def test_route_request_invalid(mock_micropython_modules, mock_config):
+    """Test de enrutado de paths inválidos"""
     sys.modules['time'] = mock_micropython_modules['time'].__class__
     
     from src.http_server import HTTPServer
@@ -49,12 +60,14 @@ def test_parse_path_invalid(mock_micropython_modules, mock_config):
     
     server = HTTPServer("192.168.1.1", motors, sensor, logger, security, auto_mode)
     
-    # Request line inválido debe retornar "/"
-    assert server._parse_path("") == "/"
-    assert server._parse_path("INVALID") == "/"
+    # Path vacío o sin "/" no coincide con ninguna ruta
+    for path in ("", "INVALID", "/status/extra"):
+        client = FakeClient()
+        server._route_request(client, path, "192.168.1.50")
+        assert client.sent.startswith(b"HTTP/1.1 404 Not Found")
 
 
-def test_get_query_param_valid(mock_micropython_modules, mock_config):
+def test_query_param_valid(mock_micropython_modules, mock_config):
     """Test de extracción de query parameters"""
     sys.modules['time'] = mock_micropython_modules['time'].__class__
     
@@ -74,15 +87,15 @@ def test_get_query_param_valid(mock_micropython_modules, mock_config):
     server = HTTPServer("192.168.1.1", motors, sensor, logger, security, auto_mode)
     
     # Test de query parameters válidos
-    assert server._get_query_param("/move?dir=F", "dir") == "F"
-    assert server._get_query_param("/auto?enabled=1", "enabled") == "1"
-    assert server._get_query_param("/logs?token=abc123", "token") == "abc123"
+    assert server._query_param("dir=F", "dir") == "F"
+    assert server._query_param("enabled=1", "enabled") == "1"
+    assert server._query_param("token=abc123", "token") == "abc123"
     
     # Múltiples parámetros
-    assert server._get_query_param("/test?a=1&b=2&c=3", "b") == "2"
+    assert server._query_param("a=1&b=2&c=3", "b") == "2"
 
 
-def test_get_query_param_missing(mock_micropython_modules, mock_config):
+def test_query_param_missing(mock_micropython_modules, mock_config):
     """Test de query parameter faltante"""
     sys.modules['time'] = mock_micropython_modules['time'].__class__
     
@@ -102,10 +115,10 @@ def test_get_query_param_missing(mock_micropython_modules, mock_config):
     server = HTTPServer("192.168.1.1", motors, sensor, logger, security, auto_mode)
     
     # Parámetro no existe
-    assert server._get_query_param("/move?dir=F", "speed") is None
+    assert server._query_param("dir=F", "speed") is None
     
     # Sin query string
-    assert server._get_query_param("/status", "dir") is None
+    assert server._query_param("", "dir") is None
 
 
 def test_escape_json_string(mock_micropython_modules, mock_config):
@@ -257,3 +270,842 @@ def test_check_rate_limit_different_ips(mock_micropython_modules, mock_config):
     
     # IP2 debe estar permitida (límite separado)
     assert server._check_rate_limit("192.168.1.101") == True
+
+
+class FakeClient:
+    """Socket de cliente simulado con peticiones encoladas"""
+
+    def __init__(self, requests=()):
+        self.requests = list(requests)
+        self.sent = b""
+        self.closed = False
+        self.timeout = None
+
+    def recv_into(self, buf):
+        if not self.requests:
+            # Socket no bloqueante sin datos (EAGAIN)
+            raise OSError(11)
+        data = self.requests.pop(0)
+        buf[:len(data)] = data
+        return len(data)
+
+    def send(self, data):
+        self.sent += data
+        return len(data)
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def close(self):
+        self.closed = True
+
+
+def _build_server(mock_micropython_modules):
+    """Crea un HTTPServer con todos sus módulos sobre los mocks de hardware"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.http_server import HTTPServer
+    from src.motor_controller import MotorController
+    from src.sensor_handler import UltrasonicSensor
+    from src.logger import Logger
+    from src.security_manager import SecurityManager
+    from src.auto_mode import AutoMode
+
+    motors = MotorController()
+    sensor = UltrasonicSensor()
+    logger = Logger()
+    security = SecurityManager(logger)
+    auto_mode = AutoMode(motors, sensor, logger)
+
+    return HTTPServer("192.168.1.1", motors, sensor, logger, security, auto_mode)
+
+
+def test_send_json_content_length(mock_micropython_modules, mock_config):
+    """Test de Content-Length en bytes (no en caracteres)"""
+    server = _build_server(mock_micropython_modules)
+    client = FakeClient()
+
+    server._send_json(client, '{"msg":"ñandú"}')
+
+    head, body = client.sent.split(b"\r\n\r\n", 1)
+    assert b"Content-Length: " + str(len(body)).encode() in head
+    assert b"Connection: close" in head
+    assert body.decode() == '{"msg":"ñandú"}'
+
+
+def test_keep_alive_client_is_pooled(mock_micropython_modules, mock_config):
+    """Test de que una petición HTTP/1.1 deja la conexión abierta"""
+    server = _build_server(mock_micropython_modules)
+    client = FakeClient([b"GET /status HTTP/1.1\r\nHost: robot\r\n\r\n"])
+
+    server._handle_request(client, ("192.168.1.50", 1234))
+
+    assert b"Connection: keep-alive" in client.sent
+    assert not client.closed
+    assert client.timeout == 0
+    assert server.keepalive_clients[0][0] is client
+
+
+def test_keep_alive_connection_close(mock_micropython_modules, mock_config):
+    """Test de que "Connection: close" y HTTP/1.0 cierran el socket"""
+    server = _build_server(mock_micropython_modules)
+
+    client = FakeClient([b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n"])
+    server._handle_request(client, ("192.168.1.50", 1234))
+    assert client.closed
+    assert b"Connection: close" in client.sent
+
+    client = FakeClient([b"GET / HTTP/1.0\r\n\r\n"])
+    server._handle_request(client, ("192.168.1.50", 1234))
+    assert client.closed
+
+    assert server.keepalive_clients == []
+
+
+def test_keep_alive_poll_serves_next_request(mock_micropython_modules, mock_config):
+    """Test de que _poll_keepalive atiende la siguiente petición del socket"""
+    server = _build_server(mock_micropython_modules)
+    client = FakeClient([b"GET /status HTTP/1.1\r\n\r\n"])
+    server._handle_request(client, ("192.168.1.50", 1234))
+
+    # Sin datos nuevos: la conexión sigue abierta
+    server._poll_keepalive()
+    assert len(server.keepalive_clients) == 1
+
+    client.sent = b""
+    client.requests.append(b"GET /move?dir=F HTTP/1.1\r\n\r\n")
+    server._poll_keepalive()
+
+    assert b'"dir":"F"' in client.sent
+    assert server.motors.in1.value() == 1
+    assert server.keepalive_clients[0][0] is client
+
+
+def test_keep_alive_idle_timeout(mock_micropython_modules, mock_config):
+    """Test de cierre de conexiones inactivas"""
+    mock_time = mock_micropython_modules['time'].__class__
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    client = FakeClient([b"GET / HTTP/1.1\r\n\r\n"])
+    server._handle_request(client, ("192.168.1.50", 1234))
+
+    mock_time._ticks += config.KEEPALIVE_IDLE_MS + 1
+    server._poll_keepalive()
+
+    assert client.closed
+    assert server.keepalive_clients == []
+
+
+def test_keep_alive_pool_is_capped(mock_micropython_modules, mock_config):
+    """Test de que el pool no supera KEEPALIVE_MAX_CONNECTIONS"""
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    clients = []
+    for i in range(config.KEEPALIVE_MAX_CONNECTIONS + 2):
+        client = FakeClient([b"GET / HTTP/1.1\r\n\r\n"])
+        server._handle_request(client, ("192.168.1." + str(i), 1234))
+        clients.append(client)
+
+    assert len(server.keepalive_clients) == config.KEEPALIVE_MAX_CONNECTIONS
+    assert clients[-1].closed
+    assert b"Connection: close" in clients[-1].sent
+
+
+def test_route_exact_match(mock_micropython_modules, mock_config):
+    """Test de que las rutas solo coinciden exactamente (sin prefijos)"""
+    server = _build_server(mock_micropython_modules)
+
+    client = FakeClient()
+    server._route_request(client, "/status?x=1", "192.168.1.50")
+    assert client.sent.startswith(b"HTTP/1.1 200 OK")
+
+    client = FakeClient()
+    server._route_request(client, "/statusX", "192.168.1.50")
+    assert client.sent.startswith(b"HTTP/1.1 404 Not Found")
+    assert server.security.last_error == "route_not_found:/statusX"
+
+
+def test_route_method_not_allowed(mock_micropython_modules, mock_config):
+    """Test de rutas que existen pero no aceptan el método"""
+    server = _build_server(mock_micropython_modules)
+    client = FakeClient()
+
+    server._route_request(client, "/move?dir=F", "192.168.1.50", "DELETE")
+
+    assert client.sent.startswith(b"HTTP/1.1 405 Method Not Allowed")
+    assert server.motors.in1.value() == 0
+
+
+def test_add_route_registers_handler(mock_micropython_modules, mock_config):
+    """Test del API de registro de endpoints"""
+    server = _build_server(mock_micropython_modules)
+    calls = []
+
+    def handle_ping(client, query, client_ip):
+        calls.append((query, client_ip))
+        server._send_text(client, "pong")
+
+    server.add_route("/ping", handle_ping, methods=("GET", "POST"))
+
+    client = FakeClient([b"POST /ping?n=1 HTTP/1.1\r\n\r\n"])
+    server._handle_request(client, ("192.168.1.50", 1234))
+
+    assert calls == [("n=1", "192.168.1.50")]
+    assert client.sent.endswith(b"pong")
+
+
+def test_query_param_from_split_query(mock_micropython_modules, mock_config):
+    """Test de extracción de parámetros de un query string ya separado"""
+    server = _build_server(mock_micropython_modules)
+
+    assert server._query_param("dir=F&token=abc", "token") == "abc"
+    assert server._query_param("dir=F", "speed") is None
+    assert server._query_param("", "dir") is None
+
+
+def test_websocket_not_available_in_sync_mode(mock_micropython_modules, mock_config):
+    """Test de que /ws responde 501 en el servidor síncrono"""
+    server = _build_server(mock_micropython_modules)
+    client = FakeClient([
+        b"GET /ws HTTP/1.1\r\nUpgrade: websocket\r\nSec-WebSocket-Key: abc\r\n\r\n"
+    ])
+
+    server._handle_request(client, ("192.168.1.50", 1234))
+
+    assert client.sent.startswith(b"HTTP/1.1 501 Not Implemented")
+
+
+def test_event_stream_not_available_in_sync_mode(mock_micropython_modules, mock_config):
+    """Test de que /events responde 501 en el servidor síncrono"""
+    server = _build_server(mock_micropython_modules)
+    client = FakeClient([b"GET /events HTTP/1.1\r\n\r\n"])
+
+    server._handle_request(client, ("192.168.1.50", 1234))
+
+    assert client.sent.startswith(b"HTTP/1.1 501 Not Implemented")
+
+
+def _dechunk(body):
+    """Cuerpo de una respuesta Transfer-Encoding: chunked sin el framing"""
+    data = b""
+    while True:
+        size_line, body = body.split(b"\r\n", 1)
+        size = int(size_line, 16)
+        if size == 0:
+            assert body == b"\r\n"
+            return data
+        data += body[:size]
+        assert body[size:size + 2] == b"\r\n"
+        body = body[size + 2:]
+
+
+def _snapshot(server, path):
+    """Pide path al servidor síncrono y devuelve (status line, JSON)"""
+    import json
+    client = FakeClient(["GET {} HTTP/1.1\r\n\r\n".format(path).encode()])
+    server._handle_request(client, ("192.168.1.50", 1234))
+    head, body = client.sent.split(b"\r\n\r\n", 1)
+    if b"Transfer-Encoding: chunked" in head:
+        body = _dechunk(body)
+    return head.split(b"\r\n")[0].decode(), json.loads(body)
+
+
+def test_snapshot_all_sections(mock_micropython_modules, mock_config):
+    """Test de /snapshot con token: las cuatro secciones en un documento"""
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    status, data = _snapshot(server, "/snapshot?token=" + config.SECURITY_TOKEN)
+
+    assert status == "HTTP/1.1 200 OK"
+    assert list(data) == ["status", "telemetry", "security", "logs"]
+    assert data["status"]["ip"] == "192.168.1.1"
+    assert "distance_cm" in data["telemetry"]
+    assert data["security"]["safe_mode"] == False
+    assert isinstance(data["logs"]["logs"], list)
+    assert data["logs"]["head"] == server.logger.head_seq
+
+
+def test_snapshot_field_selector(mock_micropython_modules, mock_config):
+    """Test de ?fields= y de que sin token no se incluyen los logs"""
+    server = _build_server(mock_micropython_modules)
+
+    _, selected = _snapshot(server, "/snapshot?fields=security,telemetry")
+    _, public = _snapshot(server, "/snapshot")
+
+    assert list(selected) == ["telemetry", "security"]
+    assert "logs" not in public
+
+
+def test_snapshot_logs_require_token(mock_micropython_modules, mock_config):
+    """Test de 401 al pedir logs sin token y 400 con un campo desconocido"""
+    server = _build_server(mock_micropython_modules)
+
+    unauthorized, _ = _snapshot(server, "/snapshot?fields=status,logs")
+    unknown, _ = _snapshot(server, "/snapshot?fields=status,secrets")
+
+    assert unauthorized == "HTTP/1.1 401 Unauthorized"
+    assert unknown == "HTTP/1.1 400 Bad Request"
+
+
+def test_logs_since_returns_delta(mock_micropython_modules, mock_config):
+    """Test de /logs?since=N: solo entradas nuevas y secuencia actual"""
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    for i in range(3):
+        server.logger.add("entrada {}".format(i))
+    head = server.logger.head_seq
+
+    status, data = _snapshot(server, "/logs?since={}&token={}".format(head - 1, config.SECURITY_TOKEN))
+    bad, _ = _snapshot(server, "/logs?since=abc&token=" + config.SECURITY_TOKEN)
+
+    assert status == "HTTP/1.1 200 OK"
+    assert data["head"] == head
+    assert data["gap"] == False
+    assert len(data["logs"]) == 1 and "entrada 2" in data["logs"][0]
+    assert bad == "HTTP/1.1 400 Bad Request"
+
+
+def _get(server, path, headers=""):
+    """Pide path al servidor síncrono y devuelve (status line, headers, cuerpo)"""
+    client = FakeClient(["GET {} HTTP/1.1\r\n{}\r\n".format(path, headers).encode()])
+    server._handle_request(client, ("192.168.1.50", 1234))
+    head, body = client.sent.split(b"\r\n\r\n", 1)
+    lines = head.decode().split("\r\n")
+    fields = dict(line.split(": ", 1) for line in lines[1:])
+    return lines[0], fields, body
+
+
+def test_security_conditional_get(mock_micropython_modules, mock_config):
+    """Test de ETag y 304 en /security hasta que cambia la versión"""
+    server = _build_server(mock_micropython_modules)
+
+    status, headers, body = _get(server, "/security")
+    etag = headers["ETag"]
+    assert status == "HTTP/1.1 200 OK"
+    assert headers["Cache-Control"] == "no-cache"
+
+    status, headers, body = _get(server, "/security", "If-None-Match: " + etag + "\r\n")
+    assert status == "HTTP/1.1 304 Not Modified"
+    assert headers["ETag"] == etag
+    assert body == b""
+
+    # Un error nuevo cambia la versión: vuelve a enviarse el cuerpo
+    server.security.add_error("10.0.0.9", "test")
+    status, headers, body = _get(server, "/security", "If-None-Match: " + etag + "\r\n")
+    assert status == "HTTP/1.1 200 OK"
+    assert headers["ETag"] != etag
+    assert b'"fail_count": 1' in body
+
+
+def test_logs_and_status_conditional_get(mock_micropython_modules, mock_config):
+    """Test de 304 en /logs (por secuencia) y /status (por segundo de uptime)"""
+    server = _build_server(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+    import config
+
+    logs_path = "/logs?token=" + config.SECURITY_TOKEN
+    _, headers, _ = _get(server, logs_path)
+    status, _, _ = _get(server, logs_path, "If-None-Match: " + headers["ETag"] + "\r\n")
+    assert status == "HTTP/1.1 304 Not Modified"
+
+    server.logger.add("nueva")
+    status, _, _ = _get(server, logs_path, "If-None-Match: " + headers["ETag"] + "\r\n")
+    assert status == "HTTP/1.1 200 OK"
+
+    _, headers, _ = _get(server, "/status")
+    status, _, _ = _get(server, "/status", "If-None-Match: " + headers["ETag"] + "\r\n")
+    assert status == "HTTP/1.1 304 Not Modified"
+
+    mock_time._ticks += 1000
+    status, _, body = _get(server, "/status", "If-None-Match: " + headers["ETag"] + "\r\n")
+    assert status == "HTTP/1.1 200 OK"
+    assert b'"uptime": 1' in body
+
+
+def test_telemetry_binary_format(mock_micropython_modules, mock_config):
+    """Test de /telemetry?fmt=bin y de la negociación por Accept"""
+    server = _build_server(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+    from src.telemetry_format import unpack, RECORD_SIZE
+
+    mock_time._ticks += 1500
+    status, headers, body = _get(server, "/telemetry?fmt=bin")
+    assert status == "HTTP/1.1 200 OK"
+    assert headers["Content-Type"] == "application/octet-stream"
+    assert headers["Content-Length"] == str(RECORD_SIZE)
+    first = unpack(body)
+    assert first["uptime_ms"] == 1500
+
+    _, headers, body = _get(server, "/telemetry", "Accept: application/octet-stream\r\n")
+    assert headers["Content-Type"] == "application/octet-stream"
+    assert unpack(body)["seq"] == first["seq"] + 1
+
+    # ?fmt=json manda sobre Accept; sin nada sigue siendo JSON
+    _, headers, body = _get(server, "/telemetry?fmt=json", "Accept: application/octet-stream\r\n")
+    assert headers["Content-Type"] == "application/json"
+    _, headers, body = _get(server, "/telemetry")
+    assert headers["Content-Type"] == "application/json"
+    assert b'"distance_cm"' in body
+
+
+def test_expensive_routes_have_own_budget(mock_micropython_modules, mock_config):
+    """Test de que /logs agota su límite sin bloquear /move ni /status"""
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    logs_path = "/logs?token=" + config.SECURITY_TOKEN
+    for i in range(config.RATE_LIMIT_EXPENSIVE_REQUESTS):
+        status, _, _ = _get(server, logs_path)
+        assert status == "HTTP/1.1 200 OK"
+
+    status, _, _ = _get(server, logs_path)
+    assert status == "HTTP/1.1 429 Too Many Requests"
+
+    status, _, _ = _get(server, "/status")
+    assert status == "HTTP/1.1 200 OK"
+
+
+def _post(server, path, body, content_length=None):
+    """Envía un POST al servidor síncrono y devuelve (status line, headers, cuerpo)"""
+    if content_length is None:
+        content_length = len(body)
+    raw = "POST {} HTTP/1.1\r\nContent-Length: {}\r\n\r\n{}".format(path, content_length, body)
+    client = FakeClient([raw.encode()])
+    server._handle_request(client, ("192.168.1.50", 1234))
+    head, response = client.sent.split(b"\r\n\r\n", 1)
+    lines = head.decode().split("\r\n")
+    return lines[0], dict(line.split(": ", 1) for line in lines[1:]), response
+
+
+def test_program_get_and_progress_in_telemetry(mock_micropython_modules, mock_config):
+    """Test de /program por query, avance en el loop de control y progreso en /telemetry"""
+    import json
+    server = _build_server(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    status, _, body = _get(server, "/program?steps=F%3A500%2CL%3A300")
+    assert status == "HTTP/1.1 200 OK"
+    assert json.loads(body) == {"ok": True, "segments": 2, "total_ms": 800}
+    assert server.motors.in1.value() == 1
+
+    mock_time._ticks += 500
+    server._control_step()
+    _, _, body = _get(server, "/telemetry")
+    progress = json.loads(body)["program"]
+    assert progress["state"] == "running"
+    assert progress["segment"] == 2
+
+    mock_time._ticks += 300
+    server._control_step()
+    _, _, body = _get(server, "/program")
+    assert json.loads(body)["state"] == "done"
+
+
+def test_program_post_body(mock_micropython_modules, mock_config):
+    """Test de /program por POST y cuerpo incompleto"""
+    server = _build_server(mock_micropython_modules)
+
+    status, _, _ = _post(server, "/program", "F:500,S:0")
+    assert status == "HTTP/1.1 200 OK"
+    assert server.program.is_running()
+
+    status, _, body = _post(server, "/program", "F:500", content_length=50)
+    assert status == "HTTP/1.1 400 Bad Request"
+    assert b"incomplete body" in body
+
+
+def test_program_preempted_by_move(mock_micropython_modules, mock_config):
+    """Test de que /move cancela el programa en curso"""
+    server = _build_server(mock_micropython_modules)
+
+    _get(server, "/program?steps=F:5000")
+    status, _, _ = _get(server, "/move?dir=S")
+
+    assert status == "HTTP/1.1 200 OK"
+    assert server.program.state == "stopped"
+    assert server.motors.in1.value() == 0
+
+
+def test_other_paths_cancel_udp_duration(mock_micropython_modules, mock_config):
+    """Test de que /move, /program y /auto quitan a UDP la parada programada"""
+    server = _build_server(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+    from src.udp_control import UDPControl
+
+    server.udp = UDPControl(server.motors, server.security, server.logger, server.program)
+
+    for path in ("/move?dir=F", "/program?steps=F:5000", "/auto?enabled=1"):
+        server.udp.move_started = mock_time._ticks
+        server.udp.move_duration = 200
+        _get(server, path)
+        assert server.udp.move_duration == 0
+    server.auto_mode.disable()
+
+
+def test_program_rejections(mock_micropython_modules, mock_config):
+    """Test de programa inválido, modo auto activo y Safe Mode"""
+    server = _build_server(mock_micropython_modules)
+
+    status, _, _ = _get(server, "/program?steps=X:100")
+    assert status == "HTTP/1.1 400 Bad Request"
+
+    server.auto_mode.enable()
+    status, _, _ = _get(server, "/program?steps=F:100")
+    assert status == "HTTP/1.1 409 Conflict"
+    server.auto_mode.disable()
+
+    _get(server, "/program?steps=F:5000")
+    server.security.activate_safe_mode()
+    server._control_step()
+    assert server.program.state == "stopped"
+
+    status, _, _ = _get(server, "/program?steps=F:100")
+    assert status == "HTTP/1.1 403 Forbidden"
+
+
+def test_telemetry_reads_sampler_cache(mock_micropython_modules, mock_config):
+    """Test de /telemetry sin medir: edad de la muestra y caducidad"""
+    import json
+    server = _build_server(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    _, _, body = _get(server, "/telemetry")
+    data = json.loads(body)
+    assert data["stale"] == True
+    assert data["distance_cm"] == -1.0
+    assert server.sampler.samples == 0
+
+    server._control_step()
+    mock_time._ticks += 30
+    _, _, body = _get(server, "/telemetry")
+    data = json.loads(body)
+    assert data["stale"] == False
+    assert data["sample_age_ms"] == 30
+    assert data["max_sample_age_ms"] == server.sampler.max_age_ms
+    assert data["distance_cm"] == 10.0
+    assert data["distance_raw_cm"] == 10.0
+    assert data["distance_median_cm"] == 10.0
+    assert data["distance_ema_cm"] == 10.0
+    assert data["valid_ratio"] == 1.0
+    assert server.sampler.samples == 1
+
+
+def test_telemetry_and_metrics_per_sensor(mock_micropython_modules, mock_config):
+    """Test de distancia por sensor en /telemetry y /metrics con un SensorArray"""
+    import json
+    server = _build_server(mock_micropython_modules)
+    # Los mismos módulos que importa http_server (sin el prefijo src.)
+    from sensor_array import SensorArray
+    from sensor_handler import UltrasonicSensor
+
+    server.sampler = SensorArray([
+        UltrasonicSensor(17, 16, "left"), UltrasonicSensor(5, 18, "center"), UltrasonicSensor(19, 21, "right")
+    ], guard_ms=0)
+    # Medición bloqueante con el time_pulse_us simulado (10 cm)
+    for sampler in server.sampler.samplers:
+        sampler.non_blocking = False
+    server._control_step()
+
+    _, _, body = _get(server, "/telemetry")
+    data = json.loads(body)
+    assert data["sensors"] == {"left": 10.0, "center": -1.0, "right": -1.0}
+    assert data["distance_cm"] == -1.0
+
+    _, _, body = _get(server, "/metrics")
+    text = body.decode()
+    assert 'robot_sensor_distance_cm{sensor="left"} 10.0' in text
+    assert 'robot_sensor_distance_cm{sensor="right"} -1.0' in text
+
+
+def test_metrics_endpoint(mock_micropython_modules, mock_config):
+    """Test de /metrics: peticiones por ruta, latencia, 404 y rechazos del rate limiter"""
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    _get(server, "/status")
+    _get(server, "/status")
+    _get(server, "/no-existe")
+    # Las tres peticiones anteriores también gastan del presupuesto general
+    for i in range(config.RATE_LIMIT_REQUESTS - 3):
+        _get(server, "/telemetry")
+
+    status, headers, body = _get(server, "/telemetry")
+    assert status == "HTTP/1.1 429 Too Many Requests"
+
+    # Nueva ventana para poder pedir /metrics
+    mock_time = mock_micropython_modules['time'].__class__
+    mock_time._ticks += config.RATE_LIMIT_WINDOW_MS
+
+    status, headers, body = _get(server, "/metrics")
+    lines = body.decode().split("\n")
+
+    assert status == "HTTP/1.1 200 OK"
+    assert headers["Content-Type"].startswith("text/plain")
+    assert 'robot_http_requests_total{route="/status",code="200"} 2' in lines
+    assert 'robot_http_requests_total{route="other",code="404"} 1' in lines
+    assert 'robot_http_request_duration_seconds_count{route="/status"} 2' in lines
+    assert 'robot_http_rate_limited_total{budget="general"} 1' in lines
+    assert 'robot_sensor_errors_total{code="-1"} 0' in lines
+    assert "robot_sensor_valid_ratio 0.00" in lines
+    assert any(line.startswith("robot_http_response_bytes_total ") for line in lines)
+
+
+def test_loop_profiler_auto_interval(mock_micropython_modules, mock_config):
+    """Test del intervalo real entre comprobaciones del modo auto y su exposición"""
+    server = _build_server(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+    import config
+
+    # Camino libre: sin maniobras de evasión que alarguen el paso
+    server.sampler.sensor.measure_distance_cm = lambda: 100.0
+
+    server.auto_mode.enable()
+    mock_time._ticks += config.AUTO_CHECK_INTERVAL
+    server._control_step()
+    # La primera comprobación no tiene referencia anterior
+    assert server.profiler.auto_interval_ms.count == 0
+
+    # Bajo carga el loop llega tarde a la siguiente comprobación
+    mock_time._ticks += config.AUTO_CHECK_INTERVAL + config.PROFILER_DEADLINE_MARGIN_MS + 100
+    server._control_step()
+    assert server.profiler.auto_interval_ms.summary()[2] == config.AUTO_CHECK_INTERVAL + config.PROFILER_DEADLINE_MARGIN_MS + 100
+    assert server.profiler.deadline_misses == 1
+
+    # Desactivado no hay comprobaciones y el hueco no cuenta como retraso
+    server.auto_mode.disable()
+    mock_time._ticks += 5000
+    server._control_step()
+    server.auto_mode.enable()
+    mock_time._ticks += config.AUTO_CHECK_INTERVAL
+    server._control_step()
+    assert server.profiler.auto_interval_ms.count == 1
+    assert server.profiler.loop_interval_ms.count == 3
+
+    status, headers, body = _get(server, "/telemetry")
+    loop = json.loads(body)["loop"]
+    assert loop["deadline_misses"] == 1
+    assert loop["auto_target_ms"] == config.AUTO_CHECK_INTERVAL
+
+    # La petición anterior ya quedó registrada
+    status, headers, body = _get(server, "/metrics")
+    lines = body.decode().split("\n")
+    assert 'robot_auto_deadline_misses_total 1' in lines
+    assert any(line.startswith('robot_request_us{stat="p99"} ') for line in lines)
+    assert any(line.startswith('robot_loop_interval_ms{stat="max"} ') for line in lines)
+
+
+def _build_dashboard_server(mock_micropython_modules, mock_config, tmp_path):
+    """HTTPServer con un dashboard de prueba en tmp_path como STATIC_ROOT"""
+    from tests.test_static_files import write_www
+
+    compressed = write_www(tmp_path, {
+        "/index.html": (b"<html><div id='root'></div></html>", "text/html; charset=utf-8", "revalidate"),
+        "/assets/index-abc123.js": (b"console.log('robot');" * 100, "application/javascript", "immutable"),
+    })
+    server = _build_server(mock_micropython_modules)
+    from src.static_files import StaticFiles
+
+    server.static = StaticFiles(str(tmp_path), 64)
+    server.static.load()
+    server._register_routes()
+    return server, compressed
+
+
+def test_dashboard_served_gzipped(mock_micropython_modules, mock_config, tmp_path):
+    """Test del dashboard: gzip, Content-Length del fichero comprimido y caché inmutable"""
+    server, compressed = _build_dashboard_server(mock_micropython_modules, mock_config, tmp_path)
+
+    status, headers, body = _get(server, "/assets/index-abc123.js")
+
+    assert status == "HTTP/1.1 200 OK"
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["Content-Type"] == "application/javascript"
+    assert headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert int(headers["Content-Length"]) == len(compressed["/assets/index-abc123.js"])
+    assert body == compressed["/assets/index-abc123.js"]
+
+    # Con el ETag en caché no se vuelve a leer la flash
+    status, headers, body = _get(server, "/assets/index-abc123.js", "If-None-Match: " + headers["ETag"] + "\r\n")
+    assert status == "HTTP/1.1 304 Not Modified"
+    assert headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert body == b""
+
+
+def test_dashboard_index_at_root(mock_micropython_modules, mock_config, tmp_path):
+    """Test de / con dashboard: index.html revalidable en lugar del texto de la API"""
+    server, compressed = _build_dashboard_server(mock_micropython_modules, mock_config, tmp_path)
+
+    status, headers, body = _get(server, "/")
+
+    assert status == "HTTP/1.1 200 OK"
+    assert headers["Cache-Control"] == "no-cache"
+    assert body == compressed["/index.html"]
+
+    # La API sigue respondiendo igual
+    status, headers, body = _get(server, "/status")
+    assert status == "HTTP/1.1 200 OK"
+
+
+def test_dashboard_missing_file(mock_micropython_modules, mock_config, tmp_path):
+    """Test de fichero en el manifiesto pero no en la flash: 404 antes de las cabeceras"""
+    server, compressed = _build_dashboard_server(mock_micropython_modules, mock_config, tmp_path)
+    (tmp_path / "assets" / "index-abc123.js.gz").unlink()
+
+    status, headers, body = _get(server, "/assets/index-abc123.js")
+
+    assert status == "HTTP/1.1 404 Not Found"
+    assert "Content-Encoding" not in headers
+
+
+def test_logs_streamed_chunked(mock_micropython_modules, mock_config):
+    """Test de /logs por chunks: cada envío cabe en el buffer del ResponseWriter"""
+    import json
+    server = _build_server(mock_micropython_modules)
+    import config
+    from src.http_response import RESPONSE_BUFFER_SIZE
+
+    for i in range(config.MAX_LOG_ENTRIES):
+        server.logger.add("entrada de log bastante larga número {}".format(i))
+
+    client = FakeClient(["GET /logs?token={} HTTP/1.1\r\n\r\n".format(config.SECURITY_TOKEN).encode()])
+    sends = []
+    send = client.send
+
+    def tracking_send(data):
+        sends.append(len(data))
+        return send(data)
+
+    client.send = tracking_send
+    server._handle_request(client, ("192.168.1.50", 1234))
+
+    head, body = client.sent.split(b"\r\n\r\n", 1)
+    assert b"Transfer-Encoding: chunked" in head
+    assert b"ETag: " in head
+    data = json.loads(_dechunk(body))
+    assert len(data["logs"]) == config.MAX_LOG_ENTRIES
+    assert data["head"] == server.logger.head_seq
+    assert len(body) > RESPONSE_BUFFER_SIZE
+    assert max(sends) <= RESPONSE_BUFFER_SIZE
+
+
+def test_logs_http10_not_chunked(mock_micropython_modules, mock_config):
+    """Test de /logs para clientes HTTP/1.0: cuerpo sin chunks y cierre de conexión"""
+    import json
+    server = _build_server(mock_micropython_modules)
+    import config
+
+    client = FakeClient(["GET /logs?token={} HTTP/1.0\r\nConnection: keep-alive\r\n\r\n".format(
+        config.SECURITY_TOKEN).encode()])
+    server._handle_request(client, ("192.168.1.50", 1234))
+
+    head, body = client.sent.split(b"\r\n\r\n", 1)
+    assert b"Transfer-Encoding" not in head
+    assert b"Connection: close" in head
+    assert json.loads(body)["head"] == server.logger.head_seq
+    assert server.keepalive_clients == []
+
+
+class FakeListener:
+    """Socket de escucha simulado con una cola de conexiones pendientes"""
+
+    def __init__(self, clients=(), error=11):
+        self.pending = list(clients)
+        self.error = error
+        self.timeouts = []
+
+    def accept(self):
+        if not self.pending:
+            raise OSError(self.error)
+        return self.pending.pop(0), ("192.168.1.60", 4321)
+
+    def settimeout(self, timeout):
+        self.timeouts.append(timeout)
+
+
+def test_accept_backlog_served_in_one_iteration(mock_micropython_modules, mock_config):
+    """Test de que una ráfaga en cola se atiende sin volver al loop de control"""
+    server = _build_server(mock_micropython_modules)
+    clients = [FakeClient([b"GET /status HTTP/1.1\r\nConnection: close\r\n\r\n"]) for _ in range(4)]
+    server.socket = FakeListener(clients)
+
+    first = server._accept()
+    server._handle_request(first[0], first[1])
+    served = server._accept_backlog()
+
+    assert served == 3
+    assert all(client.sent.startswith(b"HTTP/1.1 200 OK") for client in clients)
+    assert server.connections_accepted == 4
+    assert server.connections_queued == 3
+    assert server.connections_refused == 0
+    # La cola se revisa sin bloquear
+    assert server.socket.timeouts[-1] == 0
+
+
+def test_accept_backlog_time_budget(mock_micropython_modules, mock_config, monkeypatch):
+    """Test de que la cola se deja para la siguiente vuelta al agotar el presupuesto"""
+    server = _build_server(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+    import config
+
+    class SlowClient(FakeClient):
+        def recv_into(self, buf):
+            # Cada petición tarda la mitad del presupuesto
+            mock_time._ticks += config.ACCEPT_BUDGET_MS // 2
+            return FakeClient.recv_into(self, buf)
+
+    clients = [SlowClient([b"GET /status HTTP/1.1\r\nConnection: close\r\n\r\n"]) for _ in range(5)]
+    server.socket = FakeListener(clients)
+
+    assert server._accept_backlog() == 2
+    assert len(server.socket.pending) == 3
+
+    # Presupuesto 0: una conexión por vuelta, como antes (config del módulo del servidor)
+    import src.http_server
+    monkeypatch.setattr(src.http_server.config, "ACCEPT_BUDGET_MS", 0)
+    assert server._accept_backlog() == 0
+    assert len(server.socket.pending) == 3
+
+
+def test_accept_timeout_follows_sensor_interval(mock_micropython_modules, mock_config):
+    """Test de que accept() no frena el muestreo rápido del modo automático"""
+    server = _build_server(mock_micropython_modules)
+    import src.http_server
+    config = src.http_server.config
+
+    assert server._accept_wait() == config.SOCKET_TIMEOUT
+
+    # Con el modo auto activo el loop vuelve antes a la tarea de control
+    server.auto_mode.enable()
+    assert server._accept_wait() == config.KEEPALIVE_POLL_TIMEOUT
+
+    # Con alcance reducido, no más que el intervalo rápido del sensor
+    server.sampler.request_range(50)
+    assert server._accept_wait() == config.SENSOR_FAST_INTERVAL_MS / 1000
+
+    server.sampler.request_range(None)
+    server.auto_mode.disable()
+    assert server._accept_wait() == config.SOCKET_TIMEOUT
+
+
+def test_accept_errors_counted_as_refused(mock_micropython_modules, mock_config):
+    """Test de contadores: timeout/EAGAIN no cuentan, ENOMEM sí, y salen en /metrics"""
+    server = _build_server(mock_micropython_modules)
+
+    server.socket = FakeListener(error=11)
+    assert server._accept() is None
+    server.socket = FakeListener(error=110)
+    assert server._accept() is None
+    assert server.connections_refused == 0
+
+    server.socket = FakeListener(error=12)
+    assert server._accept() is None
+    assert server.connections_refused == 1
+
+    status, headers, body = _get(server, "/metrics")
+    lines = body.decode().split("\n")
+    assert 'robot_http_connections_total{kind="refused"} 1' in lines
+    assert 'robot_http_connections_total{kind="queued"} 0' in lines
@@ -139,3 +139,179 @@ def test_logger_json_escape(mock_micropython_modules, mock_config):
     
     # Las comillas deben estar escapadas
     assert '\\"quotes\\"' in json_array
+
+
+def test_logger_sequence_numbers(mock_micropython_modules, mock_config):
+    """Test de secuencia monotónica (también tras clear)"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    
+    from src.logger import Logger
+    
+    logger = Logger()
+    assert logger.head_seq == 0
+    
+    logger.add("uno")
+    logger.add("dos")
+    assert logger.head_seq == 2
+    
+    # clear() añade "LOGS CLEARED" sin reiniciar la secuencia
+    logger.clear()
+    assert logger.head_seq == 3
+    assert len(logger.logs) == 1
+
+
+def test_logger_get_since_delta(mock_micropython_modules, mock_config):
+    """Test de entradas posteriores a un cursor"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    
+    from src.logger import Logger
+    
+    logger = Logger()
+    for i in range(5):
+        logger.add("msg {}".format(i))
+    
+    entries, head, gap = logger.get_since(3)
+    assert [e.split("] ")[1] for e in entries] == ["msg 3", "msg 4"]
+    assert head == 5
+    assert gap == False
+    
+    # Al día: nada nuevo
+    assert logger.get_since(5) == ([], 5, False)
+
+
+def test_logger_get_since_gap(mock_micropython_modules, mock_config):
+    """Test de hueco cuando el buffer circular ya sobrescribió lo pedido"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    
+    from src.logger import Logger
+    import config
+    
+    logger = Logger()
+    for i in range(config.MAX_LOG_ENTRIES + 10):
+        logger.add("msg {}".format(i))
+    
+    # Las entradas 1..10 ya no están
+    entries, head, gap = logger.get_since(5)
+    assert gap == True
+    assert len(entries) == config.MAX_LOG_ENTRIES
+    
+    # La primera que queda es la 11: since=10 no tiene hueco
+    entries, head, gap = logger.get_since(10)
+    assert gap == False
+    assert len(entries) == config.MAX_LOG_ENTRIES
+    
+    # Cursor de un arranque anterior (mayor que head)
+    assert logger.get_since(head + 100)[2] == True
+
+
+def test_logger_get_json_since(mock_micropython_modules, mock_config):
+    """Test del JSON incremental de /logs"""
+    import json
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    
+    from src.logger import Logger
+    
+    logger = Logger()
+    logger.add("a")
+    logger.add('con "comillas"')
+    
+    data = json.loads(logger.get_json_since(1))
+    assert data == {"logs": ['[0s] con "comillas"'], "head": 2, "gap": False}
+    assert len(json.loads(logger.get_json_since())["logs"]) == 2
+
+
+def test_logger_json_cache(mock_micropython_modules, mock_config):
+    """Test de que el JSON completo solo se regenera con entradas nuevas"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    
+    from src.logger import Logger
+    
+    logger = Logger()
+    logger.add("a")
+    
+    body = logger.get_json_since()
+    assert logger.get_json_since() is body
+    assert logger.get_json_array() is logger.get_json_array()
+    
+    logger.add("b")
+    assert logger.get_json_since() is not body
+    assert "b" in logger.get_json_array()
+
+
+def test_logger_iter_json_since(mock_micropython_modules, mock_config):
+    """Test del JSON por partes: idéntico a get_json_since() en todos los casos"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    
+    from src.logger import Logger
+    
+    logger = Logger()
+    for i in range(5):
+        logger.add('entrada "{}"'.format(i))
+    
+    for since in (None, 0, 3, 5, 999):
+        assert "".join(logger.iter_json_since(since)) == logger.get_json_since(since)
+    
+    # Una parte por entrada más apertura y cierre
+    assert len(list(logger.iter_json_since())) == 7
+    
+    empty = Logger()
+    assert "".join(empty.iter_json_since()) == empty.get_json_since()
+
+
+def test_logger_iter_json_since_snapshot(mock_micropython_modules, mock_config):
+    """Test de que las entradas nuevas durante el envío no alteran el cuerpo"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    
+    from src.logger import Logger
+    
+    logger = Logger()
+    logger.add("a")
+    expected = logger.get_json_since()
+    
+    parts = logger.iter_json_since()
+    first = next(parts)
+    logger.add("b")
+    assert first + "".join(parts) == expected
+
+
+def test_logger_streamed_peak_memory(mock_micropython_modules, mock_config):
+    """Test de que el pico al enviar /logs por partes no crece con el tamaño del log"""
+    import tracemalloc
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    
+    from src.logger import Logger
+    from src.http_response import ResponseWriter
+    
+    class DiscardClient:
+        def send(self, data):
+            return len(data)
+    
+    client = DiscardClient()
+    writer = ResponseWriter()
+    
+    def peak(entries, streamed):
+        logger = Logger()
+        # Llenar la lista directamente: MAX_LOG_ENTRIES no limita la prueba
+        logger.logs = ["[{}s] entrada de log de longitud típica".format(i) for i in range(entries)]
+        logger.head_seq = entries
+        
+        tracemalloc.start()
+        try:
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            if streamed:
+                writer.start_stream(client, "200 OK", "application/json")
+                for part in logger.iter_json_since():
+                    writer.write_stream(client, part)
+                writer.end_stream(client)
+            else:
+                writer.send(client, "200 OK", "application/json", logger.get_json_since())
+            _, top = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return top - base
+    
+    # Montando la cadena el pico crece con el log; por partes solo la
+    # copia de referencias de la lista (8 bytes por entrada)
+    assert peak(2000, False) > 10 * peak(2000, True)
+    assert peak(2000, True) - peak(100, True) < 2000 * 16
@@ -0,0 +1,104 @@
+"""
+Tests para loop_profiler.py (retraso del loop y jitter del modo auto)
+"""
+import sys
+import json
+
+
+def _build_profiler(mock_micropython_modules, size=8):
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.loop_profiler import LoopProfiler
+
+    return LoopProfiler(size)
+
+
+def test_rolling_stats_empty(mock_micropython_modules, mock_config):
+    """Test de ventana vacía: sin estadísticas"""
+    profiler = _build_profiler(mock_micropython_modules)
+
+    assert profiler.step_us.summary() is None
+
+
+def test_rolling_stats_summary(mock_micropython_modules, mock_config):
+    """Test de min/avg/max/p99 sobre las muestras de la ventana"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    from src.loop_profiler import RollingStats
+
+    stats = RollingStats(100)
+    for value in range(1, 101):
+        stats.add(value)
+
+    assert stats.summary() == (1, 50, 100, 100)
+
+    stats = RollingStats(4)
+    for value in (10, 20, 30):
+        stats.add(value)
+    assert stats.summary() == (10, 20, 30, 30)
+
+
+def test_rolling_stats_ring_is_fixed(mock_micropython_modules, mock_config):
+    """Test de anillo fijo: las muestras viejas se sobrescriben"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    from src.loop_profiler import RollingStats
+
+    stats = RollingStats(4)
+    for value in (1000, 1, 2, 3, 4):
+        stats.add(value)
+
+    assert len(stats.samples) == 4
+    assert stats.count == 5
+    assert stats.summary() == (1, 2, 4, 4)
+
+
+def test_loop_interval_and_step_duration(mock_micropython_modules, mock_config):
+    """Test de intervalo entre pasos de control y duración de cada paso"""
+    profiler = _build_profiler(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    started = profiler.step_started()
+    mock_time._ticks += 3
+    profiler.step_finished(started)
+
+    # El primer paso no tiene anterior: no hay intervalo todavía
+    assert profiler.loop_interval_ms.summary() is None
+    assert profiler.step_us.summary() == (3000, 3000, 3000, 3000)
+
+    mock_time._ticks += 7
+    profiler.step_finished(profiler.step_started())
+
+    assert profiler.loop_interval_ms.summary() == (10, 10, 10, 10)
+
+
+def test_auto_deadline_misses(mock_micropython_modules, mock_config):
+    """Test de deadlines: solo cuenta lo que supera intervalo + margen"""
+    profiler = _build_profiler(mock_micropython_modules)
+    import config
+
+    profiler.auto_checked(config.AUTO_CHECK_INTERVAL)
+    profiler.auto_checked(config.AUTO_CHECK_INTERVAL + config.PROFILER_DEADLINE_MARGIN_MS)
+    profiler.auto_checked(config.AUTO_CHECK_INTERVAL + config.PROFILER_DEADLINE_MARGIN_MS + 1)
+
+    assert profiler.deadline_misses == 1
+    assert profiler.auto_interval_ms.summary()[2] == config.AUTO_CHECK_INTERVAL + config.PROFILER_DEADLINE_MARGIN_MS + 1
+
+
+def test_json_cached_for_one_second(mock_micropython_modules, mock_config):
+    """Test del resumen JSON: válido y recalculado como mucho una vez por segundo"""
+    profiler = _build_profiler(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+    import config
+
+    profiler.auto_checked(210)
+    data = json.loads(profiler.get_json())
+
+    assert data["auto_interval_ms"] == [210, 210, 210, 210]
+    assert data["request_us"] is None
+    assert data["auto_target_ms"] == config.AUTO_CHECK_INTERVAL
+    assert data["deadline_misses"] == 0
+
+    profiler.auto_checked(900)
+    assert json.loads(profiler.get_json())["deadline_misses"] == 0
+
+    mock_time._ticks += 1000
+    assert json.loads(profiler.get_json())["deadline_misses"] == 1
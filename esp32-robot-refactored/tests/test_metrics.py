@@ -0,0 +1,81 @@
+"""
+Tests para metrics.py (contadores e histogramas en formato Prometheus)
+"""
+import pytest
+
+
+def _metrics(max_routes=4):
+    from src.metrics import Metrics
+
+    metrics = Metrics(max_routes)
+    metrics.add_route("/status")
+    metrics.add_route("/logs")
+    return metrics
+
+
+def test_routes_are_preallocated():
+    """Test de índices fijos por ruta y hueco "other" para el resto"""
+    metrics = _metrics(max_routes=3)
+
+    assert metrics.route("/status") == 1
+    assert metrics.route("/logs") == 2
+    assert metrics.route("/nope") == 0
+    assert metrics.add_route("/status") == 1
+
+    size = len(metrics.requests)
+    assert metrics.add_route("/move") == 3
+    # Sin huecos libres la ruta cuenta como "other" y las listas no crecen
+    assert metrics.add_route("/auto") == 0
+    assert len(metrics.requests) == size
+
+
+def test_observe_status_and_buckets():
+    """Test de conteo por código y cubo de latencia"""
+    from src.metrics import LATENCY_BUCKETS_US
+
+    metrics = _metrics()
+    route = metrics.route("/status")
+    metrics.observe(route, "200 OK", 300)
+    metrics.observe(route, "200 OK", 3000)
+    metrics.observe(route, "304 Not Modified", 5000000)
+
+    base = route * metrics.n_status
+    assert metrics.requests[base + metrics.status_index["200 OK"]] == 2
+    assert metrics.requests[base + metrics.status_index["304 Not Modified"]] == 1
+
+    buckets = metrics.buckets[route * metrics.n_buckets:(route + 1) * metrics.n_buckets]
+    assert buckets[0] == 1
+    assert buckets[LATENCY_BUCKETS_US.index(5000)] == 1
+    assert buckets[-1] == 1
+    assert metrics.latency_sum_us[route] == 5003300
+
+
+def test_unknown_status_counts_as_other():
+    """Test de un status fuera de STATUS_LINES"""
+    metrics = _metrics()
+    metrics.observe(1, "418 I'm a teapot", 10)
+
+    assert metrics.requests[1 * metrics.n_status + metrics.n_status - 1] == 1
+
+
+def test_render_prometheus_histogram():
+    """Test del formato de texto: cubos acumulados, suma en segundos y rutas sin tráfico omitidas"""
+    metrics = _metrics()
+    route = metrics.route("/status")
+    metrics.observe(route, "200 OK", 400)
+    metrics.observe(route, "200 OK", 1500)
+    metrics.count_rate_limited(1)
+
+    lines = []
+    metrics.render(lines)
+    text = "\n".join(lines)
+
+    assert 'robot_http_requests_total{route="/status",code="200"} 2' in lines
+    assert 'robot_http_request_duration_seconds_bucket{route="/status",le="0.000500"} 1' in lines
+    assert 'robot_http_request_duration_seconds_bucket{route="/status",le="0.002500"} 2' in lines
+    assert 'robot_http_request_duration_seconds_bucket{route="/status",le="+Inf"} 2' in lines
+    assert 'robot_http_request_duration_seconds_sum{route="/status"} 0.001900' in lines
+    assert 'robot_http_request_duration_seconds_count{route="/status"} 2' in lines
+    assert 'robot_http_rate_limited_total{budget="expensive"} 1' in lines
+    assert 'route="/logs"' not in text
+    assert "# TYPE robot_http_request_duration_seconds histogram" in lines
@@ -0,0 +1,144 @@
+"""
+Tests para motion_program.py (programas de movimiento temporizados)
+"""
+import sys
+import pytest
+
+
+FORWARD = (1, 0, 1, 0)
+LEFT = (0, 1, 1, 0)
+STOPPED = (0, 0, 0, 0)
+
+
+def _pins(motors):
+    return (motors.in1.value(), motors.in2.value(), motors.in3.value(), motors.in4.value())
+
+
+def _build_program(mock_micropython_modules):
+    """MotionProgram con motores reales sobre los mocks"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.motion_program import MotionProgram
+    from src.motor_controller import MotorController
+    from src.logger import Logger
+
+    motors = MotorController()
+    return MotionProgram(motors, Logger()), motors
+
+
+def test_parse_program(mock_micropython_modules, mock_config):
+    """Test de parseo de segmentos (minúsculas y espacios incluidos)"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    from src.motion_program import parse_program
+
+    assert parse_program("F:500, l:300,S:0") == [("F", 500), ("L", 300), ("S", 0)]
+
+
+@pytest.mark.parametrize("text", ["", "F", "X:100", "F:abc", "F:-5", "F:999999", "FF:100"])
+def test_parse_program_invalid(mock_micropython_modules, mock_config, text):
+    """Test de programas inválidos"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    from src.motion_program import parse_program
+
+    with pytest.raises(ValueError):
+        parse_program(text)
+
+
+def test_parse_program_segment_limit(mock_micropython_modules, mock_config):
+    """Test del máximo de segmentos por programa"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    from src.motion_program import parse_program
+    import config
+
+    parse_program(",".join(["F:10"] * config.PROGRAM_MAX_SEGMENTS))
+    with pytest.raises(ValueError):
+        parse_program(",".join(["F:10"] * (config.PROGRAM_MAX_SEGMENTS + 1)))
+
+
+def test_program_runs_segments_in_order(mock_micropython_modules, mock_config):
+    """Test de ejecución no bloqueante segmento a segmento"""
+    program, motors = _build_program(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    program.start([("F", 500), ("L", 300)])
+    assert _pins(motors) == FORWARD
+    assert program.index == 0
+
+    mock_time._ticks += 499
+    program.step()
+    assert _pins(motors) == FORWARD
+
+    mock_time._ticks += 1
+    program.step()
+    assert _pins(motors) == LEFT
+
+    mock_time._ticks += 300
+    program.step()
+    assert _pins(motors) == STOPPED
+    assert program.state == "done"
+    assert program.is_running() == False
+
+
+def test_late_step_does_not_shift_schedule(mock_micropython_modules, mock_config):
+    """Test de que un paso tardío acorta el segmento siguiente"""
+    program, motors = _build_program(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    program.start([("F", 500), ("L", 300), ("F", 100)])
+
+    # El loop de control llega 120 ms tarde al primer cambio
+    mock_time._ticks += 620
+    program.step()
+    assert _pins(motors) == LEFT
+
+    # El segundo cambio sigue en 800 ms desde el inicio
+    mock_time._ticks += 180
+    program.step()
+    assert _pins(motors) == FORWARD
+
+
+def test_zero_duration_segments_chain(mock_micropython_modules, mock_config):
+    """Test de segmentos de 0 ms en una misma llamada"""
+    program, motors = _build_program(mock_micropython_modules)
+
+    program.start([("F", 0), ("S", 0)])
+
+    assert program.state == "done"
+    assert _pins(motors) == STOPPED
+
+
+def test_stop_preempts_program(mock_micropython_modules, mock_config):
+    """Test de cancelación: motores parados y programa detenido"""
+    program, motors = _build_program(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    program.start([("F", 1000), ("L", 1000)])
+    mock_time._ticks += 200
+
+    assert program.stop("move") == True
+    assert _pins(motors) == STOPPED
+    assert program.state == "stopped"
+    assert program.elapsed_ms == 200
+
+    # Los pasos siguientes ya no mueven los motores
+    mock_time._ticks += 2000
+    program.step()
+    assert _pins(motors) == STOPPED
+    assert program.stop() == False
+
+
+def test_progress_json(mock_micropython_modules, mock_config):
+    """Test del progreso enviado en la telemetría"""
+    import json
+    program, motors = _build_program(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    assert json.loads(program.progress_json())["state"] == "idle"
+
+    program.start([("F", 500), ("L", 300)])
+    mock_time._ticks += 600
+    program.step()
+
+    assert json.loads(program.progress_json()) == {
+        "state": "running", "segment": 2, "segments": 2, "elapsed_ms": 600, "total_ms": 800
+    }
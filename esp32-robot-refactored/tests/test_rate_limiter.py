@@ -0,0 +1,96 @@
+"""
+Tests para rate_limiter.py (token buckets por IP)
+"""
+import sys
+import pytest
+
+
+def _limiter(mock_micropython_modules, requests=10, expensive=2, window=1000, max_clients=4):
+    """RateLimiter sobre el reloj simulado"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.rate_limiter import RateLimiter
+
+    return RateLimiter(requests, expensive, window, max_clients)
+
+
+def test_burst_up_to_capacity(mock_micropython_modules):
+    """Test de ráfaga: se admiten `requests` seguidas y se rechaza la siguiente"""
+    limiter = _limiter(mock_micropython_modules)
+
+    for i in range(10):
+        assert limiter.allow("10.0.0.1") == True
+    assert limiter.allow("10.0.0.1") == False
+
+
+def test_partial_refill(mock_micropython_modules):
+    """Test de recarga proporcional: 10 por segundo son un token cada 100 ms"""
+    limiter = _limiter(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    for i in range(10):
+        limiter.allow("10.0.0.1")
+
+    mock_time._ticks += 99
+    assert limiter.allow("10.0.0.1") == False
+    mock_time._ticks += 1
+    assert limiter.allow("10.0.0.1") == True
+    assert limiter.allow("10.0.0.1") == False
+
+
+def test_refill_is_capped(mock_micropython_modules):
+    """Test de que una pausa larga no acumula más de una ráfaga"""
+    limiter = _limiter(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    limiter.allow("10.0.0.1")
+    mock_time._ticks += 60000
+
+    allowed = sum(1 for _ in range(20) if limiter.allow("10.0.0.1"))
+    assert allowed == 10
+
+
+def test_expensive_budget_is_separate(mock_micropython_modules):
+    """Test de que el cubo costoso se agota sin tocar el general"""
+    limiter = _limiter(mock_micropython_modules)
+
+    assert limiter.allow("10.0.0.1", True) == True
+    assert limiter.allow("10.0.0.1", True) == True
+    assert limiter.allow("10.0.0.1", True) == False
+
+    # Las peticiones baratas siguen disponibles
+    for i in range(10):
+        assert limiter.allow("10.0.0.1") == True
+
+
+def test_table_is_bounded_with_lru_eviction(mock_micropython_modules):
+    """Test de tabla acotada: una IP nueva expulsa a la menos reciente"""
+    limiter = _limiter(mock_micropython_modules, max_clients=3)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        limiter.allow(ip)
+        mock_time._ticks += 10
+
+    # 10.0.0.1 vuelve a usarse: ahora la menos reciente es 10.0.0.2
+    limiter.allow("10.0.0.1")
+    mock_time._ticks += 10
+    limiter.allow("10.0.0.4")
+
+    assert len(limiter.clients) == 3
+    assert "10.0.0.2" not in limiter.clients
+    assert "10.0.0.1" in limiter.clients
+    assert limiter.evictions == 1
+
+
+def test_many_clients_keep_table_size(mock_micropython_modules):
+    """Test de miles de IPs de origen: la tabla no crece"""
+    limiter = _limiter(mock_micropython_modules, max_clients=32)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    for i in range(5000):
+        assert limiter.allow("10.{}.{}.{}".format(i >> 16, (i >> 8) & 255, i & 255)) == True
+        mock_time._ticks += 1
+
+    assert len(limiter.clients) == 32
+    assert limiter.evictions == 5000 - 32
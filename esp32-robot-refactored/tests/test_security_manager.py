@@ -157,3 +157,27 @@ def test_security_json_escape_quotes(mock_micropython_modules, mock_config):
     
     # Las comillas deben estar escapadas
     assert '\\"quotes\\"' in json_str
+
+
+def test_security_version_and_json_cache(mock_micropython_modules, mock_config):
+    """Test de versión por cambio y JSON reutilizado mientras no cambia"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    
+    from src.security_manager import SecurityManager
+    from src.logger import Logger
+    
+    logger = Logger()
+    security = SecurityManager(logger)
+    
+    first = security.get_json()
+    assert security.get_json() is first
+    
+    security.add_error("192.168.1.100", "test_error")
+    assert security.version == 1
+    second = security.get_json()
+    assert second is not first
+    assert '"fail_count": 1' in second
+    
+    security.deactivate_safe_mode()
+    assert security.version == 2
+    assert '"fail_count": 0' in security.get_json()
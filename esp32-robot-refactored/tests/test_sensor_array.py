@@ -0,0 +1,195 @@
+"""
+Tests para sensor_array.py (varios sensores con disparo escalonado)
+"""
+import sys
+import pytest
+
+
+class IrqSensor:
+    """Sensor simulado sin bloqueo que apunta en log el orden de los pings"""
+    irq_capable = True
+
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+        self.pending = False
+        self.result = None
+        self.busy = False
+
+    def start_measurement(self, max_range_cm=None):
+        self.log.append(self.name)
+        self.pending = True
+        self.result = None
+        return True
+
+    def finish(self, distance):
+        self.result = distance
+
+    def read_measurement(self):
+        if not self.pending or self.result is None:
+            return None
+        self.pending = False
+        return self.result
+
+    def echo_busy(self):
+        return self.busy
+
+
+class BlockingSensor:
+    """Sensor simulado bloqueante con una distancia fija"""
+    irq_capable = False
+
+    def __init__(self, name, distance, log):
+        self.name = name
+        self.distance = distance
+        self.log = log
+
+    def measure_distance_cm(self, max_range_cm=None):
+        self.log.append((self.name, max_range_cm))
+        # Más allá del alcance pedido no vuelve el eco a tiempo
+        if max_range_cm is not None and self.distance > max_range_cm:
+            return -1.0
+        return self.distance
+
+    def echo_busy(self):
+        return False
+
+
+def _array(mock_micropython_modules, sensors, guard_ms=5):
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.sensor_array import SensorArray
+
+    return SensorArray(sensors, guard_ms=guard_ms), mock_micropython_modules['time'].__class__
+
+
+def test_staggered_round_robin(mock_micropython_modules, mock_config):
+    """Test de un solo ping en el aire: cada sensor espera al eco del anterior y a la guarda"""
+    log = []
+    sensors = [IrqSensor(name, log) for name in ("left", "center", "right")]
+    array, mock_time = _array(mock_micropython_modules, sensors)
+
+    mock_time._ticks += 5
+    assert array.step() == False
+    assert log == ["left"]
+
+    # El eco de left no ha vuelto: center no dispara
+    mock_time._ticks += 3
+    assert array.step() == False
+    assert log == ["left"]
+
+    # Eco recibido antes de la guarda (desde el ping de left): center espera
+    sensors[0].finish(120.0)
+    assert array.step() == True
+    assert array.current == 1
+    assert log == ["left"]
+
+    # El ECHO de left aún en alto (rebote lejano) también bloquea
+    mock_time._ticks += 4
+    sensors[0].busy = True
+    array.step()
+    assert log == ["left"]
+    sensors[0].busy = False
+    array.step()
+    assert log == ["left", "center"]
+
+    # Pasada la guarda, el siguiente sale en la misma llamada que recoge el eco
+    mock_time._ticks += 20
+    sensors[1].finish(15.0)
+    assert array.step() == True
+    assert log == ["left", "center", "right"]
+    sensors[2].finish(60.0)
+    array.step()
+
+    # Vuelta completa: left espera su propio intervalo desde su ping
+    mock_time._ticks += 5
+    array.step()
+    assert log == ["left", "center", "right"]
+    mock_time._ticks += 100
+    array.step()
+    assert log[-1] == "left"
+
+    assert array.readings() == [("left", 120.0), ("center", 15.0), ("right", 60.0)]
+    assert array.clearer_side() == "left"
+
+    # La interfaz de SensorSampler es la del sensor frontal
+    assert array.measure_distance_cm() == 15.0
+    assert array.samples == 1
+    assert array.is_obstacle_detected(20) == True
+
+
+def test_blocking_round_robin_and_range(mock_micropython_modules, mock_config):
+    """Test de turnos con medición bloqueante y alcance pedido solo al frontal"""
+    log = []
+    sensors = [BlockingSensor(name, distance, log)
+               for name, distance in (("left", 30.0), ("center", 80.0), ("right", 90.0))]
+    array, mock_time = _array(mock_micropython_modules, sensors)
+    assert array.active_interval_ms() == 5
+    array.request_range(50)
+    assert [sampler.range_cm for sampler in array.samplers] == [None, 50, None]
+
+    for _ in range(6):
+        mock_time._ticks += 5
+        array.step()
+
+    # Primera vuelta completa; después solo el frontal (con alcance corto)
+    # tiene turno: los laterales esperan su intervalo normal sin retenerlo
+    assert log == [("left", None), ("center", None), ("right", None),
+                   ("center", 50), ("center", 50)]
+    assert array.clearer_side() == "right"
+    assert array.distance_of("center") == 80.0
+    assert array.distance_of("rear") is None
+
+    # Pasado el intervalo normal los laterales vuelven a medir completo
+    mock_time._ticks += array.samplers[0].interval_ms
+    array.step()
+    assert log[-1] == ("right", None)
+
+
+def test_side_sensors_keep_full_range(mock_micropython_modules, mock_config):
+    """Test de lateral bloqueado más allá del alcance auto: el giro va al otro lado"""
+    log = []
+    # Izquierda a 60 cm: dentro del alcance completo, fuera del de auto (50)
+    sensors = [BlockingSensor(name, distance, log)
+               for name, distance in (("left", 60.0), ("center", 15.0), ("right", 150.0))]
+    array, mock_time = _array(mock_micropython_modules, sensors)
+    array.request_range(50)
+
+    # Más que SENSOR_MAX_AGE_MS: la primera lectura completa ya no cuenta
+    for _ in range(100):
+        mock_time._ticks += 10
+        array.step()
+
+    assert all(max_range is None for name, max_range in log if name != "center")
+    assert array.readings() == [("left", 60.0), ("center", 15.0), ("right", 150.0)]
+    assert array.clearer_side() == "right"
+
+
+def test_single_sensor_delegates(mock_micropython_modules, mock_config):
+    """Test de un solo sensor: mismo muestreo que SensorSampler y sin laterales"""
+    log = []
+    array, mock_time = _array(mock_micropython_modules, [IrqSensor("center", log)])
+
+    assert array.step() == False
+    assert log == ["center"]
+    array.samplers[0].sensor.finish(42.0)
+    assert array.step() == True
+    assert array.measure_distance_cm() == 42.0
+    assert array.clearer_side() is None
+
+
+def test_build_sensors_from_config(mock_micropython_modules, mock_config, monkeypatch):
+    """Test de creación de los sensores desde ULTRASONIC_SENSORS"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+    import src.sensor_array
+    from src.sensor_array import build_sensors
+
+    sensors = build_sensors()
+    assert [sensor.name for sensor in sensors] == ["center"]
+
+    monkeypatch.setattr(src.sensor_array.config, "ULTRASONIC_SENSORS",
+                        (("left", 17, 16), ("right", 19, 21)))
+    sensors = build_sensors()
+    assert [sensor.name for sensor in sensors] == ["left", "right"]
+    assert sensors[1].trig.pin_num == 19
+    assert sensors[1].echo.pin_num == 21
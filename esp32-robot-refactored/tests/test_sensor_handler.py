@@ -89,11 +89,25 @@ def test_measure_distance_below_min_range(mock_micropython_modules, mock_config)
     
     sensor = UltrasonicSensor()
     
-    # 1cm = 58µs (fuera de rango)
+    # 1cm = 58µs (obstáculo pegado al sensor, no "libre")
     with patch('src.sensor_handler.machine.time_pulse_us', return_value=58):
         distance = sensor.measure_distance_cm()
-        # Debe retornar -1.0 (fuera de rango)
-        assert distance == -1.0
+        # Debe retornar -4.0 (menos de 2 cm)
+        assert distance == -4.0
+        assert sensor.is_obstacle_detected() == True
+
+
+def test_measure_distance_no_echo_start(mock_micropython_modules, mock_config):
+    """Test de ECHO que no llega a subir: time_pulse_us() == -2"""
+    from src.sensor_handler import UltrasonicSensor
+    from unittest.mock import patch
+
+    sensor = UltrasonicSensor()
+
+    with patch('src.sensor_handler.machine.time_pulse_us', return_value=-2):
+        assert sensor.measure_distance_cm() == -5.0
+        assert sensor.measure_distance_cm(50) == -5.0
+        assert sensor.is_obstacle_detected() == False
 
 
 def test_measure_distance_above_max_range(mock_micropython_modules, mock_config):
@@ -167,3 +181,141 @@ def test_is_obstacle_detected_error(mock_micropython_modules, mock_config):
     with patch('src.sensor_handler.machine.time_pulse_us', return_value=-1):
         # En caso de error, debe retornar False
         assert sensor.is_obstacle_detected() == False
+
+
+def _irq_sensor(mock_micropython_modules, echo, monkeypatch):
+    """Sensor con ECHO de interrupciones y el reloj simulado"""
+    import src.sensor_handler
+    from src.sensor_handler import UltrasonicSensor
+
+    mock_time = mock_micropython_modules['time'].__class__
+    monkeypatch.setattr(src.sensor_handler, "time", mock_time)
+
+    sensor = UltrasonicSensor()
+    sensor.echo = echo
+    sensor.irq_capable = True
+    return sensor, mock_time
+
+
+def test_irq_measurement(mock_micropython_modules, mock_config, mock_irq_pin, monkeypatch):
+    """Test de medición sin bloqueo: el resultado sale de los flancos de ECHO"""
+    sensor, mock_time = _irq_sensor(mock_micropython_modules, mock_irq_pin, monkeypatch)
+
+    sensor.start_measurement()
+    assert mock_irq_pin.handler is not None
+    assert mock_irq_pin.hard == True
+    assert sensor.pending == True
+    assert sensor.read_measurement() is None
+
+    # Eco de 2 ms (ticks_us simulado avanza de 1000 en 1000) = 34.4 cm
+    mock_time._ticks += 1
+    mock_irq_pin.fire(1)
+    assert sensor.read_measurement() is None
+    mock_time._ticks += 2
+    mock_irq_pin.fire(0)
+
+    distance = sensor.read_measurement()
+    assert 34 < distance < 35
+    assert sensor.pending == False
+    assert sensor.read_measurement() is None
+
+
+def test_irq_measurement_timeout(mock_micropython_modules, mock_config, mock_irq_pin, monkeypatch):
+    """Test de timeout sin eco: -1.0 pasado ULTRASONIC_TIMEOUT, como time_pulse_us"""
+    sensor, mock_time = _irq_sensor(mock_micropython_modules, mock_irq_pin, monkeypatch)
+
+    sensor.start_measurement()
+    mock_time._ticks += 20
+    assert sensor.read_measurement() is None
+
+    mock_irq_pin.fire(1)
+    mock_time._ticks += 20
+    assert sensor.read_measurement() == -1.0
+    assert sensor.pending == False
+
+    # ECHO no llega a subir (sensor desconectado): -5.0, no un timeout
+    mock_irq_pin.fire(0)
+    sensor.start_measurement()
+    mock_time._ticks += 40
+    assert sensor.read_measurement() == -5.0
+
+
+def test_irq_measurement_range_and_errors(mock_micropython_modules, mock_config, mock_irq_pin, monkeypatch):
+    """Test de validación de rango y códigos -2/-3 en el modo sin bloqueo"""
+    sensor, mock_time = _irq_sensor(mock_micropython_modules, mock_irq_pin, monkeypatch)
+
+    # Eco instantáneo (0 µs): por debajo de 2 cm
+    sensor.start_measurement()
+    mock_irq_pin.fire(1)
+    mock_irq_pin.fire(0)
+    assert sensor.read_measurement() == -4.0
+
+    # Un segundo ping reutiliza la interrupción y vuelve a contar flancos
+    sensor.start_measurement()
+    mock_irq_pin.fire(1)
+    mock_time._ticks += 1
+    mock_irq_pin.fire(0)
+    assert 17 < sensor.read_measurement() < 18
+
+    # Error de I/O en TRIG
+    def broken(val=None):
+        raise OSError("Hardware error")
+    sensor.trig.value = broken
+    sensor.start_measurement()
+    assert sensor.read_measurement() == -2.0
+
+    # ECHO sin soporte de interrupciones
+    sensor, mock_time = _irq_sensor(mock_micropython_modules, object(), monkeypatch)
+    sensor.start_measurement()
+    assert sensor.read_measurement() == -3.0
+
+
+def test_echo_timeout_for_range(mock_micropython_modules, mock_config):
+    """Test del timeout proporcional al alcance (58.2 µs por cm, ida y vuelta)"""
+    from src.sensor_handler import echo_timeout_us
+    import src.sensor_handler
+
+    full = src.sensor_handler.config.ULTRASONIC_TIMEOUT
+    assert echo_timeout_us() == full
+    assert echo_timeout_us(50) == 2911
+    assert echo_timeout_us(10000) == full
+
+
+def test_measure_distance_short_range(mock_micropython_modules, mock_config):
+    """Test de medición con alcance reducido: timeout corto y ECHO ocupado"""
+    from src.sensor_handler import UltrasonicSensor
+
+    timeouts = []
+
+    def pulse(pin, level, timeout):
+        timeouts.append(timeout)
+        return -1
+
+    sensor = UltrasonicSensor()
+    with patch('src.sensor_handler.machine.time_pulse_us', side_effect=pulse):
+        assert sensor.measure_distance_cm(50) == -1.0
+        assert timeouts == [2911]
+
+        # ECHO aún en alto por un eco lejano: no se dispara (el HC-SR04 lo ignoraría)
+        sensor.echo.value(1)
+        assert sensor.measure_distance_cm(50) is None
+        assert len(timeouts) == 1
+
+
+def test_irq_measurement_short_range(mock_micropython_modules, mock_config, mock_irq_pin, monkeypatch):
+    """Test de ping sin bloqueo con alcance reducido y ECHO ocupado"""
+    sensor, mock_time = _irq_sensor(mock_micropython_modules, mock_irq_pin, monkeypatch)
+
+    # Con el eco anterior aún en curso no se lanza un ping nuevo
+    mock_irq_pin.fire(1)
+    assert sensor.start_measurement(50) == False
+    assert sensor.pending == False
+    mock_irq_pin.fire(0)
+
+    # Sin eco dentro de 50 cm el timeout llega a los ~5 ms, no a los 30 ms
+    assert sensor.start_measurement(50) == True
+    mock_irq_pin.fire(1)
+    mock_time._ticks += 3
+    assert sensor.read_measurement() is None
+    mock_time._ticks += 3
+    assert sensor.read_measurement() == -1.0
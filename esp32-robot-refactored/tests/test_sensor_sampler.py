@@ -0,0 +1,300 @@
+"""
+Tests para sensor_sampler.py (lecturas compartidas del sensor)
+"""
+import sys
+import pytest
+
+
+class CountingSensor:
+    """Sensor simulado que cuenta las mediciones"""
+
+    def __init__(self, distance=25.0):
+        self.distance = distance
+        self.measurements = 0
+        self.ranges = []
+
+    def measure_distance_cm(self, max_range_cm=None):
+        self.measurements += 1
+        self.ranges.append(max_range_cm)
+        return self.distance
+
+
+def _build_sampler(mock_micropython_modules, distance=25.0):
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.sensor_sampler import SensorSampler
+
+    sensor = CountingSensor(distance)
+    return SensorSampler(sensor, interval_ms=100, max_age_ms=500), sensor
+
+
+def test_no_reading_before_first_sample(mock_micropython_modules, mock_config):
+    """Test de lectura inexistente: caducada y sin medir al leer"""
+    sampler, sensor = _build_sampler(mock_micropython_modules)
+
+    assert sampler.measure_distance_cm() == -1.0
+    assert sampler.age_ms() == -1
+    assert sampler.is_stale() == True
+    assert sensor.measurements == 0
+
+
+def test_sampling_at_fixed_rate(mock_micropython_modules, mock_config):
+    """Test de una medición por intervalo aunque step() se llame más a menudo"""
+    sampler, sensor = _build_sampler(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    assert sampler.step() == True
+    for i in range(4):
+        mock_time._ticks += 20
+        assert sampler.step() == False
+    mock_time._ticks += 20
+    assert sampler.step() == True
+
+    assert sensor.measurements == 2
+
+
+def test_reads_do_not_touch_sensor(mock_micropython_modules, mock_config):
+    """Test de lecturas O(1): cualquier número de clientes, una sola medición"""
+    sampler, sensor = _build_sampler(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    sampler.step()
+    mock_time._ticks += 40
+    for i in range(50):
+        assert sampler.measure_distance_cm() == 25.0
+
+    assert sampler.age_ms() == 40
+    assert sensor.measurements == 1
+
+
+def test_stale_reading(mock_micropython_modules, mock_config):
+    """Test de lectura caducada: se trata como un timeout del sensor"""
+    sampler, sensor = _build_sampler(mock_micropython_modules, distance=10.0)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    sampler.step()
+    assert sampler.is_obstacle_detected(15) == True
+
+    mock_time._ticks += 501
+    assert sampler.is_stale() == True
+    assert sampler.measure_distance_cm() == -1.0
+    assert sampler.is_obstacle_detected(15) == False
+
+
+def test_auto_mode_uses_cached_reading(mock_micropython_modules, mock_config):
+    """Test de AutoMode leyendo del muestreador sin medir otra vez"""
+    sampler, sensor = _build_sampler(mock_micropython_modules, distance=50.0)
+    mock_time = mock_micropython_modules['time'].__class__
+    from src.auto_mode import AutoMode
+    from src.motor_controller import MotorController
+    from src.logger import Logger
+
+    motors = MotorController()
+    auto_mode = AutoMode(motors, sampler, Logger())
+    auto_mode.enable()
+
+    sampler.step()
+    mock_time._ticks += 250
+    auto_mode.step()
+
+    assert motors.in1.value() == 1
+    assert sensor.measurements == 1
+
+
+def test_error_codes_are_counted(mock_micropython_modules, mock_config):
+    """Test de conteo de los códigos de error del sensor (-1 a -5)"""
+    sampler, sensor = _build_sampler(mock_micropython_modules)
+    mock_time = mock_micropython_modules['time'].__class__
+
+    for distance in (-1.0, -2.0, -1.0, 30.0, -3.0, -4.0, -5.0):
+        sensor.distance = distance
+        sampler.step()
+        mock_time._ticks += 100
+
+    assert sampler.errors == [2, 1, 1, 1, 1]
+    assert sampler.samples == 7
+
+
+class IrqSensor:
+    """Sensor simulado sin bloqueo: el eco se completa con finish()"""
+    irq_capable = True
+
+    def __init__(self):
+        self.pending = False
+        self.pings = 0
+        self.result = None
+        self.busy = False
+
+    def start_measurement(self, max_range_cm=None):
+        if self.busy:
+            return False
+        self.pings += 1
+        self.pending = True
+        self.result = None
+        return True
+
+    def finish(self, distance):
+        self.result = distance
+
+    def read_measurement(self):
+        if not self.pending or self.result is None:
+            return None
+        self.pending = False
+        return self.result
+
+    def measure_distance_cm(self):
+        raise AssertionError("la medición bloqueante no debe usarse")
+
+
+def test_non_blocking_sampling(mock_micropython_modules, mock_config):
+    """Test de muestreo con interrupciones: ping en un step, lectura en otro"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.sensor_sampler import SensorSampler
+
+    mock_time = mock_micropython_modules['time'].__class__
+    sensor = IrqSensor()
+    sampler = SensorSampler(sensor, interval_ms=100, max_age_ms=500)
+    assert sampler.non_blocking == True
+
+    # Lanza el ping y vuelve sin muestra
+    assert sampler.step() == False
+    assert sensor.pings == 1
+
+    # El eco aún no ha vuelto: no bloquea ni lanza otro ping
+    mock_time._ticks += 10
+    assert sampler.step() == False
+    assert sensor.pings == 1
+
+    sensor.finish(42.0)
+    mock_time._ticks += 10
+    assert sampler.step() == True
+    assert sampler.measure_distance_cm() == 42.0
+    assert sampler.age_ms() == 0
+
+    # El intervalo cuenta desde el ping: el siguiente sale a los 100 ms
+    mock_time._ticks += 70
+    assert sampler.step() == False
+    assert sensor.pings == 1
+    mock_time._ticks += 10
+    assert sampler.step() == False
+    assert sensor.pings == 2
+
+    # Los errores se cuentan igual que en el modo bloqueante
+    sensor.finish(-1.0)
+    assert sampler.step() == True
+    assert sampler.errors == [1, 0, 0, 0, 0]
+
+
+def test_busy_echo_retries_ping(mock_micropython_modules, mock_config):
+    """Test de ECHO aún en alto: el ping no se cuenta y se reintenta"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.sensor_sampler import SensorSampler
+
+    sensor = IrqSensor()
+    sensor.busy = True
+    sampler = SensorSampler(sensor, interval_ms=100, max_age_ms=500)
+
+    assert sampler.step() == False
+    assert sampler.pings == 0
+
+    sensor.busy = False
+    sampler.step()
+    assert sampler.pings == 1
+    assert sensor.pings == 1
+
+
+def test_short_range_sampling(mock_micropython_modules, mock_config):
+    """Test de alcance reducido: más frecuente, con un ping completo cada N"""
+    sampler, sensor = _build_sampler(mock_micropython_modules, distance=-1.0)
+    mock_time = mock_micropython_modules['time'].__class__
+    sampler.fast_interval_ms = 10
+    sampler.full_range_every = 4
+    sampler.request_range(50)
+
+    for _ in range(8):
+        sampler.step()
+        mock_time._ticks += 10
+
+    assert sensor.ranges == [None, 50, 50, 50, None, 50, 50, 50]
+
+    # Un ping corto sin eco no es un error: libre al menos hasta el alcance
+    assert sampler.clear == True
+    assert sampler.clears == 6
+    assert sampler.errors == [2, 0, 0, 0, 0]
+    assert sampler.measure_distance_cm() == 50.0
+    assert sampler.is_obstacle_detected(20) == False
+
+    # Un obstáculo dentro del alcance se mide normalmente
+    sensor.distance = 12.0
+    sampler.step()
+    assert sampler.clear == False
+    assert sampler.measure_distance_cm() == 12.0
+
+    # Eco de menos de 2 cm o ECHO que no sube: nunca "libre", y el filtro
+    # no los tapa con las lecturas válidas anteriores
+    for code, obstacle in ((-4.0, True), (-5.0, False)):
+        mock_time._ticks += 10
+        sensor.distance = code
+        sampler.step()
+        assert sampler.clear == False
+        assert sampler.measure_distance_cm() == code
+        assert sampler.is_obstacle_detected(20) == obstacle
+    sensor.distance = 12.0
+
+    # ECHO ocupado por el pulso anterior: no hay muestra y se reintenta
+    mock_time._ticks += 10
+    sensor.distance = None
+    assert sampler.step() == False
+    assert sampler.samples == 11
+    sensor.distance = 12.0
+
+    # Sin alcance pedido vuelve al intervalo normal y a pings completos
+    sampler.request_range(None)
+    mock_time._ticks += 10
+    assert sampler.step() == False
+    mock_time._ticks += 90
+    assert sampler.step() == True
+    assert sensor.ranges[-1] is None
+
+
+def test_filtered_reading_ignores_spike(mock_micropython_modules, mock_config):
+    """Test de lectura filtrada: un eco espurio no dispara la evasión de AutoMode"""
+    sampler, sensor = _build_sampler(mock_micropython_modules, distance=80.0)
+    mock_time = mock_micropython_modules['time'].__class__
+    from src.auto_mode import AutoMode
+    from src.motor_controller import MotorController
+    from src.logger import Logger
+
+    sampler.filter_mode = "median"
+    motors = MotorController()
+    auto_mode = AutoMode(motors, sampler, Logger())
+    auto_mode.enable()
+
+    for distance in (80.0, 81.0, 5.0):
+        sensor.distance = distance
+        sampler.step()
+        mock_time._ticks += 100
+
+    assert sampler.raw_distance_cm() == 5.0
+    assert sampler.measure_distance_cm() == 80.0
+
+    mock_time._ticks += 150
+    auto_mode.step()
+    # Sigue adelante (in1=1, in2=0) en lugar de retroceder
+    assert motors.in1.value() == 1
+    assert motors.in2.value() == 0
+
+    # La EMA (alpha 0.3) amortigua el pico en lugar de descartarlo
+    sampler.filter_mode = "ema"
+    assert 57 < sampler.measure_distance_cm() < 58
+
+    # Sin lecturas válidas vigentes se devuelve el código de error
+    for _ in range(3):
+        sensor.distance = -2.0
+        sampler.step()
+        mock_time._ticks += 300
+    sensor.distance = -2.0
+    sampler.step()
+    assert sampler.measure_distance_cm() == -2.0
@@ -0,0 +1,32 @@
+"""
+Tests para sse.py (formato text/event-stream)
+"""
+import pytest
+
+
+def test_stream_head():
+    """Test de cabeceras sin Content-Length y campo retry"""
+    from src.sse import stream_head
+
+    head = stream_head(3000)
+
+    assert head.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert b"Content-Type: text/event-stream\r\n" in head
+    assert b"Content-Length" not in head
+    assert head.endswith(b"\r\n\r\nretry: 3000\n\n")
+
+
+def test_encode_event():
+    """Test de un evento de una línea"""
+    from src.sse import encode_event
+
+    assert encode_event("telemetry", '{"uptime": 3}') == b'event: telemetry\ndata: {"uptime": 3}\n\n'
+
+
+def test_encode_event_multiline_data():
+    """Test de que un salto de línea no corta el evento"""
+    from src.sse import encode_event
+
+    event = encode_event("logs", "a\nb")
+
+    assert event == b"event: logs\ndata: a\ndata: b\n\n"
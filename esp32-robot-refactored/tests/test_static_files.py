@@ -0,0 +1,96 @@
+"""
+Tests para static_files.py (dashboard comprimido en la flash)
+"""
+import gzip
+import sys
+
+
+def write_www(root, files):
+    """
+    Crea un www/ como el de tools/build_dashboard.py
+
+    Args:
+        root: Directorio (pathlib.Path)
+        files (dict): {url: (contenido, content-type, immutable|revalidate)}
+
+    Returns:
+        dict: {url: bytes comprimidos}
+    """
+    compressed = {}
+    lines = []
+    for url, (data, mime, cache) in files.items():
+        target = url.lstrip("/") + ".gz"
+        packed = gzip.compress(data, mtime=0)
+        (root / target).parent.mkdir(parents=True, exist_ok=True)
+        (root / target).write_bytes(packed)
+        lines.append("\t".join([url, target, mime, str(len(packed)), "e" + str(len(lines)), cache]))
+        compressed[url] = packed
+    (root / "manifest.tsv").write_text("\n".join(lines) + "\n")
+    return compressed
+
+
+class ChunkClient:
+    """Socket simulado que guarda cada envío por separado"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def send(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+
+def _build_static(mock_micropython_modules, root, chunk_size=16):
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.static_files import StaticFiles
+
+    return StaticFiles(str(root), chunk_size)
+
+
+def test_missing_manifest(mock_micropython_modules, mock_config, tmp_path):
+    """Test sin dashboard subido: ningún fichero"""
+    static = _build_static(mock_micropython_modules, tmp_path / "www")
+
+    assert static.load() == 0
+    assert static.get("/index.html") is None
+
+
+def test_manifest_entries(mock_micropython_modules, mock_config, tmp_path):
+    """Test del manifiesto: tamaño, ETag entre comillas y caché por fichero"""
+    compressed = write_www(tmp_path, {
+        "/index.html": (b"<html></html>", "text/html; charset=utf-8", "revalidate"),
+        "/assets/index-abc123.js": (b"console.log(1)" * 20, "application/javascript", "immutable"),
+    })
+    static = _build_static(mock_micropython_modules, tmp_path)
+    from src.http_response import CACHE_IMMUTABLE, CACHE_REVALIDATE
+
+    assert static.load() == 2
+
+    index = static.get("/index.html")
+    assert index.content_type == "text/html; charset=utf-8"
+    assert index.size == len(compressed["/index.html"])
+    assert index.etag == b'"e0"'
+    assert index.cache_control == CACHE_REVALIDATE
+    assert static.get("/assets/index-abc123.js").cache_control == CACHE_IMMUTABLE
+
+
+def test_send_in_fixed_chunks(mock_micropython_modules, mock_config, tmp_path):
+    """Test de envío por trozos del buffer preasignado, nunca el fichero entero"""
+    data = bytes(range(256)) * 8
+    compressed = write_www(tmp_path, {
+        "/assets/data.bin": (data, "application/octet-stream", "immutable"),
+    })
+    static = _build_static(mock_micropython_modules, tmp_path, chunk_size=64)
+    from src.http_response import ResponseWriter
+
+    static.load()
+    entry = static.get("/assets/data.bin")
+    client = ChunkClient()
+    writer = ResponseWriter()
+    static.send(client, writer, static.open(entry))
+
+    assert b"".join(client.chunks) == compressed["/assets/data.bin"]
+    assert max(len(chunk) for chunk in client.chunks) <= 64
+    assert writer.bytes_sent == entry.size
+    assert gzip.decompress(b"".join(client.chunks)) == data
@@ -0,0 +1,53 @@
+"""
+Tests para telemetry_format.py (registro binario de telemetría)
+"""
+import struct
+import pytest
+
+
+def test_record_layout_matches_schema():
+    """Test de que el formato ocupa exactamente RECORD_SIZE bytes"""
+    from src.telemetry_format import RECORD_FORMAT, RECORD_SIZE
+
+    assert struct.calcsize(RECORD_FORMAT) == RECORD_SIZE == 16
+
+
+def test_pack_unpack_roundtrip():
+    """Test de ida y vuelta de todos los campos"""
+    from src.telemetry_format import pack_into, unpack, RECORD_SIZE
+
+    buf = bytearray(RECORD_SIZE)
+    pack_into(buf, 42, 123456, 25.5, True, False)
+
+    record = unpack(buf)
+    assert record["seq"] == 42
+    assert record["uptime_ms"] == 123456
+    assert record["distance_cm"] == 25.5
+    assert record["obstacle"] == True
+    assert record["auto_enabled"] == False
+    assert record["distance_valid"] == True
+
+
+def test_invalid_distance_is_flagged():
+    """Test de que cualquier código de error se guarda como -1 sin flag de validez"""
+    from src.telemetry_format import pack_into, unpack, RECORD_SIZE
+
+    buf = bytearray(RECORD_SIZE)
+    pack_into(buf, 1, 0, -2.0, False, True)
+
+    record = unpack(buf)
+    assert record["distance_cm"] == -1.0
+    assert record["distance_valid"] == False
+    assert record["auto_enabled"] == True
+
+
+def test_unpack_rejects_unknown_version():
+    """Test de versión de esquema no soportada"""
+    from src.telemetry_format import pack_into, unpack, RECORD_SIZE
+
+    buf = bytearray(RECORD_SIZE)
+    pack_into(buf, 1, 0, 10.0, False, False)
+    buf[0] = 99
+
+    with pytest.raises(ValueError):
+        unpack(buf)
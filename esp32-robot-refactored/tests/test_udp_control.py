@@ -0,0 +1,193 @@
+"""
+Tests para udp_control.py (canal de control UDP binario)
+"""
+import sys
+import pytest
+
+
+CLIENT = ("192.168.1.50", 40000)
+
+
+class FakeUDPSocket:
+    """Socket UDP simulado con datagramas encolados"""
+
+    def __init__(self):
+        self.incoming = []
+        self.sent = []
+
+    def recvfrom(self, size):
+        if not self.incoming:
+            # Socket no bloqueante sin datos (EAGAIN)
+            raise OSError(11)
+        return self.incoming.pop(0)
+
+    def sendto(self, data, addr):
+        self.sent.append((bytes(data), addr))
+        return len(data)
+
+
+def _build_control(mock_micropython_modules):
+    """UDPControl con motores y seguridad reales sobre los mocks"""
+    sys.modules['time'] = mock_micropython_modules['time'].__class__
+
+    from src.udp_control import UDPControl
+    from src.motor_controller import MotorController
+    from src.logger import Logger
+    from src.security_manager import SecurityManager
+
+    logger = Logger()
+    control = UDPControl(MotorController(), SecurityManager(logger), logger)
+    control.sock = FakeUDPSocket()
+    return control
+
+
+def _queue(control, seq, command, duration=0, token=None, addr=CLIENT):
+    from src.udp_control import encode_command
+    import config
+    if token is None:
+        token = config.SECURITY_TOKEN
+    control.sock.incoming.append((encode_command(seq, command, duration, token), addr))
+
+
+def _acks(control):
+    from src.udp_control import decode_ack
+    return [decode_ack(data) for data, _ in control.sock.sent]
+
+
+def test_udp_command_executes_and_acks(mock_micropython_modules, mock_config):
+    """Test de comando válido: mueve los motores y confirma con su secuencia"""
+    control = _build_control(mock_micropython_modules)
+    from src.udp_control import ACK_OK
+
+    _queue(control, 1, "F")
+    control.poll()
+
+    assert control.motors.in1.value() == 1
+    assert _acks(control) == [(ACK_OK, 1)]
+    assert control.sock.sent[0][1] == CLIENT
+    assert control.executed == 1
+
+
+def test_udp_bad_token(mock_micropython_modules, mock_config):
+    """Test de token inválido: no mueve y cuenta como error de seguridad"""
+    control = _build_control(mock_micropython_modules)
+    from src.udp_control import ACK_BAD_TOKEN
+
+    _queue(control, 1, "F", token="incorrecto")
+    control.poll()
+
+    assert control.motors.in1.value() == 0
+    assert _acks(control) == [(ACK_BAD_TOKEN, 1)]
+    assert control.security.fail_count == 1
+
+
+def test_udp_safe_mode_blocks_commands(mock_micropython_modules, mock_config):
+    """Test de Safe Mode: el comando se rechaza igual que en /move"""
+    control = _build_control(mock_micropython_modules)
+    from src.udp_control import ACK_SAFE_MODE
+    control.security.activate_safe_mode()
+
+    _queue(control, 1, "F")
+    control.poll()
+
+    assert control.motors.in1.value() == 0
+    assert _acks(control) == [(ACK_SAFE_MODE, 1)]
+
+
+def test_udp_drops_out_of_order(mock_micropython_modules, mock_config):
+    """Test de paquetes viejos o repetidos: se descartan sin ack"""
+    control = _build_control(mock_micropython_modules)
+    from src.udp_control import ACK_OK
+
+    _queue(control, 5, "F")
+    control.poll()
+    _queue(control, 3, "B")
+    _queue(control, 5, "B")
+    control.poll()
+
+    assert control.motors.in1.value() == 1
+    assert _acks(control) == [(ACK_OK, 5)]
+    assert control.dropped == 2
+
+    # Otro cliente empieza su propia secuencia
+    _queue(control, 1, "S", addr=("192.168.1.60", 40001))
+    control.poll()
+    assert _acks(control)[-1] == (ACK_OK, 1)
+
+
+def test_udp_only_latest_queued_command_runs(mock_micropython_modules, mock_config):
+    """Test de comandos acumulados: solo se ejecuta el más reciente"""
+    control = _build_control(mock_micropython_modules)
+    from src.udp_control import ACK_OK
+
+    _queue(control, 1, "F")
+    _queue(control, 2, "B")
+    _queue(control, 3, "L")
+    control.poll()
+
+    assert control.executed == 1
+    assert _acks(control) == [(ACK_OK, 3)]
+    # Giro a la izquierda: in2 e in3 activos
+    assert control.motors.in2.value() == 1 and control.motors.in3.value() == 1
+
+
+def test_udp_duration_stops_motors(mock_micropython_modules, mock_config):
+    """Test de duración: los motores se paran al vencer"""
+    mock_time = mock_micropython_modules['time'].__class__
+    control = _build_control(mock_micropython_modules)
+
+    _queue(control, 1, "F", duration=200)
+    control.poll()
+    assert control.motors.in1.value() == 1
+
+    mock_time._ticks += 199
+    control.poll()
+    assert control.motors.in1.value() == 1
+
+    mock_time._ticks += 1
+    control.poll()
+    assert control.motors.in1.value() == 0
+
+
+def test_udp_cancel_keeps_motors(mock_micropython_modules, mock_config):
+    """Test de cancel(): la duración pendiente ya no para lo que mandó otro camino"""
+    mock_time = mock_micropython_modules['time'].__class__
+    control = _build_control(mock_micropython_modules)
+
+    _queue(control, 1, "F", duration=200)
+    control.poll()
+    control.cancel()
+    control.motors.turn_left()
+
+    mock_time._ticks += 200
+    control.poll()
+    assert control.motors.in2.value() == 1 and control.motors.in3.value() == 1
+
+
+def test_udp_invalid_command(mock_micropython_modules, mock_config):
+    """Test de comando desconocido y datagramas malformados"""
+    control = _build_control(mock_micropython_modules)
+    from src.udp_control import ACK_INVALID
+
+    _queue(control, 1, "X")
+    control.sock.incoming.append((b"\x01\x46", CLIENT))
+    control.poll()
+
+    assert _acks(control) == [(ACK_INVALID, 1)]
+    assert control.security.last_error == "udp_invalid_cmd:X"
+
+
+def test_udp_command_cancels_program(mock_micropython_modules, mock_config):
+    """Test de que un comando UDP cancela el programa de movimiento en curso"""
+    control = _build_control(mock_micropython_modules)
+    from src.motion_program import MotionProgram
+
+    control.program = MotionProgram(control.motors, control.logger)
+    control.program.start([("F", 5000)])
+
+    _queue(control, 1, "L")
+    control.poll()
+
+    assert control.program.state == "stopped"
+    # El comando UDP se ejecuta después de cancelar (giro a la izquierda)
+    assert control.motors.in2.value() == 1
@@ -0,0 +1,104 @@
+"""
+Tests para websocket.py (handshake y codificación de tramas)
+"""
+import asyncio
+import os
+import pytest
+
+
+class FakeReader:
+    """StreamReader simulado sobre bytes fijos"""
+
+    def __init__(self, data):
+        self.data = data
+
+    async def readexactly(self, n):
+        if len(self.data) < n:
+            raise EOFError()
+        chunk, self.data = self.data[:n], self.data[n:]
+        return chunk
+
+
+def _client_frame(payload, opcode=0x1, mask=b"\x12\x34\x56\x78", fin=True):
+    """Trama de cliente enmascarada como la envía un navegador"""
+    head = bytes(((0x80 if fin else 0) | opcode,))
+    if len(payload) < 126:
+        head += bytes((0x80 | len(payload),))
+    else:
+        head += bytes((0x80 | 126, len(payload) >> 8, len(payload) & 0xFF))
+    masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return head + mask + masked
+
+
+def test_accept_key_rfc_example():
+    """Test con el ejemplo de la sección 1.3 del RFC 6455"""
+    from src.websocket import accept_key
+
+    assert accept_key("dGhlIHNhbXBsZSBub25jZQ==") == b"s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+
+
+def test_handshake_response():
+    """Test de la respuesta 101 completa"""
+    from src.websocket import handshake_response
+
+    response = handshake_response("dGhlIHNhbXBsZSBub25jZQ==")
+
+    assert response.startswith(b"HTTP/1.1 101 Switching Protocols\r\n")
+    assert b"Upgrade: websocket\r\n" in response
+    assert b"Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=\r\n\r\n" in response
+
+
+def test_encode_frame_lengths():
+    """Test de longitud corta y extendidas de 16 y 64 bits"""
+    from src.websocket import encode_frame, OP_TEXT
+
+    short = encode_frame("hola")
+    assert short == b"\x81\x04hola"
+
+    payload = b"x" * 300
+    extended = encode_frame(payload, OP_TEXT)
+    assert extended[:4] == b"\x81\x7e\x01\x2c"
+    assert extended[4:] == payload
+
+    # Desde 65536 bytes (ej: un volcado grande de logs): 127 + 8 bytes
+    payload = b"x" * 70000
+    large = encode_frame(payload, OP_TEXT)
+    assert large[:10] == b"\x81\x7f\x00\x00\x00\x00\x00\x01\x11\x70"
+    assert large[10:] == payload
+
+
+def test_read_frame_unmasks_payload():
+    """Test de desenmascarado de una trama de texto"""
+    from src.websocket import read_frame, OP_TEXT
+
+    reader = FakeReader(_client_frame(b"move:F"))
+    opcode, payload = asyncio.run(read_frame(reader))
+
+    assert opcode == OP_TEXT
+    assert payload == b"move:F"
+
+
+def test_read_frame_rejects_unmasked():
+    """Test de que una trama sin máscara es un error de protocolo"""
+    from src.websocket import read_frame, WebSocketError
+
+    with pytest.raises(WebSocketError):
+        asyncio.run(read_frame(FakeReader(b"\x81\x02hi")))
+
+
+def test_read_frame_rejects_fragments_and_large_frames():
+    """Test de tramas fragmentadas o mayores que max_size"""
+    from src.websocket import read_frame, WebSocketError
+
+    with pytest.raises(WebSocketError):
+        asyncio.run(read_frame(FakeReader(_client_frame(b"move", fin=False))))
+
+    with pytest.raises(WebSocketError):
+        asyncio.run(read_frame(FakeReader(_client_frame(os.urandom(200)))))
+
+    # Longitud de 64 bits: se lee y se compara con max_size
+    frame = b"\x81\xff" + bytes((0, 0, 0, 0, 0, 0, 0, 4)) + b"\x00" * 4 + b"move"
+    assert asyncio.run(read_frame(FakeReader(frame))) == (0x1, bytearray(b"move"))
+    frame = b"\x81\xff" + bytes((0, 0, 0, 1, 0, 0, 0, 0)) + b"\x00" * 4
+    with pytest.raises(WebSocketError):
+        asyncio.run(read_frame(FakeReader(frame)))
@@ -0,0 +1,107 @@
+"""
+Empaqueta el build del dashboard para servirlo desde la flash del ESP32
+
+Comprime con gzip cada fichero de robot-dashboard/dist (salida de
+`npm run build`) en un directorio www/ con la misma estructura y escribe
+www/manifest.tsv, que src/static_files.py lee al arrancar:
+
+    url<TAB>fichero<TAB>content-type<TAB>bytes<TAB>etag<TAB>immutable|revalidate
+
+Los ficheros de assets/ llevan un hash de Vite en el nombre y se marcan
+como inmutables; el resto (index.html) se revalida con su ETag. La
+compresión es determinista (mtime=0): el mismo build da los mismos ETags.
+
+Uso:
+    python tools/build_dashboard.py ../robot-dashboard/dist www
+    ampy --port /dev/ttyUSB0 put www /www
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import sys
+
+MANIFEST_NAME = "manifest.tsv"
+
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "application/javascript",
+    ".css": "text/css",
+    ".json": "application/json",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".ico": "image/x-icon",
+    ".webmanifest": "application/manifest+json",
+    ".woff2": "font/woff2",
+    ".txt": "text/plain",
+}
+
+# Directorio donde Vite deja los ficheros con hash en el nombre
+HASHED_DIR = "assets/"
+
+
+def content_type(name):
+    """Tipo MIME por extensión (application/octet-stream si no se conoce)"""
+    return CONTENT_TYPES.get(os.path.splitext(name)[1].lower(), "application/octet-stream")
+
+
+def build(dist, out):
+    """
+    Comprime dist en out y escribe el manifiesto
+
+    Args:
+        dist (str): Directorio con la salida de vite build
+        out (str): Directorio de salida (se sube a la flash como /www)
+
+    Returns:
+        list: [(url, fichero, content-type, bytes, etag, caché, bytes originales)]
+    """
+    entries = []
+    for parent, dirs, files in os.walk(dist):
+        dirs.sort()
+        for name in sorted(files):
+            source = os.path.join(parent, name)
+            relative = os.path.relpath(source, dist).replace(os.sep, "/")
+            target = relative + ".gz"
+
+            with open(source, "rb") as f:
+                data = f.read()
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+
+            os.makedirs(os.path.dirname(os.path.join(out, target)), exist_ok=True)
+            with open(os.path.join(out, target), "wb") as f:
+                f.write(compressed)
+
+            cache = "immutable" if relative.startswith(HASHED_DIR) else "revalidate"
+            etag = hashlib.sha1(compressed).hexdigest()[:16]
+            entries.append((
+                "/" + relative, target, content_type(name), len(compressed), etag, cache, len(data)
+            ))
+
+    with open(os.path.join(out, MANIFEST_NAME), "w", newline="\n") as f:
+        for entry in entries:
+            f.write("\t".join(str(field) for field in entry[:6]) + "\n")
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("dist", help="salida de vite build (robot-dashboard/dist)")
+    parser.add_argument("out", help="directorio a subir a la flash como /www")
+    args = parser.parse_args()
+
+    if not os.path.isfile(os.path.join(args.dist, "index.html")):
+        sys.exit("No hay index.html en {} (¿ejecutaste npm run build?)".format(args.dist))
+
+    entries = build(args.dist, args.out)
+    total = 0
+    total_raw = 0
+    for url, target, mime, size, etag, cache, raw in entries:
+        print("{:<40} {:>8} -> {:>7} B  {}".format(url, raw, size, cache))
+        total += size
+        total_raw += raw
+    print("{} ficheros, {} -> {} B en {}".format(len(entries), total_raw, total, args.out))
+
+
+if __name__ == "__main__":
+    main()
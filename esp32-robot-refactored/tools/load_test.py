@@ -0,0 +1,473 @@
+"""
+Generador de carga asyncio para la API HTTP del robot
+
+Simula clientes (dashboards, teleoperación...) que piden rutas a una
+frecuencia fija sobre conexiones HTTP/1.1 persistentes y guarda, por
+ruta, un histograma de latencia de precisión relativa fija (estilo HDR),
+los códigos de estado (429 = _check_rate_limit) y los errores de red.
+
+La carga es de lazo abierto: cada petición tiene su instante programado y
+la latencia se mide desde ese instante, no desde que sale. Si el robot se
+atasca, las peticiones que esperan conexión cuentan su espera (sin
+"coordinated omission").
+
+Clientes: NOMBRE=RUTA[|RUTA...]@HZ[xN][/CONEXIONES]. Las rutas se piden por
+turnos; {token} se sustituye por --token. Sin --client se usa el escenario
+por defecto: cinco dashboards sondeando /snapshot a 1 Hz y un /move a 20 Hz.
+
+Uso:
+    python tools/load_test.py 192.168.4.1 --duration 30 --json informe.json --csv informe.csv
+    python tools/load_test.py --emulator sync --distinct-sources --baseline benchmarks/load_baseline.json
+    python tools/load_test.py 192.168.4.1 --client 'teleop=/move?dir=F|/move?dir=S@20'
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import emulator
+
+config = emulator.install()
+
+
+DEFAULT_CLIENTS = (
+    "dashboard=/snapshot?fields=status,telemetry,security,logs&token={token}@1x5",
+    "teleop=/move?dir=F|/move?dir=L|/move?dir=F|/move?dir=R@20",
+)
+
+# Bits de precisión por potencia de 2: error relativo < 1/64 (~1.6%)
+SUB_BUCKET_BITS = 7
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Histograma log-lineal de latencias en µs (precisión relativa fija)
+
+    Cada valor cae en un cubo de anchura 2^e con e = bits(v) - 7, así que
+    el error es < 1.6% desde 1 µs hasta minutos con unos cientos de cubos.
+
+    Attributes:
+        counts (dict): {límite inferior del cubo: muestras}
+        total (int): Muestras registradas
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket(value):
+        """Límite inferior del cubo de value"""
+        shift = max(0, value.bit_length() - SUB_BUCKET_BITS)
+        return (value >> shift) << shift
+
+    @staticmethod
+    def bucket_high(low):
+        """Mayor valor equivalente al cubo que empieza en low"""
+        shift = max(0, low.bit_length() - SUB_BUCKET_BITS)
+        return low + (1 << shift) - 1
+
+    def record(self, value_us):
+        value = max(0, int(value_us))
+        low = self.bucket(value)
+        self.counts[low] = self.counts.get(low, 0) + 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        """Valor (µs) por debajo del que queda el p% de las muestras"""
+        if not self.total:
+            return None
+        rank = max(1, -(-self.total * p // 100))
+        seen = 0
+        for low in sorted(self.counts):
+            seen += self.counts[low]
+            if seen >= rank:
+                return min(self.bucket_high(low), self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else None
+
+    def buckets(self):
+        """[[límite inferior µs, muestras], ...] ordenados"""
+        return [[low, self.counts[low]] for low in sorted(self.counts)]
+
+
+class RouteStats:
+    """Resultados de una ruta: latencias, códigos de estado y errores"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.statuses = {}
+        self.errors = {}
+
+    def add(self, status, latency_us):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.latency.record(latency_us)
+
+    def error(self, name):
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self, seconds):
+        """Resumen serializable (latencias en ms)"""
+        latency = self.latency
+        ok = sum(count for status, count in self.statuses.items() if 200 <= status < 400)
+        result = {
+            "requests": latency.total + sum(self.errors.values()),
+            "responses": latency.total,
+            "rps": round(latency.total / seconds, 2),
+            "ok": ok,
+            "rate_limited": self.statuses.get(429, 0),
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "errors": dict(sorted(self.errors.items())),
+            "mean_ms": _ms(latency.mean()),
+            "max_ms": _ms(latency.max if latency.total else None),
+            "histogram_us": latency.buckets(),
+        }
+        for p in PERCENTILES:
+            result["p{}_ms".format(p)] = _ms(latency.percentile(p))
+        return result
+
+
+def _ms(value_us):
+    return None if value_us is None else round(value_us / 1000, 3)
+
+
+class Connection:
+    """Conexión HTTP/1.1 persistente; se reabre sola si el robot la cierra"""
+
+    def __init__(self, host, port, source=None):
+        self.host = host
+        self.port = port
+        self.source = source
+        self.reader = None
+        self.writer = None
+        self.opened = 0
+
+    async def request(self, path):
+        """
+        Returns:
+            int: Código de estado (el cuerpo se lee y se descarta)
+        """
+        if self.writer is None:
+            local_addr = (self.source, 0) if self.source else None
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port, local_addr=local_addr
+            )
+            self.opened += 1
+
+        self.writer.write(
+            "GET {} HTTP/1.1\r\nHost: {}\r\n\r\n".format(path, self.host).encode()
+        )
+        await self.writer.drain()
+
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionResetError("conexión cerrada sin respuesta")
+        status = int(line.split()[1])
+
+        length = None
+        chunked = False
+        close = line.startswith(b"HTTP/1.0")
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "transfer-encoding":
+                chunked = "chunked" in value
+            elif name == "connection":
+                close = value == "close"
+
+        if chunked:
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif length is not None:
+            await self.reader.readexactly(length)
+        else:
+            await self.reader.read()
+            close = True
+
+        if close:
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = None
+        self.writer = None
+
+
+class Client:
+    """Cliente simulado: rutas por turnos a frecuencia fija con su pool de conexiones"""
+
+    def __init__(self, name, paths, rate, connections, host, port, source=None):
+        self.name = name
+        self.paths = paths
+        self.rate = rate
+        self.pool = asyncio.Queue()
+        self.connections = [Connection(host, port, source) for _ in range(connections)]
+        for connection in self.connections:
+            self.pool.put_nowait(connection)
+
+    async def run(self, start, duration, stats, timeout):
+        """Programa una petición cada 1/rate s hasta agotar duration"""
+        loop = asyncio.get_running_loop()
+        tasks = []
+        index = 0
+        while True:
+            scheduled = start + index / self.rate
+            if scheduled - start >= duration:
+                break
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            path = self.paths[index % len(self.paths)]
+            tasks.append(asyncio.ensure_future(self._fetch(path, scheduled, stats, timeout)))
+            index += 1
+        await asyncio.gather(*tasks)
+        for connection in self.connections:
+            connection.close()
+
+    async def _fetch(self, path, scheduled, stats, timeout):
+        loop = asyncio.get_running_loop()
+        route = stats.setdefault(path.split("?", 1)[0], RouteStats())
+        connection = await self.pool.get()
+        try:
+            status = await asyncio.wait_for(connection.request(path), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            connection.close()
+            route.error(type(e).__name__)
+        else:
+            route.add(status, (loop.time() - scheduled) * 1000000)
+        finally:
+            self.pool.put_nowait(connection)
+
+
+def parse_client(spec, token):
+    """
+    NOMBRE=RUTA[|RUTA...]@HZ[xN][/CONEXIONES] -> (nombre, rutas, hz, n, conexiones)
+    """
+    name, _, rest = spec.partition("=")
+    paths, _, timing = rest.rpartition("@")
+    if not name or not paths or not timing:
+        raise argparse.ArgumentTypeError("cliente inválido: " + spec)
+
+    connections = 1
+    if "/" in timing:
+        timing, connections = timing.split("/", 1)
+        connections = int(connections)
+    count = 1
+    if "x" in timing:
+        timing, count = timing.split("x", 1)
+        count = int(count)
+    rate = float(timing)
+    if rate <= 0 or count < 1 or connections < 1:
+        raise argparse.ArgumentTypeError("cliente inválido: " + spec)
+
+    return name, [path.replace("{token}", token) for path in paths.split("|")], rate, count, connections
+
+
+def parse_target(target):
+    """host[:puerto] o http://host[:puerto] -> (host, puerto)"""
+    if "://" in target:
+        target = target.split("://", 1)[1]
+    target = target.rstrip("/")
+    host, _, port = target.partition(":")
+    return host, int(port) if port else 80
+
+
+async def run(clients, host, port, duration, timeout, distinct_sources):
+    """
+    Returns:
+        dict: {ruta: RouteStats}
+    """
+    stats = {}
+    runners = []
+    source_index = 2
+    for name, paths, rate, count, connections in clients:
+        for _ in range(count):
+            # Con loopback, una IP de origen por cliente (como dispositivos distintos)
+            source = "127.0.0.{}".format(source_index) if distinct_sources else None
+            source_index += 1
+            runners.append(Client(name, paths, rate, connections, host, port, source))
+
+    start = asyncio.get_running_loop().time() + 0.1
+    await asyncio.gather(*(client.run(start, duration, stats, timeout) for client in runners))
+    return stats
+
+
+def build_report(stats, args, clients):
+    routes = {route: stats[route].summary(args.duration) for route in sorted(stats)}
+    return {
+        "target": args.target,
+        "emulator": args.emulator,
+        "duration_s": args.duration,
+        "clients": [
+            {"name": name, "paths": paths, "rate_hz": rate, "count": count, "connections": connections}
+            for name, paths, rate, count, connections in clients
+        ],
+        "total_rps": round(sum(route["rps"] for route in routes.values()), 2),
+        "routes": routes,
+    }
+
+
+CSV_FIELDS = ("route", "requests", "responses", "rps", "ok", "rate_limited", "errors",
+              "mean_ms", "p50_ms", "p90_ms", "p99_ms", "p99.9_ms", "max_ms")
+
+
+def write_csv(report, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        for route, summary in report["routes"].items():
+            row = dict(summary, route=route, errors=sum(summary["errors"].values()))
+            writer.writerow([row[field] for field in CSV_FIELDS])
+
+
+def compare(report, baseline, tolerance, slack_ms):
+    """
+    Compara con un informe guardado
+
+    Una ruta empeora si su p50 o su p99 suben más de tolerance (fracción)
+    más slack_ms (el jitter del host en latencias de pocos ms), si su
+    throughput baja más de tolerance, o si aparecen errores o 429 nuevos.
+
+    Returns:
+        list: Descripciones de las regresiones (vacía si no hay)
+    """
+    regressions = []
+    for route, before in baseline["routes"].items():
+        after = report["routes"].get(route)
+        if after is None:
+            regressions.append("{}: sin respuestas".format(route))
+            continue
+
+        for key in ("p50_ms", "p99_ms"):
+            if before[key] is not None and after[key] is not None and \
+                    after[key] > before[key] * (1 + tolerance) + slack_ms:
+                regressions.append("{}: {} {} -> {}".format(route, key, before[key], after[key]))
+        if after["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append("{}: {} -> {} resp/s".format(route, before["rps"], after["rps"]))
+
+        if after["rate_limited"] > before["rate_limited"] * (1 + tolerance) + 1:
+            regressions.append("{}: 429 {} -> {}".format(route, before["rate_limited"], after["rate_limited"]))
+        errors_before = sum(before["errors"].values())
+        errors_after = sum(after["errors"].values())
+        if errors_after > errors_before * (1 + tolerance) + 1:
+            regressions.append("{}: errores {} -> {}".format(route, errors_before, errors_after))
+    return regressions
+
+
+def start_emulator(mode, port):
+    """Arranca el firmware en el emulador y espera a que escuche"""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "emulator", "--port", str(port), "--mode", mode],
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    sys.exit("El emulador no arrancó en el puerto {}".format(port))
+
+
+def print_report(report):
+    print("{:<12} {:>7} {:>8} {:>6} {:>6} {:>9} {:>9} {:>9} {:>9}".format(
+        "ruta", "resp", "resp/s", "429", "err", "p50 ms", "p90 ms", "p99 ms", "max ms"))
+    for route, s in report["routes"].items():
+        print("{:<12} {:>7} {:>8} {:>6} {:>6} {:>9} {:>9} {:>9} {:>9}".format(
+            route, s["responses"], s["rps"], s["rate_limited"], sum(s["errors"].values()),
+            s["p50_ms"], s["p90_ms"], s["p99_ms"], s["max_ms"]))
+    print("Total: {} resp/s".format(report["total_rps"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("target", nargs="?", help="IP o URL del robot (no hace falta con --emulator)")
+    parser.add_argument("--emulator", choices=("sync", "async"),
+                        help="arranca el firmware en el emulador local con este servidor")
+    parser.add_argument("--port", type=int, default=18100, help="puerto del emulador")
+    parser.add_argument("--client", action="append", default=None,
+                        help="NOMBRE=RUTA[|RUTA...]@HZ[xN][/CONEXIONES] (repetible)")
+    parser.add_argument("--token", default=config.SECURITY_TOKEN)
+    parser.add_argument("--duration", type=float, default=20.0, help="segundos de carga")
+    parser.add_argument("--timeout", type=float, default=5.0, help="timeout por petición (s)")
+    parser.add_argument("--distinct-sources", action="store_true",
+                        help="una IP 127.0.0.x por cliente (solo con destino loopback)")
+    parser.add_argument("--json", help="guarda el informe JSON")
+    parser.add_argument("--csv", help="guarda el resumen por ruta en CSV")
+    parser.add_argument("--baseline", help="informe JSON con el que comparar (sale con 1 si empeora)")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="empeoramiento admitido respecto al baseline (fracción)")
+    parser.add_argument("--slack-ms", type=float, default=10.0,
+                        help="margen absoluto de latencia sobre la tolerancia (ms)")
+    args = parser.parse_args()
+
+    if args.emulator is None and args.target is None:
+        parser.error("indica el robot o --emulator")
+
+    clients = [parse_client(spec, args.token) for spec in (args.client or DEFAULT_CLIENTS)]
+
+    proc = None
+    if args.emulator:
+        proc = start_emulator(args.emulator, args.port)
+        args.target = "127.0.0.1:{}".format(args.port)
+    host, port = parse_target(args.target)
+
+    try:
+        stats = asyncio.run(run(clients, host, port, args.duration, args.timeout, args.distinct_sources))
+    finally:
+        if proc is not None:
+            proc.kill()
+            proc.wait()
+
+    report = build_report(stats, args, clients)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if args.csv:
+        write_csv(report, args.csv)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance, args.slack_ms)
+        if regressions:
+            print("\nRegresiones respecto a {}:".format(args.baseline))
+            for regression in regressions:
+                print("  " + regression)
+            sys.exit(1)
+        print("\nSin regresiones respecto a {} (tolerancia {:.0%})".format(args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Grabación y decodificación de telemetría binaria (/telemetry?fmt=bin)
+
+Dos modos:
+    record  Pide /telemetry?fmt=bin a una frecuencia fija y añade cada
+            registro de 16 bytes a un fichero.
+    decode  Lee un fichero de registros concatenados como arrays de NumPy
+            y resume la sesión (o la exporta a CSV).
+
+El esquema es el de src/telemetry_format.py; decode() se puede importar
+desde un notebook para analizar las grabaciones.
+
+Uso:
+    python tools/telemetry_decode.py record 192.168.4.1 sesion.bin --rate 20 --seconds 60
+    python tools/telemetry_decode.py decode sesion.bin [--csv sesion.csv]
+
+Requiere NumPy en el host (pip install numpy).
+"""
+import argparse
+import os
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emulator
+
+emulator.install()
+
+import telemetry_format  # noqa: E402
+from telemetry_format import (  # noqa: E402
+    SCHEMA_VERSION, RECORD_SIZE, FLAG_OBSTACLE, FLAG_AUTO, FLAG_DISTANCE_VALID
+)
+
+
+# Campos de la versión 1 con sus offsets (ver telemetry_format.py)
+FIELDS = (
+    ("version", "u1", 0),
+    ("flags", "u1", 1),
+    ("size", "<u2", 2),
+    ("seq", "<u4", 4),
+    ("uptime_ms", "<u4", 8),
+    ("distance_cm", "<f4", 12),
+)
+
+
+def record_dtype(size=RECORD_SIZE):
+    """
+    dtype de NumPy para registros de `size` bytes
+
+    Las versiones futuras solo añaden campos al final: con itemsize = size
+    se leen los campos conocidos y se salta el resto.
+    """
+    return np.dtype({
+        "names": [name for name, _, _ in FIELDS],
+        "formats": [fmt for _, fmt, _ in FIELDS],
+        "offsets": [offset for _, _, offset in FIELDS],
+        "itemsize": size,
+    })
+
+
+def decode(data):
+    """
+    Convierte registros concatenados en arrays de NumPy
+
+    Args:
+        data (bytes): Contenido de una grabación
+
+    Returns:
+        dict: {campo: np.ndarray} con seq, uptime_ms, distance_cm (NaN si
+            no es válida), obstacle, auto_enabled y distance_valid
+
+    Raises:
+        ValueError: Si la grabación está truncada o mezcla esquemas
+    """
+    if not data:
+        return {name: np.empty(0) for name in
+                ("seq", "uptime_ms", "distance_cm", "obstacle", "auto_enabled", "distance_valid")}
+
+    size = int.from_bytes(data[2:4], "little")
+    if size < RECORD_SIZE or len(data) % size:
+        raise ValueError("grabación truncada o tamaño de registro inválido")
+
+    records = np.frombuffer(data, dtype=record_dtype(size))
+    if np.any(records["version"] < SCHEMA_VERSION) or np.any(records["size"] != size):
+        raise ValueError("la grabación mezcla versiones del esquema")
+
+    flags = records["flags"]
+    valid = (flags & FLAG_DISTANCE_VALID) != 0
+    return {
+        "seq": records["seq"].astype(np.int64),
+        "uptime_ms": records["uptime_ms"].astype(np.int64),
+        "distance_cm": np.where(valid, records["distance_cm"], np.nan).astype(np.float32),
+        "obstacle": (flags & FLAG_OBSTACLE) != 0,
+        "auto_enabled": (flags & FLAG_AUTO) != 0,
+        "distance_valid": valid,
+    }
+
+
+def record(args):
+    """Graba --seconds segundos a --rate Hz en el fichero de salida"""
+    url = "http://{}/telemetry?fmt=bin".format(args.host)
+    period = 1.0 / args.rate
+    deadline = time.monotonic() + args.seconds
+    next_poll = time.monotonic()
+    count = errors = 0
+
+    with open(args.file, "ab") as out:
+        while time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(url, timeout=args.timeout) as response:
+                    data = response.read()
+                telemetry_format.unpack(data)
+                out.write(data)
+                count += 1
+            except (OSError, ValueError):
+                errors += 1
+
+            next_poll += period
+            time.sleep(max(0.0, next_poll - time.monotonic()))
+
+    print("Registros: {}  errores: {}  ({} bytes)".format(count, errors, count * RECORD_SIZE))
+
+
+def summarize(args):
+    """Resume una grabación y opcionalmente la exporta a CSV"""
+    with open(args.file, "rb") as f:
+        columns = decode(f.read())
+
+    seq = columns["seq"]
+    print("Registros: {}".format(len(seq)))
+    if not len(seq):
+        return
+
+    # Muestras perdidas: huecos en la secuencia (un reinicio la devuelve a 1)
+    steps = np.diff(seq)
+    lost = int(np.sum(steps[steps > 1] - 1))
+    restarts = int(np.sum(steps <= 0))
+    uptime = columns["uptime_ms"]
+    distance = columns["distance_cm"]
+    valid = columns["distance_valid"]
+
+    print("Secuencia: {} -> {}  perdidas: {}  reinicios: {}".format(seq[0], seq[-1], lost, restarts))
+    print("Uptime: {:.1f} s -> {:.1f} s".format(uptime[0] / 1000, uptime[-1] / 1000))
+    if len(uptime) > 1:
+        intervals = np.diff(uptime)
+        print("Intervalo ms  p50 {:.0f}  p95 {:.0f}  máx {:.0f}".format(
+            np.percentile(intervals, 50), np.percentile(intervals, 95), intervals.max()
+        ))
+    if valid.any():
+        print("Distancia cm  mín {:.1f}  media {:.1f}  máx {:.1f}  ({:.0%} válidas)".format(
+            np.nanmin(distance), np.nanmean(distance), np.nanmax(distance), valid.mean()
+        ))
+    print("Obstáculo {:.0%}  modo auto {:.0%}".format(
+        columns["obstacle"].mean(), columns["auto_enabled"].mean()
+    ))
+
+    if args.csv:
+        names = ("seq", "uptime_ms", "distance_cm", "obstacle", "auto_enabled")
+        table = np.column_stack([columns[name].astype(np.float64) for name in names])
+        np.savetxt(args.csv, table, delimiter=",", header=",".join(names), comments="",
+                   fmt=("%d", "%d", "%.1f", "%d", "%d"))
+        print("CSV: " + args.csv)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    record_parser = modes.add_parser("record")
+    record_parser.add_argument("host", help="IP del robot")
+    record_parser.add_argument("file", help="fichero de salida (se añade al final)")
+    record_parser.add_argument("--rate", type=float, default=10.0, help="muestras por segundo")
+    record_parser.add_argument("--seconds", type=float, default=30.0)
+    record_parser.add_argument("--timeout", type=float, default=1.0, help="timeout por petición (s)")
+
+    decode_parser = modes.add_parser("decode")
+    decode_parser.add_argument("file", help="grabación de registros binarios")
+    decode_parser.add_argument("--csv", help="exportar las columnas a CSV")
+
+    args = parser.parse_args()
+    if args.mode == "record":
+        record(args)
+    else:
+        summarize(args)
+
+
+if __name__ == "__main__":
+    main()
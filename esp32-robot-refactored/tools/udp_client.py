@@ -0,0 +1,164 @@
+"""
+Cliente de host para el canal de control UDP del robot
+
+Dos modos:
+    drive  Lee comandos de la entrada estándar ("F", "L 300", "S") y los
+           envía uno a uno mostrando el ack y su tiempo de ida y vuelta.
+    bench  Envía N comandos a una frecuencia fija y resume el RTT
+           (mín/p50/p95/máx) y los paquetes sin ack.
+
+Uso:
+    python tools/udp_client.py 192.168.4.1 --token TOKEN drive
+    python tools/udp_client.py 192.168.4.1 --token TOKEN bench --count 500 --rate 50
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emulator
+
+config = emulator.install()
+
+from udp_control import (  # noqa: E402
+    encode_command, decode_ack, ACK_OK, ACK_BAD_TOKEN, ACK_SAFE_MODE, ACK_INVALID
+)
+
+
+STATUS_NAMES = {
+    ACK_OK: "ok",
+    ACK_BAD_TOKEN: "token inválido",
+    ACK_SAFE_MODE: "safe mode",
+    ACK_INVALID: "comando inválido",
+}
+
+
+class RobotUDPClient:
+    """Envía comandos numerados y empareja los acks por secuencia"""
+
+    def __init__(self, host, port, token):
+        self.addr = (host, port)
+        self.token = token
+        # La secuencia arranca en el reloj para no chocar con una sesión anterior
+        self.seq = int(time.time() * 1000) & 0x7FFFFFFF
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, command, duration_ms=0):
+        """Envía un comando y devuelve (secuencia, instante de envío)"""
+        self.seq += 1
+        sent_at = time.perf_counter()
+        self.sock.sendto(encode_command(self.seq, command, duration_ms, self.token), self.addr)
+        return self.seq, sent_at
+
+    def receive(self, timeout):
+        """Espera un ack: (estado, secuencia, instante) o None si vence el timeout"""
+        self.sock.settimeout(timeout)
+        try:
+            data, _ = self.sock.recvfrom(64)
+        except socket.timeout:
+            return None
+        ack = decode_ack(data)
+        if ack is None:
+            return None
+        return ack[0], ack[1], time.perf_counter()
+
+
+def drive(client, args):
+    """Modo interactivo: un comando por línea"""
+    print("Comandos: F, B, L, R, S [duración_ms]. Ctrl+D para salir.")
+    for line in sys.stdin:
+        parts = line.split()
+        if not parts:
+            continue
+        duration = int(parts[1]) if len(parts) > 1 else args.duration
+        seq, sent_at = client.send(parts[0][0].upper(), duration)
+
+        deadline = sent_at + args.timeout
+        while True:
+            ack = client.receive(max(0.0, deadline - time.perf_counter()))
+            if ack is None:
+                print("#{} sin ack".format(seq))
+                break
+            status, ack_seq, received_at = ack
+            if ack_seq == seq:
+                print("#{} {} en {:.2f} ms".format(
+                    seq, STATUS_NAMES.get(status, status), (received_at - sent_at) * 1000
+                ))
+                break
+
+
+def _percentile(values, p):
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def bench(client, args):
+    """Envía --count comandos a --rate Hz y resume el RTT"""
+    pending = {}
+    rtts = []
+    statuses = {}
+    period = 1.0 / args.rate
+    next_send = time.perf_counter()
+
+    for _ in range(args.count):
+        seq, sent_at = client.send(args.command, args.duration)
+        pending[seq] = sent_at
+        next_send += period
+
+        # Recoger acks hasta el siguiente envío
+        while True:
+            wait = next_send - time.perf_counter()
+            if wait <= 0:
+                break
+            ack = client.receive(wait)
+            if ack is not None and ack[1] in pending:
+                status, ack_seq, received_at = ack
+                rtts.append((received_at - pending.pop(ack_seq)) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    # Últimos acks en vuelo
+    deadline = time.perf_counter() + args.timeout
+    while pending and time.perf_counter() < deadline:
+        ack = client.receive(max(0.0, deadline - time.perf_counter()))
+        if ack is not None and ack[1] in pending:
+            status, ack_seq, received_at = ack
+            rtts.append((received_at - pending.pop(ack_seq)) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    print("Enviados: {}  con ack: {}  sin ack: {}".format(args.count, len(rtts), len(pending)))
+    for status, count in sorted(statuses.items()):
+        print("  {:<18} {}".format(STATUS_NAMES.get(status, status), count))
+    if rtts:
+        rtts.sort()
+        print("RTT ms  mín {:.2f}  p50 {:.2f}  p95 {:.2f}  máx {:.2f}  media {:.2f}".format(
+            rtts[0], _percentile(rtts, 50), _percentile(rtts, 95), rtts[-1], sum(rtts) / len(rtts)
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("host", help="IP del robot")
+    parser.add_argument("--port", type=int, default=config.UDP_CONTROL_PORT)
+    parser.add_argument("--token", default=config.SECURITY_TOKEN)
+    parser.add_argument("--duration", type=int, default=0, help="duración por comando (ms)")
+    parser.add_argument("--timeout", type=float, default=0.5, help="espera máxima de un ack (s)")
+    modes = parser.add_subparsers(dest="mode", required=True)
+    modes.add_parser("drive")
+    bench_parser = modes.add_parser("bench")
+    bench_parser.add_argument("--count", type=int, default=200)
+    bench_parser.add_argument("--rate", type=float, default=20.0, help="comandos por segundo")
+    bench_parser.add_argument("--command", default="S", help="comando a repetir (S no mueve el robot)")
+    args = parser.parse_args()
+
+    client = RobotUDPClient(args.host, args.port, args.token)
+    if args.mode == "drive":
+        drive(client, args)
+    else:
+        bench(client, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,12 @@
 import { useEffect, useState } from "react";
 import Dashboard from "./components/Dashboard";
 import { API_URL } from "./hooks/useRobotApi";
+import useStatus from "./hooks/useStatus";
 import "./styles.css";
 
 export default function App() {
   const [robotIP, setRobotIP] = useState(null);
   const [isRestarting, setIsRestarting] = useState(false);
-  const [statusData, setStatusData] = useState(null);
 
   // Obtener IP del robot desde /status
   const loadRobotIP = async () => {
@@ -21,23 +21,8 @@ export default function App() {
     }
   };
 
-  // Polling de status - pausado durante reinicio
-  useEffect(() => {
-    if (!isRestarting) {
-      const checkStatus = async () => {
-        try {
-          const res = await fetch(`${API_URL}/status`);
-          const data = await res.json();
-          setStatusData(data);
-        } catch (e) {
-          setStatusData(null);
-        }
-      };
-      checkStatus();
-      const id = setInterval(checkStatus, 1000);
-      return () => clearInterval(id);
-    }
-  }, [isRestarting]);
+  // Status por WebSocket (polling como respaldo) - pausado durante reinicio
+  const statusData = useStatus(!isRestarting);
 
   useEffect(() => {
     loadRobotIP();
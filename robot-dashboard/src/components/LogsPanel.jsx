@@ -1,24 +1,28 @@
-import { useEffect, useState } from "react";
 import PropTypes from 'prop-types';
-import { apiGet } from "../hooks/useRobotApi";
+import useRobotStream from "../hooks/useRobotStream";
+
+// Igual que MAX_LOG_ENTRIES en config.py del ESP32
+const MAX_LOGS = 50;
+
+// Los mensajes de logs traen {logs, head, gap}: head es la secuencia de la
+// última entrada. Solo se añaden las entradas con secuencia mayor que la que
+// ya se muestra; con hueco (gap) o tras un reinicio se sustituye la lista.
+function appendLogs(prev, d) {
+  if (!d || !d.logs) return prev;
+  if (!prev || d.gap || d.head < prev.head) {
+    return { logs: d.logs.slice(-MAX_LOGS), head: d.head };
+  }
+  const fresh = d.logs.slice(Math.max(0, d.logs.length - (d.head - prev.head)));
+  return { logs: prev.logs.concat(fresh).slice(-MAX_LOGS), head: d.head };
+}
 
 function LogsPanel({ robotIP, isRestarting }) {
-  const [logs, setLogs] = useState([]);
-
-  const load = async () => {
-    if (!robotIP || isRestarting) return;
-
-    const d = await apiGet("/logs", true); // Requiere autenticación
-    if (d && d.logs) setLogs(d.logs);
-  };
-
-  useEffect(() => {
-    if (!isRestarting) {
-      load();
-      const interval = setInterval(load, 1000);
-      return () => clearInterval(interval);
-    }
-  }, [robotIP, isRestarting]);
+  // Requiere autenticación (el token va en la URL del WebSocket y de /snapshot)
+  const state = useRobotStream("logs", {
+    enabled: !!robotIP && !isRestarting,
+    reduce: appendLogs
+  });
+  const logs = state ? state.logs : [];
 
   return (
     <div className="card">
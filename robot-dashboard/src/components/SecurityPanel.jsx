@@ -1,9 +1,11 @@
 import { useEffect, useState } from "react";
 import PropTypes from 'prop-types';
 import { apiGet, restartESP32, API_URL } from "../hooks/useRobotApi";
+import useRobotStream from "../hooks/useRobotStream";
 
 function SecurityPanel({ isRestarting, setIsRestarting }) {
   const [sec, setSec] = useState(null);
+  const streamed = useRobotStream("security", { enabled: !isRestarting });
 
   async function refresh(){
     if (!isRestarting) {
@@ -53,13 +55,10 @@ function SecurityPanel({ isRestarting, setIsRestarting }) {
     }
   }
 
+  // Cambios enviados por el robot (o polling si no hay WebSocket)
   useEffect(()=>{
-    if (!isRestarting) {
-      refresh();
-      const id=setInterval(refresh,1500);
-      return()=>clearInterval(id);
-    }
-  },[isRestarting]);
+    if (streamed) setSec(streamed);
+  },[streamed]);
 
   if (isRestarting) return (
     <div className="card">
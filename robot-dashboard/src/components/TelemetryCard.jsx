@@ -1,18 +1,8 @@
-import { useEffect, useState } from "react";
 import PropTypes from 'prop-types';
-import { apiGet } from "../hooks/useRobotApi";
+import useTelemetry from "../hooks/useTelemetry";
 
 function TelemetryCard({ isRestarting }) {
-  const [t, setT] = useState(null);
-
-  useEffect(() => {
-    if (!isRestarting) {
-      const f = async () => setT(await apiGet("/telemetry"));
-      f();
-      const id = setInterval(f, 800);
-      return () => clearInterval(id);
-    }
-  }, [isRestarting]);
+  const t = useTelemetry(!isRestarting);
 
   if (isRestarting) return (
     <div className="card">
@@ -67,6 +57,17 @@ function TelemetryCard({ isRestarting }) {
             </span>
           </div>
         </div>
+        {t.program && t.program.state === "running" && (
+          <div className="metric">
+            <div className="metric-label">Programa</div>
+            <div className="metric-value">
+              {t.program.segment}/{t.program.segments}
+              <span className="metric-unit">
+                {Math.round(t.program.elapsed_ms / 100) / 10}/{t.program.total_ms / 1000} s
+              </span>
+            </div>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -1,6 +1,8 @@
 // Leer IP del robot desde variables de entorno
-// Si no está definida, usar localhost como fallback
-export const API_URL = import.meta.env.VITE_ROBOT_IP || "http://localhost";
+// Si no está definida: en desarrollo localhost; en el build servido por
+// el propio ESP32 (npm run build:robot), el mismo origen que la página
+export const API_URL = import.meta.env.VITE_ROBOT_IP ||
+  (import.meta.env.DEV ? "http://localhost" : window.location.origin);
 
 // Token de seguridad para endpoints protegidos
 // Debe coincidir con SECURITY_TOKEN en config.py del ESP32
@@ -31,6 +33,132 @@ export async function apiGet(path, requiresAuth = false) {
   }
 }
 
-export async function move(dir) { return apiGet("/move?dir=" + dir); }
+// ==========================================
+// Estado del robot: un WebSocket por dashboard y /snapshot como respaldo
+// ==========================================
+
+// ws://IP/ws?token=... (con token el robot envía también los logs)
+const WS_URL = API_URL.replace(/^http/, "ws") + addToken("/ws");
+const WS_RETRY_MS = 3000;
+const SNAPSHOT_POLL_MS = 1000;
+
+const listeners = {};  // {sección: Set(callback)}
+let socket = null;
+let socketOpen = false;
+let retryTimer = null;
+let pollTimer = null;
+let pendingFields = null;
+let subscriptions = 0;
+let logHead = 0;  // Secuencia del último log recibido (cursor de ?since=)
+
+function emit(type, data) {
+  if (type === "logs" && data && data.head !== undefined) logHead = data.head;
+  (listeners[type] || []).forEach((callback) => callback(data));
+}
+
+function subscribedFields() {
+  return Object.keys(listeners).filter((type) => listeners[type].size > 0);
+}
+
+// Una sola petición /snapshot con las secciones pedidas
+async function pollSnapshot(fields = subscribedFields()) {
+  if (fields.length === 0) return;
+
+  // Con logs se piden solo las entradas posteriores a la última recibida
+  const withLogs = fields.includes("logs");
+  const since = withLogs && logHead > 0 ? "&since=" + logHead : "";
+  const data = await apiGet("/snapshot?fields=" + fields.join(",") + since, withLogs);
+  fields.forEach((field) => emit(field, data ? data[field] : null));
+}
+
+// Agrupa en un /snapshot las secciones que se suscriben en el mismo render
+function requestSnapshot(type) {
+  if (pendingFields) {
+    pendingFields.add(type);
+    return;
+  }
+  pendingFields = new Set([type]);
+  setTimeout(() => {
+    const fields = [...pendingFields];
+    pendingFields = null;
+    pollSnapshot(fields);
+  }, 0);
+}
+
+function startPolling() {
+  if (pollTimer || subscriptions === 0) return;
+  pollSnapshot();
+  pollTimer = setInterval(pollSnapshot, SNAPSHOT_POLL_MS);
+}
+
+function stopPolling() {
+  clearInterval(pollTimer);
+  pollTimer = null;
+}
+
+function connectSocket() {
+  if (socket || subscriptions === 0 || typeof WebSocket === "undefined") return;
+
+  socket = new WebSocket(WS_URL);
+  socket.onopen = () => {
+    socketOpen = true;
+    stopPolling();
+  };
+  socket.onmessage = (event) => {
+    try {
+      const message = JSON.parse(event.data);
+      emit(message.type, message.data);
+    } catch (e) {
+      if (import.meta.env.DEV) console.error("Mensaje WS inválido:", event.data);
+    }
+  };
+  socket.onclose = () => {
+    socket = null;
+    socketOpen = false;
+    // Volver al polling y reintentar mientras algún componente siga suscrito
+    if (subscriptions > 0) {
+      startPolling();
+      retryTimer = setTimeout(connectSocket, WS_RETRY_MS);
+    }
+  };
+  socket.onerror = () => socket && socket.close();
+}
+
+// Suscribirse a una sección ("status", "telemetry", "security", "logs")
+// Devuelve la función para cancelar la suscripción
+export function subscribe(type, callback) {
+  if (!listeners[type]) listeners[type] = new Set();
+  listeners[type].add(callback);
+  subscriptions++;
+  connectSocket();
+
+  // El WebSocket solo envía cambios: pedir el estado actual una vez
+  if (socketOpen || pollTimer) requestSnapshot(type);
+  else startPolling();
+
+  return () => {
+    listeners[type].delete(callback);
+    subscriptions--;
+    // Sin nadie mostrando logs, el próximo suscriptor necesita la lista completa
+    if (type === "logs" && listeners[type].size === 0) logHead = 0;
+    if (subscriptions === 0) {
+      stopPolling();
+      clearTimeout(retryTimer);
+      if (socket) socket.close();
+    }
+  };
+}
+
+// Envía un comando por el WebSocket; false si no está abierto
+export function sendCommand(command) {
+  if (!socketOpen) return false;
+  socket.send(command);
+  return true;
+}
+
+export async function move(dir) {
+  if (sendCommand("move:" + dir)) return null;
+  return apiGet("/move?dir=" + dir);
+}
 export async function toggleAuto(flag) { return apiGet("/auto?enabled=" + flag); }
 export async function restartESP32() { return apiGet("/restart", true); } // Requiere autenticación
\ No newline at end of file
@@ -0,0 +1,18 @@
+import { useEffect, useState } from "react";
+import { subscribe } from "./useRobotApi";
+
+const replace = (prev, data) => data;
+
+// Sección del estado del robot ("status", "telemetry", "security" o "logs").
+// Llega por el WebSocket compartido o, si no está abierto, por /snapshot.
+// `reduce(prev, data)` permite acumular mensajes incrementales (logs).
+export default function useRobotStream(type, { enabled = true, reduce = replace } = {}) {
+  const [data, setData] = useState(null);
+
+  useEffect(() => {
+    if (!enabled) return;
+    return subscribe(type, (d) => setData((prev) => reduce(prev, d)));
+  }, [type, enabled]);
+
+  return data;
+}
@@ -1,15 +1,5 @@
-import { useEffect, useState } from "react";
-import { apiGet } from "./useRobotApi";
+import useRobotStream from "./useRobotStream";
 
-export default function useStatus() {
-  const [data, setData] = useState(null);
-
-  useEffect(() => {
-    const f = async () => setData(await apiGet("/status"));
-    f();
-    const id = setInterval(f, 1000);
-    return () => clearInterval(id);
-  }, []);
-
-  return data;
-}
\ No newline at end of file
+export default function useStatus(enabled = true) {
+  return useRobotStream("status", { enabled });
+}
@@ -1,15 +1,5 @@
-import { useEffect, useState } from "react";
-import { apiGet } from "./useRobotApi";
+import useRobotStream from "./useRobotStream";
 
-export default function useTelemetry() {
-  const [telemetry, setTelemetry] = useState(null);
-
-  useEffect(() => {
-    const f = async () => setTelemetry(await apiGet("/telemetry"));
-    f();
-    const id = setInterval(f, 800);
-    return () => clearInterval(id);
-  }, []);
-
-  return telemetry;
-}
\ No newline at end of file
+export default function useTelemetry(enabled = true) {
+  return useRobotStream("telemetry", { enabled });
+}